@@ -42,6 +42,11 @@ class BusInterconnectUtils():
 
                     new_master_config.add((s, access))
 
+                if hasattr(m, "with_slaves"):
+                    # keep the additional parameters of the master
+                    # (e.g. :class:`hwtLib.amba.axi_comp.interconnect.arbitration.AxiInterconnectMasterConfig`)
+                    new_master_config = m.with_slaves(new_master_config)
+
             masters.append(new_master_config)
 
         return tuple(masters)
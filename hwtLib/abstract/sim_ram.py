@@ -1,11 +1,16 @@
+from bisect import bisect_left
+from collections.abc import MutableMapping
 from math import ceil
+from struct import calcsize
+from typing import Optional, Tuple, Union
 
 from hwt.hdl.transTmpl import TransTmpl
 from hwt.hdl.types.array import HArray
 from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.struct import HStruct
 from hwt.pyUtils.arrayQuery import grouper
-from pyMathBitPrecise.bit_utils import mask, get_bit_range, int_list_to_int
+from pyMathBitPrecise.bit_utils import mask, get_bit_range, int_list_to_int, \
+    ValidityError
 from hwt.math import shiftIntArray
 
 
@@ -35,29 +40,328 @@ def reshapedInitItems(actualCellSize, requestedCellSize, values):
             f"Reshaping of array from cell size {actualCellSize:d} to {requestedCellSize:d}")
 
 
+class SimRamDictStorage(dict):
+    """
+    dict word index -> int/HValue/None which tracks the end of the used memory
+    (same as :class:`~.SimRamPagedStorage`, so the allocation does not need to search for it)
+
+    :ivar ~.endIndex: index of the first word behind the last present word
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(SimRamDictStorage, self).__init__()
+        self.endIndex = 0
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, index: int, v):
+        if index >= self.endIndex:
+            self.endIndex = index + 1
+        dict.__setitem__(self, index, v)
+
+    def __delitem__(self, index: int):
+        dict.__delitem__(self, index)
+        if index + 1 == self.endIndex:
+            self._updateEndIndex()
+
+    def _updateEndIndex(self):
+        self.endIndex = max(self.keys()) + 1 if self else 0
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def setdefault(self, index: int, default=None):
+        if index not in self:
+            self[index] = default
+        return self[index]
+
+    def pop(self, index: int, *default):
+        v = dict.pop(self, index, *default)
+        if index + 1 == self.endIndex:
+            self._updateEndIndex()
+        return v
+
+    def popitem(self):
+        item = dict.popitem(self)
+        if item[0] + 1 == self.endIndex:
+            self._updateEndIndex()
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        self.endIndex = 0
+
+
+class SimRamPagedStorage(MutableMapping):
+    """
+    Dict-like storage of memory words (word index -> int/HValue/None)
+    which keeps the data in lazily allocated pages of fixed size.
+
+    Each page is a bytearray of data with a parallel validity bitmap
+    (one bit for each data bit) and a flag for each word which tells
+    if the word is present (an equivalent of the key in dict).
+    Fully valid words are returned as int, words without any valid bit
+    as None and partially valid words as Bits HValue.
+
+    :ivar ~.cellSize: size of the word in bytes
+    :ivar ~.pageWords: number of words in a single page
+    :ivar ~.pages: dict page index -> tuple (data, validity, present)
+    :ivar ~.endIndex: index of the first word behind the last present word
+    """
+
+    def __init__(self, cellSize: int, pageWords: int=4096):
+        self.cellSize = cellSize
+        self.pageWords = pageWords
+        self.pageBytes = pageWords * cellSize
+        self.word_t = Bits(cellSize * 8)
+        self.allMask = mask(cellSize * 8)
+        self.pages = {}
+        self.endIndex = 0
+        self._len = 0
+
+    def _getPage(self, index: int, create: bool) -> Tuple[Optional[Tuple[bytearray, bytearray, bytearray]], int]:
+        """
+        :return: tuple (page or None, index of word in page)
+        """
+        if index < 0:
+            raise KeyError(index)
+        pageIndex, offset = divmod(index, self.pageWords)
+        p = self.pages.get(pageIndex, None)
+        if p is None and create:
+            p = self.pages[pageIndex] = (
+                bytearray(self.pageBytes),
+                bytearray(self.pageBytes),
+                bytearray(self.pageWords),
+            )
+        return p, offset
+
+    def __getitem__(self, index: int):
+        p, offset = self._getPage(index, False)
+        if p is None or not p[2][offset]:
+            raise KeyError(index)
+
+        data, vld, _ = p
+        start = offset * self.cellSize
+        end = start + self.cellSize
+        vld_mask = int.from_bytes(vld[start:end], "little")
+        if vld_mask == self.allMask:
+            return int.from_bytes(data[start:end], "little")
+        elif vld_mask == 0:
+            return None
+        else:
+            return self.word_t.from_py(
+                int.from_bytes(data[start:end], "little"), vld_mask)
+
+    def __setitem__(self, index: int, v):
+        if v is None:
+            val = 0
+            vld_mask = 0
+        elif isinstance(v, int):
+            assert v >= 0 and v <= self.allMask, (
+                "Value does not fit in to the memory word", index, v, self.cellSize)
+            val = v
+            vld_mask = self.allMask
+        else:
+            assert v._dtype.bit_length() <= self.cellSize * 8, (
+                "Value does not fit in to the memory word", index, v, self.cellSize)
+            val = v.val
+            vld_mask = v.vld_mask
+
+        p, offset = self._getPage(index, True)
+        data, vld, present = p
+        if not present[offset]:
+            present[offset] = 1
+            self._len += 1
+            if index >= self.endIndex:
+                self.endIndex = index + 1
+
+        start = offset * self.cellSize
+        end = start + self.cellSize
+        data[start:end] = (val & vld_mask).to_bytes(self.cellSize, "little")
+        vld[start:end] = vld_mask.to_bytes(self.cellSize, "little")
+
+    def __delitem__(self, index: int):
+        p, offset = self._getPage(index, False)
+        if p is None or not p[2][offset]:
+            raise KeyError(index)
+
+        data, vld, present = p
+        present[offset] = 0
+        start = offset * self.cellSize
+        end = start + self.cellSize
+        data[start:end] = bytes(self.cellSize)
+        vld[start:end] = bytes(self.cellSize)
+        self._len -= 1
+        if index + 1 == self.endIndex:
+            self._updateEndIndex()
+
+    def _updateEndIndex(self):
+        for pageIndex in sorted(self.pages.keys(), reverse=True):
+            present = self.pages[pageIndex][2]
+            for i in range(self.pageWords - 1, -1, -1):
+                if present[i]:
+                    self.endIndex = pageIndex * self.pageWords + i + 1
+                    return
+        self.endIndex = 0
+
+    def __contains__(self, index):
+        if not isinstance(index, int):
+            return False
+        p, offset = self._getPage(index, False)
+        return p is not None and bool(p[2][offset])
+
+    def __iter__(self):
+        for pageIndex in sorted(self.pages.keys()):
+            base = pageIndex * self.pageWords
+            for i, isPresent in enumerate(self.pages[pageIndex][2]):
+                if isPresent:
+                    yield base + i
+
+    def __len__(self):
+        return self._len
+
+    def _iterPageChunks(self, addr: int, size: int, create: bool):
+        """
+        Split the byte range to parts which are in a single page
+
+        :return: generator of tuples (page index, page or None,
+            offset in page, size of part)
+        """
+        if addr < 0:
+            raise ValueError("Negative address", addr)
+        pageBytes = self.pageBytes
+        while size:
+            pageIndex, offset = divmod(addr, pageBytes)
+            p = self.pages.get(pageIndex, None)
+            if p is None and create:
+                p, _ = self._getPage(pageIndex * self.pageWords, True)
+            n = min(size, pageBytes - offset)
+            yield pageIndex, p, offset, n
+            addr += n
+            size -= n
+
+    def readBytes(self, addr: int, size: int) -> memoryview:
+        """
+        :return: memoryview of the memory bytes, if the range is in a single
+            page the memoryview is a zero-copy view of the page
+            (it reflects the later changes of the memory)
+        :raise ValidityError: if some byte in range is not fully valid
+        """
+        chunks = []
+        for _, p, offset, n in self._iterPageChunks(addr, size, False):
+            if p is None:
+                raise ValidityError(
+                    "Invalid read of uninitialized value on addr 0x%x" % addr)
+            vld = p[1]
+            if vld[offset:offset + n].count(0xff) != n:
+                for i in range(offset, offset + n):
+                    if vld[i] != 0xff:
+                        break
+                raise ValidityError(
+                    "Invalid read of uninitialized value on addr 0x%x" % (addr + i - offset))
+            chunks.append(memoryview(p[0])[offset:offset + n])
+            addr += n
+
+        if len(chunks) == 1:
+            return chunks[0]
+        else:
+            return memoryview(b"".join(chunks))
+
+    def writeBytes(self, addr: int, data: Union[bytes, bytearray, memoryview]):
+        """
+        Write bytes to memory and mark them as valid
+        """
+        data = memoryview(data).cast("B")
+        cellSize = self.cellSize
+        pageWords = self.pageWords
+        i = 0
+        for pageIndex, p, offset, n in self._iterPageChunks(addr, len(data), True):
+            d, vld, present = p
+            d[offset:offset + n] = data[i:i + n]
+            vld[offset:offset + n] = b"\xff" * n
+            w0 = offset // cellSize
+            w1 = (offset + n + cellSize - 1) // cellSize
+            newWords = present[w0:w1].count(0)
+            if newWords:
+                present[w0:w1] = b"\x01" * (w1 - w0)
+                self._len += newWords
+                end = pageIndex * pageWords + w1
+                if end > self.endIndex:
+                    self.endIndex = end
+            i += n
+
+
 class SimRam():
     """
     Dense memory for simulation purposes with data pump interfaces
 
-    :ivar ~.data: memory dict
+    :ivar ~.data: memory dict (:class:`~.SimRamDictStorage`
+        or :class:`~.SimRamPagedStorage` if paged)
+    :ivar ~.allocations: dict address -> tuple (word index, word cnt)
+        of the memory blocks allocated by malloc/calloc
+    :ivar ~.freeList: list of tuples (word index, word cnt)
+        of the memory blocks released by free which can be reused,
+        sorted by the word index, the adjacent blocks are merged
     """
 
-    def __init__(self, cellSize, parent=None):
+    def __init__(self, cellSize, parent=None, paged=False, pageWords: int=4096):
         """
         :param cellWidth: width of items in memory
         :param clk: clk signal for synchronization
         :param parent: parent instance of SimRam
                        (memory will be shared with this instance)
+        :param paged: if True the :class:`~.SimRamPagedStorage` is used
+            instead of dict to store the memory words
+            (the memory consumption is lower)
+        :param pageWords: number of words in a single page if paged
         """
 
         self.parent = parent
         if parent is None:
-            self.data = {}
+            if paged:
+                self.data = SimRamPagedStorage(cellSize, pageWords=pageWords)
+            else:
+                self.data = SimRamDictStorage()
+            self.allocations = {}
+            self.freeList = []
         else:
             self.data = parent.data
+            self.allocations = parent.allocations
+            self.freeList = parent.freeList
         self.cellSize = cellSize
         self.prevAllocatedAddrEnd = 0
 
+    def _allocationStart(self, keepOut):
+        """
+        Resolve the address behind the last used memory word
+        """
+        addr = self.prevAllocatedAddrEnd
+        endIndex = self.data.endIndex
+        if endIndex:
+            addr = endIndex * self.cellSize
+
+        if keepOut:
+            addr += keepOut
+        return addr
+
+    def _reuseFreeBlock(self, wordCnt: int, keepOut) -> Optional[int]:
+        """
+        Take the first block from free list which is large enough
+
+        :return: word index of the block or None if there is not any
+        """
+        if keepOut:
+            return None
+        fl = self.freeList
+        for i, (indx, cnt) in enumerate(fl):
+            if cnt >= wordCnt:
+                if cnt == wordCnt:
+                    del fl[i]
+                else:
+                    fl[i] = (indx + wordCnt, cnt - wordCnt)
+                return indx
+        return None
+
     def malloc(self, size, keepOut=None):
         """
         Allocates a block of memory of size and initialize it
@@ -68,30 +372,31 @@ class SimRam():
                         and lastly allocated
         :return: address of allocated memory
         """
-        addr = self.prevAllocatedAddrEnd
-        k = self.data.keys()
-        if k:
-            addr = (max(k) + 1) * self.cellSize
-
-        if keepOut:
-            addr += keepOut
-
-        indx = addr // self.cellSize
-        if indx * self.cellSize != addr:
-            NotImplementedError(
-                f"unaligned allocations not implemented (0x{addr:x})")
+        wordCnt = size // self.cellSize
+        indx = self._reuseFreeBlock(wordCnt, keepOut)
+        reused = indx is not None
+        if reused:
+            addr = indx * self.cellSize
+        else:
+            addr = self._allocationStart(keepOut)
+            indx = addr // self.cellSize
+            if indx * self.cellSize != addr:
+                NotImplementedError(
+                    f"unaligned allocations not implemented (0x{addr:x})")
 
         d = self.data
-        for i in range(size // self.cellSize):
+        for i in range(wordCnt):
             tmp = indx + i
 
-            if tmp in d.keys():
+            if not reused and tmp in d:
                 raise AllocationError(
                     "Address 0x%x is already occupied" % (tmp * self.cellSize))
 
             d[tmp] = None
 
-        self.prevAllocatedAddrEnd = addr
+        self.allocations[addr] = (indx, wordCnt)
+        if not reused:
+            self.prevAllocatedAddrEnd = addr
         return addr
 
     def calloc(self, num, size, keepOut=None, initValues=None) -> int:
@@ -106,17 +411,17 @@ class SimRam():
         :param initValues: iterable of word values to init memory with
         :return: address (byte step) of allocated memory
         """
-        addr = self.prevAllocatedAddrEnd
-        k = self.data.keys()
-        if k:
-            addr = (max(k) + 1) * self.cellSize
-
-        if keepOut:
-            addr += keepOut
-
-        indx = addr // self.cellSize
-        shift = addr % self.cellSize
         wordCnt = ceil((num * size) / self.cellSize)
+        indx = self._reuseFreeBlock(wordCnt, keepOut)
+        reused = indx is not None
+        if reused:
+            addr = indx * self.cellSize
+            shift = 0
+        else:
+            addr = self._allocationStart(keepOut)
+            indx = addr // self.cellSize
+            shift = addr % self.cellSize
+
         if shift:
             # shift all data in init values
             initValues = shiftIntArray(initValues, self.cellSize * 8, shift * 8)
@@ -133,7 +438,7 @@ class SimRam():
         for i in range(wordCnt):
             tmp = indx + i
 
-            if tmp in d.keys():
+            if not reused and tmp in d:
                 raise AllocationError(
                     "Address 0x%x is already occupied" % (tmp * self.cellSize))
             if initValues is None:
@@ -141,9 +446,122 @@ class SimRam():
             else:
                 d[tmp] = initValues[i]
 
-        self.prevAllocatedAddrEnd = (indx + wordCnt) * self.cellSize
+        self.allocations[addr] = (indx, wordCnt)
+        if not reused:
+            self.prevAllocatedAddrEnd = (indx + wordCnt) * self.cellSize
         return addr
 
+    def free(self, addr: int):
+        """
+        Release the memory block allocated by malloc/calloc,
+        the content of the block is invalidated and the block
+        is reused by next allocations (without keepOut) which fits in to it
+
+        :param addr: address returned by malloc/calloc
+        """
+        try:
+            indx, wordCnt = self.allocations.pop(addr)
+        except KeyError:
+            raise AllocationError(
+                "Address 0x%x was not allocated" % addr) from None
+
+        d = self.data
+        for i in range(indx, indx + wordCnt):
+            d[i] = None
+
+        # insert the block in to the sorted free list and merge it with its neighbors
+        fl = self.freeList
+        i = bisect_left(fl, (indx, wordCnt))
+        if i < len(fl) and fl[i][0] == indx + wordCnt:
+            wordCnt += fl[i][1]
+            del fl[i]
+        if i > 0 and fl[i - 1][0] + fl[i - 1][1] == indx:
+            i -= 1
+            indx, prevCnt = fl[i]
+            wordCnt += prevCnt
+            del fl[i]
+        fl.insert(i, (indx, wordCnt))
+
+    def read_bytes(self, addr: int, size: int) -> bytes:
+        """
+        Read the memory content as bytes (little endian)
+
+        :raise ValidityError: if some byte in range is not fully valid
+        """
+        d = self.data
+        if isinstance(d, SimRamPagedStorage):
+            return bytes(d.readBytes(addr, size))
+
+        v = self.getBits(addr * 8, (addr + size) * 8, False)
+        if v.vld_mask != mask(size * 8):
+            raise ValidityError(
+                "Invalid read of uninitialized value in 0x%x-0x%x" % (addr, addr + size))
+        return v.val.to_bytes(size, "little")
+
+    def write_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview]):
+        """
+        Write bytes (little endian) to the memory
+        """
+        d = self.data
+        if isinstance(d, SimRamPagedStorage):
+            d.writeBytes(addr, data)
+            return
+
+        data = bytes(data)
+        cellSize = self.cellSize
+        wordMask = mask(cellSize * 8)
+        word_t = Bits(cellSize * 8)
+        end = addr + len(data)
+        i = addr // cellSize
+        while i * cellSize < end:
+            wordStart = i * cellSize
+            start = max(addr, wordStart)
+            wordEnd = min(end, wordStart + cellSize)
+            offset = (start - wordStart) * 8
+            width = (wordEnd - start) * 8
+            val = int.from_bytes(data[start - addr:wordEnd - addr], "little")
+            if width == cellSize * 8:
+                d[i] = val
+            else:
+                cur = d.get(i, None)
+                if cur is None:
+                    cur_val = 0
+                    cur_mask = 0
+                elif isinstance(cur, int):
+                    cur_val = cur
+                    cur_mask = wordMask
+                else:
+                    cur_val = cur.val
+                    cur_mask = cur.vld_mask
+                m = mask(width) << offset
+                cur_val = (cur_val & ~m) | (val << offset)
+                cur_mask |= m
+                if cur_mask == wordMask:
+                    d[i] = cur_val
+                else:
+                    d[i] = word_t.from_py(cur_val, cur_mask)
+            i += 1
+
+    def view(self, addr: int, dtype: str, count: int) -> memoryview:
+        """
+        Get memoryview of an array in memory
+
+        :param dtype: struct format character of the array item
+            (e.g. "B", "I", "Q", little endian is expected)
+        :param count: number of items
+        :return: memoryview which can be used e.g. in :func:`numpy.frombuffer`,
+            if the memory is paged and the array is in a single page
+            the view is zero-copy (it reflects the later changes of the memory)
+        :raise ValidityError: if some byte in range is not fully valid
+        """
+        size = calcsize(dtype) * count
+        d = self.data
+        if isinstance(d, SimRamPagedStorage):
+            data = d.readBytes(addr, size)
+        else:
+            data = memoryview(self.read_bytes(addr, size))
+        return data.cast("B").cast(dtype)
+
     def getArray(self, addr: int, item_size: int, item_cnt: int):
         """
         Get array stored in memory
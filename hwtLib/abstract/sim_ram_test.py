@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from hwt.hdl.types.bits import Bits
+from hwtLib.abstract.sim_ram import SimRam, SimRamPagedStorage, \
+    AllocationError, SimRamDictStorage
+from pyMathBitPrecise.bit_utils import ValidityError
+
+
+class SimRamPagedStorage_TC(unittest.TestCase):
+
+    def test_dict_like(self):
+        d = SimRamPagedStorage(4, pageWords=8)
+        self.assertEqual(len(d), 0)
+        self.assertNotIn(0, d)
+        d[3] = 0x12345678
+        d[20] = None
+        self.assertEqual(len(d), 2)
+        self.assertEqual(d[3], 0x12345678)
+        self.assertIsNone(d[20])
+        self.assertIsNone(d.get(21, None))
+        with self.assertRaises(KeyError):
+            d[2]
+        self.assertSequenceEqual(list(d.keys()), [3, 20])
+        self.assertEqual(d.endIndex, 21)
+        self.assertEqual(len(d.pages), 2)
+
+        del d[20]
+        self.assertEqual(d.endIndex, 4)
+        self.assertSequenceEqual(list(d.items()), [(3, 0x12345678)])
+
+    def test_partially_valid(self):
+        d = SimRamPagedStorage(2)
+        t = Bits(16)
+        d[0] = t.from_py(0xab00, 0xff00)
+        v = d[0]
+        self.assertEqual(v.val, 0xab00)
+        self.assertEqual(v.vld_mask, 0xff00)
+        d[1] = t.from_py(0xabcd)
+        self.assertEqual(d[1], 0xabcd)
+
+    def test_value_too_wide(self):
+        d = SimRamPagedStorage(2)
+        with self.assertRaises(AssertionError):
+            d[0] = 0x10000
+        with self.assertRaises(AssertionError):
+            d[0] = Bits(32).from_py(0)
+        self.assertNotIn(0, d)
+
+
+class SimRamDictStorage_TC(unittest.TestCase):
+
+    def test_end_index(self):
+        d = SimRamDictStorage({2: 0})
+        self.assertEqual(d.endIndex, 3)
+        d[10] = None
+        d.setdefault(5, 1)
+        self.assertEqual(d.endIndex, 11)
+        del d[10]
+        self.assertEqual(d.endIndex, 6)
+        d.pop(5)
+        self.assertEqual(d.endIndex, 3)
+        d.clear()
+        self.assertEqual(d.endIndex, 0)
+
+
+class SimRam_TC(unittest.TestCase):
+
+    def _test_alloc(self, paged):
+        m = SimRam(8, paged=paged)
+        a0 = m.malloc(8 * 4)
+        a1 = m.calloc(4, 8, initValues=[1, 2, 3, 4])
+        self.assertEqual(a0, 0)
+        self.assertEqual(a1, 8 * 4)
+        self.assertEqual(m.getArray(a1, 8, 4), [1, 2, 3, 4])
+        self.assertEqual(m.getArray(a0, 8, 2), [None, None])
+
+        m.free(a0)
+        a2 = m.calloc(2, 8)
+        self.assertEqual(a2, a0)
+        a3 = m.malloc(8 * 2)
+        self.assertEqual(a3, a0 + 2 * 8)
+        a4 = m.malloc(8)
+        self.assertEqual(a4, a1 + 4 * 8)
+        with self.assertRaises(AllocationError):
+            m.free(a4 + 1)
+
+        v = m.getBits(a1 * 8 + 4, a1 * 8 + 64 + 4, False)
+        self.assertEqual(v.val, (2 << 60) | (1 >> 4))
+        self.assertEqual(v.vld_mask, Bits(64).all_mask())
+
+    def _test_free_coalescing(self, paged):
+        m = SimRam(4, paged=paged)
+        a = [m.malloc(4 * 2) for _ in range(4)]
+        m.free(a[2])
+        m.free(a[0])
+        self.assertSequenceEqual(m.freeList, [(0, 2), (4, 2)])
+        m.free(a[1])
+        self.assertSequenceEqual(m.freeList, [(0, 6)])
+        # the merged block is large enough for an allocation which did not fit in to any of the parts
+        a4 = m.malloc(4 * 5)
+        self.assertEqual(a4, a[0])
+        self.assertSequenceEqual(m.freeList, [(5, 1)])
+        m.free(a[3])
+        self.assertSequenceEqual(m.freeList, [(5, 3)])
+
+    def test_free_coalescing_dict(self):
+        self._test_free_coalescing(False)
+
+    def test_free_coalescing_paged(self):
+        self._test_free_coalescing(True)
+
+    def test_alloc_after_direct_write(self):
+        for paged in (False, True):
+            m = SimRam(4, paged=paged)
+            m.data[9] = 0
+            self.assertEqual(m.malloc(4), 10 * 4)
+
+    def test_alloc_dict(self):
+        self._test_alloc(False)
+
+    def test_alloc_paged(self):
+        self._test_alloc(True)
+
+    def _test_bytes(self, paged):
+        m = SimRam(4, paged=paged)
+        a = m.malloc(4 * 4)
+        m.write_bytes(a + 1, b"\x01\x02\x03\x04\x05\x06")
+        self.assertEqual(m.read_bytes(a + 1, 6), b"\x01\x02\x03\x04\x05\x06")
+        with self.assertRaises(ValidityError):
+            m.read_bytes(a, 4)
+        v = m.data[a // 4]
+        self.assertEqual(v.val, 0x03020100)
+        self.assertEqual(v.vld_mask, 0xffffff00)
+        v = m.data[a // 4 + 1]
+        self.assertEqual(v.val, 0x060504)
+        self.assertEqual(v.vld_mask, 0xffffff)
+
+        m.write_bytes(a, b"\x00")
+        self.assertSequenceEqual(list(m.view(a, "H", 3)), [0x0100, 0x0302, 0x0504])
+        self.assertEqual(m.getArray(a, 4, 1), [0x03020100, ])
+
+    def test_bytes_dict(self):
+        self._test_bytes(False)
+
+    def test_bytes_paged(self):
+        self._test_bytes(True)
+
+    def test_view_zero_copy(self):
+        m = SimRam(8, paged=True, pageWords=4)
+        a = m.calloc(8, 8)
+        m.write_bytes(a, bytes(range(64)))
+        v = m.view(a, "Q", 2)
+        m.write_bytes(a, b"\xff")
+        # view is a view of the page
+        self.assertEqual(v[0], 0x07060504030201ff)
+        # crossing the page boundary
+        self.assertEqual(m.read_bytes(a + 30, 4), b"\x1e\x1f\x20\x21")
+        self.assertEqual(len(m.data), 8)
+        self.assertEqual(m.data.endIndex, 8)
+
+    def test_shared_paged(self):
+        m0 = SimRam(4, paged=True)
+        m1 = SimRam(4, parent=m0)
+        a0 = m0.calloc(10, 4)
+        a1 = m1.calloc(10, 4)
+        self.assertIs(m0.data, m1.data)
+        self.assertEqual(a1, a0 + 10 * 4)
+
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(SimRam_TC('test_alloc_paged'))
+    suite.addTest(unittest.makeSuite(SimRamPagedStorage_TC))
+    suite.addTest(unittest.makeSuite(SimRamDictStorage_TC))
+    suite.addTest(unittest.makeSuite(SimRam_TC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+from typing import List, Optional, Tuple, Iterable, Dict, Union
+
+from hwtLib.amba.axi_comp.cache.pseudo_lru import PseudoLru
+from hwtLib.amba.axi_comp.cache.replacement_policy import TrueLru, Srrip, \
+    Brrip, LfsrRandom
+from pyMathBitPrecise.bit_utils import mask
+
+
+class PseudoLruModel():
+    """
+    Python model of :class:`hwtLib.amba.axi_comp.cache.pseudo_lru.PseudoLru` for a single cache set
+
+    :ivar ~.state: list of bits of the tree
+    """
+
+    def __init__(self, items: int, rand: Optional[Random]=None):
+        self.items = items
+        self.state = [0 for _ in range(PseudoLru.lru_reg_width(items))]
+
+    def victim(self) -> int:
+        st = self.state
+        w = len(st)
+        node = 0
+        while True:
+            left = 2 * node + 1
+            right = 2 * node + 2
+            if left >= w:
+                # last level, 1 means that the left item is the LRU
+                return left - w if st[node] else right - w
+            node = right if st[node] else left
+
+    def _items_of_node(self, node: int) -> range:
+        w = len(self.state)
+        first = node
+        last = node
+        while first < w:
+            first = 2 * first + 1
+            last = 2 * last + 2
+        return range(first - w, last - w + 1)
+
+    def on_hit(self, item: int):
+        st = self.state
+        w = len(st)
+        for node in range(w):
+            left = 2 * node + 1
+            in_left = item in self._items_of_node(left)
+            in_right = item in self._items_of_node(left + 1)
+            if in_left or in_right:
+                if left >= w:
+                    st[node] = int(in_right)
+                else:
+                    st[node] = int(in_left)
+
+    def on_insert(self, item: int):
+        self.on_hit(item)
+
+
+class TrueLruModel():
+    """
+    Python model of :class:`hwtLib.amba.axi_comp.cache.replacement_policy.TrueLru` for a single cache set
+
+    :ivar ~.order: list of items, the first one is the least recently used
+    """
+
+    def __init__(self, items: int, rand: Optional[Random]=None):
+        # the state 0 in hardware means that the lower index was used more recently
+        self.order = list(reversed(range(items)))
+
+    def victim(self) -> int:
+        return self.order[0]
+
+    def on_hit(self, item: int):
+        self.order.remove(item)
+        self.order.append(item)
+
+    def on_insert(self, item: int):
+        self.on_hit(item)
+
+
+class SrripModel():
+    """
+    Python model of :class:`hwtLib.amba.axi_comp.cache.replacement_policy.Srrip` for a single cache set
+
+    :ivar ~.rrpv: list of re-reference prediction values
+    """
+    RRPV_WIDTH = Srrip.RRPV_WIDTH
+
+    def __init__(self, items: int, rand: Optional[Random]=None):
+        self.rrpv = [0 for _ in range(items)]
+        self.RRPV_MAX = mask(self.RRPV_WIDTH)
+        self.rand = rand
+
+    def victim(self) -> int:
+        return self.rrpv.index(max(self.rrpv))
+
+    def on_hit(self, item: int):
+        self.rrpv[item] = 0
+
+    def insert_rrpv(self) -> int:
+        return self.RRPV_MAX - 1
+
+    def on_insert(self, item: int):
+        age = self.RRPV_MAX - max(self.rrpv)
+        self.rrpv = [v + age for v in self.rrpv]
+        self.rrpv[item] = self.insert_rrpv()
+
+
+class BrripModel(SrripModel):
+    """
+    Python model of :class:`hwtLib.amba.axi_comp.cache.replacement_policy.Brrip` for a single cache set
+
+    :note: the random bits are generated by Python random generator
+        and not by LFSR as in hardware
+    """
+    RAND_WIDTH = Brrip.RAND_WIDTH
+
+    def insert_rrpv(self) -> int:
+        if self.rand.getrandbits(self.RAND_WIDTH) == mask(self.RAND_WIDTH):
+            return self.RRPV_MAX - 1
+        else:
+            return self.RRPV_MAX
+
+
+class RandomModel():
+    """
+    Python model of :class:`hwtLib.amba.axi_comp.cache.replacement_policy.LfsrRandom` for a single cache set
+    """
+
+    def __init__(self, items: int, rand: Optional[Random]=None):
+        self.items = items
+        self.rand = rand
+
+    def victim(self) -> int:
+        return self.rand.randrange(self.items)
+
+    def on_hit(self, item: int):
+        pass
+
+    def on_insert(self, item: int):
+        pass
+
+
+POLICY_MODELS = {
+    PseudoLru: PseudoLruModel,
+    TrueLru: TrueLruModel,
+    Srrip: SrripModel,
+    Brrip: BrripModel,
+    LfsrRandom: RandomModel,
+}
+
+
+class CacheModel():
+    """
+    Cycle-free Python model of a set associative cache
+    (e.g. :class:`hwtLib.amba.axi_comp.cache.caheWriteAllocWawOnlyWritePropagating.AxiCaheWriteAllocWawOnlyWritePropagating`)
+    which replays a trace of accesses and counts hits and misses.
+    It is meant to be used for a selection of replacement policy and cache
+    parameters for a specific workload before synthesis.
+
+    :ivar ~.tags: list of sets, each set is list of tags for each way (None for invalid way)
+    :ivar ~.policies: the model of replacement policy for each set
+    :ivar ~.stats: dict with counters of accesses, hits and misses
+
+    :note: Same as in the hardware, the item inserted to an empty way does not update
+        the state of the replacement policy, the policy is used (and updated) only if there
+        is no empty way in the set.
+    """
+
+    def __init__(self, CACHE_LINE_SIZE: int, CACHE_LINE_CNT: int, WAY_CNT: int,
+                 REPLACEMENT_POLICY=PseudoLru,
+                 ALLOCATE_ON_READ=False, seed: int=0):
+        """
+        :param REPLACEMENT_POLICY: the hardware replacement policy class
+            (key in :data:`~.POLICY_MODELS`)
+        :param ALLOCATE_ON_READ: if False the read miss does not load the cacheline
+            (the reads which are not in the cache are just forwarded to the memory)
+        :param seed: seed for the random generator of randomized policies
+        """
+        assert CACHE_LINE_CNT % WAY_CNT == 0, (CACHE_LINE_CNT, WAY_CNT)
+        self.CACHE_LINE_SIZE = CACHE_LINE_SIZE
+        self.CACHE_LINE_CNT = CACHE_LINE_CNT
+        self.WAY_CNT = WAY_CNT
+        self.SET_CNT = CACHE_LINE_CNT // WAY_CNT
+        self.ALLOCATE_ON_READ = ALLOCATE_ON_READ
+        self.REPLACEMENT_POLICY = REPLACEMENT_POLICY
+        model_cls = POLICY_MODELS[REPLACEMENT_POLICY]
+        rand = Random(seed)
+        self.tags: List[List[Optional[int]]] = [
+            [None for _ in range(WAY_CNT)] for _ in range(self.SET_CNT)]
+        self.policies = [model_cls(WAY_CNT, rand) for _ in range(self.SET_CNT)]
+        self.stats = {
+            "read_cnt": 0,
+            "write_cnt": 0,
+            "read_hit_cnt": 0,
+            "write_hit_cnt": 0,
+            "eviction_cnt": 0,
+        }
+
+    def parse_addr(self, addr: int) -> Tuple[int, int]:
+        """
+        :return: tuple (tag, index)
+        """
+        line = addr // self.CACHE_LINE_SIZE
+        return line // self.SET_CNT, line % self.SET_CNT
+
+    def access(self, addr: int, is_write: bool=False) -> bool:
+        """
+        Perform a single access to the cache
+
+        :return: True if the access was a hit
+        """
+        st = self.stats
+        st["write_cnt" if is_write else "read_cnt"] += 1
+        tag, index = self.parse_addr(addr)
+        tags = self.tags[index]
+        policy = self.policies[index]
+        try:
+            way = tags.index(tag)
+        except ValueError:
+            way = None
+
+        if way is not None:
+            st["write_hit_cnt" if is_write else "read_hit_cnt"] += 1
+            policy.on_hit(way)
+            return True
+
+        if is_write or self.ALLOCATE_ON_READ:
+            try:
+                way = tags.index(None)
+            except ValueError:
+                way = policy.victim()
+                policy.on_insert(way)
+                st["eviction_cnt"] += 1
+            tags[way] = tag
+
+        return False
+
+    def replay(self, trace: Iterable[Union[int, Tuple[bool, int]]]) -> dict:
+        """
+        :param trace: iterable of addresses (reads) or tuples (is_write, addr)
+        :return: the stats extended with the hit_rate
+        """
+        for item in trace:
+            if isinstance(item, int):
+                self.access(item)
+            else:
+                is_write, addr = item
+                self.access(addr, is_write)
+
+        return self.report()
+
+    def report(self) -> dict:
+        res = dict(self.stats)
+        acc = res["read_cnt"] + res["write_cnt"]
+        hits = res["read_hit_cnt"] + res["write_hit_cnt"]
+        res["hit_rate"] = hits / acc if acc else None
+        return res
+
+
+def parse_trace(lines: Iterable[str]) -> List[Tuple[bool, int]]:
+    """
+    Parse the trace file, each line is "<addr>" (read) or "R <addr>" or "W <addr>",
+    the address is a Python int literal (e.g. 0x10 or 16), empty lines and lines
+    starting with # are ignored
+
+    :return: list of tuples (is_write, addr)
+    """
+    res = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        if len(parts) == 1:
+            res.append((False, int(parts[0], 0)))
+        else:
+            rw, addr = parts
+            rw = rw.upper()
+            assert rw in ("R", "W"), line
+            res.append((rw == "W", int(addr, 0)))
+    return res
+
+
+def compare_policies(trace: List[Union[int, Tuple[bool, int]]],
+                     policies=tuple(POLICY_MODELS.keys()),
+                     **cache_kwargs) -> Dict[str, dict]:
+    """
+    Replay the trace for each replacement policy
+
+    :param cache_kwargs: the arguments for :class:`~.CacheModel`
+    :return: dict policy name: stats from :meth:`CacheModel.replay`
+    """
+    res = {}
+    for p in policies:
+        m = CacheModel(REPLACEMENT_POLICY=p, **cache_kwargs)
+        res[p.__name__] = m.replay(trace)
+    return res
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay an address trace and print the hit rate for each replacement policy")
+    parser.add_argument("trace", help="file with the trace (see parse_trace())")
+    parser.add_argument("--cache-line-size", type=int, default=64)
+    parser.add_argument("--cache-line-cnt", type=int, default=4 * 4096)
+    parser.add_argument("--way-cnt", type=int, default=4)
+    parser.add_argument("--allocate-on-read", action="store_true")
+    args = parser.parse_args()
+    with open(args.trace) as f:
+        trace = parse_trace(f)
+
+    res = compare_policies(trace,
+                           CACHE_LINE_SIZE=args.cache_line_size,
+                           CACHE_LINE_CNT=args.cache_line_cnt,
+                           WAY_CNT=args.way_cnt,
+                           ALLOCATE_ON_READ=args.allocate_on_read)
+    for name, st in sorted(res.items(), key=lambda x: -(x[1]["hit_rate"] or 0)):
+        print(f"{name:12s} {st['hit_rate'] or 0:.4f}")
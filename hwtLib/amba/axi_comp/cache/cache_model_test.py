@@ -0,0 +1,88 @@
+from random import Random
+import unittest
+
+from hwtLib.amba.axi_comp.cache.cache_model import CacheModel, parse_trace, \
+    compare_policies, POLICY_MODELS
+from hwtLib.amba.axi_comp.cache.pseudo_lru import PseudoLru
+from hwtLib.amba.axi_comp.cache.replacement_policy import TrueLru, Srrip, \
+    Brrip
+
+
+class CacheModel_TC(unittest.TestCase):
+    CACHE_LINE_SIZE = 64
+    CACHE_LINE_CNT = 16
+    WAY_CNT = 4
+
+    def mk_model(self, **kwargs):
+        return CacheModel(self.CACHE_LINE_SIZE, self.CACHE_LINE_CNT, self.WAY_CNT, **kwargs)
+
+    def test_parse_trace(self):
+        trace = parse_trace([
+            "# comment",
+            "0x40",
+            "",
+            "W 0x80",
+            "r 128",
+        ])
+        self.assertEqual(trace, [(False, 0x40), (True, 0x80), (False, 128)])
+
+    def test_read_does_not_allocate(self):
+        m = self.mk_model()
+        st = m.replay([0, 0, 64])
+        self.assertEqual(st["read_hit_cnt"], 0)
+        self.assertEqual(st["hit_rate"], 0)
+
+        m = self.mk_model(ALLOCATE_ON_READ=True)
+        st = m.replay([0, 0, 64, 64 + 32])
+        self.assertEqual(st["read_hit_cnt"], 2)
+        self.assertEqual(st["hit_rate"], 0.5)
+
+    def test_write_allocate(self):
+        m = self.mk_model()
+        st = m.replay([(True, 0), (False, 0), (False, 8), (True, 0)])
+        self.assertEqual(st["read_hit_cnt"], 2)
+        self.assertEqual(st["write_hit_cnt"], 1)
+        self.assertEqual(st["eviction_cnt"], 0)
+
+    def test_lru_eviction(self):
+        SET_CNT = self.CACHE_LINE_CNT // self.WAY_CNT
+        SET_STEP = self.CACHE_LINE_SIZE * SET_CNT
+        # WAY_CNT + 1 lines in the same set, used in cycle
+        trace = [(True, (i % (self.WAY_CNT + 1)) * SET_STEP) for i in range(10 * (self.WAY_CNT + 1))]
+        # the LRU like policies always evict the line which will be used next
+        # (only the lines placed to empty ways do not update the state of the policy)
+        for p in (TrueLru, PseudoLru, Srrip):
+            st = self.mk_model(REPLACEMENT_POLICY=p).replay(trace)
+            self.assertLessEqual(st["write_hit_cnt"], self.WAY_CNT, p)
+
+        # BRRIP keeps most of the lines and it is thrash resistant
+        st = self.mk_model(REPLACEMENT_POLICY=Brrip).replay(trace)
+        self.assertGreater(st["write_hit_cnt"], len(trace) // 2)
+
+    def test_compare_policies(self, N=2000):
+        rand = Random(0)
+        # hot set of lines with scans of the lines which are not used again
+        trace = []
+        scan_addr = 1 << 20
+        for _ in range(N):
+            if rand.randint(0, 3):
+                trace.append((True, rand.randrange(8) * self.CACHE_LINE_SIZE))
+            else:
+                scan_addr += self.CACHE_LINE_SIZE
+                trace.append((True, scan_addr))
+
+        res = compare_policies(trace,
+                               CACHE_LINE_SIZE=self.CACHE_LINE_SIZE,
+                               CACHE_LINE_CNT=self.CACHE_LINE_CNT,
+                               WAY_CNT=self.WAY_CNT)
+        self.assertSetEqual(set(res.keys()), set(p.__name__ for p in POLICY_MODELS.keys()))
+        for st in res.values():
+            self.assertEqual(st["write_cnt"], N)
+            self.assertGreater(st["hit_rate"], 0)
+        # the scan resistant policies are better than LRU for this trace
+        self.assertGreater(res[Srrip.__name__]["hit_rate"], res[TrueLru.__name__]["hit_rate"])
+        self.assertGreater(res[Brrip.__name__]["hit_rate"], res[TrueLru.__name__]["hit_rate"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,34 +3,38 @@
 
 from math import ceil
 
-from hwt.code import If, Or, SwitchLogic, In
+from hwt.code import If, Or, SwitchLogic, In, Concat
 from hwt.code_utils import rename_signal
 from hwt.hdl.constants import READ, WRITE
 from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.defs import BIT
 from hwt.hdl.types.struct import HStruct
-from hwt.interfaces.std import BramPort_withoutClk, Handshaked, HandshakeSync
+from hwt.interfaces.std import BramPort_withoutClk, Handshaked, HandshakeSync, \
+    Signal
 from hwt.interfaces.structIntf import HdlType_to_Interface
 from hwt.interfaces.utils import addClkRstn, propagateClkRstn
 from hwt.math import log2ceil
 from hwt.synthesizer.hObjList import HObjList
 from hwt.synthesizer.param import Param
-from hwtLib.amba.axi4 import Axi4, Axi4_r, Axi4_addr
+from hwtLib.amba.axi4 import Axi4, Axi4_r, Axi4_addr, Axi4_b
 from hwtLib.amba.axi_comp.cache.addrTypeConfig import CacheAddrTypeConfig
 from hwtLib.amba.axi_comp.cache.lru_array import AxiCacheLruArray, IndexWayHs
+from hwtLib.amba.axi_comp.cache.mshr import AxiCacheMshrFile
+from hwtLib.amba.axi_comp.cache.pseudo_lru import PseudoLru
 from hwtLib.amba.axi_comp.cache.tag_array import AxiCacheTagArray, \
     AxiCacheTagArrayLookupResIntf, AxiCacheTagArrayUpdateIntf
 from hwtLib.amba.axis_comp.builder import AxiSBuilder
 from hwtLib.amba.constants import RESP_OKAY, BURST_INCR, CACHE_DEFAULT, \
     LOCK_DEFAULT, BYTES_IN_TRANS, PROT_DEFAULT, QOS_DEFAULT
 from hwtLib.common_nonstd_interfaces.addr_data_hs import AddrDataHs
-from hwtLib.common_nonstd_interfaces.addr_hs import AddrHs
+from hwtLib.common_nonstd_interfaces.addr_hs import AddrHs, AddrHsAgent
 from hwtLib.handshaked.builder import HsBuilder
 from hwtLib.handshaked.ramAsHs import RamAsHs, RamHsR
 from hwtLib.handshaked.reg import HandshakedReg
 from hwtLib.handshaked.streamNode import StreamNode
 from hwtLib.logic.binToOneHot import binToOneHot
 from hwtLib.mem.ram import RamSingleClock
+from hwtSimApi.hdlSimulator import HdlSimulator
 from pyMathBitPrecise.bit_utils import mask
 
 
@@ -48,11 +52,57 @@ class HsStructIntf(HandshakeSync):
         HandshakeSync._declr(self)
 
 
+class AxiCacheFlushIntf(AddrHs):
+    """
+    An interface for a request to write back (clean) the cacheline
+    specified by the address if it is present in the cache and it is dirty
+
+    :ivar invalidate: if 1 the cacheline is also removed from the cache
+
+    .. hwt-autodoc::
+    """
+
+    def _declr(self):
+        AddrHs._declr(self)
+        self.invalidate = Signal()
+
+    def _initSimAgent(self, sim: HdlSimulator):
+        self._ag = AxiCacheFlushIntfAgent(sim, self)
+
+
+class AxiCacheFlushIntfAgent(AddrHsAgent):
+    """
+    Simulation agent for :class:`~.AxiCacheFlushIntf`
+
+    :note: the data format is (id, addr, invalidate) or (addr, invalidate) if ID_WIDTH == 0
+    """
+
+    def set_data(self, data):
+        if data is None:
+            d, invalidate = None, None
+        else:
+            *d, invalidate = data
+            d = tuple(d) if len(d) > 1 else d[0]
+        AddrHsAgent.set_data(self, d)
+        self.intf.invalidate.write(invalidate)
+
+    def get_data(self):
+        d = AddrHsAgent.get_data(self)
+        invalidate = self.intf.invalidate.read()
+        if self.intf.ID_WIDTH:
+            return (*d, invalidate)
+        else:
+            return (d, invalidate)
+
+
 class data_trans_t():
     read = 0
     read_and_write = 1
     write = 2
     write_and_flush = 3
+    # only for WRITE_BACK, requests from flush port
+    flush = 4  # write back of the dirty cacheline
+    flush_no_data = 5  # the cacheline is not dirty or not present
 
 # [TODO] complete IO for functions
 #   sorted io of components
@@ -86,6 +136,24 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
     :see: :class:`hwtLib.amba.axi_comp.cache.CacheAddrTypeConfig`
     :ivar DATA_WIDTH: data width of interfaces
     :ivar WAY_CNT: number of places where one cache line can be stored
+    :ivar REPLACEMENT_POLICY: the replacement policy used in lru_array
+        (:mod:`hwtLib.amba.axi_comp.cache.replacement_policy`),
+        :class:`hwtLib.amba.axi_comp.cache.cache_model.CacheModel` can be used to compare
+        the policies on an address trace
+    :ivar MSHR_CNT: number of outstanding read misses tracked in :class:`~.AxiCacheMshrFile`,
+        0 means that the read misses are passed directly to "m" interface
+    :ivar MSHR_TARGET_CNT: max number of read misses to the same cacheline merged in to a single
+        read from "m" interface
+    :ivar WRITE_BACK: if True the tag_array stores a dirty flag for each cacheline
+        and only the dirty victims are written to "m" interface, the "flush" port is also available
+        to write back (and optionally invalidate) a cacheline explicitly.
+        If False every victim is written to "m" interface.
+    :ivar flush: (only if WRITE_BACK) port to clean/flush the cacheline specified by the address,
+        the request waits until all previous writes are finished and blocks new writes
+        until it is accepted
+    :ivar flush_ack: (only if WRITE_BACK) the response for flush request with the id of the request
+    :note: The flush_ack is sent once the data is sent to "m" interface, the response on m.b is not awaited
+        (same as for a regular write back of a victim).
 
     :note: 1-way associative = directly mapped
     :note: This cache does not check access colisions with a requests to main (slave) memory.
@@ -109,6 +177,10 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
         Axi4._config(self)
         self.WAY_CNT = Param(4)
         self.MAX_BLOCK_DATA_WIDTH = Param(None)
+        self.MSHR_CNT = Param(0)
+        self.MSHR_TARGET_CNT = Param(4)
+        self.REPLACEMENT_POLICY = Param(PseudoLru)
+        self.WRITE_BACK = Param(False)
         CacheAddrTypeConfig._config(self)
 
     def _declr(self):
@@ -130,6 +202,15 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
             for a in [self.tag_array, self.lru_array]:
                 a.PORT_CNT = 2  # r+w
 
+            if self.WRITE_BACK:
+                self.flush = AxiCacheFlushIntf()
+                self.flush_ack = Axi4_b()._m()
+
+        self.tag_array.HAS_DIRTY = self.WRITE_BACK
+        if self.WRITE_BACK:
+            # the id of lookup in tag_array has also flags (is_flush, invalidate) for flush requests
+            self.tag_array.ID_WIDTH = self.ID_WIDTH + 2
+
         # self.flush = HandshakeSync()
         # self.init = HandshakeSync()
 
@@ -143,6 +224,16 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
         data_array.PORT_CNT = (READ, WRITE)
         data_array.HAS_BE = True
 
+        if self.MSHR_CNT:
+            # the MSHR tracks whole cachelines, which are read in a single beat
+            assert self.CACHE_LINE_SIZE * 8 == self.DATA_WIDTH, (self.CACHE_LINE_SIZE, self.DATA_WIDTH)
+            mshr = self.mshr = AxiCacheMshrFile()
+            mshr.ADDR_WIDTH = self.ADDR_WIDTH - self.OFFSET_W
+            mshr.ID_WIDTH = self.ID_WIDTH
+            mshr.DATA_WIDTH = self.DATA_WIDTH
+            mshr.MSHR_CNT = self.MSHR_CNT
+            mshr.TARGET_CNT = self.MSHR_TARGET_CNT
+
     def axiAddrDefaults(self, a: Axi4_addr):
         a.burst(BURST_INCR)
         a.cache(CACHE_DEFAULT)
@@ -156,20 +247,74 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
         # connect address lookups to a tag array
         tags = self.tag_array
         for a, tag_lookup in zip((in_ar, in_aw), tags.lookup):
-            tag_lookup.addr(a.addr)
-            tag_lookup.id(a.id)
             if a is in_aw:
                 rc = self.read_cancel
                 rc.addr(a.addr)
-                StreamNode([a], [tag_lookup, rc]).sync()
+                if self.WRITE_BACK:
+                    self.connect_aw_and_flush_tag_lookup(tag_lookup, rc)
+                else:
+                    tag_lookup.addr(a.addr)
+                    tag_lookup.id(a.id)
+                    StreamNode([a], [tag_lookup, rc]).sync()
             else:
+                tag_lookup.addr(a.addr)
+                if self.WRITE_BACK:
+                    tag_lookup.id(Concat(Bits(2).from_py(0), a.id))
+                else:
+                    tag_lookup.id(a.id)
                 StreamNode([a], [tag_lookup]).sync()
 
+    def connect_aw_and_flush_tag_lookup(self, tag_lookup: AddrHs, rc: AddrHs):
+        """
+        Share the tag_array lookup port between write requests and flush requests,
+        the flush request is dispatched only if there is not any write in progress
+        (so the dirty flags in tag_array are up to date) and it has priority over writes.
+        The flags of flush request are stored in MSB of the lookup id.
+        """
+        in_aw = self.s.aw
+        flush = self.flush
+        b = self.s.b
+        # the number of writes in the pipeline is limited by the pipeline registers
+        w_in_progress_cnt = self._reg("write_in_progress_cnt", Bits(4), def_val=0)
+        aw_ack = in_aw.valid & in_aw.ready
+        b_ack = b.valid & b.ready
+        If(aw_ack & ~b_ack,
+           w_in_progress_cnt(w_in_progress_cnt + 1),
+        ).Elif(~aw_ack & b_ack,
+           w_in_progress_cnt(w_in_progress_cnt - 1),
+        )
+        flush_en = rename_signal(self, flush.vld & w_in_progress_cnt._eq(0), "flush_en")
+
+        If(flush.vld,
+           tag_lookup.addr(flush.addr),
+           tag_lookup.id(Concat(BIT.from_py(1), flush.invalidate, flush.id)),
+        ).Else(
+           tag_lookup.addr(in_aw.addr),
+           tag_lookup.id(Concat(Bits(2).from_py(0), in_aw.id)),
+        )
+        tag_lookup.vld(flush_en | (~flush.vld & in_aw.valid & rc.rd))
+        flush.rd(flush_en & tag_lookup.rd)
+        in_aw.ready(~flush.vld & tag_lookup.rd & rc.rd)
+        rc.vld(~flush.vld & in_aw.valid & tag_lookup.rd)
+
+    def parse_lookup_id(self, tag_res: AxiCacheTagArrayLookupResIntf):
+        """
+        :return: the original id of the transaction from the lookup id of tag_array
+        """
+        if self.WRITE_BACK:
+            return tag_res.id[self.ID_WIDTH:]
+        else:
+            return tag_res.id
+
     def incr_lru_on_hit(self,
                         lru_incr: IndexWayHs,
-                        tag_res: AxiCacheTagArrayLookupResIntf):
+                        tag_res: AxiCacheTagArrayLookupResIntf,
+                        en=None):
         index = self.parse_addr(tag_res.addr)[1]
-        lru_incr.vld(tag_res.vld & tag_res.found)
+        vld = tag_res.vld & tag_res.found
+        if en is not None:
+            vld = vld & en
+        lru_incr.vld(vld)
         lru_incr.way(tag_res.way)
         lru_incr.index(index)
 
@@ -187,34 +332,53 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
 
         # send read request to data_array
         ar_index = self.parse_addr(ar_tagRes.addr)[1]
-        data_arr_read_req.id(ar_tagRes.id)
+        ar_id = self.parse_lookup_id(ar_tagRes)
+        data_arr_read_req.id(ar_id)
         data_arr_read_req.index(ar_index),
         data_arr_read_req.way(ar_tagRes.way)
 
-        # delegate read request to m.ar if not hit
+        # delegate read request to m.ar (or to MSHR file) if not hit
         out_ar = self.m.ar
+        if self.MSHR_CNT:
+            # the hits are not blocked by the misses which are waiting for the data,
+            # the misses to the same cacheline are merged into a single m.ar transaction
+            mshr = self.mshr
+            miss = mshr.miss
+            miss.addr(ar_tagRes.addr[:self.OFFSET_W])
+            miss.id(ar_id)
+            mem_req = mshr.mem_req
+            out_ar.addr(Concat(mem_req.addr, Bits(self.OFFSET_W).from_py(0)))
+            out_ar.id(mem_req.id)
+            out_ar.valid(mem_req.vld)
+            mem_req.rd(out_ar.ready)
+            mshr.mem_resp(self.m.r)
+            miss_r = mshr.s_r
+        else:
+            miss = out_ar
+            out_ar.addr(ar_tagRes.addr)
+            out_ar.id(ar_id)
+            miss_r = self.m.r
+
         StreamNode(
             [ar_tagRes],
-            [out_ar, data_arr_read_req],
+            [miss, data_arr_read_req],
             extraConds={
-                out_ar: ar_tagRes.vld & ~ar_tagRes.found,
+                miss: ar_tagRes.vld & ~ar_tagRes.found,
                 data_arr_read_req: ar_tagRes.vld & ar_tagRes.found,
             },
             skipWhen={
-                out_ar: ar_tagRes.vld & ar_tagRes.found,
+                miss: ar_tagRes.vld & ar_tagRes.found,
                 data_arr_read_req: ar_tagRes.vld & ~ar_tagRes.found,
             },
         ).sync()
         # ar_tagRes.rd(out_ar.ready & data_arr_read_req.rd)
 
-        out_ar.addr(ar_tagRes.addr)
-        out_ar.id(ar_tagRes.id)
         out_ar.len(0)
         self.axiAddrDefaults(out_ar)
 
         s_r = AxiSBuilder.join_prioritized(self, [
             data_arr_read,
-            self.m.r,
+            miss_r,
         ]).end
         self.s.r(s_r)
 
@@ -256,10 +420,20 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
         :ivar data_arr_r_port: read port of main data array
         :ivar data_arr_w_port: write port of main data array
         """
+        WRITE_BACK = self.WRITE_BACK
+        if WRITE_BACK:
+            # the lookup of flush request, the flags are in MSBs of lookup id
+            aw_is_flush = aw_tagRes.id[self.ID_WIDTH + 1]
+            aw_invalidate = aw_tagRes.id[self.ID_WIDTH]
+            # the flush is not an use of the cacheline
+            lru_incr_en = ~aw_is_flush
+        else:
+            lru_incr_en = None
+
         # note that the lru update happens even if the data is stalled
         # but that is not a problem because it wont change the order of the usage
         # of the cahceline
-        self.incr_lru_on_hit(aw_lru_incr, aw_tagRes)
+        self.incr_lru_on_hit(aw_lru_incr, aw_tagRes, en=lru_incr_en)
 
         st0 = self._reg(
             "victim_load_status0",
@@ -270,6 +444,11 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
                 (BIT, "tag_found"),
                 (BIT, "had_empty"),  # had some empty tag
                 (aw_tagRes.way._dtype, "found_way"),
+                *((
+                    (BIT, "is_flush"),  # the request from flush port
+                    (BIT, "invalidate"),
+                    (BIT, "found_dirty"),  # the found cacheline is dirty
+                ) if WRITE_BACK else ()),
                 (BIT, "valid"),
             ),
             def_val={
@@ -279,8 +458,20 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
         # resolve if we need to select a victim and optianally ask for it
         st0_ready = self._sig("victim_load_status0_ready")
         has_empty = rename_signal(self, Or(*(~t.valid for t in aw_tagRes.tags)), "has_empty")
+        if WRITE_BACK:
+            If(st0_ready,
+               st0.is_flush(aw_is_flush),
+               st0.invalidate(aw_invalidate),
+               st0.found_dirty(Or(*(aw_tagRes.way._eq(i) & t.dirty
+                                    for i, t in enumerate(aw_tagRes.tags)))),
+            )
+            # the flush request never needs a victim
+            no_victim_req = aw_tagRes.found | has_empty | aw_is_flush
+        else:
+            no_victim_req = aw_tagRes.found | has_empty
+
         If(st0_ready,
-           st0.write_id(aw_tagRes.id),
+           st0.write_id(self.parse_lookup_id(aw_tagRes)),
            st0.replacement_addr(aw_tagRes.addr),
            st0.tags(aw_tagRes.tags),
            st0.tag_found(aw_tagRes.found),
@@ -295,13 +486,10 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
             [aw_tagRes],
             [victim_req],
             skipWhen={
-                victim_req: aw_tagRes.vld & (
-                                aw_tagRes.found |
-                                has_empty
-                            )
+                victim_req: aw_tagRes.vld & no_victim_req
             },
             extraConds={
-                victim_req:~aw_tagRes.found & ~has_empty
+                victim_req:~no_victim_req
             }
         )
 
@@ -320,18 +508,39 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
                 (self.s.ar.id._dtype, "read_id"),
                 (self.s.aw.id._dtype, "write_id"),
                 (self.s.aw.addr._dtype, "replacement_addr"),  # the original address used to resolve new tag
-                (Bits(2), "data_array_op"),  # type of operation with data_array
+                (Bits(3 if WRITE_BACK else 2), "data_array_op"),  # type of operation with data_array
+                *((
+                    (BIT, "tag_found"),  # the cacheline of flush request was found
+                    (BIT, "invalidate"),
+                ) if WRITE_BACK else ()),
             )
         ########################## st1 - pre (read request resolution, victim address resolution) ##############
         d_arr_r, d_arr_w = self.instantiate_data_array_to_hs(
             data_arr_r_port, data_arr_w_port)
 
+        st0_index = self.parse_addr(st0.replacement_addr)[1]
+        if WRITE_BACK:
+            # write (not a flush request) in st0
+            st0_write = st0.valid & ~st0.is_flush
+            # the flush request which needs to write back the data
+            flush_req_dirty = rename_signal(self, st0.valid & st0.is_flush & st0.tag_found & st0.found_dirty, "flush_req_dirty")
+            # the flush request which does not need the data
+            flush_req_clean = rename_signal(self, st0.valid & st0.is_flush & ~(st0.tag_found & st0.found_dirty), "flush_req_clean")
+        else:
+            st0_write = st0.valid
+
         # :note: flush with higher priority than regular read
-        need_to_flush = rename_signal(self, st0.valid & (~st0.had_empty & ~st0.tag_found), "need_to_flush")
+        # :note: in WRITE_BACK mode the victim is written back only if it is dirty
+        need_to_flush = rename_signal(self, st0_write & (~st0.had_empty & ~st0.tag_found), "need_to_flush")
 
-        If(need_to_flush,
-            d_arr_r.addr.data(self.addr_in_data_array(victim_way.data, self.parse_addr(st0.replacement_addr)[1])),
-        ).Else(
+        d_arr_r_addr = If(need_to_flush,
+            d_arr_r.addr.data(self.addr_in_data_array(victim_way.data, st0_index)),
+        )
+        if WRITE_BACK:
+            d_arr_r_addr.Elif(flush_req_dirty,
+                d_arr_r.addr.data(self.addr_in_data_array(st0.found_way, st0_index)),
+            )
+        d_arr_r_addr.Else(
             d_arr_r.addr.data(self.addr_in_data_array(data_arr_read_req.way, data_arr_read_req.index))
         )
         _victim_way = self._sig("victim_way_tmp", Bits(log2ceil(self.WAY_CNT)))
@@ -364,43 +573,83 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
 
         st1_in = victim_load_status[0].dataIn.data
         # placed between st0, st1
-        pure_write = rename_signal(self, st0.valid & ~need_to_flush & ~data_arr_read_req.vld, "pure_write")
+        pure_write = rename_signal(self, st0_write & ~need_to_flush & ~data_arr_read_req.vld, "pure_write")
         pure_read = rename_signal(self, ~st0.valid & data_arr_read_req.vld, "pure_read")
-        read_plus_write = rename_signal(self, st0.valid & ~need_to_flush & data_arr_read_req.vld, "read_plus_write")
-        flush_write = rename_signal(self, st0.valid & need_to_flush & ~data_arr_read_req.vld, "flush_write")
-        read_flush_write = rename_signal(self, st0.valid & need_to_flush & data_arr_read_req.vld, "read_flush_write")  # not dispatched at once
+        read_plus_write = rename_signal(self, st0_write & ~need_to_flush & data_arr_read_req.vld, "read_plus_write")
+        flush_write = rename_signal(self, st0_write & need_to_flush & ~data_arr_read_req.vld, "flush_write")
+        read_flush_write = rename_signal(self, st0_write & need_to_flush & data_arr_read_req.vld, "read_flush_write")  # not dispatched at once
+
+        victim_way_en = flush_write | read_flush_write
+        victim_way_skip = pure_write | pure_read | read_plus_write
+        data_arr_read_req_skip = pure_write | flush_write | read_flush_write
+        if WRITE_BACK:
+            # the victim data is loaded only if the victim is dirty
+            # (the victim_way.vld is used to prevent propagation of invalid data)
+            victim_dirty = rename_signal(self, victim_way.vld & Or(*(
+                    victim_way.data._eq(i) & t.dirty
+                    for i, t in enumerate(st0.tags)
+                )), "victim_dirty")
+            victim_flush = victim_way_en & victim_dirty
+            victim_flush_skip = victim_way_en & ~victim_dirty
+            # the read request is not dispatched together with flush request
+            victim_way_skip = victim_way_skip | flush_req_dirty | flush_req_clean
+            data_arr_read_req_skip = data_arr_read_req_skip | flush_req_dirty | flush_req_clean
+            d_arr_r_addr_en = pure_read | read_plus_write | victim_flush | flush_req_dirty
+            d_arr_r_addr_skip = pure_write | victim_flush_skip | flush_req_clean
+        else:
+            d_arr_r_addr_en = pure_read | read_plus_write | flush_write | read_flush_write
+            d_arr_r_addr_skip = pure_write
 
         read_req_node = StreamNode(
             [victim_way, data_arr_read_req],
             [d_arr_r.addr, victim_load_status[0].dataIn],
             extraConds={
-                victim_way: flush_write | read_flush_write,  # 0
+                victim_way: victim_way_en,  # 0
                                    # only write without flush       not write at all but read request
                 data_arr_read_req: pure_read | read_plus_write,  # pure_read | read_plus_write, #
-                d_arr_r.addr: pure_read | read_plus_write | flush_write | read_flush_write,  # need_to_flush | data_arr_read_req.vld, # 1
+                d_arr_r.addr: d_arr_r_addr_en,  # need_to_flush | data_arr_read_req.vld, # 1
                 # victim_load_status[0].dataIn: st0.valid | data_arr_read_req.vld,
             },
             skipWhen={
-                victim_way: pure_write | pure_read | read_plus_write,
-                data_arr_read_req: pure_write | flush_write | read_flush_write,
-                d_arr_r.addr: pure_write,
+                victim_way: victim_way_skip,
+                data_arr_read_req: data_arr_read_req_skip,
+                d_arr_r.addr: d_arr_r_addr_skip,
             }
         )
         read_req_node.sync()
         st1_ready(victim_load_status[0].dataIn.rd & read_req_node.ack())
 
-        st1_in.victim_addr(self.deparse_addr(_victim_tag, self.parse_addr(st0.replacement_addr)[1], 0))
+        victim_addr = self.deparse_addr(_victim_tag, st0_index, 0)
+        if WRITE_BACK:
+            # the flush request writes back the cacheline of the requested address
+            victim_addr = st0.is_flush._ternary(
+                self.deparse_addr(self.parse_addr(st0.replacement_addr)[0], st0_index, 0),
+                victim_addr
+            )
+            st1_in.tag_found(st0.tag_found)
+            st1_in.invalidate(st0.invalidate)
+        st1_in.victim_addr(victim_addr)
         st1_in.victim_way(st0.tag_found._ternary(st0.found_way, _victim_way)),
         st1_in.read_id(data_arr_read_req.id)
         st1_in.write_id(st0.write_id)
         st1_in.replacement_addr(st0.replacement_addr)
-        If(pure_write,
+        data_array_op = If(pure_write,
             st1_in.data_array_op(data_trans_t.write)
         ).Elif(pure_read,
             st1_in.data_array_op(data_trans_t.read)
         ).Elif(read_plus_write,
             st1_in.data_array_op(data_trans_t.read_and_write)
-        ).Else(# .Elif(flush_write | read_flush_write,
+        )
+        if WRITE_BACK:
+            data_array_op.Elif(flush_req_dirty,
+                st1_in.data_array_op(data_trans_t.flush)
+            ).Elif(flush_req_clean,
+                st1_in.data_array_op(data_trans_t.flush_no_data)
+            ).Elif(victim_flush_skip,
+                # the victim is not dirty, it is just replaced
+                st1_in.data_array_op(data_trans_t.write)
+            )
+        data_array_op.Else(# .Elif(flush_write | read_flush_write,
             st1_in.data_array_op(data_trans_t.write_and_flush)
         )
         # If(st0.valid,
@@ -466,51 +715,80 @@ class AxiCaheWriteAllocWawOnlyWritePropagating(CacheAddrTypeConfig):
         # to prevent deadlock
         # write replacement after victim load with higher priority
         # else if found just write the data to data array
-        is_flush = st2.data_array_op._eq(data_trans_t.write_and_flush)
+        WRITE_BACK = self.WRITE_BACK
+        if WRITE_BACK:
+            is_flush = rename_signal(self, In(st2.data_array_op, [data_trans_t.write_and_flush,
+                                                                  data_trans_t.flush]), "is_flush")
+            contains_read = rename_signal(self, In(st2.data_array_op, [data_trans_t.read,
+                                                                       data_trans_t.write_and_flush,
+                                                                       data_trans_t.read_and_write,
+                                                                       data_trans_t.flush]), "contains_read")
+            is_flush_req = rename_signal(self, In(st2.data_array_op, [data_trans_t.flush,
+                                                                      data_trans_t.flush_no_data]), "is_flush_req")
+        else:
+            is_flush = st2.data_array_op._eq(data_trans_t.write_and_flush)
+            contains_read = rename_signal(self, In(st2.data_array_op, [data_trans_t.read,
+                                                                       data_trans_t.write_and_flush,
+                                                                       data_trans_t.read_and_write]), "contains_read")
         contains_write = rename_signal(self, In(st2.data_array_op, [data_trans_t.write,
                                                                     data_trans_t.write_and_flush,
                                                                     data_trans_t.read_and_write]), "contains_write")
-        contains_read = rename_signal(self, In(st2.data_array_op, [data_trans_t.read,
-                                                                   data_trans_t.write_and_flush,
-                                                                   data_trans_t.read_and_write]), "contains_read")
         contains_read_data = rename_signal(self, In(st2.data_array_op, [data_trans_t.read,
                                                                         data_trans_t.read_and_write]), "contains_read_data")
 
+        extraConds = {
+            data_arr_read_data: contains_read,
+            in_w: contains_write,
+
+            data_arr_read: contains_read_data,
+            m.aw: is_flush,
+            m.w: is_flush,
+            d_arr_w: contains_write,
+            self.s.b: contains_write,
+        }
+        skipWhen = {
+            data_arr_read_data:~contains_read,
+            in_w:~contains_write,
+
+            data_arr_read:~contains_read_data,
+            m.aw:~is_flush,
+            m.w:~is_flush,
+            d_arr_w:~contains_write,
+            self.s.b:~contains_write,
+        }
+        slaves = [data_arr_read,
+                  m.aw, m.w,
+                  d_arr_w, self.s.b]  # to read block or to slave connected on "m" interface
+                                      # write data to data array and send write acknowledge
+        if WRITE_BACK:
+            flush_ack = self.flush_ack
+            flush_ack.id(st2.write_id)
+            flush_ack.resp(RESP_OKAY)
+            slaves.append(flush_ack)
+            extraConds[flush_ack] = is_flush_req
+            skipWhen[flush_ack] = ~is_flush_req
+
         flush_or_read_node = StreamNode(
             [st2_out,
              data_arr_read_data, in_w],  # collect read data from data array, collect write data
-            [data_arr_read,
-             m.aw, m.w,
-             d_arr_w, self.s.b],  # to read block or to slave connected on "m" interface
-                                  # write data to data array and send write acknowledge
-            extraConds={
-                data_arr_read_data: contains_read,
-                in_w: contains_write,
-
-                data_arr_read: contains_read_data,
-                m.aw: is_flush,
-                m.w: is_flush,
-                d_arr_w: contains_write,
-                self.s.b: contains_write,
-            },
-            skipWhen={
-                data_arr_read_data:~contains_read,
-                in_w:~contains_write,
-
-                data_arr_read:~contains_read_data,
-                m.aw:~is_flush,
-                m.w:~is_flush,
-                d_arr_w:~contains_write,
-                self.s.b:~contains_write,
-            }
+            slaves,
+            extraConds=extraConds,
+            skipWhen=skipWhen,
         )
         flush_or_read_node.sync()
         m.b.ready(1)
 
-        tag_update.vld(st2_out.vld & contains_write)
-        tag_update.delete(0)
         tag_update.way_en(binToOneHot(st2.victim_way))
         tag_update.addr(st2.replacement_addr)
+        if WRITE_BACK:
+            # the flush request cleans the dirty flag or removes the cacheline
+            flush_req_update = is_flush_req & st2.tag_found
+            tag_update.vld(st2_out.vld & (contains_write | flush_req_update))
+            tag_update.delete(flush_req_update & st2.invalidate)
+            tag_update.dirty(contains_write)
+        else:
+            tag_update.vld(st2_out.vld & contains_write)
+            tag_update.delete(0)
         # [TODO] initial clean
         lru_array_set = self.lru_array.set
         lru_array_set.addr(None)
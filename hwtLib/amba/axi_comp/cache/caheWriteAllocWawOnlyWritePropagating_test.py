@@ -4,16 +4,19 @@
 from typing import List
 
 from hwt.code import Concat
+from hwt.hdl.constants import NOP
 from hwt.hdl.types.arrayVal import HArrayVal
 from hwt.hdl.types.bits import Bits
 from hwt.serializer.combLoopAnalyzer import CombLoopAnalyzer
 from hwt.simulator.simTestCase import SimTestCase
 from hwtLib.amba.axiLite_comp.sim.utils import axi_randomize_per_channel
 from hwtLib.amba.axi_comp.cache.caheWriteAllocWawOnlyWritePropagating import AxiCaheWriteAllocWawOnlyWritePropagating
+from hwtLib.amba.axi_comp.cache.replacement_policy import TrueLru, Brrip
 from hwtLib.amba.constants import RESP_OKAY
 from hwtLib.examples.errors.combLoops import freeze_set_of_sets
 from hwtLib.tools.debug_bus_monitor_ctl import select_bit_range
 from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
 from pyMathBitPrecise.bit_utils import set_bit_range, mask, int_list_to_int, \
     int_to_int_list
 
@@ -85,13 +88,16 @@ class AxiCaheWriteAllocWawOnlyWritePropagatingTC(SimTestCase):
             self._get_from_mems(self.DATA, i + i2) for i2 in range(self.LEN + 1)
         )))
 
-    def set_tag(self, addr, way):
+    def set_tag(self, addr, way, dirty=1):
         u = self.u
         tag, index, offset = u.parse_addr_int(addr)
         assert offset == 0, addr
         tag_t = u.tag_array.tag_record_t
         tag_t_w = tag_t.bit_length()
-        v = tag_t.from_py({"tag": tag, "valid": 1})._reinterpret_cast(Bits(tag_t_w))
+        tag_record = {"tag": tag, "valid": 1}
+        if u.WRITE_BACK:
+            tag_record["dirty"] = dirty
+        v = tag_t.from_py(tag_record)._reinterpret_cast(Bits(tag_t_w))
 
         cur_v = self._get_from_mems(self.TAGS, index)
         assert cur_v._is_full_valid(), (cur_v, index)
@@ -100,8 +106,8 @@ class AxiCaheWriteAllocWawOnlyWritePropagatingTC(SimTestCase):
 
         return index
 
-    def cacheline_insert(self, addr, way, data):
-        index = self.set_tag(addr, way)
+    def cacheline_insert(self, addr, way, data, dirty=1):
+        index = self.set_tag(addr, way, dirty=dirty)
         self.set_data(index, way, data)
 
     def get_cachelines(self):
@@ -334,8 +340,314 @@ class AxiCaheWriteAllocWawOnlyWritePropagating_len1TC(AxiCaheWriteAllocWawOnlyWr
     LEN = 1
 
 
+class AxiCaheWriteAllocWawOnlyWritePropagating_mshrTC(AxiCaheWriteAllocWawOnlyWritePropagatingTC):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiCaheWriteAllocWawOnlyWritePropagating()
+        u.DATA_WIDTH = 32
+        u.CACHE_LINE_SIZE = 4
+        u.CACHE_LINE_CNT = 16
+        u.MAX_BLOCK_DATA_WIDTH = 8
+        u.WAY_CNT = 2
+        u.MSHR_CNT = 4
+        u.MSHR_TARGET_CNT = 4
+        cls.ADDR_STEP = u.DATA_WIDTH // 8
+        cls.WAY_CACHELINES = u.CACHE_LINE_CNT // u.WAY_CNT
+        cls.compileSim(u)
+
+    @staticmethod
+    def mem_data(addr):
+        return addr + 0x100
+
+    def mem_responder(self, ar_log: list, delay=0):
+        """
+        Sim. process which responds to each read on "m" interface after specified delay
+
+        :param ar_log: list where the consumed read requests are stored
+        """
+        u = self.u
+        ar = u.m.ar._ag.data
+        r = u.m.r._ag.data
+        while True:
+            yield Timer(CLK_PERIOD)
+            while ar:
+                req = ar.popleft()
+                ar_log.append(req)
+                _id, addr = req[0], req[1]
+                for _ in range(delay):
+                    r.append(NOP)
+                r.append((_id, self.mem_data(int(addr)), RESP_OKAY, 1))
+
+    def test_read_through(self):
+        # the read requests are dispatched with an id of MSHR,
+        # without the data the number of reads is limited by the number of MSHRs
+        u = self.u
+        self.clean_tags()
+        N = u.MSHR_CNT + 2
+        u.s.ar._ag.data.extend(
+            u.s.ar._ag.create_addr_req(addr=i * self.ADDR_STEP, _len=self.LEN, _id=i)
+            for i in range(N)
+        )
+        self.runSim((N + 10) * CLK_PERIOD)
+        self.assertValSequenceEqual(u.m.ar._ag.data, [
+            u.m.ar._ag.create_addr_req(addr=i * self.ADDR_STEP, _len=self.LEN, _id=i)
+            for i in range(u.MSHR_CNT)
+        ])
+        for x in [u.m.aw, u.m.w, u.s.r, u.s.b]:
+            self.assertEmpty(x._ag.data)
+
+    def test_read_miss_merge(self, randomized=False):
+        # the reads of the same cacheline are merged into a single read on "m" interface
+        u = self.u
+        self.clean_tags()
+        addrs = [0, 0, 1, 0, 2, 1, 3, 0]
+        u.s.ar._ag.data.extend(
+            u.s.ar._ag.create_addr_req(addr=a * self.ADDR_STEP, _len=self.LEN, _id=i)
+            for i, a in enumerate(addrs)
+        )
+        m_ar = []
+        self.procs.append(self.mem_responder(m_ar, delay=20))
+        t = 120 * CLK_PERIOD
+        if randomized:
+            self.randomize_all()
+            t *= 3
+
+        self.runSim(t)
+        self.assertEqual(len(m_ar), len(set(addrs)))
+        self.assertSequenceEqual(
+            sorted((int(_id), int(d)) for _id, d, _, _ in u.s.r._ag.data),
+            sorted((i, self.mem_data(a * self.ADDR_STEP)) for i, a in enumerate(addrs)))
+        for x in [u.s.ar, u.m.aw, u.m.w, u.s.b]:
+            self.assertEmpty(x._ag.data)
+
+    def test_hit_under_miss(self, MAGIC=99):
+        # the hit is not blocked by a miss which is waiting for the data
+        u = self.u
+        self.clean_tags()
+        self.clean_data()
+        hit_addr = 1 * self.ADDR_STEP
+        self.cacheline_insert(hit_addr, 0, self.build_cacheline([MAGIC]))
+        u.s.ar._ag.data.extend([
+            u.s.ar._ag.create_addr_req(addr=0, _len=self.LEN, _id=0),
+            u.s.ar._ag.create_addr_req(addr=hit_addr, _len=self.LEN, _id=1),
+        ])
+        self.runSim(20 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.m.ar._ag.data, [
+            u.m.ar._ag.create_addr_req(addr=0, _len=self.LEN, _id=0),
+        ])
+        self.assertValSequenceEqual(u.s.r._ag.data, [
+            (1, MAGIC, RESP_OKAY, 1),
+        ])
+
+
+class AxiCaheWriteAllocWawOnlyWritePropagating_trueLruTC(AxiCaheWriteAllocWawOnlyWritePropagatingTC):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiCaheWriteAllocWawOnlyWritePropagating()
+        u.DATA_WIDTH = 32
+        u.CACHE_LINE_SIZE = 4
+        u.CACHE_LINE_CNT = 16
+        u.MAX_BLOCK_DATA_WIDTH = 8
+        u.WAY_CNT = 2
+        u.REPLACEMENT_POLICY = TrueLru
+        cls.ADDR_STEP = u.DATA_WIDTH // 8
+        cls.WAY_CACHELINES = u.CACHE_LINE_CNT // u.WAY_CNT
+        cls.compileSim(u)
+
+
+class AxiCaheWriteAllocWawOnlyWritePropagating_brripTC(AxiCaheWriteAllocWawOnlyWritePropagating_trueLruTC):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiCaheWriteAllocWawOnlyWritePropagating()
+        u.DATA_WIDTH = 32
+        u.CACHE_LINE_SIZE = 4
+        u.CACHE_LINE_CNT = 16
+        u.MAX_BLOCK_DATA_WIDTH = 8
+        u.WAY_CNT = 2
+        u.REPLACEMENT_POLICY = Brrip
+        cls.ADDR_STEP = u.DATA_WIDTH // 8
+        cls.WAY_CACHELINES = u.CACHE_LINE_CNT // u.WAY_CNT
+        cls.compileSim(u)
+
+
+class AxiCaheWriteAllocWawOnlyWritePropagating_writeBackTC(AxiCaheWriteAllocWawOnlyWritePropagatingTC):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiCaheWriteAllocWawOnlyWritePropagating()
+        u.DATA_WIDTH = 32
+        u.CACHE_LINE_SIZE = 4
+        u.CACHE_LINE_CNT = 16
+        u.MAX_BLOCK_DATA_WIDTH = 8
+        u.WAY_CNT = 2
+        u.WRITE_BACK = True
+        cls.ADDR_STEP = u.DATA_WIDTH // 8
+        cls.WAY_CACHELINES = u.CACHE_LINE_CNT // u.WAY_CNT
+        cls.compileSim(u)
+
+    def setUp(self):
+        AxiCaheWriteAllocWawOnlyWritePropagatingTC.setUp(self)
+        lru_mem = self.rtl_simulator.model.lru_array_inst.lru_mem_inst
+        self.LRU = [
+            getattr(lru_mem, name).io.ram_memory
+            for name in dir(lru_mem)
+            if name.startswith(("r_rams_", "w_rams_")) and name.endswith("_inst")
+        ]
+
+    def clean_lru(self):
+        self._clean_mems(self.LRU)
+
+    def get_dirty(self, addr):
+        """
+        :return: dirty flag of the cacheline or None if the cacheline is not in the cache
+        """
+        u = self.u
+        tag, index, _ = u.parse_addr_int(addr)
+        tags_t = u.tag_array.tag_record_t[u.WAY_CNT]
+        tags = self._get_from_mems(self.TAGS, index)
+        tags = Bits(tags_t.bit_length()).from_py(tags.val, tags.vld_mask)._reinterpret_cast(tags_t)
+        for t in tags:
+            if t.valid and int(t.tag) == tag:
+                return int(t.dirty)
+        return None
+
+    def _test_evict(self, dirty, MAGIC=99):
+        u = self.u
+        self.clean_tags()
+        self.clean_data()
+        self.clean_lru()
+        index = 3
+        addrs = [(index + t * self.WAY_CACHELINES) * self.ADDR_STEP for t in range(u.WAY_CNT + 1)]
+        for w, a in enumerate(addrs[:-1]):
+            self.cacheline_insert(a, w, MAGIC + w, dirty=dirty)
+        new_addr = addrs[-1]
+        u.s.aw._ag.data.append(u.s.aw._ag.create_addr_req(addr=new_addr, _len=0, _id=1))
+        u.s.w._ag.data.append((MAGIC + 10, mask(u.CACHE_LINE_SIZE), 1))
+
+        self.runSim(20 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.s.b._ag.data, [(1, RESP_OKAY)])
+        cachelines = self.get_cachelines()
+        self.assertEqual(cachelines[new_addr], MAGIC + 10)
+        self.assertEqual(self.get_dirty(new_addr), 1)
+        evicted = [(w, a) for w, a in enumerate(addrs[:-1]) if a not in cachelines]
+        self.assertEqual(len(evicted), 1, evicted)
+        evicted_way, evicted_addr = evicted[0]
+        if dirty:
+            self.assertValSequenceEqual(u.m.aw._ag.data, [
+                u.m.aw._ag.create_addr_req(addr=evicted_addr, _len=0, _id=1)
+            ])
+            self.assertValSequenceEqual(u.m.w._ag.data, [
+                (MAGIC + evicted_way, mask(u.CACHE_LINE_SIZE), 1)
+            ])
+        else:
+            # the clean victim is not written back
+            for x in [u.m.aw, u.m.w]:
+                self.assertEmpty(x._ag.data)
+
+    def test_evict_clean(self):
+        self._test_evict(dirty=0)
+
+    def test_evict_dirty(self):
+        self._test_evict(dirty=1)
+
+    def _test_flush(self, invalidate, MAGIC=99):
+        u = self.u
+        self.clean_tags()
+        self.clean_data()
+        # dirty, clean and not present cacheline
+        addrs = [i * self.ADDR_STEP for i in range(3)]
+        self.cacheline_insert(addrs[0], 0, MAGIC, dirty=1)
+        self.cacheline_insert(addrs[1], 1, MAGIC + 1, dirty=0)
+        u.flush._ag.data.extend((i, a, invalidate) for i, a in enumerate(addrs))
+
+        self.runSim(30 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.flush_ack._ag.data, [(i, RESP_OKAY) for i in range(len(addrs))])
+        # only the dirty cacheline is written back
+        self.assertValSequenceEqual(u.m.aw._ag.data, [
+            u.m.aw._ag.create_addr_req(addr=addrs[0], _len=0, _id=0)
+        ])
+        self.assertValSequenceEqual(u.m.w._ag.data, [
+            (MAGIC, mask(u.CACHE_LINE_SIZE), 1)
+        ])
+        if invalidate:
+            self.assertDictEqual(self.get_cachelines(), {})
+        else:
+            self.assertDictEqual(self.get_cachelines(), {addrs[0]: MAGIC, addrs[1]: MAGIC + 1})
+            for a in addrs[:2]:
+                self.assertEqual(self.get_dirty(a), 0)
+
+    def test_flush_clean(self):
+        self._test_flush(invalidate=0)
+
+    def test_flush_invalidate(self):
+        self._test_flush(invalidate=1)
+
+    def test_write_then_flush(self, MAGIC=99):
+        # the flush has to wait until the write is finished
+        # (otherwise the cacheline would not be dirty yet)
+        u = self.u
+        self.clean_tags()
+        self.clean_data()
+        u.s.aw._ag.data.append(u.s.aw._ag.create_addr_req(addr=0, _len=0, _id=1))
+        u.s.w._ag.data.append((MAGIC, mask(u.CACHE_LINE_SIZE), 1))
+
+        def flush_proc():
+            yield Timer(2 * CLK_PERIOD)
+            u.flush._ag.data.append((2, 0, 0))
+
+        self.procs.append(flush_proc())
+        self.runSim(30 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.s.b._ag.data, [(1, RESP_OKAY)])
+        self.assertValSequenceEqual(u.flush_ack._ag.data, [(2, RESP_OKAY)])
+        self.assertValSequenceEqual(u.m.aw._ag.data, [
+            u.m.aw._ag.create_addr_req(addr=0, _len=0, _id=2)
+        ])
+        self.assertValSequenceEqual(u.m.w._ag.data, [
+            (MAGIC, mask(u.CACHE_LINE_SIZE), 1)
+        ])
+        self.assertEqual(self.get_dirty(0), 0)
+
+    def test_write_heavy(self, ADDR_CNT=4, N=10):
+        # repeated writes to a small set of cachelines (e.g. counters)
+        # do not generate any traffic on "m" interface until the flush
+        u = self.u
+        self.clean_tags()
+        self.clean_data()
+        aw = u.s.aw._ag
+        M = mask(u.CACHE_LINE_SIZE)
+        addrs = [i * self.ADDR_STEP for i in range(ADDR_CNT)]
+        for i in range(N):
+            for a in addrs:
+                aw.data.append(aw.create_addr_req(addr=a, _len=0, _id=0))
+                u.s.w._ag.data.append((i * ADDR_CNT + a, M, 1))
+
+        def flush_proc():
+            while len(u.s.b._ag.data) < N * ADDR_CNT:
+                yield Timer(CLK_PERIOD)
+            self.assertEmpty(u.m.aw._ag.data)
+            u.flush._ag.data.extend((i, a, 0) for i, a in enumerate(addrs))
+
+        self.procs.append(flush_proc())
+        self.runSim((N * ADDR_CNT * 2 + 40) * CLK_PERIOD)
+        self.assertEqual(len(u.s.b._ag.data), N * ADDR_CNT)
+        self.assertEqual(len(u.flush_ack._ag.data), ADDR_CNT)
+        self.assertValSequenceEqual(u.m.aw._ag.data, [
+            aw.create_addr_req(addr=a, _len=0, _id=i) for i, a in enumerate(addrs)
+        ])
+        self.assertValSequenceEqual(u.m.w._ag.data, [
+            ((N - 1) * ADDR_CNT + a, M, 1) for a in addrs
+        ])
+
+
 AxiCaheWriteAllocWawOnlyWritePropagatingTCs = [
     AxiCaheWriteAllocWawOnlyWritePropagatingTC,
+    AxiCaheWriteAllocWawOnlyWritePropagating_mshrTC,
+    AxiCaheWriteAllocWawOnlyWritePropagating_trueLruTC,
+    AxiCaheWriteAllocWawOnlyWritePropagating_brripTC,
+    AxiCaheWriteAllocWawOnlyWritePropagating_writeBackTC,
     #AxiCaheWriteAllocWawOnlyWritePropagating_len1TC,
 ]
 
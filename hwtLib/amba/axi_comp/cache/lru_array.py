@@ -4,6 +4,7 @@
 from hwt.code import If, Or, Concat
 from hwt.code_utils import rename_signal
 from hwt.hdl.constants import WRITE, READ
+from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.defs import BIT
 from hwt.hdl.types.struct import HStruct
 from hwt.interfaces.std import VectSignal, Handshaked, HandshakeSync
@@ -17,6 +18,7 @@ from hwtLib.amba.axi_comp.cache.pseudo_lru import PseudoLru
 from hwtLib.common_nonstd_interfaces.addr_data_hs import AddrDataHs
 from hwtLib.common_nonstd_interfaces.addr_hs import AddrHs
 from hwtLib.logic.binToOneHot import binToOneHot
+from hwtLib.logic.lfsr import Lfsr
 from hwtLib.mem.ramXor import RamXorSingleClock
 
 
@@ -39,12 +41,16 @@ class IndexWayHs(HandshakeSync):
 
 class AxiCacheLruArray(CacheAddrTypeConfig):
     """
-    A memory storing Tree-PLRU records with multiple ports.
+    A memory storing the records of the replacement policy (Tree-PLRU by default) with multiple ports.
     The access using various ports is merged together.
     The victim_req port also marks the way as lastly used.
     The set port dissables all discards all pending updates
     and it is ment to be used for an intialization of the array/cache.
 
+    :ivar REPLACEMENT_POLICY: the class of replacement policy
+        (:class:`hwtLib.amba.axi_comp.cache.replacement_policy.CacheReplacementPolicy` subclass)
+    :note: If the policy requires random bits they are generated by :class:`hwtLib.logic.lfsr.Lfsr`.
+
     .. figure:: ./_static/AxiCacheLruArray.png
 
     .. hwt-autodoc::
@@ -54,11 +60,13 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
         CacheAddrTypeConfig._config(self)
         self.INCR_PORT_CNT = Param(2)
         self.WAY_CNT = Param(4)
+        self.REPLACEMENT_POLICY = Param(PseudoLru)
 
     def _compute_constants(self):
         assert self.WAY_CNT >= 1, self.WAY_CNT
         self._compupte_tag_index_offset_widths()
-        self.LRU_WIDTH = PseudoLru.lru_reg_width(self.WAY_CNT)
+        self.LRU_WIDTH = self.REPLACEMENT_POLICY.state_width(self.WAY_CNT)
+        self.RAND_WIDTH = self.REPLACEMENT_POLICY.rand_width(self.WAY_CNT)
 
     def _declr(self):
         self._compute_constants()
@@ -92,6 +100,14 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
             #  incr preload, incr write back...
             *flatten((READ, WRITE) for _ in range(self.INCR_PORT_CNT))
         )
+        if self.RAND_WIDTH:
+            self.lfsr = Lfsr()
+
+    def _policy(self, state):
+        """
+        :return: an instance of the replacement policy for a state of a single set
+        """
+        return self.REPLACEMENT_POLICY(state, rand=self._rand)
 
     def merge_successor_writes_into_incr_one_hot(self, succ_writes, incr_val_oh):
         if succ_writes:
@@ -101,6 +117,13 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
         return incr_val_oh
 
     def _impl(self):
+        if self.RAND_WIDTH:
+            # collect last RAND_WIDTH bits from LFSR
+            rand = self._rand = self._reg("rand", Bits(self.RAND_WIDTH), def_val=0)
+            rand(Concat(rand, self.lfsr.dataOut)[self.RAND_WIDTH:])
+        else:
+            self._rand = None
+
         m = self.lru_mem
         victim_req_r, victim_req_w = m.port[:2]
 
@@ -146,8 +169,8 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
             incr_val_oh = rename_signal(self, binToOneHot(incr_in.way), f"incr_val{i:d}_oh")
             incr_tmp_mask_oh.append((incr_tmp, incr_val_oh))
 
-        lru = PseudoLru(victim_req_r.dout)
-        victim = rename_signal(self, lru.get_lru(), "victim")
+        lru = self._policy(victim_req_r.dout)
+        victim = rename_signal(self, lru.get_victim(), "victim")
         victim_oh = rename_signal(self, binToOneHot(victim), "victim_oh")
 
         victim_data.data(victim)
@@ -157,8 +180,10 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
             (incr2_tmp.vld & incr2_tmp.index._eq(victim_req_tmp.index), incr2_val_oh)
             for incr2_tmp, incr2_val_oh in incr_tmp_mask_oh
         ]
-        _victim_oh = self.merge_successor_writes_into_incr_one_hot(succ_writes, victim_oh)
-        _victim_oh = rename_signal(self, _victim_oh, f"victim_val{i:d}_oh_final")
+        # the items used by following accesses to the same index
+        victim_succ_oh = self.merge_successor_writes_into_incr_one_hot(
+            succ_writes, Bits(self.WAY_CNT).from_py(0))
+        victim_succ_oh = rename_signal(self, victim_succ_oh, "victim_succ_oh")
 
         set_.rd(1)
         If(set_.vld,
@@ -170,7 +195,7 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
             # use victim_req_w port for a victim req write back as usuall
             victim_req_w.en(victim_req_tmp.vld),
             victim_req_w.addr(victim_req_tmp.index),
-            victim_req_w.din(lru.mark_use_many(_victim_oh)),
+            victim_req_w.din(lru.on_insert(victim_oh, victim_succ_oh)),
         )
 
         for i, (incr_in, (incr_r, incr_w), (incr_tmp, incr_val_oh)) in enumerate(zip(self.incr, incr_rw, incr_tmp_mask_oh)):
@@ -198,7 +223,7 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
             # if collides with others merge the incr_val_oh
             incr_val_oh = self.merge_successor_writes_into_incr_one_hot(succ_writes, incr_val_oh)
             incr_val_oh = rename_signal(self, incr_val_oh, f"incr_val{i:d}_oh_final")
-            incr_w.din(PseudoLru(incr_r.dout).mark_use_many(incr_val_oh))
+            incr_w.din(self._policy(incr_r.dout).on_hit(incr_val_oh))
 
         propagateClkRstn(self)
 
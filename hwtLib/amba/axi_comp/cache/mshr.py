@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.code import If, Concat, Or
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.utils import addClkRstn
+from hwt.math import log2ceil, isPow2
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axi4 import Axi4_r
+from hwtLib.common_nonstd_interfaces.addr_hs import AddrHs
+from hwtLib.handshaked.streamNode import StreamNode
+from hwtLib.logic.oneHotToBin import oneHotToBin
+from pyMathBitPrecise.bit_utils import mask
+
+
+@serializeParamsUniq
+class AxiCacheMshrFile(Unit):
+    """
+    Miss status holding register (MSHR) file,
+    tracks outstanding reads from the main memory and merges
+    secondary misses (misses to the cacheline which is already being read)
+    into the already dispatched read.
+
+    * A primary miss allocates a free MSHR and dispatches a read on mem_req
+      with the id set to the index of MSHR.
+    * A secondary miss is only appended to the list of targets of the MSHR.
+    * The data from mem_resp are stored in the MSHR (mem_resp is always ready),
+      then they are returned on s_r once for each target of the MSHR
+      (with an original id of the target) and then the MSHR is deallocated.
+
+    The order of the responses with the same id is kept (as required by AXI)
+    even if the main memory returns the data for different MSHRs out of order:
+
+    * The MSHR remembers which MSHRs had a target with the same id as its first target
+      at the time of its allocation and its data are not returned until all of them are deallocated.
+    * The secondary miss is merged only if it does not overtake any older target with the same id,
+      otherwise a new MSHR is allocated (and the cacheline is read again).
+
+    :ivar ~.ADDR_WIDTH: width of the cacheline address (the address without offset bits)
+    :ivar ~.ID_WIDTH: width of the id of the requests
+    :ivar ~.MSHR_CNT: max number of outstanding reads on mem_req
+    :ivar ~.TARGET_CNT: max number of requests merged in to a single MSHR (power of 2)
+    :ivar ~.miss: the read request which was not found in the cache
+    :ivar ~.mem_req: the read request for the main memory, the id is an index of MSHR
+    :ivar ~.mem_resp: the read data from main memory (for mem_req)
+    :ivar ~.s_r: the read data for the requests from the miss port
+
+    :attention: each read has to be a single beat (the cacheline is a single bus word)
+    :note: The MSHR which has already received the data does not accept new targets,
+        the miss to the same cacheline allocates a new MSHR instead.
+    :note: Stalls the miss port if there is no free MSHR
+        or the MSHR for this cacheline has already TARGET_CNT targets.
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        self.ADDR_WIDTH = Param(32)
+        self.ID_WIDTH = Param(4)
+        self.DATA_WIDTH = Param(64)
+        self.MSHR_CNT = Param(4)
+        self.TARGET_CNT = Param(4)
+
+    def _declr(self):
+        assert self.MSHR_CNT > 1, self.MSHR_CNT
+        assert log2ceil(self.MSHR_CNT) <= self.ID_WIDTH, (self.MSHR_CNT, self.ID_WIDTH)
+        assert self.TARGET_CNT > 1 and isPow2(self.TARGET_CNT), self.TARGET_CNT
+        addClkRstn(self)
+        with self._paramsShared():
+            self.miss = AddrHs()
+            self.mem_req = AddrHs()._m()
+            self.mem_resp = Axi4_r()
+            self.s_r = Axi4_r()._m()
+
+    def _impl(self):
+        MSHR_CNT = self.MSHR_CNT
+        TARGET_CNT = self.TARGET_CNT
+        INDEX_W = log2ceil(MSHR_CNT)
+        TARGET_INDEX_W = log2ceil(TARGET_CNT)
+        mshr_vec_t = Bits(MSHR_CNT)
+        # MSHR records, only the valid flags have to be reset
+        mshr_vld = self._reg("mshr_vld", mshr_vec_t, def_val=0)
+        # the data from main memory were received
+        mshr_data_vld = self._reg("mshr_data_vld", mshr_vec_t, def_val=0)
+        # for each MSHR the mask of older MSHRs which have to be deallocated before the data of this MSHR are returned
+        mshr_wait_for = [self._reg(f"mshr_wait_for{i:d}", mshr_vec_t, def_val=0) for i in range(MSHR_CNT)]
+        mshr_addr = self._sig("mshr_addr", Bits(self.ADDR_WIDTH)[MSHR_CNT],
+                              [0 for _ in range(MSHR_CNT)])
+        mshr_data = self._sig("mshr_data", Bits(self.DATA_WIDTH)[MSHR_CNT],
+                              [0 for _ in range(MSHR_CNT)])
+        mshr_resp = self._sig("mshr_resp", self.mem_resp.resp._dtype[MSHR_CNT],
+                              [0 for _ in range(MSHR_CNT)])
+        # index of the last target in target list
+        mshr_last_target = self._sig("mshr_last_target", Bits(TARGET_INDEX_W)[MSHR_CNT],
+                                     [0 for _ in range(MSHR_CNT)])
+        # the ids of the original requests, the index is Concat(mshr index, target index)
+        mshr_target_id = self._sig("mshr_target_id", Bits(self.ID_WIDTH)[MSHR_CNT * TARGET_CNT],
+                                   [0 for _ in range(MSHR_CNT * TARGET_CNT)])
+
+        ########################## resp - store the data in MSHR ########################
+        resp = self.mem_resp
+        resp_mshr = rename_signal(self, resp.id[INDEX_W:], "resp_mshr")
+        # each MSHR receives exactly one response, there is always a space for it
+        resp.ready(1)
+        If(self.clk._onRisingEdge() & resp.valid,
+           mshr_data[resp_mshr](resp.data),
+           mshr_resp[resp_mshr](resp.resp),
+        )
+
+        ########################## replay - return the data for each target ############
+        s_r = self.s_r
+        replay_ready = []
+        for i in range(MSHR_CNT):
+            replay_ready.append(mshr_vld[i] & mshr_data_vld[i] & mshr_wait_for[i]._eq(0))
+        replay_ready = rename_signal(self, Concat(*reversed(replay_ready)), "replay_ready")
+        replay_ready_index = oneHotToBin(self, replay_ready, "replay_ready_index")
+        # the MSHR which is currently returning the data (the MSHR can not be changed until its last target)
+        replay_vld = self._reg("replay_vld", def_val=0)
+        replay_mshr_reg = self._reg("replay_mshr_reg", Bits(INDEX_W))
+        replay_target = self._reg("replay_target", Bits(TARGET_INDEX_W), def_val=0)
+        replay_mshr = rename_signal(self, replay_vld._ternary(replay_mshr_reg, replay_ready_index), "replay_mshr")
+        replay_last_target = rename_signal(self, replay_target._eq(mshr_last_target[replay_mshr]), "replay_last_target")
+
+        s_r.id(mshr_target_id[Concat(replay_mshr, replay_target)])
+        s_r.data(mshr_data[replay_mshr])
+        s_r.resp(mshr_resp[replay_mshr])
+        s_r.last(1)
+        s_r.valid(replay_vld | (replay_ready != 0))
+        replay_ack = s_r.valid & s_r.ready
+        If(replay_ack,
+           If(replay_last_target,
+              replay_vld(0),
+              replay_target(0),
+           ).Else(
+              replay_vld(1),
+              replay_mshr_reg(replay_mshr),
+              replay_target(replay_target + 1),
+           )
+        )
+        replay_done = rename_signal(self, replay_ack & replay_last_target, "replay_done")
+        dealloc = [replay_done & replay_mshr._eq(i) for i in range(MSHR_CNT)]
+        dealloc = rename_signal(self, Concat(*reversed(dealloc)), "dealloc")
+
+        ########################## miss - allocate MSHR or append target ##############
+        miss = self.miss
+        mem_req = self.mem_req
+        # the MSHRs which have a target with the same id as the miss
+        id_in_mshr = []
+        for i in range(MSHR_CNT):
+            id_in_mshr.append(mshr_vld[i] & Or(*(
+                mshr_target_id[i * TARGET_CNT + t]._eq(miss.id) &
+                (mshr_last_target[i] >= t)
+                for t in range(TARGET_CNT)
+            )))
+        id_in_mshr = rename_signal(self, Concat(*reversed(id_in_mshr)), "id_in_mshr")
+
+        match_oh = []
+        for i in range(MSHR_CNT):
+            # MSHR which has already the data can not accept a new target
+            # and the target can not be replayed before an older target with the same id in other MSHR
+            other_id_in_mshr = id_in_mshr & ~mshr_wait_for[i] & mshr_vec_t.from_py(mask(MSHR_CNT) & ~(1 << i))
+            match_oh.append(miss.vld & mshr_vld[i] & ~mshr_data_vld[i] &
+                            mshr_addr[i]._eq(miss.addr) & other_id_in_mshr._eq(0))
+        match_oh = rename_signal(self, Concat(*reversed(match_oh)), "match_oh")
+        match_index = oneHotToBin(self, match_oh, "match_index")
+        found = rename_signal(self, match_oh != 0, "found")
+        can_merge = rename_signal(
+            self,
+            found & (mshr_last_target[match_index] != TARGET_CNT - 1),
+            "can_merge")
+
+        free_index = oneHotToBin(self, ~mshr_vld, "free_index")
+        can_alloc = rename_signal(self, ~found & (mshr_vld != mask(MSHR_CNT)), "can_alloc")
+
+        mem_req.addr(miss.addr)
+        mem_req.id(free_index, fit=True)
+        StreamNode(
+            [miss],
+            [mem_req],
+            extraConds={
+                miss: can_merge | can_alloc,
+                mem_req: can_alloc,
+            },
+            skipWhen={
+                mem_req: found,
+            }
+        ).sync()
+        miss_ack = miss.vld & miss.rd
+        alloc = rename_signal(self, miss_ack & can_alloc, "alloc")
+        merge = rename_signal(self, miss_ack & can_merge, "merge")
+
+        # alloc and merge are mutually exclusive, only one MSHR is updated at once
+        If(self.clk._onRisingEdge(),
+            If(alloc,
+               mshr_addr[free_index](miss.addr),
+               mshr_last_target[free_index](0),
+               mshr_target_id[Concat(free_index, Bits(TARGET_INDEX_W).from_py(0))](miss.id),
+            ).Elif(merge,
+               mshr_last_target[match_index](mshr_last_target[match_index] + 1),
+               mshr_target_id[Concat(match_index, mshr_last_target[match_index] + 1)](miss.id),
+            )
+        )
+        # the allocated MSHR is not valid so it can not be deallocated at the same time
+        vld_next = []
+        data_vld_next = []
+        for i in range(MSHR_CNT):
+            alloc_i = alloc & free_index._eq(i)
+            v = (mshr_vld[i] & ~dealloc[i]) | alloc_i
+            vld_next.append(v)
+            dv = (mshr_data_vld[i] & ~dealloc[i]) | (resp.valid & resp_mshr._eq(i))
+            data_vld_next.append(dv)
+            # the MSHR waits for the older MSHRs with the same id, the deallocated MSHRs are removed
+            If(alloc_i,
+               mshr_wait_for[i](id_in_mshr & ~dealloc)
+            ).Else(
+               mshr_wait_for[i](mshr_wait_for[i] & ~dealloc)
+            )
+        mshr_vld(Concat(*reversed(vld_next)))
+        mshr_data_vld(Concat(*reversed(data_vld_next)))
+
+
+def _example_AxiCacheMshrFile():
+    u = AxiCacheMshrFile()
+    u.ADDR_WIDTH = 30
+    u.ID_WIDTH = 4
+    u.DATA_WIDTH = 32
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_AxiCacheMshrFile()
+    print(to_rtl_str(u))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+import unittest
+
+from hwt.hdl.constants import NOP
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axi_comp.cache.mshr import AxiCacheMshrFile
+from hwtLib.amba.constants import RESP_OKAY
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+
+
+class AxiCacheMshrFileTC(SimTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = AxiCacheMshrFile()
+        u.ADDR_WIDTH = 8
+        u.ID_WIDTH = 4
+        u.DATA_WIDTH = 16
+        u.MSHR_CNT = 4
+        u.TARGET_CNT = 4
+        cls.compileSim(u)
+
+    @staticmethod
+    def mem_data(addr):
+        return (addr * 3 + 1) & 0xffff
+
+    def mem_responder(self, delay=0):
+        """
+        Sim. process which responds to each mem_req after specified delay
+        """
+        u = self.u
+        req = u.mem_req._ag.data
+        resp = u.mem_resp._ag.data
+        while True:
+            yield Timer(CLK_PERIOD)
+            while req:
+                _id, addr = req.popleft()
+                for _ in range(delay):
+                    resp.append(NOP)
+                resp.append((_id, self.mem_data(int(addr)), RESP_OKAY, 1))
+
+    def mem_responder_shuffled(self, rand: Random):
+        """
+        Sim. process which responds to the mem_req in random order
+        """
+        u = self.u
+        req = u.mem_req._ag.data
+        resp = u.mem_resp._ag.data
+        pending = []
+        while True:
+            yield Timer(CLK_PERIOD)
+            while req:
+                _id, addr = req.popleft()
+                pending.append((int(_id), int(addr)))
+            if pending and not resp and rand.randint(0, 2) == 0:
+                _id, addr = pending.pop(rand.randrange(len(pending)))
+                resp.append((_id, self.mem_data(addr), RESP_OKAY, 1))
+
+    def r_data(self):
+        return [(int(_id), int(d)) for (_id, d, _, _) in self.u.s_r._ag.data]
+
+    def test_nop(self):
+        u = self.u
+        self.runSim(10 * CLK_PERIOD)
+        self.assertEmpty(u.mem_req._ag.data)
+        self.assertEmpty(u.s_r._ag.data)
+
+    def test_primary_misses(self):
+        u = self.u
+        u.miss._ag.data.extend([(5, 10), (6, 11), (7, 12)])
+        # respond out of order after all requests were dispatched
+        u.mem_resp._ag.data.extend([NOP for _ in range(10)] + [
+            (2, 12, RESP_OKAY, 1),
+            (0, 10, RESP_OKAY, 1),
+            (1, 11, RESP_OKAY, 1)
+        ])
+        self.runSim(25 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.mem_req._ag.data,
+                                    [(0, 10), (1, 11), (2, 12)])
+        self.assertValSequenceEqual(u.s_r._ag.data,
+                                    [(7, 12, RESP_OKAY, 1),
+                                     (5, 10, RESP_OKAY, 1),
+                                     (6, 11, RESP_OKAY, 1)])
+
+    def test_same_id_shuffled_resp(self):
+        u = self.u
+        u.miss._ag.data.extend([(5, 10), (6, 11), (5, 12), (5, 13)])
+        u.mem_resp._ag.data.extend([NOP for _ in range(10)] + [
+            (3, 13, RESP_OKAY, 1),
+            (2, 12, RESP_OKAY, 1),
+            (1, 11, RESP_OKAY, 1),
+            (0, 10, RESP_OKAY, 1),
+        ])
+        self.runSim(30 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.mem_req._ag.data,
+                                    [(0, 10), (1, 11), (2, 12), (3, 13)])
+        # the response with other id may overtake,
+        # the responses with the same id have to stay in order of the requests
+        self.assertValSequenceEqual(u.s_r._ag.data,
+                                    [(6, 11, RESP_OKAY, 1),
+                                     (5, 10, RESP_OKAY, 1),
+                                     (5, 12, RESP_OKAY, 1),
+                                     (5, 13, RESP_OKAY, 1)])
+
+    def test_same_id_no_merge_over_other_mshr(self):
+        u = self.u
+        # the last miss can not be merged to MSHR 0 because it would overtake the miss in MSHR 1
+        u.miss._ag.data.extend([(5, 10), (5, 11), (5, 10)])
+        u.mem_resp._ag.data.extend([NOP for _ in range(10)] + [
+            (2, 10, RESP_OKAY, 1),
+            (1, 11, RESP_OKAY, 1),
+            (0, 10, RESP_OKAY, 1),
+        ])
+        self.runSim(30 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.mem_req._ag.data,
+                                    [(0, 10), (1, 11), (2, 10)])
+        self.assertValSequenceEqual(u.s_r._ag.data,
+                                    [(5, 10, RESP_OKAY, 1),
+                                     (5, 11, RESP_OKAY, 1),
+                                     (5, 10, RESP_OKAY, 1)])
+
+    def test_merge(self):
+        u = self.u
+        u.miss._ag.data.extend([(1, 10), (2, 10), (3, 11), (4, 10)])
+        self.procs.append(self.mem_responder(delay=10))
+        self.runSim(30 * CLK_PERIOD)
+        self.assertEmpty(u.mem_req._ag.data)
+        self.assertSequenceEqual(self.r_data(),
+                                 [(1, self.mem_data(10)),
+                                  (2, self.mem_data(10)),
+                                  (4, self.mem_data(10)),
+                                  (3, self.mem_data(11))])
+
+    def test_all_busy(self):
+        u = self.u
+        N = u.MSHR_CNT + 2
+        u.miss._ag.data.extend((i, i) for i in range(N))
+        self.runSim(20 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.mem_req._ag.data,
+                                    [(i, i) for i in range(u.MSHR_CNT)])
+        self.assertEmpty(u.s_r._ag.data)
+
+    def test_too_many_targets(self):
+        u = self.u
+        N = u.TARGET_CNT + 1
+        u.miss._ag.data.extend((i, 10) for i in range(N))
+        self.runSim(20 * CLK_PERIOD)
+        # the last request waits for the MSHR which is already full
+        self.assertValSequenceEqual(u.mem_req._ag.data, [(0, 10)])
+        self.assertEmpty(u.s_r._ag.data)
+
+    def test_randomized(self, N=200):
+        u = self.u
+        rand = Random(0)
+        self.randomize(u.miss)
+        self.randomize(u.mem_req)
+        self.randomize(u.mem_resp)
+        self.randomize(u.s_r)
+        self.procs.append(self.mem_responder(delay=3))
+        expected = []
+        for _ in range(N):
+            _id = rand.randint(0, 15)
+            addr = rand.randint(0, 7)
+            u.miss._ag.data.append((_id, addr))
+            expected.append((_id, self.mem_data(addr)))
+
+        self.runSim(N * 8 * CLK_PERIOD)
+        self.assertEmpty(u.miss._ag.data)
+        self.assertSequenceEqual(sorted(self.r_data()), sorted(expected))
+
+    def test_randomized_same_id_order(self, N=200):
+        u = self.u
+        rand = Random(1)
+        self.randomize(u.miss)
+        self.randomize(u.s_r)
+        self.procs.append(self.mem_responder_shuffled(rand))
+        expected = {}
+        for _ in range(N):
+            _id = rand.randint(0, 2)
+            addr = rand.randint(0, 7)
+            u.miss._ag.data.append((_id, addr))
+            expected.setdefault(_id, []).append(self.mem_data(addr))
+
+        self.runSim(N * 10 * CLK_PERIOD)
+        self.assertEmpty(u.miss._ag.data)
+        r_data = self.r_data()
+        self.assertEqual(len(r_data), N)
+        for _id, ref in expected.items():
+            self.assertSequenceEqual([d for i, d in r_data if i == _id], ref, _id)
+
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiCacheMshrFileTC('test_merge'))
+    suite.addTest(unittest.makeSuite(AxiCacheMshrFileTC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -1,10 +1,11 @@
 from operator import ne
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from hwt.code import Concat, And, Or
 from hwt.code_utils import _mkOp
 from hwt.math import isPow2, log2ceil
 from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwtLib.amba.axi_comp.cache.replacement_policy import CacheReplacementPolicy
 
 
 def parity(bit_vector):
@@ -12,7 +13,7 @@ def parity(bit_vector):
 
 
 # https://chipress.co/2019/07/09/how-to-implement-pseudo-lru/
-class PseudoLru():
+class PseudoLru(CacheReplacementPolicy):
     """
     Tree-PLRU, Pseudo Last Recently Used (LRU) algorithm
     * Often used to select least used value in caches etc.
@@ -53,6 +54,8 @@ class PseudoLru():
       bit 5: bank[3] more recently used than bank[2]
 
     :note: this is not a component in order to make this alg independent on lru reg storage type
+    :note: :meth:`~.get_victim` is :meth:`~.get_lru` and :meth:`~.on_hit` is :meth:`~.mark_use_many`
+        (the interface of :class:`hwtLib.amba.axi_comp.cache.replacement_policy.CacheReplacementPolicy`)
     :ivar lru_reg: register with bits which represents binary tree
         used in pseudo LRU. It uses a common binary tree in array node representation
         index of left is 2x parent index; index of right is 2x parent index + 1
@@ -66,37 +69,74 @@ class PseudoLru():
     def lru_reg_items(width):
         return 2 ** log2ceil(width + 1)
 
-    def __init__(self, lru_reg: RtlSignal):
-        assert isPow2(lru_reg._dtype.bit_length() - 1) or lru_reg._dtype.bit_length() == 1, lru_reg._dtype.bit_length()
+    @staticmethod
+    def state_width(items: int) -> int:
+        return PseudoLru.lru_reg_width(items)
+
+    def __init__(self, lru_reg: RtlSignal, rand: Optional[RtlSignal]=None):
+        assert isPow2(lru_reg._dtype.bit_length() + 1), lru_reg._dtype.bit_length()
+        super(PseudoLru, self).__init__(lru_reg, rand=rand)
         self.lru_regs = lru_reg
 
-    def node_selected_mask(self, lru_tree, node_i):
+    def _item_flags(self, used_item_mask, node_i):
         """
-        :ivar lru_tree: array with lru binary tree, nodes are lru registers,
-            leafs are select flags
-        :ivar node_i: index of node which we are checking
+        :return: generator of bits from used_item_mask for items in subtree of node_i
         """
-        is_leaf = 2 * node_i + 1 >= self.lru_regs._dtype.bit_length()
-        if is_leaf:
-            yield lru_tree[node_i]
+        w = self.lru_regs._dtype.bit_length()
+        if node_i >= w:
+            yield used_item_mask[node_i - w]
         else:
-            # right
-            yield from self.node_selected_mask(lru_tree, 2 * node_i + 1)
-            # left
-            yield from self.node_selected_mask(lru_tree, 2 * node_i + 2)
+            yield from self._item_flags(used_item_mask, 2 * node_i + 1)
+            yield from self._item_flags(used_item_mask, 2 * node_i + 2)
+
+    def _node_update(self, used_item_mask, i: int):
+        """
+        :return: tuple (left subtree used, right subtree used, the value of the node
+            which makes the used subtree the more recently used one)
+        """
+        w = self.lru_regs._dtype.bit_length()
+        left = Or(*self._item_flags(used_item_mask, 2 * i + 1))
+        right = Or(*self._item_flags(used_item_mask, 2 * i + 2))
+        if 2 * i + 1 >= w:
+            # last level, 0 means that the right item is the LRU
+            away = right
+        else:
+            # 0 means that the LRU is in left subtree
+            away = left
+        return left, right, away
+
+    def mark_use(self, used_item_mask):
+        """
+        Mark a single item as the most recently used, the nodes on the path
+        to this item are set to point to the other subtree
+
+        :param used_item_mask: one hot encoded index of the item (or 0 for no change),
+            use :meth:`~.mark_use_many` if multiple bits may be set
+        :return: new value for lru_reg
+        """
+        res = []
+        for i in range(self.lru_regs._dtype.bit_length()):
+            left, right, away = self._node_update(used_item_mask, i)
+            res.append((left | right)._ternary(away, self.lru_regs[i]))
+
+        return Concat(*reversed(res))
 
     def mark_use_many(self, used_item_mask):
         """
-        Mark values as used just now
+        Mark multiple items as used just now, the node where items from only one subtree are used
+        is set to point to the other subtree (same as :meth:`~.mark_use`),
+        the node where items from both subtrees are used is toggled
+
+        :param used_item_mask: mask of used items (or 0 for no change)
+        :return: new value for lru_reg
         """
-        lru_tree = [*self.lru_regs, *used_item_mask]
-        invert_mask = []
+        res = []
         for i in range(self.lru_regs._dtype.bit_length()):
-            # flip lru node if it is accessed odd-number times
-            do_invert = parity(self.node_selected_mask(lru_tree, i))
-            invert_mask.append(do_invert)
+            left, right, away = self._node_update(used_item_mask, i)
+            n = self.lru_regs[i]
+            res.append((left & right)._ternary(~n, (left | right)._ternary(away, n)))
 
-        return self.lru_regs ^ Concat(*reversed(invert_mask))
+        return Concat(*reversed(res))
 
     def _build_node_paths(self, node_paths: Dict[int, List[RtlSignal]],
                           i: int,
@@ -143,3 +183,10 @@ class PseudoLru():
 
         # MSB was first so the result is in little endian MSB..LSB
         return Concat(*lru_index_bin)
+
+    def get_victim(self):
+        return self.get_lru()
+
+    def on_hit(self, used_item_mask):
+        # the mask may be multi hot (e.g. merged accesses in :class:`hwtLib.amba.axi_comp.cache.lru_array.AxiCacheLruArray`)
+        return self.mark_use_many(used_item_mask)
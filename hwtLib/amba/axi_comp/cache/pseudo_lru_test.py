@@ -1,5 +1,8 @@
 import unittest
+
+from hwt.hdl.types.bits import Bits
 from hwtLib.amba.axi_comp.cache.pseudo_lru import PseudoLru
+from pyMathBitPrecise.bit_utils import mask
 
 
 class PseudoLru_TC(unittest.TestCase):
@@ -17,6 +20,82 @@ class PseudoLru_TC(unittest.TestCase):
             items_ = PseudoLru.lru_reg_items(w)
             self.assertEqual(items_, items)
 
+    def test_mark_use(self):
+        for items in (2, 4, 8):
+            lru_t = Bits(PseudoLru.lru_reg_width(items), force_vector=True)
+            mask_t = Bits(items)
+            for v in range(2 ** lru_t.bit_length()):
+                lru = PseudoLru(lru_t.from_py(v))
+                # empty mask does not change anything
+                self.assertEqual(int(lru.mark_use(mask_t.from_py(0))), v)
+                for i in range(items):
+                    v_next = lru.mark_use(mask_t.from_py(1 << i))
+                    victim = PseudoLru(lru_t.from_py(int(v_next))).get_lru()
+                    self.assertNotEqual(int(victim), i)
+
+            # use of all items in order, the first one is the LRU
+            v = lru_t.from_py(0)
+            for i in range(items):
+                v = lru_t.from_py(int(PseudoLru(v).mark_use(mask_t.from_py(1 << i))))
+            self.assertEqual(int(PseudoLru(v).get_lru()), 0)
+
+    @staticmethod
+    def _mark_use_many_ref(v: int, m: int, items: int) -> int:
+        w = PseudoLru.lru_reg_width(items)
+        res = v
+        for i in range(w):
+            # items in subtree of the node, the left child of the node is 2 * i + 1
+            first = last = i
+            while first < w:
+                first = 2 * first + 1
+                last = 2 * last + 2
+            first -= w
+            last -= w
+            half = (first + last + 1) // 2
+            left = (m >> first) & mask(half - first) != 0
+            right = (m >> half) & mask(last + 1 - half) != 0
+            if left and right:
+                res ^= 1 << i
+            elif left or right:
+                if 2 * i + 1 >= w:
+                    away = right
+                else:
+                    away = left
+                res = (res & ~(1 << i)) | (int(away) << i)
+        return res
+
+    def test_mark_use_many(self):
+        for items in (2, 4):
+            lru_t = Bits(PseudoLru.lru_reg_width(items), force_vector=True)
+            mask_t = Bits(items)
+            for v in range(2 ** lru_t.bit_length()):
+                lru = PseudoLru(lru_t.from_py(v))
+                for m in range(2 ** items):
+                    self.assertEqual(int(lru.mark_use_many(mask_t.from_py(m))),
+                                     self._mark_use_many_ref(v, m, items), (items, v, m))
+                # for one hot masks it is same as mark_use
+                for i in range(items):
+                    self.assertEqual(int(lru.mark_use_many(mask_t.from_py(1 << i))),
+                                     int(lru.mark_use(mask_t.from_py(1 << i))), (items, v, i))
+
+    def test_on_hit_sequence(self):
+        items = 8
+        lru_t = Bits(PseudoLru.lru_reg_width(items), force_vector=True)
+        mask_t = Bits(items)
+        # one hot accesses, the state sequence is same as with mark_use
+        v = v_ref = lru_t.from_py(0)
+        for i in [3, 0, 7, 5, 5, 1, 6, 2, 4]:
+            m = mask_t.from_py(1 << i)
+            v = lru_t.from_py(int(PseudoLru(v).on_hit(m)))
+            v_ref = lru_t.from_py(int(PseudoLru(v_ref).mark_use(m)))
+            self.assertEqual(int(v), int(v_ref), i)
+            self.assertNotEqual(int(PseudoLru(v).get_lru()), i)
+
+        # merged accesses
+        for m in [0b00000011, 0b10000001, 0b01100000, 0b11111111, 0]:
+            v_prev = int(v)
+            v = lru_t.from_py(int(PseudoLru(v).on_hit(mask_t.from_py(m))))
+            self.assertEqual(int(v), self._mark_use_many_ref(v_prev, m, items), m)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,268 @@
+from typing import Optional, List
+
+from hwt.code import Concat, Or, And
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
+from hwt.math import log2ceil, isPow2
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from pyMathBitPrecise.bit_utils import mask
+
+
+def _one_hot_to_bin(one_hot: List[RtlSignal]):
+    """
+    Convert the list of one hot encoded bits to a binary index
+    (without a parent component, usable also on constant values)
+    """
+    w = log2ceil(len(one_hot))
+    res = []
+    for b in range(w):
+        res.append(Or(*(bit for i, bit in enumerate(one_hot) if (i >> b) & 1)))
+    return Concat(*reversed(res))
+
+
+def _first_one_hot(flags: List[RtlSignal]):
+    """
+    :return: list of bits where only the first 1 from flags is set
+    """
+    res = []
+    for i, f in enumerate(flags):
+        if i == 0:
+            res.append(f)
+        else:
+            res.append(f & ~Or(*flags[:i]))
+    return res
+
+
+class CacheReplacementPolicy():
+    """
+    A base class of the cache replacement policies
+
+    The policy is not a component, it is just a function of the state of a single
+    cache set (so the state can be stored in any type of memory) in a same way
+    as :class:`hwtLib.amba.axi_comp.cache.pseudo_lru.PseudoLru`.
+
+    :ivar ~.state: signal/value with the state of the cache set
+    :ivar ~.rand: random bits (:meth:`~.rand_width` wide)
+        or None if the policy does not need them
+    """
+
+    def __init__(self, state: RtlSignal, rand: Optional[RtlSignal]=None):
+        self.state = state
+        self.rand = rand
+
+    @staticmethod
+    def state_width(items: int) -> int:
+        """
+        :return: number of bits of the state for the set with the specified number of items (ways)
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def rand_width(cls, items: int) -> int:
+        """
+        :return: number of random bits required by this policy (the rand argument of the constructor)
+        """
+        return 0
+
+    def get_victim(self):
+        """
+        :return: a binary index of the item which should be replaced
+        """
+        raise NotImplementedError()
+
+    def on_hit(self, used_item_mask):
+        """
+        :param used_item_mask: the one hot encoded items which were used (or 0 for no change)
+        :return: the new value of the state
+        """
+        raise NotImplementedError()
+
+    def on_insert(self, inserted_item_mask, used_item_mask):
+        """
+        :param inserted_item_mask: the one hot encoded item which was replaced by a new item
+            (the victim from :meth:`~.get_victim`)
+        :param used_item_mask: the items which were used at the same time
+        :return: the new value of the state
+        """
+        return self.on_hit(inserted_item_mask | used_item_mask)
+
+
+class TrueLru(CacheReplacementPolicy):
+    """
+    True LRU (Least Recently Used) replacement policy
+    (suitable only for small number of ways as the state grows with items^2)
+
+    The state has a bit for each pair of items (i, j) where i < j,
+    the bit is 1 if the item j was used more recently than the item i.
+    """
+
+    @staticmethod
+    def state_width(items: int) -> int:
+        return items * (items - 1) // 2
+
+    @staticmethod
+    def items_from_width(width: int) -> int:
+        items = 1
+        while TrueLru.state_width(items) < width:
+            items += 1
+        assert TrueLru.state_width(items) == width, width
+        return items
+
+    def __init__(self, state: RtlSignal, rand: Optional[RtlSignal]=None):
+        super(TrueLru, self).__init__(state, rand=rand)
+        self.items = self.items_from_width(state._dtype.bit_length())
+        self.pair_index = {}
+        for i in range(self.items):
+            for j in range(i + 1, self.items):
+                self.pair_index[(i, j)] = len(self.pair_index)
+
+    def get_victim(self):
+        st = self.state
+        victim_oh = []
+        for i in range(self.items):
+            # all other items were used more recently than this one
+            older = []
+            for j in range(self.items):
+                if j > i:
+                    older.append(st[self.pair_index[(i, j)]])
+                elif j < i:
+                    older.append(~st[self.pair_index[(j, i)]])
+            victim_oh.append(And(*older))
+        return _one_hot_to_bin(victim_oh)
+
+    def on_hit(self, used_item_mask):
+        st = self.state
+        res = []
+        for (i, j), b_i in sorted(self.pair_index.items(), key=lambda x: x[1]):
+            used_i = used_item_mask[i]
+            used_j = used_item_mask[j]
+            res.append(
+                (used_j & ~used_i)._ternary(
+                    BIT.from_py(1),
+                    (used_i & ~used_j)._ternary(BIT.from_py(0), st[b_i])
+                )
+            )
+        return Concat(*reversed(res))
+
+
+class Srrip(CacheReplacementPolicy):
+    """
+    SRRIP (Static Re-Reference Interval Prediction) replacement policy
+
+    Each item has a RRPV_WIDTH wide re-reference prediction value (RRPV).
+    The victim is the first item with the max RRPV, if the max RRPV is lower
+    than the max value of RRPV all items are aged so the victim has the max value.
+    The hit sets the RRPV of the item to 0 and the inserted item has RRPV
+    of the max value - 1 (long re-reference interval).
+
+    :cvar RRPV_WIDTH: number of bits of RRPV for each item
+    :see: Jaleel et al., High Performance Cache Replacement Using Re-Reference Interval Prediction (RRIP), ISCA 2010
+    """
+    RRPV_WIDTH = 2
+
+    @classmethod
+    def state_width(cls, items: int) -> int:
+        return items * cls.RRPV_WIDTH
+
+    def __init__(self, state: RtlSignal, rand: Optional[RtlSignal]=None):
+        super(Srrip, self).__init__(state, rand=rand)
+        w = state._dtype.bit_length()
+        assert w % self.RRPV_WIDTH == 0, (w, self.RRPV_WIDTH)
+        self.items = w // self.RRPV_WIDTH
+        self.RRPV_MAX = mask(self.RRPV_WIDTH)
+
+    def rrpv(self, i: int):
+        W = self.RRPV_WIDTH
+        return self.state[(i + 1) * W:i * W]
+
+    def max_rrpv(self):
+        res = None
+        for i in range(self.items):
+            v = self.rrpv(i)
+            if res is None:
+                res = v
+            else:
+                res = (v > res)._ternary(v, res)
+        return res
+
+    def get_victim(self):
+        max_v = self.max_rrpv()
+        return _one_hot_to_bin(_first_one_hot(
+            [self.rrpv(i)._eq(max_v) for i in range(self.items)]))
+
+    def insert_rrpv(self):
+        return Bits(self.RRPV_WIDTH).from_py(self.RRPV_MAX - 1)
+
+    def on_hit(self, used_item_mask):
+        res = []
+        for i in range(self.items):
+            res.append(used_item_mask[i]._ternary(
+                Bits(self.RRPV_WIDTH).from_py(0),
+                self.rrpv(i)))
+        return Concat(*reversed(res))
+
+    def on_insert(self, inserted_item_mask, used_item_mask):
+        # aging of all items, the victim had the max rrpv
+        age = Bits(self.RRPV_WIDTH).from_py(self.RRPV_MAX) - self.max_rrpv()
+        ins_v = self.insert_rrpv()
+        res = []
+        for i in range(self.items):
+            res.append(used_item_mask[i]._ternary(
+                Bits(self.RRPV_WIDTH).from_py(0),
+                inserted_item_mask[i]._ternary(
+                    ins_v,
+                    self.rrpv(i) + age
+                )
+            ))
+        return Concat(*reversed(res))
+
+
+class Brrip(Srrip):
+    """
+    BRRIP (Bimodal Re-Reference Interval Prediction) replacement policy
+
+    Same as :class:`~.Srrip` but the inserted item has RRPV of the max value
+    (distant re-reference interval) and only with the probability 1/2^RAND_WIDTH
+    the max value - 1. This prevents the thrashing for working sets
+    larger than the cache.
+
+    :cvar RAND_WIDTH: the log2 of inverse probability of the insertion with long re-reference interval
+    :note: the rand should have all bits 1 with the probability 1/2^RAND_WIDTH
+        (e.g. several bits from :class:`hwtLib.logic.lfsr.Lfsr`)
+    """
+    RAND_WIDTH = 5
+
+    @classmethod
+    def rand_width(cls, items: int) -> int:
+        return cls.RAND_WIDTH
+
+    def insert_rrpv(self):
+        return self.rand._eq(mask(self.RAND_WIDTH))._ternary(
+            Bits(self.RRPV_WIDTH).from_py(self.RRPV_MAX - 1),
+            Bits(self.RRPV_WIDTH).from_py(self.RRPV_MAX),
+        )
+
+
+class LfsrRandom(CacheReplacementPolicy):
+    """
+    Random replacement policy, the victim is selected by the random bits
+    (e.g. from :class:`hwtLib.logic.lfsr.Lfsr`)
+
+    :note: this policy does not have any state, the state_width is 1
+        only to have a same memory layout as other policies, the bit is unused
+    """
+
+    @staticmethod
+    def state_width(items: int) -> int:
+        return 1
+
+    @classmethod
+    def rand_width(cls, items: int) -> int:
+        assert items > 1 and isPow2(items), items
+        return log2ceil(items)
+
+    def get_victim(self):
+        return self.rand
+
+    def on_hit(self, used_item_mask):
+        return self.state
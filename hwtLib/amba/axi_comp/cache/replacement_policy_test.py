@@ -0,0 +1,96 @@
+from random import Random
+import unittest
+
+from hwt.hdl.types.bits import Bits
+from hwtLib.amba.axi_comp.cache.cache_model import PseudoLruModel, \
+    TrueLruModel, SrripModel
+from hwtLib.amba.axi_comp.cache.pseudo_lru import PseudoLru
+from hwtLib.amba.axi_comp.cache.replacement_policy import TrueLru, Srrip, \
+    Brrip, LfsrRandom
+
+
+class CacheReplacementPolicy_TC(unittest.TestCase):
+    """
+    Check that the hardware policies (evaluated on constant values)
+    behave same as the Python models in :mod:`hwtLib.amba.axi_comp.cache.cache_model`
+    """
+
+    def _test_policy_against_model(self, policy_cls, model_cls, items, N=200):
+        rand = Random(items)
+        st_t = Bits(policy_cls.state_width(items), force_vector=True)
+        mask_t = Bits(items)
+        zero = mask_t.from_py(0)
+        st = st_t.from_py(0)
+        model = model_cls(items)
+        for _ in range(N):
+            victim = int(policy_cls(st).get_victim())
+            self.assertEqual(victim, model.victim())
+            if rand.randint(0, 2):
+                item = rand.randrange(items)
+                st = policy_cls(st).on_hit(mask_t.from_py(1 << item))
+                model.on_hit(item)
+            else:
+                st = policy_cls(st).on_insert(mask_t.from_py(1 << victim), zero)
+                model.on_insert(victim)
+            st = st_t.from_py(int(st))
+
+    def test_pseudo_lru(self):
+        for items in (2, 4, 8):
+            self._test_policy_against_model(PseudoLru, PseudoLruModel, items)
+
+    def test_true_lru(self):
+        for items in (2, 3, 4, 8):
+            self._test_policy_against_model(TrueLru, TrueLruModel, items)
+
+    def test_true_lru_order(self):
+        items = 4
+        st_t = Bits(TrueLru.state_width(items))
+        mask_t = Bits(items)
+        st = st_t.from_py(0)
+        for i in [2, 0, 3, 1, 0]:
+            st = st_t.from_py(int(TrueLru(st).on_hit(mask_t.from_py(1 << i))))
+        # 2 is the least recently used
+        self.assertEqual(int(TrueLru(st).get_victim()), 2)
+
+    def test_srrip(self):
+        for items in (2, 4, 8):
+            self._test_policy_against_model(Srrip, SrripModel, items)
+
+    def test_srrip_scan_resistance(self):
+        items = 4
+        st_t = Bits(Srrip.state_width(items))
+        mask_t = Bits(items)
+        zero = mask_t.from_py(0)
+        st = st_t.from_py(0)
+        # fill the set and use the item 1
+        for i in range(items):
+            st = st_t.from_py(int(Srrip(st).on_insert(mask_t.from_py(1 << i), zero)))
+        st = st_t.from_py(int(Srrip(st).on_hit(mask_t.from_py(1 << 1))))
+        # scan of new items does not replace the item 1
+        # (LRU would replace it after items - 1 insertions)
+        for _ in range(2 * (items - 1)):
+            v = int(Srrip(st).get_victim())
+            self.assertNotEqual(v, 1)
+            st = st_t.from_py(int(Srrip(st).on_insert(mask_t.from_py(1 << v), zero)))
+
+    def test_brrip_insert(self):
+        items = 4
+        st_t = Bits(Brrip.state_width(items))
+        mask_t = Bits(items)
+        rand_t = Bits(Brrip.rand_width(items))
+        st = st_t.from_py(0)
+        for rand, rrpv in [(0, 3), (rand_t.all_mask(), 2)]:
+            p = Brrip(st, rand=rand_t.from_py(rand))
+            new_st = p.on_insert(mask_t.from_py(1 << 2), mask_t.from_py(0))
+            self.assertEqual(int(Brrip(new_st, rand=rand_t.from_py(rand)).rrpv(2)), rrpv)
+
+    def test_random(self):
+        items = 8
+        rand_t = Bits(LfsrRandom.rand_width(items))
+        st = Bits(LfsrRandom.state_width(items)).from_py(0)
+        for r in range(items):
+            self.assertEqual(int(LfsrRandom(st, rand=rand_t.from_py(r)).get_victim()), r)
+
+
+if __name__ == '__main__':
+    unittest.main()
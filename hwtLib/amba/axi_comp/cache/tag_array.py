@@ -55,6 +55,7 @@ class AxiCacheTagArrayUpdateIntf(VldSynced):
     :note: address is split on index, tag, offset and then stored
     :ivar delete: If true the record will be deleted form array
         else new record will be inserted.
+    :ivar dirty: the value of dirty flag of the record (present only if HAS_DIRTY)
 
     .. hwt-autodoc::
     """
@@ -62,12 +63,15 @@ class AxiCacheTagArrayUpdateIntf(VldSynced):
     def _config(self):
         self.WAY_CNT = Param(4)
         self.ADDR_WIDTH = Param(32)
+        self.HAS_DIRTY = Param(False)
 
     def _declr(self):
         self.addr = VectSignal(self.ADDR_WIDTH)
         if self.WAY_CNT > 1:
             self.way_en = VectSignal(self.WAY_CNT)
         self.delete = Signal()
+        if self.HAS_DIRTY:
+            self.dirty = Signal()
         self.vld = Signal()
 
 
@@ -82,6 +86,7 @@ class AxiCacheTagArray(CacheAddrTypeConfig):
     :ivar CACHE_LINE_CNT: a total number of cachelines in this array
     :ivar UPDATE_PORT_CNT: number of ports used for record update
     :ivar CACHE_LINE_SIZE: size of cacheline [B]
+    :ivar HAS_DIRTY: if True the record contains also a dirty flag (used by write-back caches)
 
     :see: :meth:`~.AxiCacheTagArrayLookupIntf._config`
     :see: :meth:`~.AxiCacheTagArrayLookupResIntf._config`
@@ -106,9 +111,13 @@ class AxiCacheTagArray(CacheAddrTypeConfig):
             # valid can be altered on cacheline flush or fill
             (BIT, "valid"),
         ]
+        if self.HAS_DIRTY:
+            # dirty specifies that the cacheline was modified and it has to be written back
+            # before it is replaced
+            tag_record_t.append((BIT, "dirty"))
         # :note: it is important that the record is aligned to byte boundary
         # because we will use byte-enable on ram port to update this item in array of such a items
-        misalign = (self.TAG_W + 1) % 8
+        misalign = (self.TAG_W + 1 + int(bool(self.HAS_DIRTY))) % 8
         if misalign != 0:
             tag_record_t.append((Bits(8 - misalign), None))
         return HStruct(*tag_record_t)
@@ -149,6 +158,7 @@ class AxiCacheTagArray(CacheAddrTypeConfig):
             HStruct(
                 (update.addr._dtype, "addr"),
                 (BIT, "delete"),
+                *([(BIT, "dirty")] if self.HAS_DIRTY else ()),
                 (update.way_en._dtype, "way_en"),
                 (BIT, "vld"),
             ),
@@ -162,10 +172,13 @@ class AxiCacheTagArray(CacheAddrTypeConfig):
 
         # construct the byte enable mask for various tag enable configurations
         # prepare write tag in every way but byte enable only requested ways
-        tag_record = self.tag_record_t.from_py({
+        tag_record = {
             "tag": tag,
             "valid":~update.delete,
-        })
+        }
+        if self.HAS_DIRTY:
+            tag_record["dirty"] = update.dirty._sig
+        tag_record = self.tag_record_t.from_py(tag_record)
         tag_record = tag_record._reinterpret_cast(Bits(self.tag_record_t.bit_length()))
         tag_mem_port_w.din(Concat(*(tag_record for _ in range(self.WAY_CNT))))
         tag_be_t = Bits(self.tag_record_t.bit_length() // 8)
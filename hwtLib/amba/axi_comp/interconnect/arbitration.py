@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Optional, Tuple, Union, Set
+
+from hwt.code import Or, rol, If, And, Concat
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
+from hwt.hdl.value import HValue
+from hwt.math import log2ceil
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axi3Lite import Axi3Lite_addr
+from hwtLib.handshaked.joinFair import HsJoinFairShare
+
+
+class AXI_ARBITRATION():
+    """
+    Arbitration schemes for the address channels of AXI interconnects
+    (:class:`hwtLib.amba.axi_comp.interconnect.matrixAddrCrossbar.AxiInterconnectMatrixAddrCrossbar`)
+
+    :cvar ROUND_ROBIN: the priority is rotated every clock cycle
+    :cvar QOS: the master with the highest QoS value wins (qos signal or static priority
+        from :class:`~.AxiInterconnectMasterConfig`), masters with same priority are selected by round-robin,
+        the master which is waiting for longer than its qos_aging gets the highest priority
+    :cvar WEIGHTED_ROUND_ROBIN: same as round-robin but the master keeps the priority
+        for "weight" transactions
+    :cvar TOKEN_BUCKET: round-robin where the masters which are over its bandwidth budget
+        are served only if there is no other master in budget
+    """
+    ROUND_ROBIN = "ROUND_ROBIN"
+    QOS = "QOS"
+    WEIGHTED_ROUND_ROBIN = "WEIGHTED_ROUND_ROBIN"
+    TOKEN_BUCKET = "TOKEN_BUCKET"
+
+
+class AxiInterconnectMasterConfig(frozenset):
+    """
+    An item of MASTERS parameter of AXI interconnects with arbitration parameters of the master.
+    It is the set of slave indexes (or tuples (slave index, access)) the same as a plain item of MASTERS.
+
+    :ivar ~.weight: number of consecutive transactions for :attr:`AXI_ARBITRATION.WEIGHTED_ROUND_ROBIN`
+    :ivar ~.priority: static priority (0-15) for :attr:`AXI_ARBITRATION.QOS`, if None the qos signal
+        of the address channel is used (or 0 if interface does not have it)
+    :ivar ~.qos_aging: number of clock cycles after which the waiting master gets the highest priority
+        for :attr:`AXI_ARBITRATION.QOS` (None means no aging)
+    :ivar ~.budget: tuple (beats, period), for :attr:`AXI_ARBITRATION.TOKEN_BUCKET`,
+        each period the master gets tokens for specified number of data beats
+        (None means unlimited)
+    :ivar ~.budget_burst: max number of tokens of the master (default is beats from budget)
+    """
+
+    def __new__(cls, slaves: Union[Set[int], Set[Tuple[int, int]]],
+                weight: int=1,
+                priority: Optional[int]=None,
+                qos_aging: Optional[int]=None,
+                budget: Optional[Tuple[int, int]]=None,
+                budget_burst: Optional[int]=None):
+        assert weight >= 1, weight
+        assert priority is None or (priority >= 0 and priority < 16), priority
+        assert qos_aging is None or qos_aging >= 1, qos_aging
+        if budget is not None:
+            beats, period = budget
+            assert beats >= 1 and period >= 1, budget
+            if budget_burst is None:
+                budget_burst = beats
+            assert budget_burst >= beats, (budget_burst, beats)
+
+        self = super(AxiInterconnectMasterConfig, cls).__new__(cls, slaves)
+        self.weight = weight
+        self.priority = priority
+        self.qos_aging = qos_aging
+        self.budget = budget
+        self.budget_burst = budget_burst
+        return self
+
+    def arbitration_params(self):
+        return {
+            "weight": self.weight,
+            "priority": self.priority,
+            "qos_aging": self.qos_aging,
+            "budget": self.budget,
+            "budget_burst": self.budget_burst,
+        }
+
+    def with_slaves(self, slaves):
+        """
+        :return: a copy of this config with a different set of slaves
+        """
+        return self.__class__(slaves, **self.arbitration_params())
+
+    @classmethod
+    def from_master(cls, master_config):
+        """
+        :return: the arbitration config for an item of MASTERS (default config for a plain set)
+        """
+        if isinstance(master_config, cls):
+            return master_config
+        else:
+            return cls(master_config)
+
+    def __repr__(self):
+        params = ", ".join(f"{k:s}={v}" for k, v in self.arbitration_params().items())
+        return f"{self.__class__.__name__:s}({set(self)}, {params:s})"
+
+    def __reduce__(self):
+        return (self.__class__, (set(self), self.weight, self.priority,
+                                 self.qos_aging, self.budget, self.budget_burst))
+
+
+def _isSelected_signals(parent: Unit, name: str, cnt: int) -> List[RtlSignal]:
+    return [parent._sig(f"{name:s}_isSelected_{i:d}") for i in range(cnt)]
+
+
+def qos_arbitration(parent: Unit, name: str,
+                    master_configs: List[AxiInterconnectMasterConfig],
+                    master_addr_channels: List[Axi3Lite_addr],
+                    master_vld: List[RtlSignal],
+                    slv_rd: RtlSignal) -> List[RtlSignal]:
+    """
+    Strict priority arbitration by QoS with an aging
+
+    :param slv_rd: the ready of the slave (the transaction of the selected master is accepted)
+    :return: isSelected flags for each master
+    """
+    if len(master_vld) == 1:
+        return [BIT.from_py(1), ]
+
+    isSelected = _isSelected_signals(parent, name, len(master_vld))
+    keys = []
+    for m_i, (cfg, m_addr, vld, isSel) in enumerate(zip(
+            master_configs, master_addr_channels, master_vld, isSelected)):
+        if cfg.priority is not None:
+            prio = Bits(4).from_py(cfg.priority)
+        elif hasattr(m_addr, "qos"):
+            prio = m_addr.qos
+        else:
+            prio = Bits(4).from_py(0)
+
+        if cfg.qos_aging is None or isinstance(vld, HValue):
+            starving = BIT.from_py(0)
+        else:
+            aging = cfg.qos_aging
+            age = parent._reg(f"{name:s}_master_{m_i:d}_age", Bits(log2ceil(aging + 1)), def_val=0)
+            starving = parent._sig(f"{name:s}_master_{m_i:d}_starving")
+            starving(age._eq(aging))
+            If(~vld | (isSel & slv_rd),
+                age(0)
+            ).Elif(~starving,
+                age(age + 1)
+            )
+        keys.append(Concat(starving, prio))
+
+    # masters with the highest priority
+    candidates = []
+    for m_i, (k, vld) in enumerate(zip(keys, master_vld)):
+        c = parent._sig(f"{name:s}_master_{m_i:d}_is_candidate")
+        c(vld & And(*(~o_vld | (k >= o_k)
+                      for o_i, (o_k, o_vld) in enumerate(zip(keys, master_vld))
+                      if o_i != m_i)))
+        candidates.append(c)
+
+    rr = HsJoinFairShare.isSelectedLogic(parent, candidates, None, None)
+    for isSel, c, r in zip(isSelected, candidates, rr):
+        isSel(c & r)
+
+    return isSelected
+
+
+def weighted_round_robin_arbitration(parent: Unit, name: str,
+                                     master_configs: List[AxiInterconnectMasterConfig],
+                                     master_vld: List[RtlSignal],
+                                     slv_rd: RtlSignal) -> List[RtlSignal]:
+    """
+    Round-robin where the prioritized master keeps the priority for "weight" accepted transactions
+    (or until it does not have a valid transaction)
+
+    :return: isSelected flags for each master
+    """
+    if len(master_vld) == 1:
+        return [BIT.from_py(1), ]
+
+    isSelected = _isSelected_signals(parent, name, len(master_vld))
+    priority = parent._reg(f"{name:s}_priority", Bits(len(master_vld)), def_val=1)
+    max_weight = max(c.weight for c in master_configs)
+    cnt = parent._reg(f"{name:s}_weight_cnt", Bits(log2ceil(max_weight + 1)), def_val=0)
+
+    for i, isSel in enumerate(isSelected):
+        isSel(HsJoinFairShare.priorityAck(priority, master_vld, i))
+
+    prio_vld = Or(*(priority[i] & vld for i, vld in enumerate(master_vld)))
+    prio_ack = prio_vld & slv_rd
+    weight_last = Or(*(priority[i] & cnt._eq(cfg.weight - 1)
+                       for i, cfg in enumerate(master_configs)))
+    If(~prio_vld | (weight_last & prio_ack),
+       priority(rol(priority, 1)),
+       cnt(0),
+    ).Elif(prio_ack,
+       cnt(cnt + 1),
+    )
+
+    return isSelected
+
+
+def token_bucket_in_budget(parent: Unit,
+                           master_configs: List[AxiInterconnectMasterConfig],
+                           master_addr_channels: List[Axi3Lite_addr]) -> List[RtlSignal]:
+    """
+    Instantiate token bucket for each master which has a budget
+    (the budget is shared for all slaves, each accepted transaction consumes len+1 tokens)
+
+    :return: flags which tells if the master is in budget for each master
+    """
+    in_budget = []
+    for m_i, (cfg, m_addr) in enumerate(zip(master_configs, master_addr_channels)):
+        if cfg.budget is None:
+            in_budget.append(BIT.from_py(1))
+            continue
+
+        beats, period = cfg.budget
+        burst = cfg.budget_burst
+        tokens = parent._reg(f"master_{m_i:d}_tokens", Bits(log2ceil(burst + 1)), def_val=burst)
+        if hasattr(m_addr, "len"):
+            len_w = m_addr.len._dtype.bit_length()
+            W = max(tokens._dtype.bit_length(), len_w + 1, log2ceil(burst + beats + 1)) + 1
+            cost = Concat(Bits(W - len_w).from_py(0), m_addr.len) + 1
+        else:
+            W = max(tokens._dtype.bit_length(), log2ceil(burst + beats + 1)) + 1
+            cost = Bits(W).from_py(1)
+
+        t = Concat(Bits(W - tokens._dtype.bit_length()).from_py(0), tokens)
+        _in_budget = parent._sig(f"master_{m_i:d}_in_budget")
+        _in_budget(t >= cost)
+        in_budget.append(_in_budget)
+
+        consume = m_addr.valid & m_addr.ready
+        after_consume = parent._sig(f"master_{m_i:d}_tokens_after_consume", Bits(W))
+        If(consume,
+            If(_in_budget,
+                after_consume(t - cost)
+            ).Else(
+                after_consume(0)
+            )
+        ).Else(
+            after_consume(t)
+        )
+
+        if period == 1:
+            refill = BIT.from_py(1)
+        else:
+            timer = parent._reg(f"master_{m_i:d}_budget_timer", Bits(log2ceil(period)), def_val=0)
+            refill = timer._eq(period - 1)
+            If(refill,
+               timer(0)
+            ).Else(
+               timer(timer + 1)
+            )
+
+        refilled = after_consume + beats
+        If(refill,
+            If(refilled > burst,
+                tokens(burst)
+            ).Else(
+                tokens(refilled[tokens._dtype.bit_length():])
+            )
+        ).Else(
+            tokens(after_consume[tokens._dtype.bit_length():])
+        )
+
+    return in_budget
+
+
+def token_bucket_arbitration(parent: Unit, name: str,
+                             master_vld: List[RtlSignal],
+                             master_in_budget: List[RtlSignal]) -> List[RtlSignal]:
+    """
+    Round-robin between masters in budget, if there is no master in budget
+    round-robin between all masters
+
+    :return: isSelected flags for each master
+    """
+    if len(master_vld) == 1:
+        return [BIT.from_py(1), ]
+
+    isSelected = _isSelected_signals(parent, name, len(master_vld))
+    priority = parent._reg(f"{name:s}_priority", Bits(len(master_vld)), def_val=1)
+    priority(rol(priority, 1))
+
+    vld_in_budget = [vld & b for vld, b in zip(master_vld, master_in_budget)]
+    any_in_budget = parent._sig(f"{name:s}_any_in_budget")
+    any_in_budget(Or(*vld_in_budget))
+    for i, (isSel, b) in enumerate(zip(isSelected, master_in_budget)):
+        isSel(any_in_budget._ternary(
+            b & HsJoinFairShare.priorityAck(priority, vld_in_budget, i),
+            HsJoinFairShare.priorityAck(priority, master_vld, i)
+        ))
+
+    return isSelected
@@ -1,13 +1,34 @@
 from itertools import chain
+from typing import Dict, Tuple, Generator
 
 from hwt.interfaces.utils import addClkRstn
 from hwt.math import log2ceil
 from hwt.synthesizer.hObjList import HObjList
 from hwt.synthesizer.param import Param
 from hwtLib.abstract.busInterconnect import BusInterconnect
+from hwtLib.amba.axi_comp.interconnect.arbitration import AXI_ARBITRATION
+from hwtLib.amba.axis_comp.builder import AxiSBuilder
 
 
 class AxiInterconnectCommon(BusInterconnect):
+    """
+    :ivar ~.MAX_TRANS_OVERLAP: max number of pending transactions (per master/slave,
+        per id if ID_REMAP is used)
+    :ivar ~.ARBITRATION: the arbitration scheme for the address channels (:class:`~.AXI_ARBITRATION`)
+    :ivar ~.ID_REMAP: if True the index of the master is prepended to the id of the transaction
+        on the way to slave and the responses are routed to masters by this id prefix,
+        this allows slaves to complete the transactions out of order
+        (the ID_WIDTH of slave interfaces is extended by the width of master index)
+    :ivar ~.REG_SLICES: names of channels ("ar", "aw", "r", "w", "b") which should have a register slice
+        (with no combinational path between input and output), the slice is on the output of internal
+        crossbar (on slave side for ar/aw/w, on master side for r/b)
+    :ivar ~.PIPELINED_ADDR_DECODE: if True the address decoder is moved before the input register
+        of the address channels (see :class:`~.AxiInterconnectMatrixAddrCrossbar`)
+    :cvar ADDR_CHANNEL_NAME: name of the address channel ("ar"/"aw") handled by the address crossbar
+        of this component, None if the component has no address crossbar of its own
+    """
+    CHANNEL_NAMES = ("ar", "aw", "r", "w", "b")
+    ADDR_CHANNEL_NAME = None
 
     def __init__(self, intfCls):
         self.intfCls = intfCls
@@ -17,9 +38,72 @@ class AxiInterconnectCommon(BusInterconnect):
         super(AxiInterconnectCommon, self)._config()
         self.INTF_CLS = Param(self.intfCls)
         self.MAX_TRANS_OVERLAP = Param(16)
+        self.ARBITRATION = Param(AXI_ARBITRATION.ROUND_ROBIN)
+        self.ID_REMAP = Param(False)
+        self.REG_SLICES = Param(())
+        self.PIPELINED_ADDR_DECODE = Param(False)
         self.intfCls._config(self)
 
+    @staticmethod
+    def _master_index_width(master_cnt: int):
+        """
+        :return: number of bits of master index prepended to id of transaction if ID_REMAP is used
+        """
+        if master_cnt > 1:
+            return log2ceil(master_cnt)
+        else:
+            return 0
+
+    def _reg_slice(self, channel_name: str, intf):
+        """
+        :return: the intf with a register slice if it is enabled for this channel in REG_SLICES
+        """
+        if channel_name in self.REG_SLICES:
+            return AxiSBuilder(self, intf).buff(1, latency=(1, 2)).end
+        else:
+            return intf
+
+    def _iter_addr_crossbars(self) -> Generator[Tuple[str, "AxiInterconnectMatrixAddrCrossbar"], None, None]:
+        """
+        :return: generator of tuples (address channel name, address crossbar)
+            for all address crossbars used in this component and in its sub interconnects
+        """
+        # (imported here because matrixAddrCrossbar imports this module)
+        from hwtLib.amba.axi_comp.interconnect.matrixAddrCrossbar import AxiInterconnectMatrixAddrCrossbar
+        for u in self._units:
+            if isinstance(u, AxiInterconnectMatrixAddrCrossbar):
+                assert self.ADDR_CHANNEL_NAME is not None, (self, "ADDR_CHANNEL_NAME not specified")
+                yield (self.ADDR_CHANNEL_NAME, u)
+            elif isinstance(u, AxiInterconnectCommon):
+                yield from u._iter_addr_crossbars()
+
+    def pipeline_report(self) -> Dict[str, Dict[str, int]]:
+        """
+        :note: can be used once the declarations were loaded (e.g. after :func:`hwt.synthesizer.utils.to_rtl`)
+        :return: dictionary channel name -> {"stages": number of register stages,
+            "comparators": number of address comparators} for each channel of this component
+        """
+        res = {}
+        for addr_ch_name, c in self._iter_addr_crossbars():
+            if addr_ch_name == "ar":
+                chs = ("ar", "r")
+            else:
+                assert addr_ch_name == "aw", addr_ch_name
+                chs = ("aw", "w", "b")
+
+            for ch in chs:
+                if ch not in res:
+                    # the address crossbar has an input register
+                    stages = int(ch == addr_ch_name) + int(ch in self.REG_SLICES)
+                    res[ch] = {"stages": stages, "comparators": 0}
+            res[addr_ch_name]["comparators"] += c.addr_decoder_comparator_cnt()
+
+        return res
+
     def _declr(self, has_r=True, has_w=True):
+        if has_r or has_w:
+            # (not for address crossbar)
+            assert set(self.REG_SLICES).issubset(self.CHANNEL_NAMES), (self.REG_SLICES, self.CHANNEL_NAMES)
         addClkRstn(self)
         AXI = self.intfCls
         with self._paramsShared():
@@ -34,3 +118,9 @@ class AxiInterconnectCommon(BusInterconnect):
 
         for s, (_, size) in zip(self.m, self.SLAVES):
             s.ADDR_WIDTH = log2ceil(size - 1)
+
+        if self.ID_REMAP:
+            assert self.ID_WIDTH > 0, ("ID_REMAP requires the interfaces with id", self.ID_WIDTH)
+            MASTER_INDEX_WIDTH = AxiInterconnectCommon._master_index_width(len(self.MASTERS))
+            for s in self.m:
+                s.ID_WIDTH = self.ID_WIDTH + MASTER_INDEX_WIDTH
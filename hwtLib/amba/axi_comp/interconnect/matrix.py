@@ -3,12 +3,15 @@
 
 from typing import Union, Set, List, Tuple
 
+from hwt.code import Concat
 from hwt.hdl.constants import READ, READ_WRITE, WRITE
+from hwt.hdl.types.bits import Bits
 from hwt.interfaces.utils import propagateClkRstn
 from hwt.synthesizer.hObjList import HObjList
 from hwtLib.abstract.busInterconnect import BusInterconnectUtils, \
     BusInterconnect
 from hwtLib.amba.axi4 import Axi4
+from hwtLib.amba.axi_comp.interconnect.arbitration import AxiInterconnectMasterConfig
 from hwtLib.amba.axi_comp.interconnect.common import AxiInterconnectCommon
 from hwtLib.amba.axi_comp.interconnect.matrixR import AxiInterconnectMatrixR
 from hwtLib.amba.axi_comp.interconnect.matrixW import AxiInterconnectMatrixW
@@ -24,7 +27,11 @@ class AxiInterconnectMatrix(AxiInterconnectCommon):
     :ivar ~.MASTERS: list of configuration of master interfaces,
         configuration is ALL if the master has visibility to all slaves
         or tuple of flags, where True means the master has visibility to slave
-        on this index
+        on this index, the item can be also :class:`~.AxiInterconnectMasterConfig`
+        in order to specify the parameters of the arbitration for this master
+    :ivar ~.ARBITRATION: the arbitration scheme for the address channels (:class:`~.AXI_ARBITRATION`)
+    :ivar ~.ID_REMAP: if True the id of the transaction is extended by index of master
+        and the responses are routed by id so the slaves can complete the transactions out of order
 
     :note: s[x] port should be connected to a AXI master,
            m[x] port should be connected to outside AXI slave
@@ -51,7 +58,7 @@ class AxiInterconnectMatrix(AxiInterconnectCommon):
         for m_i in master_indexes:
             _m = self.MASTERS[m_i]
             slvs = {s_i for s_i, _ in _m if s_i in slave_indexes}
-            connected_slaves_per_master.append(slvs)
+            connected_slaves_per_master.append((_m, slvs))
             all_used_slaves.update(slvs)
 
         assert all_used_slaves
@@ -61,9 +68,14 @@ class AxiInterconnectMatrix(AxiInterconnectCommon):
                          s_i in enumerate(all_used_slaves)}
         if len(all_used_slaves) - 1 != all_used_slaves[-1]:
             connected_slaves_per_master = [
-                {slv_index_map[s] for s in slvs}
-                for slvs in connected_slaves_per_master
+                (_m, {slv_index_map[s] for s in slvs})
+                for _m, slvs in connected_slaves_per_master
             ]
+        # keep the arbitration parameters of the master
+        connected_slaves_per_master = [
+            _m.with_slaves(slvs) if isinstance(_m, AxiInterconnectMasterConfig) else slvs
+            for _m, slvs in connected_slaves_per_master
+        ]
 
         sub_interconnect.MASTERS = tuple(connected_slaves_per_master)
         sub_interconnect.SLAVES = tuple(self.SLAVES[s_i] for s_i in slave_indexes)
@@ -79,6 +91,23 @@ class AxiInterconnectMatrix(AxiInterconnectCommon):
 
         return sub_interconnect_connetions
 
+    @staticmethod
+    def _connect_remapped_id(dst, src):
+        """
+        Connect the channel with the id extended by the index of master
+        (the sub interconnect may have a smaller number of masters and thus a narrower id)
+        """
+        dst_w = dst.id._dtype.bit_length()
+        src_w = src.id._dtype.bit_length()
+        if dst_w > src_w:
+            _id = Concat(Bits(dst_w - src_w).from_py(0), src.id)
+        elif dst_w < src_w:
+            _id = src.id[dst_w:]
+        else:
+            _id = src.id
+        dst(src, exclude={src.id, dst.id})
+        dst.id(_id)
+
     def _config(self):
         AxiInterconnectCommon._config(self)
 
@@ -151,7 +180,15 @@ class AxiInterconnectMatrix(AxiInterconnectCommon):
                 s_axi = self.m[i]
                 m_axi = sub_interconnect.m[sub_i]
 
-            if is_r:
+            if self.ID_REMAP and m_or_s == INTF_DIRECTION.SLAVE:
+                if is_r:
+                    self._connect_remapped_id(s_axi.ar, m_axi.ar)
+                    self._connect_remapped_id(m_axi.r, s_axi.r)
+                else:
+                    self._connect_remapped_id(s_axi.aw, m_axi.aw)
+                    s_axi.w(m_axi.w)
+                    self._connect_remapped_id(m_axi.b, s_axi.b)
+            elif is_r:
                 s_axi.ar(m_axi.ar)
                 m_axi.r(s_axi.r)
             else:
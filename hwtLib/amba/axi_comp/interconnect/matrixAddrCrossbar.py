@@ -1,20 +1,26 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
-from hwt.code import Concat, SwitchLogic, Or
+from hwt.code import Concat, SwitchLogic, Or, If, Switch
 from hwt.code_utils import rename_signal
 from hwt.hdl.assignment import Assignment
 from hwt.hdl.transTmpl import TransTmpl
+from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.defs import BIT
-from hwt.interfaces.std import Handshaked
+from hwt.hdl.value import HValue
+from hwt.interfaces.std import Handshaked, VldSynced
 from hwt.math import log2ceil
 from hwt.synthesizer.hObjList import HObjList
 from hwt.synthesizer.param import Param
 from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwt.synthesizer.unit import Unit
 from hwtLib.abstract.busEndpoint import BusEndpoint
+from hwtLib.amba.axi_comp.interconnect.arbitration import AXI_ARBITRATION, \
+    AxiInterconnectMasterConfig, qos_arbitration, \
+    weighted_round_robin_arbitration, token_bucket_in_budget, \
+    token_bucket_arbitration
 from hwtLib.amba.axi_comp.interconnect.common import AxiInterconnectCommon
 from hwtLib.amba.axi_comp.interconnect.matrixCrossbar import AxiInterconnectMatrixCrossbar
 from hwtLib.amba.axis_comp.builder import AxiSBuilder
@@ -26,12 +32,23 @@ from hwtLib.types.ctypes import uint8_t
 class AxiInterconnectMatrixAddrCrossbar(Unit):
     """
     Component which implements N to M crossbar for AXI address channel.
-    If there are multiple masters connected to any slave the access is mannaged by round-robin.
+    If there are multiple masters connected to any slave the access is mannaged by round-robin
+    or other arbitration scheme selected by ARBITRATION (:class:`~.AXI_ARBITRATION`),
+    the parameters of the arbitration for each master are specified by :class:`~.AxiInterconnectMasterConfig`
+    items in MASTERS.
 
     :ivar ~.order_s_index_for_m_data_out: handshaked interface with index of slave for each master,
         data is send on start of the transaction
     :ivar ~.order_m_index_for_s_data_out: handshaked interface with index of master for each slave,
         data is send on start of the transaction
+    :ivar ~.ID_REMAP: if True the index of master is prepended to the id of transaction
+        and the id of each transaction is tracked
+        so the responses for the same id from different slaves can not be reordered
+    :ivar ~.resp_done_for_m: (only if ID_REMAP) interface with the id of a finished transaction
+        for each master which can access multiple slaves
+    :ivar ~.PIPELINED_ADDR_DECODE: if True the slave select flags are resolved from the address
+        on input of the component and stored in the input register together with the address
+        (the address decoder is not in the path with the arbitration and the address mux)
 
     .. hwt-autodoc:: example_AxiInterconnectMatrixAddrCrossbar
     """
@@ -48,12 +65,22 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
         self.INTF_CLS = Param(self.intfCls)
         self.SLAVES = Param(tuple())
         self.MASTERS = Param(tuple())
+        self.ARBITRATION = Param(AXI_ARBITRATION.ROUND_ROBIN)
+        self.ID_REMAP = Param(False)
+        self.MAX_TRANS_OVERLAP = Param(16)
+        self.PIPELINED_ADDR_DECODE = Param(False)
         self.intfCls._config(self)
 
     def _declr(self):
+        assert self.ARBITRATION in (
+            AXI_ARBITRATION.ROUND_ROBIN,
+            AXI_ARBITRATION.QOS,
+            AXI_ARBITRATION.WEIGHTED_ROUND_ROBIN,
+            AXI_ARBITRATION.TOKEN_BUCKET), self.ARBITRATION
         AxiInterconnectCommon._declr(self, has_r=False, has_w=False)
         self.MASTERS_FOR_SLAVE = AxiInterconnectMatrixCrossbar._masters_for_slave(
             self.MASTERS, len(self.SLAVES))
+        self.MASTER_CONFIGS = [AxiInterconnectMasterConfig.from_master(m) for m in self.MASTERS]
         MASTER_INDEX_WIDTH = log2ceil(len(self.MASTERS))
         SLAVE_INDEX_WIDTH = log2ceil(len(self.SLAVES))
 
@@ -81,6 +108,17 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
             order_s_index_for_m_data_out.append(f)
         self.order_s_index_for_m_data_out = order_s_index_for_m_data_out
 
+        if self.ID_REMAP:
+            resp_done_for_m = HObjList()
+            for slaves in self.MASTERS:
+                if len(slaves) > 1:
+                    d = VldSynced()
+                    d.DATA_WIDTH = self.ID_WIDTH
+                else:
+                    d = None
+                resp_done_for_m.append(d)
+            self.resp_done_for_m = resp_done_for_m
+
     def propagate_addr(self, master_addr_channels, slave_addr_channels)\
             ->List[List[Tuple[RtlSignal, Assignment]]]:
         """
@@ -108,6 +146,56 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
 
         return slv_en
 
+    def addr_decode(self, src_addr_sig: RtlSignal, s_i: int):
+        """
+        :return: flag which tells that the address belongs to the slave s_i,
+            only the address prefix is compared because the address spaces of slaves
+            are aligned and have the size of power of 2 (asserted in normalization of SLAVES)
+        """
+        addr, size = self.SLAVES[s_i]
+        IN_W = src_addr_sig._dtype.bit_length()
+        sub_addr_w = (size - 1).bit_length()
+        if IN_W <= sub_addr_w:
+            return BIT.from_py(1)
+        else:
+            return src_addr_sig[:sub_addr_w]._eq(addr >> sub_addr_w)
+
+    def addr_decoder_comparator_cnt(self) -> int:
+        """
+        :return: number of the address comparators of the address decoder
+        """
+        cnt = 0
+        for slaves in self.MASTERS:
+            for s_i in slaves:
+                _, size = self.SLAVES[s_i]
+                if self.ADDR_WIDTH > (size - 1).bit_length():
+                    cnt += 1
+        return cnt
+
+    def addr_decode_pipeline(self, master_to_slave_en):
+        """
+        Replace the slave select flags resolved from the address in master input register
+        by the flags resolved from the address on input and stored in parallel with the input register
+
+        :param master_to_slave_en: the result of :meth:`~.propagate_addr`
+        """
+        res = []
+        for m_i, (m, _slv_en) in enumerate(zip(self.s, master_to_slave_en)):
+            m_ack = m.valid & m.ready
+            _res = []
+            for s_i, (en, addr_drive) in enumerate(_slv_en):
+                if addr_drive is not None:
+                    en = self.addr_decode(m.addr, s_i)
+                    if not isinstance(en, HValue):
+                        en_reg = self._reg(f"master_{m_i:d}_slave_{s_i:d}_sel", def_val=0)
+                        If(m_ack,
+                           en_reg(en)
+                        )
+                        en = en_reg
+                _res.append((en, addr_drive))
+            res.append(_res)
+        return res
+
     def addr_handler_build_addr_mux(self,
                                     slv_addr_tmp, master_addr_channels,
                                     addr_assignments, isSelectedFlags):
@@ -115,16 +203,29 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
         build all master addr to this slave mux
         """
         dataCases = []
+        MASTER_INDEX_WIDTH = AxiInterconnectCommon._master_index_width(len(self.MASTERS))
         # for each connected master
-        for isSelected, m_addr, addr_assig in zip(isSelectedFlags,
-                                                  master_addr_channels,
-                                                  addr_assignments):
+        for m_i, (isSelected, m_addr, addr_assig) in enumerate(zip(isSelectedFlags,
+                                                                   master_addr_channels,
+                                                                   addr_assignments)):
             if addr_assig is None:
                 continue
-            data_connect_exprs = slv_addr_tmp(m_addr,
-                                         exclude={m_addr.valid,
-                                                  m_addr.ready,
-                                                  m_addr.addr}) + [addr_assig]
+            if self.ID_REMAP:
+                data_connect_exprs = slv_addr_tmp(m_addr,
+                                             exclude={m_addr.valid,
+                                                      m_addr.ready,
+                                                      m_addr.addr,
+                                                      m_addr.id}) + [addr_assig]
+                if MASTER_INDEX_WIDTH:
+                    _id = Concat(Bits(MASTER_INDEX_WIDTH).from_py(m_i), m_addr.id)
+                else:
+                    _id = m_addr.id
+                data_connect_exprs.append(slv_addr_tmp.id(_id))
+            else:
+                data_connect_exprs = slv_addr_tmp(m_addr,
+                                             exclude={m_addr.valid,
+                                                      m_addr.ready,
+                                                      m_addr.addr}) + [addr_assig]
             cond = m_addr.valid & isSelected
             dataCases.append((cond, data_connect_exprs))
 
@@ -135,6 +236,68 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
 
         return SwitchLogic(dataCases, dataDefault)
 
+    def arbitration_logic(self, slv_i: int, master_addr_channels, master_vld_slave: List[RtlSignal],
+                          slv_rd: RtlSignal, master_in_budget: Optional[List[RtlSignal]]) -> List[RtlSignal]:
+        """
+        Instantiate an arbiter which selects the master for a slave
+
+        :param master_vld_slave: flags which tells that master has a valid transaction for this slave
+        :param slv_rd: flag which tells that the slave accepts the transaction of selected master
+        :param master_in_budget: flags from :func:`~.token_bucket_in_budget` (only for TOKEN_BUCKET)
+        :return: isSelected flags for each master
+        """
+        ARBITRATION = self.ARBITRATION
+        name = f"slave_{slv_i:d}_arb"
+        if ARBITRATION == AXI_ARBITRATION.ROUND_ROBIN:
+            return HsJoinFairShare.isSelectedLogic(
+                self, master_vld_slave, slv_rd, None)
+        elif ARBITRATION == AXI_ARBITRATION.QOS:
+            return qos_arbitration(
+                self, name, self.MASTER_CONFIGS,
+                master_addr_channels, master_vld_slave, slv_rd)
+        elif ARBITRATION == AXI_ARBITRATION.WEIGHTED_ROUND_ROBIN:
+            return weighted_round_robin_arbitration(
+                self, name, self.MASTER_CONFIGS, master_vld_slave, slv_rd)
+        else:
+            assert ARBITRATION == AXI_ARBITRATION.TOKEN_BUCKET, ARBITRATION
+            return token_bucket_arbitration(
+                self, name, master_vld_slave, master_in_budget)
+
+    def id_order_tracker(self, m_i: int, master_addr, target_slave: RtlSignal,
+                         m_ack: RtlSignal, resp_done: VldSynced, id_allowed: RtlSignal):
+        """
+        Track the slave and the number of pending transactions for each id of the master.
+        The transaction is allowed only if there is no pending transaction with the same id
+        on an other slave because the responses from different slaves could be reordered.
+
+        :param target_slave: index of slave for the transaction on master_addr
+        :param m_ack: flag which tells that the transaction on master_addr is accepted
+        :param resp_done: the id of a transaction for which the response was send to master
+        :param id_allowed: output flag which tells that the transaction on master_addr can be send
+        """
+        CNT_T = Bits(log2ceil(self.MAX_TRANS_OVERLAP + 1))
+        cur_cnt = self._sig(f"master_{m_i:d}_id_pending_cnt", CNT_T)
+        cur_slv = self._sig(f"master_{m_i:d}_id_slave", target_slave._dtype)
+        cases = []
+        for i in range(2 ** self.ID_WIDTH):
+            cnt = self._reg(f"master_{m_i:d}_id_{i:d}_pending_cnt", CNT_T, def_val=0)
+            slv = self._reg(f"master_{m_i:d}_id_{i:d}_slave", target_slave._dtype)
+            cases.append((i, [cur_cnt(cnt), cur_slv(slv)]))
+
+            inc = m_ack & master_addr.id._eq(i)
+            dec = resp_done.vld & resp_done.data._eq(i)
+            If(inc & ~dec,
+               cnt(cnt + 1),
+               slv(target_slave),
+            ).Elif(dec & ~inc,
+               cnt(cnt - 1),
+            )
+
+        Switch(master_addr.id).add_cases(cases)
+
+        id_allowed(cur_cnt._eq(0) |
+                   (cur_slv._eq(target_slave) & (cur_cnt != self.MAX_TRANS_OVERLAP)))
+
     def addr_handler_N_to_M(self, master_addr_channels, slave_addr_channels,
                             order_m_index_for_s_data_in,
                             order_s_index_for_m_data_in):
@@ -146,7 +309,27 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
         # and resolve enable signals
         master_to_slave_en = self.propagate_addr(
             master_addr_channels, slave_addr_channels)
+        if self.PIPELINED_ADDR_DECODE:
+            master_to_slave_en = self.addr_decode_pipeline(master_to_slave_en)
         ready_for_master = [0 for _ in master_addr_channels]
+        if self.ARBITRATION == AXI_ARBITRATION.TOKEN_BUCKET:
+            master_in_budget = token_bucket_in_budget(
+                self, self.MASTER_CONFIGS, master_addr_channels)
+        else:
+            master_in_budget = None
+
+        if self.ID_REMAP:
+            master_id_allowed = [
+                None if d is None else self._sig(f"master_{m_i:d}_id_allowed")
+                for m_i, d in enumerate(self.resp_done_for_m)
+            ]
+            master_addr_vld = [
+                m_addr.valid if allowed is None else m_addr.valid & allowed
+                for m_addr, allowed in zip(master_addr_channels, master_id_allowed)
+            ]
+        else:
+            master_id_allowed = [None for _ in master_addr_channels]
+            master_addr_vld = [m_addr.valid for m_addr in master_addr_channels]
 
         # for each slave
         for slv_i, (slv_addr, order_m_for_s, connected_masters) in enumerate(zip(
@@ -157,13 +340,13 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
             # master.ar has valid transaction for this slave flag list
             master_vld_slave = []
             master_targets_slave = []
-            for m_i, (_slv_en, m_addr) in enumerate(zip(master_to_slave_en, master_addr_channels)):
+            for m_i, (_slv_en, m_vld) in enumerate(zip(master_to_slave_en, master_addr_vld)):
                 if m_i in connected_masters:
                     m_addr_en_s = _slv_en[slv_i][0]
                     m_targets_slave = rename_signal(
                         self, m_addr_en_s, f"master_{m_i:d}_targets_slave_{slv_i:d}")
                     master_targets_slave.append(m_targets_slave)
-                    en = m_addr.valid & m_targets_slave
+                    en = m_vld & m_targets_slave
                 else:
                     en = BIT.from_py(0)
                 master_vld_slave.append(en)
@@ -177,9 +360,12 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
             ]
 
             # multiple masters can access the slave
-            # instantiate round-robin arbiter to select master
-            isSelectedFlags = HsJoinFairShare.isSelectedLogic(
-                self, master_vld_slave, slv_addr.ready, None)
+            # instantiate arbiter to select master
+            slv_rd = slv_addr.ready
+            if order_m_for_s is not None:
+                slv_rd = slv_rd & order_m_for_s.rd
+            isSelectedFlags = self.arbitration_logic(
+                slv_i, master_addr_channels, master_vld_slave, slv_rd, master_in_budget)
 
             slv_valid = []
             for m_i, (en, vld) in enumerate(zip(isSelectedFlags, master_vld_slave)):
@@ -240,11 +426,12 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
                 addr_assignments,
                 slv_master_arbitration_res)
 
-        for m_i, (master_addr, order_s_for_m, m_rd, connected_slaves) in enumerate(zip(
+        for m_i, (master_addr, order_s_for_m, m_rd, connected_slaves, id_allowed) in enumerate(zip(
                 master_addr_channels,
                 order_s_index_for_m_data_in,
                 ready_for_master,
-                self.MASTERS)):
+                self.MASTERS,
+                master_id_allowed)):
             # collect the info about arbitration win for master
             if len(connected_slaves) > 1:
                 slv_ens = [m[0] for m in master_to_slave_en[m_i]]
@@ -254,6 +441,10 @@ class AxiInterconnectMatrixAddrCrossbar(Unit):
                 order_s_for_m.vld(m_rd & master_addr.valid)
 
                 m_rd = m_rd & order_s_for_m.rd
+                if id_allowed is not None:
+                    self.id_order_tracker(m_i, master_addr, slv_ens,
+                                          m_rd & master_addr.valid,
+                                          self.resp_done_for_m[m_i], id_allowed)
 
             master_addr.ready(m_rd)
 
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from typing import List, Optional, Dict
+
+from hwt.math import log2ceil
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axi4 import Axi4
+from hwtLib.amba.axi_comp.interconnect.arbitration import AXI_ARBITRATION, \
+    AxiInterconnectMasterConfig
+from hwtLib.amba.axi_comp.interconnect.matrixAddrCrossbar import AxiInterconnectMatrixAddrCrossbar
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+
+
+class AxiInterconnectArbitration_RR_TC(SimTestCase):
+    """
+    Simulation benchmark of arbitration schemes of :class:`~.AxiInterconnectMatrixAddrCrossbar`
+    with multiple masters accessing a single slave (the slave is ready every clock).
+    """
+    ARBITRATION = AXI_ARBITRATION.ROUND_ROBIN
+    MASTERS = ({0}, {0}, {0})
+    SIM_CYCLES = 400
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiInterconnectMatrixAddrCrossbar(Axi4.AR_CLS)
+        u.MASTERS = cls.MASTERS
+        u.SLAVES = (
+            (0x0000, 0x1000),
+        )
+        u.ADDR_WIDTH = log2ceil(0x1000 - 1)
+        u.DATA_WIDTH = 64
+        u.ARBITRATION = cls.ARBITRATION
+        cls.compileSim(u)
+
+    def setUp(self):
+        SimTestCase.setUp(self)
+        self.cycle = 0
+        self.pending = [deque() for _ in self.u.s]
+        self.latencies = [[] for _ in self.u.s]
+        self.accepted_beats = [0 for _ in self.u.s]
+
+    def master_traffic(self, m_i: int, trans_cnt: int, period: Optional[int]=None, len_=0, qos=0):
+        """
+        Sim. process which generates the address transactions for a master
+
+        :param period: number of clock cycles between transactions,
+            None means that all transactions are send at once (backlogged master)
+        """
+        ag = self.u.s[m_i]._ag
+        for _ in range(trans_cnt):
+            ag.data.append(ag.create_addr_req(m_i * 8, len_, _id=m_i, qos=qos))
+            self.pending[m_i].append((self.cycle, len_ + 1))
+            if period is not None:
+                yield Timer(period * CLK_PERIOD)
+
+        if period is None:
+            # the process has to be a generator
+            yield Timer(CLK_PERIOD)
+
+    def monitor(self):
+        """
+        Sim. process which collects the latency (cycles from the send to the acceptance by the slave)
+        and number of accepted data beats for each master
+        """
+        slv_data = self.u.m[0]._ag.data
+        while True:
+            yield Timer(CLK_PERIOD)
+            self.cycle += 1
+            # the id of the transaction is the index of the master
+            while slv_data:
+                m_i = int(slv_data.popleft()[0])
+                t, beats = self.pending[m_i].popleft()
+                self.latencies[m_i].append(self.cycle - t)
+                self.accepted_beats[m_i] += beats
+
+    def run_benchmark(self, traffic: List[dict]) -> List[Dict[str, float]]:
+        """
+        :param traffic: list of kwargs for :meth:`~.master_traffic` for each master
+        :return: list of dictionaries with "bandwidth" (beats per clock cycle),
+            "latency_avg", "latency_max" and "trans_cnt" for each master
+        """
+        for m_i, t in enumerate(traffic):
+            if t is not None:
+                self.procs.append(self.master_traffic(m_i, **t))
+        self.procs.append(self.monitor())
+        self.runSim(self.SIM_CYCLES * CLK_PERIOD)
+
+        res = []
+        for lat, beats in zip(self.latencies, self.accepted_beats):
+            res.append({
+                "trans_cnt": len(lat),
+                "bandwidth": beats / self.cycle,
+                "latency_avg": sum(lat) / len(lat) if lat else None,
+                "latency_max": max(lat) if lat else None,
+            })
+
+        return res
+
+    @staticmethod
+    def format_report(name: str, stats: List[Dict[str, float]]):
+        lines = [name]
+        for m_i, st in enumerate(stats):
+            lat = st["latency_avg"]
+            lat = "-" if lat is None else f"{lat:.1f}"
+            lines.append(
+                f"  master {m_i:d}: {st['trans_cnt']:4d} trans, bandwidth {st['bandwidth']:.3f} beats/clk,"
+                f" latency avg {lat} max {st['latency_max']}")
+        return "\n".join(lines)
+
+    def test_backlogged(self):
+        stats = self.run_benchmark([{"trans_cnt": 1000} for _ in self.u.s])
+        bw = [st["bandwidth"] for st in stats]
+        # the slave is fully utilized and shared equally
+        self.assertAlmostEqual(sum(bw), 1.0, delta=0.02)
+        for b in bw:
+            self.assertAlmostEqual(b, 1 / len(bw), delta=0.02)
+
+
+class AxiInterconnectArbitration_QoS_TC(AxiInterconnectArbitration_RR_TC):
+    ARBITRATION = AXI_ARBITRATION.QOS
+    MASTERS = (
+        {0},
+        {0},
+        AxiInterconnectMasterConfig({0}, qos_aging=16),
+    )
+
+    def test_backlogged(self):
+        stats = self.run_benchmark([
+            {"trans_cnt": 1000, "qos": 2},
+            {"trans_cnt": 1000, "qos": 1},
+            {"trans_cnt": 1000, "qos": 0},
+        ])
+        bw = [st["bandwidth"] for st in stats]
+        self.assertAlmostEqual(sum(bw), 1.0, delta=0.02)
+        # master 1 is starving as it does not have the aging
+        self.assertEqual(stats[1]["trans_cnt"], 0)
+        # master 2 gets the transaction once per qos_aging + 1 cycles
+        self.assertAlmostEqual(bw[2], 1 / 17, delta=0.02)
+
+    def test_latency_critical(self):
+        stats = self.run_benchmark([
+            {"trans_cnt": 20, "period": 16, "qos": 15},
+            {"trans_cnt": 1000, "qos": 0},
+            {"trans_cnt": 1000, "qos": 0},
+        ])
+        self.assertEqual(stats[0]["trans_cnt"], 20)
+        # the latency of the high priority master is not affected by the backlogged masters
+        self.assertLessEqual(stats[0]["latency_max"], 3)
+
+
+class AxiInterconnectArbitration_WRR_TC(AxiInterconnectArbitration_RR_TC):
+    ARBITRATION = AXI_ARBITRATION.WEIGHTED_ROUND_ROBIN
+    MASTERS = (
+        AxiInterconnectMasterConfig({0}, weight=4),
+        AxiInterconnectMasterConfig({0}, weight=2),
+        {0},
+    )
+
+    def test_backlogged(self):
+        stats = self.run_benchmark([{"trans_cnt": 1000} for _ in self.u.s])
+        bw = [st["bandwidth"] for st in stats]
+        self.assertAlmostEqual(sum(bw), 1.0, delta=0.02)
+        for b, w in zip(bw, [4, 2, 1]):
+            self.assertAlmostEqual(b, w / 7, delta=0.02)
+
+
+class AxiInterconnectArbitration_TokenBucket_TC(AxiInterconnectArbitration_RR_TC):
+    ARBITRATION = AXI_ARBITRATION.TOKEN_BUCKET
+    MASTERS = (
+        {0},
+        AxiInterconnectMasterConfig({0}, budget=(8, 64)),
+        AxiInterconnectMasterConfig({0}, budget=(16, 64)),
+    )
+
+    def test_backlogged(self):
+        stats = self.run_benchmark([{"trans_cnt": 1000, "len_": 1} for _ in self.u.s])
+        bw = [st["bandwidth"] for st in stats]
+        # the slave accepts a transaction every clock, each transaction has 2 beats
+        self.assertAlmostEqual(sum(bw), 2.0, delta=0.05)
+        # the master without budget gets the rest of bandwidth
+        # as the masters over budget are served only if there is no other request
+        self.assertAlmostEqual(bw[1], 8 / 64, delta=0.03)
+        self.assertAlmostEqual(bw[2], 16 / 64, delta=0.03)
+
+    def test_idle_bandwidth_reused(self):
+        stats = self.run_benchmark([None, {"trans_cnt": 1000}, None])
+        # the budget does not block the master if the slave is not used by other masters
+        self.assertAlmostEqual(stats[1]["bandwidth"], 1.0, delta=0.02)
+
+
+AxiInterconnectArbitration_TCs = [
+    AxiInterconnectArbitration_RR_TC,
+    AxiInterconnectArbitration_QoS_TC,
+    AxiInterconnectArbitration_WRR_TC,
+    AxiInterconnectArbitration_TokenBucket_TC,
+]
+
+
+# a latency critical master with high qos and two bulk masters
+BENCHMARK_TRAFFIC = [
+    {"trans_cnt": 40, "period": 8, "qos": 15},
+    {"trans_cnt": 1000, "len_": 3},
+    {"trans_cnt": 1000},
+]
+
+
+def main():
+    import unittest
+    # run the benchmark for each arbitration scheme and print per master stats
+    for tc in AxiInterconnectArbitration_TCs:
+        tc.setUpClass()
+        t = tc("test_backlogged")
+        t.setUp()
+        stats = t.run_benchmark(BENCHMARK_TRAFFIC)
+        print(tc.format_report(f"{tc.ARBITRATION:s} {tc.MASTERS}", stats))
+
+    suite = unittest.TestSuite()
+    for tc in AxiInterconnectArbitration_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.code import Or, If, Concat, SwitchLogic, rol
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.synthesizer.hObjList import HObjList
+from hwtLib.amba.axi4 import Axi4
+from hwtLib.amba.axi_comp.interconnect.common import AxiInterconnectCommon
+from hwtLib.amba.axi_comp.interconnect.matrixCrossbar import AxiInterconnectMatrixCrossbar
+from hwtLib.handshaked.joinFair import HsJoinFairShare
+
+
+class AxiInterconnectMatrixCrossbarIdRouted(AxiInterconnectMatrixCrossbar):
+    """
+    Crossbar for AXI response channels (R/B) where the destination is resolved
+    from the id of the response (the upper bits of id are the index of output,
+    as prepended by :class:`~.AxiInterconnectMatrixAddrCrossbar` with ID_REMAP).
+    The inputs which are sending to same output are selected by round-robin,
+    the selected input keeps the output until the last word of the transaction
+    (the transactions are not interleaved).
+
+    :note: unlike :class:`~.AxiInterconnectMatrixCrossbar` this does not require the order FIFOs
+        and the inputs may return the transactions in any order
+
+    .. hwt-autodoc:: example_AxiInterconnectMatrixCrossbarIdRouted
+    """
+
+    def _declr(self):
+        addClkRstn(self)
+        INTF_CLS = self.intfCls
+        OUTPUT_CNT = len(self.OUTPUTS)
+        self.OUTS_FOR_IN = self._masters_for_slave(self.OUTPUTS, self.INPUT_CNT)
+        self.OUTPUT_INDEX_WIDTH = AxiInterconnectCommon._master_index_width(OUTPUT_CNT)
+
+        with self._paramsShared():
+            self.dataIn = HObjList([
+                INTF_CLS()
+                for _ in range(self.INPUT_CNT)])
+        for din in self.dataIn:
+            din.ID_WIDTH = self.ID_WIDTH + self.OUTPUT_INDEX_WIDTH
+
+        with self._paramsShared():
+            self.dataOut = HObjList([
+                INTF_CLS()._m()
+                for _ in range(OUTPUT_CNT)])
+
+    def output_select_logic(self, dout_i: int, dout, reqs):
+        """
+        :param reqs: flags which tells that the input has data for this output
+        :return: isSelected flags for each input
+        """
+        if len(reqs) == 1:
+            return [BIT.from_py(1), ]
+
+        priority = self._reg(f"dataOut_{dout_i:d}_priority", Bits(len(reqs)), def_val=1)
+        last = self.get_last(dout)
+        if isinstance(last, int):
+            # every transaction has just a single word
+            priority(rol(priority, 1))
+            return [
+                rename_signal(self, HsJoinFairShare.priorityAck(priority, reqs, i),
+                              f"dataOut_{dout_i:d}_isSelected_{i:d}")
+                for i in range(len(reqs))
+            ]
+
+        # the input has the output locked until the end of the transaction
+        locked = self._reg(f"dataOut_{dout_i:d}_locked", def_val=0)
+        isSelected = []
+        for i in range(len(reqs)):
+            isSel = self._sig(f"dataOut_{dout_i:d}_isSelected_{i:d}")
+            isSel(locked._ternary(priority[i],
+                                  HsJoinFairShare.priorityAck(priority, reqs, i)))
+            isSelected.append(isSel)
+
+        selectedOneHot = Concat(*reversed([isSel & req for isSel, req in zip(isSelected, reqs)]))
+        If(dout.valid & dout.ready,
+            locked(~last),
+            If(last,
+               priority(rol(selectedOneHot, 1))
+            ).Else(
+               priority(selectedOneHot)
+            )
+        ).Elif(~locked,
+            priority(rol(priority, 1))
+        )
+        return isSelected
+
+    def _impl(self):
+        propagateClkRstn(self)
+        ID_WIDTH = self.ID_WIDTH
+        OUTPUT_INDEX_WIDTH = self.OUTPUT_INDEX_WIDTH
+        din_ready = [[] for _ in self.dataIn]
+        for dout_i, (dout, connected_inputs) in enumerate(zip(self.dataOut, self.OUTPUTS)):
+            connected_inputs = sorted(connected_inputs)
+            reqs = []
+            for din_i in connected_inputs:
+                din = self.dataIn[din_i]
+                req = din.valid
+                if OUTPUT_INDEX_WIDTH:
+                    req = req & din.id[:ID_WIDTH]._eq(dout_i)
+                reqs.append(rename_signal(self, req, f"dataIn_{din_i:d}_req_dataOut_{dout_i:d}"))
+
+            isSelected = self.output_select_logic(dout_i, dout, reqs)
+            dataCases = []
+            selected = []
+            for din_i, isSel, req in zip(connected_inputs, isSelected, reqs):
+                din = self.dataIn[din_i]
+                sel = isSel & req
+                selected.append(sel)
+                din_ready[din_i].append(sel & dout.ready)
+                dataCases.append((
+                    sel,
+                    dout(din, exclude={din.valid, din.ready, din.id}) + [
+                        dout.id(din.id[ID_WIDTH:])
+                    ]
+                ))
+            dout.valid(Or(*selected))
+            SwitchLogic(dataCases, [
+                s(None)
+                for s in dout._interfaces
+                if s not in {dout.valid, dout.ready}
+            ])
+
+        for din, rd in zip(self.dataIn, din_ready):
+            assert rd, (din, "entirely disconnected from crossbar,"
+                        " this should have been handled before")
+            din.ready(Or(*rd))
+
+
+def example_AxiInterconnectMatrixCrossbarIdRouted():
+    u = AxiInterconnectMatrixCrossbarIdRouted(Axi4.R_CLS)
+    u.INPUT_CNT = 2
+    u.OUTPUTS = [{0, 1}, {0, 1}]
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = example_AxiInterconnectMatrixCrossbarIdRouted()
+    print(to_rtl_str(u))
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.math import log2ceil
+from hwt.pyUtils.arrayQuery import iter_with_last
+from hwtLib.amba.axi4 import Axi4
+from hwtLib.amba.axi_comp.interconnect.matrixR import AxiInterconnectMatrixR
+from hwtLib.amba.axi_comp.interconnect.matrixR_test import AxiInterconnectMatrixR_1to1TC
+from hwtLib.amba.axi_comp.interconnect.matrixW import AxiInterconnectMatrixW
+from hwtLib.amba.axi_comp.interconnect.matrixW_test import AxiInterconnectMatrixW_1to1TC
+from hwtLib.amba.constants import RESP_OKAY
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+
+
+class AxiInterconnectMatrixR_IdRemap_3to3TC(AxiInterconnectMatrixR_1to1TC):
+    """
+    :class:`~.AxiInterconnectMatrixR` with ID_REMAP and in order slaves
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiInterconnectMatrixR(Axi4)
+        u.MASTERS = ({0, 1}, {0, 1}, {0, 1})
+        u.SLAVES = (
+            (0x0000, 0x1000),
+            (0x1000, 0x1000),
+        )
+        u.ADDR_WIDTH = log2ceil(0x4000 - 1)
+        u.ID_WIDTH = 2
+        u.ID_REMAP = True
+        cls.compileSim(u)
+
+    def test_slave_id_width(self):
+        u = self.u
+        for s in u.m:
+            self.assertEqual(s.ID_WIDTH, u.ID_WIDTH + 2)
+
+
+class AxiInterconnectMatrixW_IdRemap_3to3TC(AxiInterconnectMatrixW_1to1TC):
+    """
+    :class:`~.AxiInterconnectMatrixW` with ID_REMAP and in order slaves
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiInterconnectMatrixW(Axi4)
+        u.MASTERS = ({0, 1}, {0, 1}, {0, 1})
+        u.SLAVES = (
+            (0x0000, 0x1000),
+            (0x1000, 0x1000),
+        )
+        u.ADDR_WIDTH = log2ceil(0x4000 - 1)
+        u.ID_WIDTH = 2
+        u.ID_REMAP = True
+        cls.compileSim(u)
+
+
+class AxiInterconnectMatrixR_IdRemap_OutOfOrder_TC(AxiInterconnectMatrixR_1to1TC):
+    """
+    Slaves which are returning the read data in reversed order of requests
+
+    :note: the same id is never used twice for same master, so the reordering is legal
+    """
+    TRANS_CNT = 4
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiInterconnectMatrixR(Axi4)
+        u.MASTERS = ({0, 1}, {0, 1})
+        u.SLAVES = (
+            (0x0000, 0x1000),
+            (0x1000, 0x1000),
+        )
+        u.ADDR_WIDTH = log2ceil(0x2000 - 1)
+        u.ID_WIDTH = 3
+        u.ID_REMAP = True
+        cls.compileSim(u)
+
+    def setUp(self):
+        AxiInterconnectMatrixR_1to1TC.setUp(self)
+        self.slave_req_order = [[] for _ in self.u.m]
+
+    def ooo_slave(self, s_i: int, trans_cnt: int, idle_timeout=16):
+        """
+        Collect the read requests and respond them in reversed order
+        once there is no new request for idle_timeout clock cycles
+        """
+        s = self.u.m[s_i]
+        done = 0
+        while done < trans_cnt:
+            reqs = []
+            idle = 0
+            while not reqs or idle < idle_timeout:
+                yield Timer(CLK_PERIOD)
+                idle += 1
+                while s.ar._ag.data:
+                    reqs.append(s.ar._ag.data.popleft())
+                    idle = 0
+
+            for req in reversed(reqs):
+                _id, addr, _, _, _len, _, _, _, _ = req
+                _id = int(_id)
+                self.slave_req_order[s_i].append(_id)
+                s.r._ag.data.extend(
+                    self.r_data(_id, int(addr) + s_i * 0x1000, int(_len)))
+            done += len(reqs)
+
+    @staticmethod
+    def r_data(_id: int, addr: int, _len: int):
+        return [(_id, addr + i, RESP_OKAY, int(last))
+                for last, i in iter_with_last(range(_len + 1))]
+
+    def run_read(self, trans_cnt: int, get_id):
+        """
+        :param get_id: function index of transaction -> id of transaction
+        """
+        u = self.u
+        self.randomize_all()
+        master_r_data = [[] for _ in u.s]
+        slave_trans_cnt = [0 for _ in u.m]
+        for m_i, m in enumerate(u.s):
+            for t_i in range(trans_cnt):
+                s_i = t_i % len(u.SLAVES)
+                addr = u.SLAVES[s_i][0] + 0x100 * m_i + 0x10 * t_i
+                _len = t_i % 3
+                _id = get_id(t_i)
+                m.ar._ag.data.append(
+                    m.ar._ag.create_addr_req(addr, _len, _id=_id))
+                master_r_data[m_i].append(self.r_data(_id, addr, _len))
+                slave_trans_cnt[s_i] += 1
+
+        for s_i, cnt in enumerate(slave_trans_cnt):
+            self.procs.append(self.ooo_slave(s_i, cnt))
+
+        self.runSim(80 * trans_cnt * CLK_PERIOD)
+        return master_r_data
+
+    def test_read(self):
+        u = self.u
+        trans_cnt = self.TRANS_CNT
+        master_r_data = self.run_read(trans_cnt, lambda t_i: t_i)
+
+        for m_i, (m, m_r_data) in enumerate(zip(u.s, master_r_data)):
+            r_data = list(m.r._ag.data)
+            self.assertEqual(len(r_data), sum(len(t) for t in m_r_data), m_i)
+            # split the data to transactions and check that each is not interleaved
+            trans = []
+            while r_data:
+                _id = int(r_data[0][0])
+                t = r_data[:len(m_r_data[_id])]
+                r_data = r_data[len(m_r_data[_id]):]
+                self.assertValSequenceEqual(t, m_r_data[_id], (m_i, _id))
+                trans.append(_id)
+
+            self.assertSequenceEqual(sorted(trans), list(range(trans_cnt)))
+
+        # the slaves really did reorder the transactions
+        for s_i, req_order in enumerate(self.slave_req_order):
+            master_ids = [_id >> u.ID_WIDTH for _id in req_order]
+            self.assertNotEqual(req_order, sorted(req_order), s_i)
+            self.assertSetEqual(set(master_ids), {0, 1}, s_i)
+
+    def test_read_same_id(self):
+        # the transactions with same id to different slaves must not be reordered
+        u = self.u
+        master_r_data = self.run_read(self.TRANS_CNT, lambda t_i: 0)
+        for m_i, (m, m_r_data) in enumerate(zip(u.s, master_r_data)):
+            ref = [beat for t in m_r_data for beat in t]
+            self.assertValSequenceEqual(m.r._ag.data, ref, m_i)
+
+
+class AxiInterconnectMatrixW_IdRemap_OutOfOrder_TC(AxiInterconnectMatrixW_1to1TC):
+    """
+    Slaves which are returning the write responses in reversed order of requests
+    """
+    TRANS_CNT = 4
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiInterconnectMatrixW(Axi4)
+        u.MASTERS = ({0, 1}, {0, 1})
+        u.SLAVES = (
+            (0x0000, 0x1000),
+            (0x1000, 0x1000),
+        )
+        u.ADDR_WIDTH = log2ceil(0x2000 - 1)
+        u.ID_WIDTH = 3
+        u.ID_REMAP = True
+        cls.compileSim(u)
+
+    def setUp(self):
+        AxiInterconnectMatrixW_1to1TC.setUp(self)
+        self.slave_req_order = [[] for _ in self.u.m]
+
+    def ooo_slave(self, s_i: int, trans_cnt: int):
+        """
+        Collect all write requests and data and respond them in reversed order
+        """
+        s = self.u.m[s_i]
+        reqs = []
+        last_cnt = 0
+        while len(reqs) < trans_cnt or last_cnt < trans_cnt:
+            yield Timer(CLK_PERIOD)
+            while s.aw._ag.data:
+                reqs.append(s.aw._ag.data.popleft())
+            while s.w._ag.data:
+                last_cnt += int(s.w._ag.data.popleft()[-1])
+
+        for req in reversed(reqs):
+            _id = int(req[0])
+            self.slave_req_order[s_i].append(_id)
+            s.b._ag.data.append((_id, RESP_OKAY))
+
+    def test_write(self):
+        u = self.u
+        self.randomize_all()
+        master_b_data = [[] for _ in u.s]
+        slave_trans_cnt = [0 for _ in u.m]
+        for m_i, m in enumerate(u.s):
+            for t_i in range(self.TRANS_CNT):
+                s_i = t_i % len(u.SLAVES)
+                addr = u.SLAVES[s_i][0] + 0x100 * m_i + 0x10 * t_i
+                _len = t_i % 3
+                m.aw._ag.data.append(
+                    m.aw._ag.create_addr_req(addr, _len, _id=t_i))
+                m.w._ag.data.extend(self.data_transaction(t_i, list(range(_len + 1))))
+                master_b_data[m_i].append((t_i, RESP_OKAY))
+                slave_trans_cnt[s_i] += 1
+
+        for s_i, cnt in enumerate(slave_trans_cnt):
+            self.procs.append(self.ooo_slave(s_i, cnt))
+
+        self.runSim(80 * self.TRANS_CNT * CLK_PERIOD)
+
+        for m_i, (m, m_b_data) in enumerate(zip(u.s, master_b_data)):
+            b_data = sorted(m.b._ag.data, key=lambda b: int(b[0]))
+            self.assertValSequenceEqual(b_data, m_b_data, m_i)
+
+        for s_i, req_order in enumerate(self.slave_req_order):
+            self.assertNotEqual(req_order, sorted(req_order), s_i)
+
+
+AxiInterconnectMatrixIdRemap_TCs = [
+    AxiInterconnectMatrixR_IdRemap_3to3TC,
+    AxiInterconnectMatrixW_IdRemap_3to3TC,
+    AxiInterconnectMatrixR_IdRemap_OutOfOrder_TC,
+    AxiInterconnectMatrixW_IdRemap_OutOfOrder_TC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    for tc in AxiInterconnectMatrixIdRemap_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from itertools import chain
+
 from hwt.interfaces.std import Handshaked
 from hwt.interfaces.utils import propagateClkRstn
 from hwt.math import log2ceil
@@ -9,6 +11,7 @@ from hwtLib.amba.axi4 import Axi4
 from hwtLib.amba.axi_comp.interconnect.common import AxiInterconnectCommon
 from hwtLib.amba.axi_comp.interconnect.matrixAddrCrossbar import AxiInterconnectMatrixAddrCrossbar
 from hwtLib.amba.axi_comp.interconnect.matrixCrossbar import AxiInterconnectMatrixCrossbar
+from hwtLib.amba.axi_comp.interconnect.matrixCrossbarIdRouted import AxiInterconnectMatrixCrossbarIdRouted
 from hwtLib.handshaked.fifo import HandshakedFifo
 
 
@@ -23,8 +26,12 @@ class AxiInterconnectMatrixR(AxiInterconnectCommon):
     :ivar ~.order_s_index_for_m_data: list, FIFOs for each master which keeps the information
         about where master should expect data
 
+    :note: If ID_REMAP is used the order FIFOs are not used, the read data is routed by id
+        and the slaves may return the data out of order.
+
     .. hwt-autodoc:: example_AxiInterconnectMatrixR
     """
+    ADDR_CHANNEL_NAME = "ar"
 
     def _declr(self):
         AxiInterconnectCommon._declr(self, has_r=True, has_w=False)
@@ -35,7 +42,7 @@ class AxiInterconnectMatrixR(AxiInterconnectCommon):
         # which master did read and where is should send it
         order_m_index_for_s_data = HObjList()
         for connected_masters in masters_for_slave:
-            if len(connected_masters) > 1:
+            if len(connected_masters) > 1 and not self.ID_REMAP:
                 f = HandshakedFifo(Handshaked)
                 f.DEPTH = self.MAX_TRANS_OVERLAP
                 f.DATA_WIDTH = log2ceil(len(self.MASTERS))
@@ -47,7 +54,7 @@ class AxiInterconnectMatrixR(AxiInterconnectCommon):
         # so master knows where it should expect the data
         order_s_index_for_m_data = HObjList()
         for connected_slaves in self.MASTERS:
-            if len(connected_slaves) > 1:
+            if len(connected_slaves) > 1 and not self.ID_REMAP:
                 f = HandshakedFifo(Handshaked)
                 f.DEPTH = self.MAX_TRANS_OVERLAP
                 f.DATA_WIDTH = log2ceil(len(self.SLAVES))
@@ -60,8 +67,12 @@ class AxiInterconnectMatrixR(AxiInterconnectCommon):
             self.addr_crossbar = AxiInterconnectMatrixAddrCrossbar(
                 self.intfCls.AR_CLS)
 
+        if self.ID_REMAP:
+            data_crossbar_cls = AxiInterconnectMatrixCrossbarIdRouted
+        else:
+            data_crossbar_cls = AxiInterconnectMatrixCrossbar
         with self._paramsShared():
-            c = self.data_crossbar = AxiInterconnectMatrixCrossbar(
+            c = self.data_crossbar = data_crossbar_cls(
                 self.intfCls.R_CLS)
             c.INPUT_CNT = len(self.SLAVES)
             c.OUTPUTS = self.MASTERS
@@ -72,14 +83,28 @@ class AxiInterconnectMatrixR(AxiInterconnectCommon):
         data_crossbar = self.data_crossbar
 
         master_addr_channels = HObjList([m.ar for m in self.s])
-        slave_addr_channels = HObjList([s.ar for s in self.m])
         addr_crossbar.s(master_addr_channels)
-        slave_addr_channels(addr_crossbar.m)
-        master_r_channels = HObjList([m.r for m in self.s])
-        master_r_channels(data_crossbar.dataOut)
+        for s, ar in zip(self.m, addr_crossbar.m):
+            s.ar(self._reg_slice("ar", ar))
+        for m, r in zip(self.s, data_crossbar.dataOut):
+            m.r(self._reg_slice("r", r))
         slave_r_channels = HObjList([s.r for s in self.m])
         data_crossbar.dataIn(slave_r_channels)
 
+        if self.ID_REMAP:
+            # the data is routed by id, the order of transactions is not required
+            for order_out in chain(addr_crossbar.order_s_index_for_m_data_out,
+                                   addr_crossbar.order_m_index_for_s_data_out):
+                if order_out is not None:
+                    order_out.rd(1)
+
+            for m_r, resp_done in zip(data_crossbar.dataOut, addr_crossbar.resp_done_for_m):
+                if resp_done is None:
+                    continue
+                resp_done.vld(m_r.valid & m_r.ready & m_r.last)
+                resp_done.data(m_r.id)
+            return
+
         for m_i, f in enumerate(self.order_s_index_for_m_data):
             if f is None:
                 continue
@@ -159,12 +159,35 @@ class AxiInterconnectMatrixR_3to3TC(AxiInterconnectMatrixR_1to1TC):
         cls.compileSim(u)
 
 
+class AxiInterconnectMatrixR_3to3_pipelined_TC(AxiInterconnectMatrixR_1to1TC):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiInterconnectMatrixR(Axi4)
+        u.MASTERS = ({0, 1, 2}, {0, 1, 2}, {1, 2})
+        u.SLAVES = (
+            (0x0000, 0x1000),
+            (0x1000, 0x1000),
+            (0x2000, 0x1000),
+        )
+        u.ADDR_WIDTH = log2ceil(0x4000 - 1)
+        u.REG_SLICES = ("ar", "r")
+        u.PIPELINED_ADDR_DECODE = True
+        cls.compileSim(u)
+
+    def test_pipeline_report(self):
+        self.assertDictEqual(self.u.pipeline_report(), {
+            "ar": {"stages": 2, "comparators": 8},
+            "r": {"stages": 1, "comparators": 0},
+        })
+
 
 AxiInterconnectMatrixR_TCs = [
     AxiInterconnectMatrixR_1to1TC,
     AxiInterconnectMatrixR_1to3TC,
     AxiInterconnectMatrixR_3to1TC,
-    AxiInterconnectMatrixR_3to3TC
+    AxiInterconnectMatrixR_3to3TC,
+    AxiInterconnectMatrixR_3to3_pipelined_TC,
 ]
 
 if __name__ == "__main__":
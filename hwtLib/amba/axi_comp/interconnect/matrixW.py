@@ -5,10 +5,12 @@ from hwt.interfaces.std import Handshaked
 from hwt.interfaces.utils import propagateClkRstn
 from hwt.math import log2ceil
 from hwt.synthesizer.hObjList import HObjList
+from hwtLib.amba.axi3 import Axi3_w
 from hwtLib.amba.axi4 import Axi4
 from hwtLib.amba.axi_comp.interconnect.common import AxiInterconnectCommon
 from hwtLib.amba.axi_comp.interconnect.matrixAddrCrossbar import AxiInterconnectMatrixAddrCrossbar
 from hwtLib.amba.axi_comp.interconnect.matrixCrossbar import AxiInterconnectMatrixCrossbar
+from hwtLib.amba.axi_comp.interconnect.matrixCrossbarIdRouted import AxiInterconnectMatrixCrossbarIdRouted
 from hwtLib.handshaked.builder import HsBuilder
 from hwtLib.handshaked.fifo import HandshakedFifo
 
@@ -19,16 +21,29 @@ class AxiInterconnectMatrixCrossbarB(AxiInterconnectMatrixCrossbar):
         return 1
 
 
+class AxiInterconnectMatrixCrossbarIdRoutedB(AxiInterconnectMatrixCrossbarIdRouted):
+
+    def get_last(self, intf):
+        return 1
+
+
 class AxiInterconnectMatrixW(AxiInterconnectCommon):
     """
     Write-only AXI3/4/Lite interconnect with supports transaction overlapping
     and guarantees the order order of transactions on the bus
 
+    :note: If ID_REMAP is used the write responses are routed by id
+        and the slaves may return them out of order
+        (the write data still has to be in order of write addresses as there is no id in AXI4 w channel).
+
     .. hwt-autodoc:: example_AxiInterconnectMatrixW
     """
+    ADDR_CHANNEL_NAME = "aw"
 
     def _declr(self):
         AxiInterconnectCommon._declr(self, has_r=False, has_w=True)
+        assert not (self.ID_REMAP and issubclass(self.intfCls.W_CLS, Axi3_w)), (
+            "ID_REMAP is not supported for the write channel with id (AXI3 write data interleaving)")
         masters_for_slave = AxiInterconnectMatrixCrossbar._masters_for_slave(
             self.MASTERS, len(self.SLAVES))
 
@@ -39,8 +54,10 @@ class AxiInterconnectMatrixW(AxiInterconnectCommon):
         for connected_masters in masters_for_slave:
             if len(connected_masters) > 1:
                 f_w = HandshakedFifo(Handshaked)
-                f_b = HandshakedFifo(Handshaked)
+                f_b = None if self.ID_REMAP else HandshakedFifo(Handshaked)
                 for _f in [f_w, f_b]:
+                    if _f is None:
+                        continue
                     _f.DEPTH = self.MAX_TRANS_OVERLAP
                     _f.DATA_WIDTH = log2ceil(len(self.MASTERS))
             else:
@@ -56,9 +73,11 @@ class AxiInterconnectMatrixW(AxiInterconnectCommon):
         for connected_slaves in self.MASTERS:
             if len(connected_slaves) > 1:
                 f_w = HandshakedFifo(Handshaked)
-                f_b = HandshakedFifo(Handshaked)
+                f_b = None if self.ID_REMAP else HandshakedFifo(Handshaked)
 
                 for f in [f_w, f_b]:
+                    if f is None:
+                        continue
                     f.DEPTH = self.MAX_TRANS_OVERLAP
                     f.DATA_WIDTH = log2ceil(len(self.SLAVES))
             else:
@@ -83,8 +102,12 @@ class AxiInterconnectMatrixW(AxiInterconnectCommon):
                     W_OUTPUTS[s_i].add(m_i)
             c.OUTPUTS = W_OUTPUTS
 
+        if self.ID_REMAP:
+            b_crossbar_cls = AxiInterconnectMatrixCrossbarIdRoutedB
+        else:
+            b_crossbar_cls = AxiInterconnectMatrixCrossbarB
         with self._paramsShared():
-            c = self.b_crossbar = AxiInterconnectMatrixCrossbarB(
+            c = self.b_crossbar = b_crossbar_cls(
                 AXI.B_CLS)
             c.INPUT_CNT = len(self.SLAVES)
             c.OUTPUTS = self.MASTERS
@@ -96,17 +119,17 @@ class AxiInterconnectMatrixW(AxiInterconnectCommon):
         b_crossbar = self.b_crossbar
 
         master_addr_channels = HObjList([m.aw for m in self.s])
-        slave_addr_channels = HObjList([s.aw for s in self.m])
         addr_crossbar.s(master_addr_channels)
-        slave_addr_channels(addr_crossbar.m)
+        for s, aw in zip(self.m, addr_crossbar.m):
+            s.aw(self._reg_slice("aw", aw))
 
         master_w_channels = HObjList([m.w for m in self.s])
         data_crossbar.dataIn(master_w_channels)
-        slave_w_channels = HObjList([s.w for s in self.m])
-        slave_w_channels(data_crossbar.dataOut)
+        for s, w in zip(self.m, data_crossbar.dataOut):
+            s.w(self._reg_slice("w", w))
 
-        master_b_channels = HObjList([m.b for m in self.s])
-        master_b_channels(b_crossbar.dataOut)
+        for m, b in zip(self.s, b_crossbar.dataOut):
+            m.b(self._reg_slice("b", b))
         slave_b_channels = HObjList([s.b for s in self.m])
         b_crossbar.dataIn(slave_b_channels)
 
@@ -117,19 +140,22 @@ class AxiInterconnectMatrixW(AxiInterconnectCommon):
             if f_w is None:
                 assert f_b is None
                 continue
-            HsBuilder(self, addr_crossbar_s_index_out)\
-                .split_copy_to(f_w.dataIn, f_b.dataIn)
+            elif f_b is None:
+                f_w.dataIn(addr_crossbar_s_index_out)
+            else:
+                HsBuilder(self, addr_crossbar_s_index_out)\
+                    .split_copy_to(f_w.dataIn, f_b.dataIn)
 
-        for f_w, f_b, data_dout_for_din, b_din_for_dout in zip(
+        for m_i, (f_w, f_b, data_dout_for_din) in enumerate(zip(
                 self.order_s_index_for_m_data,
                 self.order_s_index_for_m_b,
-                data_crossbar.order_dout_index_for_din_in,
-                b_crossbar.order_din_index_for_dout_in):
+                data_crossbar.order_dout_index_for_din_in)):
             if f_w is None:
                 assert f_b is None
                 continue
             data_dout_for_din(f_w.dataOut)
-            b_din_for_dout(f_b.dataOut)
+            if f_b is not None:
+                b_crossbar.order_din_index_for_dout_in[m_i](f_b.dataOut)
 
         for addr_crossbar_m_index_out, f_w, f_b in zip(
                 addr_crossbar.order_m_index_for_s_data_out,
@@ -139,20 +165,30 @@ class AxiInterconnectMatrixW(AxiInterconnectCommon):
                 assert f_b is None
                 assert addr_crossbar_m_index_out is None
                 continue
-            HsBuilder(self, addr_crossbar_m_index_out)\
-                .split_copy_to(f_w.dataIn, f_b.dataIn)
+            elif f_b is None:
+                f_w.dataIn(addr_crossbar_m_index_out)
+            else:
+                HsBuilder(self, addr_crossbar_m_index_out)\
+                    .split_copy_to(f_w.dataIn, f_b.dataIn)
 
-        for f_w, f_b, data_din_for_dout, b_dout_for_din in zip(
+        for s_i, (f_w, f_b, data_din_for_dout) in enumerate(zip(
                 self.order_m_index_for_s_data,
                 self.order_m_index_for_s_b,
-                data_crossbar.order_din_index_for_dout_in,
-                b_crossbar.order_dout_index_for_din_in):
+                data_crossbar.order_din_index_for_dout_in)):
             if f_w is None:
                 assert f_b is None
                 assert data_din_for_dout is None
                 continue
             data_din_for_dout(f_w.dataOut)
-            b_dout_for_din(f_b.dataOut)
+            if f_b is not None:
+                b_crossbar.order_dout_index_for_din_in[s_i](f_b.dataOut)
+
+        if self.ID_REMAP:
+            for m_b, resp_done in zip(b_crossbar.dataOut, addr_crossbar.resp_done_for_m):
+                if resp_done is None:
+                    continue
+                resp_done.vld(m_b.valid & m_b.ready)
+                resp_done.data(m_b.id)
 
 
 def example_AxiInterconnectMatrixW():
@@ -180,11 +180,36 @@ class AxiInterconnectMatrixW_3to3TC(AxiInterconnectMatrixW_1to1TC):
         cls.compileSim(u)
 
 
+class AxiInterconnectMatrixW_3to3_pipelined_TC(AxiInterconnectMatrixW_1to1TC):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.u = u = AxiInterconnectMatrixW(Axi4)
+        u.MASTERS = ({0, 1, 2}, {0, 1, 2}, {0, 1, 2})
+        u.SLAVES = (
+            (0x0000, 0x1000),
+            (0x1000, 0x1000),
+            (0x2000, 0x1000),
+        )
+        u.ADDR_WIDTH = log2ceil(0x4000 - 1)
+        u.REG_SLICES = ("aw", "w", "b")
+        u.PIPELINED_ADDR_DECODE = True
+        cls.compileSim(u)
+
+    def test_pipeline_report(self):
+        self.assertDictEqual(self.u.pipeline_report(), {
+            "aw": {"stages": 2, "comparators": 9},
+            "w": {"stages": 1, "comparators": 0},
+            "b": {"stages": 1, "comparators": 0},
+        })
+
+
 AxiInterconnectMatrixW_TCs = [
     AxiInterconnectMatrixW_1to1TC,
     AxiInterconnectMatrixW_1to3TC,
     AxiInterconnectMatrixW_3to1TC,
     AxiInterconnectMatrixW_3to3TC,
+    AxiInterconnectMatrixW_3to3_pipelined_TC,
 ]
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axi_comp.oooOp.examples.counterArray import OooOpExampleCounterArray
+from hwtLib.amba.axi_comp.oooOp.outOfOrderCummulativeOpBanked import OutOfOrderCummulativeOpBanked
+from hwtLib.amba.axi_comp.sim.ram import AxiSimRam
+from hwtLib.types.ctypes import uint32_t
+from hwtSimApi.constants import CLK_PERIOD
+
+
+class OooOpExampleCounterArrayBanked_TC(SimTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = OutOfOrderCummulativeOpBanked(OooOpExampleCounterArray)
+        u.BANK_CNT = 2
+        u.INPUT_CNT = 2
+        u.MAIN_STATE_T = uint32_t
+        u.TRANSACTION_STATE_T = None
+        u.ID_WIDTH = 2
+        u.ADDR_WIDTH = 2 + 3
+        u.DATA_WIDTH = u.MAIN_STATE_T.bit_length()
+        cls.compileSim(u)
+
+    def setUp(self):
+        SimTestCase.setUp(self)
+        u = self.u
+        self.m = AxiSimRam(axi=u.m)
+        # clear counters
+        self.ITEM_CNT = 2 ** u.ADDR_WIDTH // (u.DATA_WIDTH // 8)
+        for i in range(self.ITEM_CNT):
+            self.m.data[i] = 0
+
+    def bank_index(self, addr: int):
+        W = self.u.BANK_INDEX_WIDTH
+        res = 0
+        while addr:
+            res ^= addr & ((1 << W) - 1)
+            addr >>= W
+        return res
+
+    def test_nop(self):
+        u = self.u
+
+        self.runSim(10 * CLK_PERIOD)
+        for dout in u.dataOut:
+            self.assertEmpty(dout._ag.data)
+        self.assertEmpty(u.m.aw._ag.data)
+        self.assertEmpty(u.m.w._ag.data)
+        self.assertEmpty(u.m.ar._ag.data)
+
+    def _test_incr(self, indexes_per_input, randomize=False):
+        u = self.u
+        for din, indexes in zip(u.dataIn, indexes_per_input):
+            din._ag.data.extend(indexes)
+
+        t = (40 + sum(len(i) for i in indexes_per_input) * 8) * CLK_PERIOD
+        if randomize:
+            # :note: the randomization of "m" is not used because the latency of the memory
+            #     has to be compensated by write history of the bank (the same limitation
+            #     as for a single :class:`~.OooOpExampleCounterArray`)
+            for din in u.dataIn:
+                self.randomize(din)
+            for dout in u.dataOut:
+                self.randomize(dout)
+            t *= 5
+
+        self.runSim(t)
+
+        for din in u.dataIn:
+            self.assertEmpty(din._ag.data)
+        # check if all transactions on AXI are finished
+        self.assertEmpty(u.m.b._ag.data)
+        self.assertEmpty(u.m.r._ag.data)
+
+        all_indexes = [i for indexes in indexes_per_input for i in indexes]
+        for b_i, dout in enumerate(u.dataOut):
+            bank_indexes = [i for i in all_indexes if self.bank_index(i) == b_i]
+            out = [(int(addr), int(data)) for addr, data in dout._ag.data]
+            self.assertEqual(len(out), len(bank_indexes), b_i)
+            for addr in set(bank_indexes):
+                self.assertEqual(self.bank_index(addr), b_i)
+                # the updates of the same item are processed in order inside of the bank
+                self.assertSequenceEqual(
+                    [d for a, d in out if a == addr],
+                    list(range(1, bank_indexes.count(addr) + 1)),
+                    addr)
+
+        for i in range(self.ITEM_CNT):
+            self.assertValEqual(self.m.data[i], all_indexes.count(i), i)
+
+    def test_incr_1x_each_bank(self):
+        self._test_incr([[0], [1]])
+
+    def test_incr_2x_same(self):
+        self._test_incr([[1], [1]])
+
+    def test_incr_10x_same(self):
+        self._test_incr([[1 for _ in range(10)], [1 for _ in range(10)]])
+
+    def test_incr_parallel_different_banks(self):
+        # input 0 uses only the bank 0 and input 1 only the bank 1
+        self._test_incr([[0, 3, 5, 6] * 5, [1, 2, 4, 7] * 5])
+
+    def test_r_incr_100x_random(self):
+        # 2 ** ID_WIDTH items for each bank (same as in :class:`~.OooOpExampleCounterArray_1w_TC`)
+        index_pool = []
+        for b_i in range(self.u.BANK_CNT):
+            index_pool.extend([i for i in range(self.ITEM_CNT)
+                               if self.bank_index(i) == b_i][:2 ** self.u.ID_WIDTH])
+        d = [[self._rand.choice(index_pool) for _ in range(100)]
+             for _ in range(self.u.INPUT_CNT)]
+        self._test_incr(d, randomize=True)
+
+
+class OooOpExampleCounterArrayBanked_4b_TC(OooOpExampleCounterArrayBanked_TC):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = OutOfOrderCummulativeOpBanked(OooOpExampleCounterArray)
+        u.BANK_CNT = 4
+        u.INPUT_CNT = 3
+        u.MAIN_STATE_T = uint32_t
+        u.TRANSACTION_STATE_T = None
+        u.ID_WIDTH = 2
+        u.ADDR_WIDTH = 2 + 4
+        u.DATA_WIDTH = u.MAIN_STATE_T.bit_length()
+        cls.compileSim(u)
+
+    def test_incr_1x_each_bank(self):
+        self._test_incr([[0, 3], [1], [2]])
+
+    def test_incr_2x_same(self):
+        self._test_incr([[1], [1], [1]])
+
+    def test_incr_10x_same(self):
+        self._test_incr([[1 for _ in range(10)] for _ in range(3)])
+
+    def test_incr_parallel_different_banks(self):
+        self._test_incr([[0, 5, 10, 15] * 5, [1, 4, 11, 14] * 5, [2, 7, 8, 13] * 5])
+
+
+OooOpExampleCounterArrayBanked_TCs = [
+    OooOpExampleCounterArrayBanked_TC,
+    OooOpExampleCounterArrayBanked_4b_TC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(OooOpExampleCounterArrayBanked_TC('test_r_incr_100x_random'))
+    for tc in OooOpExampleCounterArrayBanked_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axi_comp.oooOp.examples.counterHashTable import OooOpExampleCounterHashTable
+from hwtLib.amba.axi_comp.oooOp.examples.counterHashTable_test import TState, OP
+from hwtLib.amba.axi_comp.oooOp.outOfOrderCummulativeOpBanked import OutOfOrderCummulativeOpBanked
+from hwtLib.amba.axi_comp.sim.ram import AxiSimRam
+from hwtSimApi.constants import CLK_PERIOD
+
+
+class OooOpExampleCounterHashTableBanked_TC(SimTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = OutOfOrderCummulativeOpBanked(OooOpExampleCounterHashTable)
+        u.BANK_CNT = 2
+        u.INPUT_CNT = 2
+        u.ID_WIDTH = 2
+        u.ADDR_WIDTH = u.ID_WIDTH + 3
+        cls.compileSim(u)
+
+    def setUp(self):
+        SimTestCase.setUp(self)
+        self.m = AxiSimRam(axi=self.u.m)
+
+    def bank_index(self, addr: int):
+        W = self.u.BANK_INDEX_WIDTH
+        res = 0
+        while addr:
+            res ^= addr & ((1 << W) - 1)
+            addr >>= W
+        return res
+
+    def _test_lookup(self, inputs_per_input, mem_init, randomize=False):
+        """
+        :param inputs_per_input: list of (addr, key) lookups for each input
+        :param mem_init: dictionary addr: tuple(key, value) of the items in memory
+        """
+        u = self.u
+        ADDR_ITEM_STEP = 2 ** u.ADDR_OFFSET_W
+        ITEM_CNT = 2 ** u.ADDR_WIDTH // ADDR_ITEM_STEP
+        for i in range(ITEM_CNT):
+            v = mem_init.get(i, None)
+            if v is None:
+                v = 0
+            else:
+                key, value = v
+                v = u.MAIN_STATE_T.from_py({"item_valid": 1, "key": key, "value": value})
+                v = v._reinterpret_cast(u.m.w.data._dtype)
+            self.m.data[i] = v
+
+        for din, inputs in zip(u.dataIn, inputs_per_input):
+            din._ag.data.extend((addr, TState(key, None, OP.LOOKUP)) for addr, key in inputs)
+
+        t = (40 + sum(len(i) for i in inputs_per_input) * 8) * CLK_PERIOD
+        if randomize:
+            # :note: "m" is not randomized for same reason as in :class:`~.OooOpExampleCounterArrayBanked_TC`
+            for din in u.dataIn:
+                self.randomize(din)
+            for dout in u.dataOut:
+                self.randomize(dout)
+            t *= 5
+
+        self.runSim(t)
+
+        for din in u.dataIn:
+            self.assertEmpty(din._ag.data)
+        # check if all transactions on AXI are finished
+        self.assertEmpty(u.m.b._ag.data)
+        self.assertEmpty(u.m.r._ag.data)
+
+        aeq = self.assertValEqual
+        all_inputs = [i for inputs in inputs_per_input for i in inputs]
+        for b_i, dout in enumerate(u.dataOut):
+            bank_inputs = [(a, k) for a, k in all_inputs if self.bank_index(a) == b_i]
+            out = list(dout._ag.data)
+            self.assertEqual(len(out), len(bank_inputs), b_i)
+            found_data = {}
+            for (o_addr,
+                 (o_found_key_vld, o_found_key, o_found_data),
+                 (o_reset, (_, o_key, _), o_match, o_operation)) in out:
+                addr = int(o_addr)
+                self.assertEqual(self.bank_index(addr), b_i)
+                aeq(o_reset, 0)
+                aeq(o_operation, OP.LOOKUP)
+                cur = mem_init.get(addr, None)
+                if cur is not None and cur[0] == int(o_key):
+                    # the updates of the same item are processed in order inside of the bank
+                    aeq(o_match, 1)
+                    aeq(o_found_key_vld, 1)
+                    aeq(o_found_key, cur[0])
+                    v = found_data.get(addr, cur[1]) + 1
+                    aeq(o_found_data, v)
+                    found_data[addr] = v
+                else:
+                    aeq(o_match, 0)
+                    aeq(o_found_key_vld, int(cur is not None))
+
+        for i in range(ITEM_CNT):
+            v = self.m.getStruct(i * ADDR_ITEM_STEP, u.MAIN_STATE_T)
+            ref_v = mem_init.get(i, None)
+            if ref_v is None:
+                aeq(v.item_valid, 0)
+            else:
+                key, value = ref_v
+                aeq(v.item_valid, 1)
+                aeq(v.key, key)
+                aeq(v.value, value + all_inputs.count((i, key)))
+
+    def test_1x_lookup_found_each_bank(self):
+        self._test_lookup([[(0, 10)], [(1, 11)]],
+                          mem_init={0: (10, 20), 1: (11, 30)})
+
+    def test_lookup_not_found(self):
+        self._test_lookup([[(0, 99), (2, 10)], [(1, 11), (3, 99)]],
+                          mem_init={0: (10, 20), 3: (13, 30)})
+
+    def test_10x_lookup_found_same(self):
+        self._test_lookup([[(1, 11) for _ in range(10)], [(1, 11) for _ in range(10)]],
+                          mem_init={1: (11, 0)})
+
+    def test_r_100x_lookup_found_not_found_mix(self):
+        u = self.u
+        # 2 ** ID_WIDTH items for each bank (same as in :class:`~.OooOpExampleCounterHashTable_TC`)
+        ITEM_CNT = 2 ** u.ADDR_WIDTH // 2 ** u.ADDR_OFFSET_W
+        index_pool = []
+        for b_i in range(u.BANK_CNT):
+            index_pool.extend([i for i in range(ITEM_CNT)
+                               if self.bank_index(i) == b_i][:2 ** u.ID_WIDTH])
+        mem_init = {i: (i + 1, 20 + i) for i in index_pool[::2]}
+        key_pool = [i + 1 for i in index_pool]
+        r = self._rand
+
+        def lookup():
+            addr = r.choice(index_pool)
+            # the key of the item or a random key
+            key = addr + 1 if r.randint(0, 1) else r.choice(key_pool)
+            return (addr, key)
+
+        d = [[lookup() for _ in range(100)] for _ in range(u.INPUT_CNT)]
+        self._test_lookup(d, mem_init, randomize=True)
+
+
+OooOpExampleCounterHashTableBanked_TCs = [
+    OooOpExampleCounterHashTableBanked_TC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(OooOpExampleCounterHashTableBanked_TC('test_r_100x_lookup_found_not_found_mix'))
+    for tc in OooOpExampleCounterHashTableBanked_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
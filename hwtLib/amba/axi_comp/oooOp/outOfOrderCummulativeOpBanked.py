@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Optional, Type
+
+from hwt.code import Concat, Or, SwitchLogic, Xor, rol
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.std import Handshaked
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil, isPow2
+from hwt.synthesizer.hObjList import HObjList
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axi4 import Axi4, Axi4_addr
+from hwtLib.amba.axi_comp.oooOp.outOfOrderCummulativeOp import OutOfOrderCummulativeOp
+from hwtLib.amba.axi_comp.oooOp.utils import OutOfOrderCummulativeOpIntf
+from hwtLib.amba.axis_comp.builder import AxiSBuilder
+from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.handshaked.joinFair import HsJoinFairShare
+from hwtLib.handshaked.streamNode import StreamNode
+
+
+class OutOfOrderCummulativeOpBanked(Unit):
+    """
+    Multiple independent instances (banks) of :class:`~.OutOfOrderCummulativeOp`
+    which are sharing a single AXI interface in order to process multiple
+    read-modify-write operations per clock cycle.
+
+    The address space is partitioned between the banks by a hash of the item index (address),
+    this means that the operations on a single item are always processed by the same bank
+    and the collision detection and write forwarding inside of the bank remains sufficient.
+    Each bank has its own transaction table and the AXI id range (the index of the bank
+    is stored in the MSBs of AXI id on "m" interface).
+
+    * The dispatcher routes each input transaction to the bank selected by :meth:`~.bank_index`
+      (round-robin if multiple inputs are targeting same bank).
+    * The AXI interfaces of banks are joined in round-robin fashion
+      (the order of w channel is driven by the order of aw channel),
+      the r and b channels are routed back to the bank by the MSBs of id.
+
+    :ivar OP_CLS: the class of the component used for a bank (:class:`~.OutOfOrderCummulativeOp` subclass),
+        the params of this class are also the params of this component
+    :ivar BANK_CNT: number of banks (power of 2)
+    :ivar INPUT_CNT: number of "dataIn" interfaces
+    :ivar ID_WIDTH: the id width of a single bank, the "m" interface has id wider by log2(BANK_CNT)
+    :ivar dataIn: the input transaction interfaces
+    :ivar dataOut: output interface for each bank, the transaction is finished out of order
+        (also between the banks)
+
+    .. hwt-autodoc:: _example_OutOfOrderCummulativeOpBanked
+    """
+
+    def __init__(self, opCls: Type[OutOfOrderCummulativeOp], hdl_name_override=None):
+        self.opCls = opCls
+        super(OutOfOrderCummulativeOpBanked, self).__init__(hdl_name_override=hdl_name_override)
+
+    def _config(self):
+        self.OP_CLS = Param(self.opCls)
+        self.BANK_CNT = Param(2)
+        self.INPUT_CNT = Param(2)
+        self.opCls._config(self)
+
+    def _declr(self):
+        assert self.BANK_CNT > 1 and isPow2(self.BANK_CNT), self.BANK_CNT
+        assert self.INPUT_CNT >= 1, self.INPUT_CNT
+        addClkRstn(self)
+        OutOfOrderCummulativeOp._init_constants(self)
+        self.BANK_INDEX_WIDTH = log2ceil(self.BANK_CNT)
+
+        with self._paramsShared():
+            self.banks = HObjList(self.opCls() for _ in range(self.BANK_CNT))
+            self.m = Axi4()._m()
+        self.m.ID_WIDTH = self.ID_WIDTH + self.BANK_INDEX_WIDTH
+
+        self.dataIn = HObjList(OutOfOrderCummulativeOpIntf() for _ in range(self.INPUT_CNT))
+        self.dataOut = HObjList(OutOfOrderCummulativeOpIntf()._m() for _ in range(self.BANK_CNT))
+        for i in [*self.dataIn, *self.dataOut]:
+            i.MAIN_STATE_INDEX_WIDTH = self.MAIN_STATE_INDEX_WIDTH
+            i.TRANSACTION_STATE_T = self.TRANSACTION_STATE_T
+            i.MAIN_STATE_T = self.MAIN_STATE_T if i in self.dataOut else None
+
+        # for each bank join the inputs which are targeting this bank
+        self.dispatch = HObjList(HsJoinFairShare(OutOfOrderCummulativeOpIntf)
+                                 for _ in range(self.BANK_CNT))
+        for j in self.dispatch:
+            j._updateParamsFrom(self.dataIn[0])
+            j.INPUTS = self.INPUT_CNT
+            j.EXPORT_SELECTED = False
+
+        # the index of bank for the w channel (in the order of aw transactions)
+        w_order = self.w_order = HandshakedFifo(Handshaked)
+        w_order.DATA_WIDTH = self.BANK_INDEX_WIDTH
+        w_order.DEPTH = self.BANK_CNT
+
+    def bank_index(self, addr: RtlSignal) -> RtlSignal:
+        """
+        :return: the index of the bank for the item on specified address (index of the item)
+            (XOR of all parts of address, the consecutive items are mapped to different banks)
+        """
+        W = self.BANK_INDEX_WIDTH
+        parts = []
+        addr_w = addr._dtype.bit_length()
+        for low in range(0, addr_w, W):
+            high = min(low + W, addr_w)
+            p = addr[high:low]
+            if high - low < W:
+                p = Concat(Bits(W - (high - low)).from_py(0), p)
+            parts.append(p)
+        return Xor(*parts)
+
+    def _round_robin(self, name: str, reqs: List[RtlSignal]) -> List[RtlSignal]:
+        """
+        :return: the list of grant flags for each request (same as :class:`hwtLib.handshaked.joinFair.HsJoinFairShare`)
+        """
+        priority = self._reg(f"{name:s}_priority", Bits(len(reqs)), def_val=1)
+        priority(rol(priority, 1))
+        return [
+            rename_signal(self, HsJoinFairShare.priorityAck(priority, reqs, i) & r, f"{name:s}_grant{i:d}")
+            for i, r in enumerate(reqs)
+        ]
+
+    def dispatch_inputs(self):
+        bank_sel = [
+            rename_signal(self, self.bank_index(din.addr), f"dataIn{i:d}_bank")
+            for i, din in enumerate(self.dataIn)
+        ]
+        for din_i, (din, sel) in enumerate(zip(self.dataIn, bank_sel)):
+            for b_i, j in enumerate(self.dispatch):
+                j_in = j.dataIn[din_i]
+                j_in(din, exclude={din.vld, din.rd})
+                j_in.vld(din.vld & sel._eq(b_i))
+
+            din.rd(~din.vld | Or(*(
+                sel._eq(b_i) & j.dataIn[din_i].rd
+                for b_i, j in enumerate(self.dispatch)
+            )))
+
+        for j, bank in zip(self.dispatch, self.banks):
+            bank.dataIn(j.dataOut)
+
+    def connect_addr_channel(self, name: str, srcs: List[Axi4_addr], dst: Axi4_addr,
+                             extra_dsts: Optional[List[Handshaked]]=None,
+                             src_en: Optional[List[RtlSignal]]=None):
+        """
+        Join the address channels of banks to a single address channel
+
+        :param extra_dsts: optional list of handshaked interfaces which are synchronized with dst
+        :param src_en: optional list of enable flags for each source
+        :return: list of grant flags
+        """
+        reqs = [s.valid for s in srcs]
+        if src_en is not None:
+            reqs = [r & en for r, en in zip(reqs, src_en)]
+        grants = self._round_robin(name, reqs)
+        sel = SwitchLogic([
+            (g, [
+                dst(s, exclude={s.id, s.valid, s.ready}),
+                dst.id(Concat(Bits(self.BANK_INDEX_WIDTH).from_py(b_i), s.id)),
+            ]) for b_i, (g, s) in enumerate(zip(grants, srcs))
+        ], default=[
+            dst(srcs[0], exclude={srcs[0].id, srcs[0].valid, srcs[0].ready}),
+            dst.id(None),
+        ])
+        # the inputs are routed to the output node by "sel" mux
+        if extra_dsts is None:
+            extra_dsts = []
+        node = StreamNode([], [dst, *extra_dsts])
+        any_req = Or(*reqs)
+        node.sync(any_req)
+        ack = rename_signal(self, node.ack() & any_req, f"{name:s}_ack")
+        for g, s in zip(grants, srcs):
+            s.ready(g & ack)
+        return grants, sel
+
+    def connect_resp_channel(self, src, dsts: List[Axi4]):
+        """
+        Route the response channel to a bank specified by MSBs of id
+        """
+        ID_WIDTH = self.ID_WIDTH
+        bank_i = src.id[:ID_WIDTH]
+        for b_i, d in enumerate(dsts):
+            d(src, exclude={src.id, src.valid, src.ready})
+            d.id(src.id[ID_WIDTH:])
+            d.valid(src.valid & bank_i._eq(b_i))
+
+        # :note: the id is not valid if there is no valid data
+        src.ready(~src.valid | Or(*(bank_i._eq(b_i) & d.ready for b_i, d in enumerate(dsts))))
+
+    def merge_axi(self):
+        bank_m = [b.m for b in self.banks]
+        # :note: the valid of aw/w of the bank depends on the ready of the w/aw
+        #     the register is required in order to avoid the deadlock as the w is selected by aw
+        bank_aw = [AxiSBuilder(self, m.aw, f"bank{i:d}_aw").buff(1).end for i, m in enumerate(bank_m)]
+        bank_w = [AxiSBuilder(self, m.w, f"bank{i:d}_w").buff(1).end for i, m in enumerate(bank_m)]
+
+        m = self.m
+        # the read of the bank can not overtake the write of the same bank
+        # (the collision detection in the bank expects that the memory accesses are not reordered)
+        self.connect_addr_channel("ar", [b.ar for b in bank_m], m.ar,
+                                  src_en=[~aw.valid & ~w.valid for aw, w in zip(bank_aw, bank_w)])
+        self.connect_resp_channel(m.r, [b.r for b in bank_m])
+
+        w_order = self.w_order
+        aw_grants, _ = self.connect_addr_channel("aw", bank_aw, m.aw, [w_order.dataIn])
+        w_order.dataIn.data(Concat(*reversed([
+            Or(*(g for b_i, g in enumerate(aw_grants) if (b_i >> bit_i) & 1))
+            for bit_i in range(self.BANK_INDEX_WIDTH)
+        ])))
+
+        w_sel = w_order.dataOut
+        SwitchLogic([
+            (w_sel.data._eq(b_i), m.w(w, exclude={w.valid, w.ready}))
+            for b_i, w in enumerate(bank_w)
+        ], default=m.w(bank_w[0], exclude={bank_w[0].valid, bank_w[0].ready}))
+        w_vld = rename_signal(self, Or(*(w_sel.data._eq(b_i) & w.valid
+                                         for b_i, w in enumerate(bank_w))), "w_vld")
+        m.w.valid(w_sel.vld & w_vld)
+        for b_i, w in enumerate(bank_w):
+            w.ready(w_sel.vld & w_sel.data._eq(b_i) & m.w.ready)
+        w_sel.rd(w_vld & m.w.ready & m.w.last)
+
+        self.connect_resp_channel(m.b, [b.b for b in bank_m])
+
+    def _impl(self):
+        self.dispatch_inputs()
+        self.merge_axi()
+        for dout, bank in zip(self.dataOut, self.banks):
+            dout(bank.dataOut)
+        propagateClkRstn(self)
+
+
+def _example_OutOfOrderCummulativeOpBanked():
+    from hwtLib.amba.axi_comp.oooOp.examples.counterArray import OooOpExampleCounterArray
+    u = OutOfOrderCummulativeOpBanked(OooOpExampleCounterArray)
+    u.BANK_CNT = 2
+    u.INPUT_CNT = 2
+    u.ID_WIDTH = 2
+    u.ADDR_WIDTH = 2 + 4
+    u.DATA_WIDTH = u.MAIN_STATE_T.bit_length()
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_OutOfOrderCummulativeOpBanked()
+    print(to_rtl_str(u))
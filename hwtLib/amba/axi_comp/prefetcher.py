@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.code import If, Concat
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.std import Handshaked
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil, isPow2
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axi4 import Axi4
+from hwtLib.amba.constants import BURST_INCR, CACHE_DEFAULT, LOCK_DEFAULT, \
+    BYTES_IN_TRANS, PROT_DEFAULT, QOS_DEFAULT
+from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.logic.oneHotToBin import oneHotToBin
+
+
+@serializeParamsUniq
+class AxiReadPrefetcher(Unit):
+    """
+    Read prefetcher for AXI4 read channels, it is meant to be placed
+    between a reader (e.g. :class:`hwtLib.amba.datapump.r.Axi_rDatapump`,
+    :class:`hwtLib.amba.axi_comp.cache.caheWriteAllocWawOnlyWritePropagating.AxiCaheWriteAllocWawOnlyWritePropagating`)
+    and the main memory.
+
+    The component has a buffer of BUFF_ITEMS bus words (slots).
+    Each read from "s" interface is looked up in the buffer, if the data is
+    there (or is being loaded) the read does not generate the transaction
+    on "m" interface and the data is returned from the buffer.
+    Otherwise a slot is allocated and the read is dispatched on "m" interface
+    (the id of transaction on "m" is the index of the slot).
+
+    Each read also updates a stride detection table, the record in this table
+    is selected by the lower bits of the id of the read (each id is one stream).
+    The table contains the last address, the last stride and the confidence
+    counter for the stride. If the stride was repeated CONFIDENCE_THRESHOLD times
+    the prefetch of next DEPTH bus words with this stride is started,
+    otherwise if NEXT_LINE is set the next DEPTH bus words are prefetched.
+    The prefetch uses free slots or replaces the prefetched data which were not used yet,
+    it is stopped if there is MAX_OUTSTANDING transactions in flight on "m" interface.
+
+    :ivar ~.BUFF_ITEMS: number of bus words in prefetch buffer (power of 2)
+    :ivar ~.STREAM_CNT: number of records in stride detection table (power of 2)
+    :ivar ~.DEPTH: number of bus words prefetched after each read
+        (the distance of the prefetch)
+    :ivar ~.CONFIDENCE_THRESHOLD: number of repetitions of the stride required
+        to start strided prefetch (aggressiveness of the prefetcher)
+    :ivar ~.NEXT_LINE: if True the next DEPTH bus words are prefetched
+        if the stride is not confirmed
+    :ivar ~.MAX_OUTSTANDING: max number of transactions on "m" interface,
+        only the prefetch is throttled, the demand reads are dispatched
+        if there is a free slot
+
+    :attention: only the reads of a single bus word (len=0) are supported
+    :note: The order of the data on "s" interface is the order of the requests
+        (the responses are in order even for different ids).
+    :note: The buffer is not coherent with the writes to the memory,
+        it is meant for read only data.
+    :note: The prefetched data which were not used yet are replaced
+        by demand reads or by prefetch if there is no free slot.
+
+    .. hwt-autodoc:: _example_AxiReadPrefetcher
+    """
+
+    def _config(self):
+        Axi4._config(self)
+        self.BUFF_ITEMS = Param(8)
+        self.STREAM_CNT = Param(4)
+        self.DEPTH = Param(2)
+        self.CONFIDENCE_THRESHOLD = Param(2)
+        self.NEXT_LINE = Param(True)
+        self.MAX_OUTSTANDING = Param(4)
+
+    def _declr(self):
+        assert self.BUFF_ITEMS > 1 and isPow2(self.BUFF_ITEMS), self.BUFF_ITEMS
+        assert isPow2(self.STREAM_CNT), self.STREAM_CNT
+        assert self.STREAM_CNT == 1 or log2ceil(self.STREAM_CNT) <= self.ID_WIDTH, (self.STREAM_CNT, self.ID_WIDTH)
+        assert self.DEPTH >= 0 and self.DEPTH <= self.BUFF_ITEMS, (self.DEPTH, self.BUFF_ITEMS)
+        assert self.CONFIDENCE_THRESHOLD > 0, self.CONFIDENCE_THRESHOLD
+        assert self.MAX_OUTSTANDING > 0, self.MAX_OUTSTANDING
+        self.OFFSET_W = log2ceil(self.DATA_WIDTH // 8 - 1)
+        self.LINE_ADDR_WIDTH = self.ADDR_WIDTH - self.OFFSET_W
+        self.INDEX_W = log2ceil(self.BUFF_ITEMS)
+
+        addClkRstn(self)
+        with self._paramsShared():
+            self.s = Axi4()
+            self.m = Axi4()._m()
+        self.m.ID_WIDTH = self.INDEX_W
+        for i in [self.s, self.m]:
+            i.HAS_W = False
+
+        # (id, slot index) of reads in the order of requests
+        o = self.r_order = HandshakedFifo(Handshaked)
+        o.DEPTH = self.BUFF_ITEMS
+        o.DATA_WIDTH = self.ID_WIDTH + self.INDEX_W
+
+    def line_addr(self, addr):
+        return addr[:self.OFFSET_W]
+
+    def stride_detector(self, line, ar_ack):
+        """
+        Update the stride detection table and resolve the prefetch for the read
+
+        :return: tuple (prefetch enable, stride of the prefetch)
+        """
+        ar = self.s.ar
+        STREAM_CNT = self.STREAM_CNT
+        line_t = Bits(self.LINE_ADDR_WIDTH)
+        conf_t = Bits(log2ceil(self.CONFIDENCE_THRESHOLD + 1))
+        last_line = self._sig("stream_last_line", line_t[STREAM_CNT], [0 for _ in range(STREAM_CNT)])
+        last_stride = self._sig("stream_stride", line_t[STREAM_CNT], [0 for _ in range(STREAM_CNT)])
+        conf = self._sig("stream_confidence", conf_t[STREAM_CNT], [0 for _ in range(STREAM_CNT)])
+        if STREAM_CNT == 1:
+            stream = 0
+        else:
+            stream = rename_signal(self, ar.id[log2ceil(STREAM_CNT):], "stream")
+
+        stride = rename_signal(self, line - last_line[stream], "stride")
+        cur_conf = conf[stream]
+        stride_match = rename_signal(self, stride._eq(last_stride[stream]) & (stride != 0), "stride_match")
+        If(self.clk._onRisingEdge() & ar_ack,
+            last_line[stream](line),
+            If(stride_match,
+                If(cur_conf != self.CONFIDENCE_THRESHOLD,
+                   conf[stream](cur_conf + 1)
+                )
+            ).Elif(cur_conf._eq(0),
+                last_stride[stream](stride),
+            ).Else(
+                conf[stream](cur_conf - 1)
+            )
+        )
+        stride_confirmed = rename_signal(
+            self,
+            stride_match & (cur_conf >= self.CONFIDENCE_THRESHOLD - 1),
+            "stride_confirmed")
+        if self.NEXT_LINE:
+            pf_en = 1
+            pf_stride = stride_confirmed._ternary(stride, line_t.from_py(1))
+        else:
+            pf_en = stride_confirmed
+            pf_stride = stride
+        return pf_en, pf_stride
+
+    def _impl(self):
+        propagateClkRstn(self)
+        BUFF_ITEMS = self.BUFF_ITEMS
+        INDEX_W = self.INDEX_W
+        s, m = self.s, self.m
+        line_t = Bits(self.LINE_ADDR_WIDTH)
+
+        # slot is allocated
+        slot_vld = self._reg("slot_vld", Bits(BUFF_ITEMS), def_val=0)
+        # slot contains the data from "m" interface
+        slot_data_vld = self._reg("slot_data_vld", Bits(BUFF_ITEMS), def_val=0)
+        # slot is used by read from "s" (otherwise it is just prefetched)
+        slot_claimed = self._reg("slot_claimed", Bits(BUFF_ITEMS), def_val=0)
+        slot_addr = self._sig("slot_addr", line_t[BUFF_ITEMS], [0 for _ in range(BUFF_ITEMS)])
+        slot_data = self._sig("slot_data", m.r.data._dtype[BUFF_ITEMS])
+        slot_resp = self._sig("slot_resp", m.r.resp._dtype[BUFF_ITEMS])
+        # number of transactions in flight on "m" interface
+        outstanding = self._reg("outstanding", Bits(log2ceil(BUFF_ITEMS + 1)), def_val=0)
+
+        ########################## s.ar - lookup in buffer or demand read ##############
+        ar = s.ar
+        line = rename_signal(self, self.line_addr(ar.addr), "line")
+        found_oh = rename_signal(self, Concat(*reversed([
+            ar.valid & slot_vld[i] & ~slot_claimed[i] & slot_addr[i]._eq(line)
+            for i in range(BUFF_ITEMS)
+        ])), "found_oh")
+        found = rename_signal(self, found_oh != 0, "found")
+        found_index = oneHotToBin(self, found_oh, "found_index")
+
+        has_free = rename_signal(self, slot_vld != (1 << BUFF_ITEMS) - 1, "has_free")
+        # prefetched data which were not used yet
+        evictable = rename_signal(self, slot_vld & slot_data_vld & ~slot_claimed, "evictable")
+        alloc_index = oneHotToBin(self, has_free._ternary(~slot_vld, evictable), "alloc_index")
+        can_alloc = rename_signal(self, ~found & (has_free | (evictable != 0)), "can_alloc")
+        demand_miss = rename_signal(self, ar.valid & ~found, "demand_miss")
+
+        order = self.r_order.dataIn
+        if self.ID_WIDTH:
+            order_slot = Concat(ar.id, found._ternary(found_index, alloc_index))
+        else:
+            order_slot = found._ternary(found_index, alloc_index)
+        order.data(order_slot)
+        order.vld(ar.valid & (found | (can_alloc & m.ar.ready)))
+        ar.ready(order.rd & (found | (can_alloc & m.ar.ready)))
+        ar_ack = rename_signal(self, ar.valid & ar.ready, "ar_ack")
+        claim = rename_signal(self, ar_ack & found, "claim")
+        demand_alloc = rename_signal(self, ar_ack & ~found, "demand_alloc")
+
+        ########################## prefetch address generator ########################
+        pf_en, pf_stride = self.stride_detector(line, ar_ack)
+        pf_vld = self._reg("pf_vld", def_val=0)
+        pf_addr = self._reg("pf_addr", line_t)
+        pf_step = self._reg("pf_step", line_t)
+        pf_remaining = self._reg("pf_remaining", Bits(log2ceil(self.DEPTH + 1)))
+
+        pf_found = rename_signal(self, Concat(*reversed([
+            slot_vld[i] & slot_addr[i]._eq(pf_addr) for i in range(BUFF_ITEMS)
+        ])) != 0, "pf_found")
+        # the slot which is claimed in this clock cycle can not be replaced
+        pf_evictable = rename_signal(self, evictable & ~found_oh, "pf_evictable")
+        pf_index = oneHotToBin(self, has_free._ternary(~slot_vld, pf_evictable), "pf_index")
+        pf_can_issue = rename_signal(
+            self,
+            pf_vld & ~pf_found & (has_free | (pf_evictable != 0)) &
+            (outstanding < self.MAX_OUTSTANDING),
+            "pf_can_issue")
+        # the demand read has higher priority
+        pf_req = rename_signal(self, pf_can_issue & ~demand_miss, "pf_req")
+        pf_alloc = rename_signal(self, pf_req & m.ar.ready, "pf_alloc")
+        pf_next = rename_signal(self, pf_alloc | (pf_vld & pf_found), "pf_next")
+
+        if self.DEPTH == 0:
+            pf_vld(0)
+        else:
+            If(ar_ack & pf_en,
+                pf_vld(1),
+                pf_addr(line + pf_stride),
+                pf_step(pf_stride),
+                pf_remaining(self.DEPTH - 1),
+            ).Elif(pf_next,
+                pf_addr(pf_addr + pf_step),
+                pf_remaining(pf_remaining - 1),
+                If(pf_remaining._eq(0),
+                   pf_vld(0),
+                )
+            )
+
+        ########################## m.ar ##########################################
+        m_ar = m.ar
+        If(demand_miss,
+           m_ar.addr(Concat(line, Bits(self.OFFSET_W).from_py(0))),
+           m_ar.id(alloc_index),
+        ).Else(
+           m_ar.addr(Concat(pf_addr, Bits(self.OFFSET_W).from_py(0))),
+           m_ar.id(pf_index),
+        )
+        m_ar.valid((demand_miss & can_alloc & order.rd) | pf_req)
+        m_ar.len(0)
+        m_ar.burst(BURST_INCR)
+        m_ar.cache(CACHE_DEFAULT)
+        m_ar.lock(LOCK_DEFAULT)
+        m_ar.size(BYTES_IN_TRANS(self.DATA_WIDTH // 8))
+        m_ar.prot(PROT_DEFAULT)
+        m_ar.qos(QOS_DEFAULT)
+        m_ar_ack = m_ar.valid & m_ar.ready
+
+        ########################## m.r - store data to buffer ############################
+        m_r = m.r
+        m_r.ready(1)
+        If(self.clk._onRisingEdge() & m_r.valid,
+           slot_data[m_r.id](m_r.data),
+           slot_resp[m_r.id](m_r.resp),
+        )
+        If(m_ar_ack & ~m_r.valid,
+           outstanding(outstanding + 1)
+        ).Elif(~m_ar_ack & m_r.valid,
+           outstanding(outstanding - 1)
+        )
+
+        ########################## s.r - return data in order of requests ###############
+        o = self.r_order.dataOut
+        out_index = o.data[INDEX_W:]
+        out_data_vld = rename_signal(self, o.vld & slot_data_vld[out_index], "out_data_vld")
+        r = s.r
+        if self.ID_WIDTH:
+            r.id(o.data[:INDEX_W])
+        r.data(slot_data[out_index])
+        r.resp(slot_resp[out_index])
+        r.last(1)
+        r.valid(out_data_vld)
+        o.rd(r.ready & out_data_vld)
+        release = rename_signal(self, out_data_vld & r.ready, "release")
+
+        ########################## slot state update ######################################
+        # :note: all updates of single slot are mutually exclusive except claim and m.r
+        #     (the allocations use only free or evictable slots, the release only claimed
+        #     slots with data and m.r only slots without data)
+        vld_next = []
+        data_vld_next = []
+        claimed_next = []
+        for i in range(BUFF_ITEMS):
+            d_alloc = demand_alloc & alloc_index._eq(i)
+            p_alloc = pf_alloc & pf_index._eq(i)
+            rel = release & out_index._eq(i)
+            vld_next.append((slot_vld[i] & ~rel) | d_alloc | p_alloc)
+            data_vld_next.append(
+                (slot_data_vld[i] | (m_r.valid & m_r.id._eq(i))) & ~rel & ~d_alloc & ~p_alloc)
+            claimed_next.append((slot_claimed[i] | d_alloc | (claim & found_index._eq(i))) & ~rel)
+            If(self.clk._onRisingEdge(),
+               If(d_alloc,
+                  slot_addr[i](line),
+               ).Elif(p_alloc,
+                  slot_addr[i](pf_addr),
+               )
+            )
+        slot_vld(Concat(*reversed(vld_next)))
+        slot_data_vld(Concat(*reversed(data_vld_next)))
+        slot_claimed(Concat(*reversed(claimed_next)))
+
+
+def _example_AxiReadPrefetcher():
+    u = AxiReadPrefetcher()
+    u.ADDR_WIDTH = 32
+    u.DATA_WIDTH = 64
+    u.ID_WIDTH = 4
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_AxiReadPrefetcher()
+    print(to_rtl_str(u))
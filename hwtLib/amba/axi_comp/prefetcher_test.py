@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+import unittest
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axiLite_comp.sim.utils import axi_randomize_per_channel
+from hwtLib.amba.axi_comp.prefetcher import AxiReadPrefetcher
+from hwtLib.amba.axi_comp.sim.ram import AxiSimRam
+from hwtLib.amba.constants import RESP_OKAY
+from hwtLib.amba.datapump.sim_ram_timing import AxiSimRamTimingModel
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+
+
+class AxiReadPrefetcherTC(SimTestCase):
+    LATENCY = 20
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = AxiReadPrefetcher()
+        u.ADDR_WIDTH = 16
+        u.DATA_WIDTH = 32
+        u.ID_WIDTH = 2
+        u.BUFF_ITEMS = 8
+        u.STREAM_CNT = 4
+        u.DEPTH = 4
+        u.MAX_OUTSTANDING = 4
+        cls.compileSim(u)
+
+    def setUp(self):
+        SimTestCase.setUp(self)
+        self.timing = AxiSimRamTimingModel(read_latency=self.LATENCY)
+        self.mem = AxiSimRam(axi=self.u.m, timing=self.timing)
+        for i in range(1024):
+            self.mem.data[i] = self.mem_data(i)
+
+    @staticmethod
+    def mem_data(word_i):
+        return word_i + 1000
+
+    def dependent_reader(self, word_indexes, latencies, _id=0):
+        """
+        Sim. process which reads the words one by one (the next read
+        is send after the data for previous one was received)
+        and stores the latency of each read
+        """
+        ar = self.u.s.ar._ag
+        r = self.u.s.r._ag.data
+        for i in word_indexes:
+            ar.data.append(ar.create_addr_req(i * 4, 0, _id=_id))
+            r_cnt = len(r)
+            t = 0
+            while len(r) == r_cnt:
+                yield Timer(CLK_PERIOD)
+                t += 1
+            latencies.append(t)
+
+    def assert_r_data(self, word_indexes, _id=0):
+        self.assertValSequenceEqual(
+            self.u.s.r._ag.data,
+            [(_id, self.mem_data(i), RESP_OKAY, 1) for i in word_indexes])
+
+    def test_nop(self):
+        u = self.u
+        self.runSim(10 * CLK_PERIOD)
+        self.assertEmpty(u.m.ar._ag.data)
+        self.assertEmpty(u.s.r._ag.data)
+
+    def test_sequential(self, N=32):
+        words = list(range(N))
+        latencies = []
+        self.procs.append(self.dependent_reader(words, latencies))
+        self.runSim((N * 10 + self.LATENCY * 4) * CLK_PERIOD)
+
+        self.assert_r_data(words)
+        # the first read is not prefetched, without the prefetch
+        # each read would take the same time
+        self.assertLess(sum(latencies), N * latencies[0] // 3)
+        self.assertLessEqual(max(latencies[N // 2:]), latencies[0] // 2)
+
+    def test_strided(self, N=32, STRIDE=3):
+        words = [i * STRIDE for i in range(N)]
+        latencies = []
+        self.procs.append(self.dependent_reader(words, latencies, _id=1))
+        self.runSim((N * 10 + self.LATENCY * 4) * CLK_PERIOD)
+
+        self.assert_r_data(words, _id=1)
+        self.assertLess(sum(latencies), N * latencies[0] // 3)
+        self.assertLessEqual(max(latencies[N // 2:]), latencies[0] // 2)
+
+    def test_negative_stride(self, N=32, STRIDE=-2):
+        words = [500 + i * STRIDE for i in range(N)]
+        latencies = []
+        self.procs.append(self.dependent_reader(words, latencies))
+        self.runSim((N * 10 + self.LATENCY * 8) * CLK_PERIOD)
+
+        self.assert_r_data(words)
+        self.assertLessEqual(max(latencies[N // 2:]), latencies[0] // 2)
+
+    def test_max_outstanding(self, N=32):
+        u = self.u
+        words = list(range(N))
+        latencies = []
+        in_flight = []
+
+        def monitor():
+            while True:
+                yield Timer(CLK_PERIOD)
+                in_flight.append(len(self.timing.rInFlight) + len(u.m.ar._ag.data))
+
+        self.procs.append(monitor())
+        self.procs.append(self.dependent_reader(words, latencies))
+        self.runSim((N * 10 + self.LATENCY * 4) * CLK_PERIOD)
+
+        self.assert_r_data(words)
+        # +1 for demand read which is not throttled
+        self.assertLessEqual(max(in_flight), u.MAX_OUTSTANDING + 1)
+
+    def test_random_access(self, N=100):
+        u = self.u
+        rand = Random(0)
+        axi_randomize_per_channel(self, u.s)
+        axi_randomize_per_channel(self, u.m)
+        ar = u.s.ar._ag
+        expected = []
+        for _ in range(N):
+            _id = rand.randint(0, 3)
+            i = rand.choice([rand.randint(0, 1023), rand.randint(0, 15)])
+            ar.data.append(ar.create_addr_req(i * 4, 0, _id=_id))
+            expected.append((_id, self.mem_data(i), RESP_OKAY, 1))
+
+        self.runSim(N * (self.LATENCY + 10) * CLK_PERIOD)
+        self.assertEmpty(ar.data)
+        self.assertValSequenceEqual(u.s.r._ag.data, expected)
+
+
+class AxiReadPrefetcher_noNextLineTC(AxiReadPrefetcherTC):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = AxiReadPrefetcher()
+        u.ADDR_WIDTH = 16
+        u.DATA_WIDTH = 32
+        u.ID_WIDTH = 2
+        u.BUFF_ITEMS = 4
+        u.STREAM_CNT = 1
+        u.DEPTH = 4
+        u.NEXT_LINE = False
+        u.CONFIDENCE_THRESHOLD = 1
+        cls.compileSim(u)
+
+    def test_sequential(self, N=32):
+        words = list(range(N))
+        latencies = []
+        self.procs.append(self.dependent_reader(words, latencies))
+        self.runSim((N * 10 + self.LATENCY * 4) * CLK_PERIOD)
+
+        self.assert_r_data(words)
+        # the stride has to be confirmed first, the reads are not prefetched
+        self.assertGreaterEqual(min(latencies[:3]), latencies[0] - 1)
+        self.assertLess(sum(latencies), N * latencies[0] // 3)
+
+
+AxiReadPrefetcherTCs = [
+    AxiReadPrefetcherTC,
+    AxiReadPrefetcher_noNextLineTC,
+]
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiReadPrefetcherTC('test_sequential'))
+    for tc in AxiReadPrefetcherTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -1,10 +1,12 @@
 from collections import deque
+from typing import Optional
 
 from hwt.hdl.types.bits import Bits
 from hwt.hdl.value import HValue
 from hwtLib.abstract.sim_ram import SimRam
 from hwtLib.amba.constants import RESP_OKAY
 from hwtLib.amba.datapump.sim_ram import AxiDpSimRam
+from hwtLib.amba.datapump.sim_ram_timing import AxiSimRamTimingModel
 from pyMathBitPrecise.bit_utils import mask, set_bit_range, get_bit, \
     get_bit_range
 
@@ -15,7 +17,8 @@ class AxiSimRam(AxiDpSimRam):
     """
 
     def __init__(self, axi=None, axiAR=None, axiR=None, axiAW=None,
-                 axiW=None, axiB=None, parent=None, allow_unaligned_addr=False):
+                 axiW=None, axiB=None, parent=None, allow_unaligned_addr=False,
+                 paged=False, timing: Optional[AxiSimRamTimingModel]=None):
         """
         :param clk: clk which should this memory use in simulation
         :param axi: axi (Axi3/4 master) interface to listen on
@@ -26,6 +29,10 @@ class AxiSimRam(AxiDpSimRam):
             with same memory as parent one
         :attention: memories are commiting into memory in "data" property
             after transaction is complete
+        :param paged: use :class:`hwtLib.abstract.sim_ram.SimRamPagedStorage`
+            for memory data
+        :param timing: optional timing model (latency, bandwidth, ...),
+            if None the requests are resolved immediately
         """
         if axi is not None:
             assert axiAR is None
@@ -72,7 +79,7 @@ class AxiSimRam(AxiDpSimRam):
         else:
             self.HAS_W_ID = False
         self.allow_unaligned_addr = allow_unaligned_addr
-        SimRam.__init__(self, DW // 8, parent=parent)
+        SimRam.__init__(self, DW // 8, parent=parent, paged=paged)
 
         self.allMask = mask(self.cellSize)
         self.word_t = Bits(self.cellSize * 8)
@@ -80,6 +87,7 @@ class AxiSimRam(AxiDpSimRam):
         self.rPending = deque()
         self.wPending = deque()
         self.clk = clk
+        self.timing = timing
         self._registerOnClock()
 
     def parseReq(self, req):
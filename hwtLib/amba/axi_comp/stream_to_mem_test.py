@@ -33,13 +33,13 @@ class Axi4_streamToMemTC(SimTestCase):
         self.assertEmpty(u.axi.aw._ag.data)
         self.assertEmpty(u.axi.w._ag.data)
 
-    def test_simpleTransfer(self):
+    def test_simpleTransfer(self, paged=False):
         u = self.u
         regs = self.regs
         N = 33
 
         sampleData = [self._rand.getrandbits(self.DATA_WIDTH) for _ in range(N)]
-        m = AxiSimRam(u.axi)
+        m = AxiSimRam(u.axi, paged=paged)
         blockPtr = m.malloc(self.DATA_WIDTH // 8 * N)
 
         u.dataIn._ag.data.extend(sampleData)
@@ -51,6 +51,12 @@ class Axi4_streamToMemTC(SimTestCase):
 
         self.assertValSequenceEqual(m.getArray(blockPtr, self.DATA_WIDTH // 8, N),
                                     sampleData)
+        DW_B = self.DATA_WIDTH // 8
+        self.assertEqual(m.read_bytes(blockPtr, DW_B * N),
+                         b"".join(d.to_bytes(DW_B, "little") for d in sampleData))
+
+    def test_simpleTransfer_paged(self):
+        self.test_simpleTransfer(paged=True)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 from typing import List, Tuple, Union
 
+from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.utils import HdlValue_unpack
 from hwt.interfaces.std import Signal, VectSignal
 from hwt.pyUtils.arrayQuery import iter_with_last
@@ -175,6 +176,7 @@ def _axis_recieve_bytes(ag_data, D_B, use_keep, use_id, offset=0) -> Tuple[int,
     first = True
     current_id = 0
     mask_all = mask(D_B)
+    data_mask_all = mask(D_B * 8)
     while ag_data:
         _d = ag_data.popleft()
         if use_id:
@@ -206,14 +208,18 @@ def _axis_recieve_bytes(ag_data, D_B, use_keep, use_id, offset=0) -> Tuple[int,
                     offset = i
                     break
             assert offset is not None, keep
-        for i in range(D_B):
-            if get_bit(keep, i):
-                d = get_bit_range(data.val, i * 8, 8)
-                if get_bit_range(data.vld_mask, i * 8, 8) != 0xff:
-                    raise AssertionError(
-                        "Data not valid but it should be"
-                        f" based on strb/keep B_i:{i:d}, 0x{keep:x}, 0x{data.vld_mask:x}")
-                data_B.append(d)
+        if keep == mask_all and data.vld_mask == data_mask_all:
+            # whole word at once
+            data_B.extend(data.val.to_bytes(D_B, "little"))
+        else:
+            for i in range(D_B):
+                if get_bit(keep, i):
+                    d = get_bit_range(data.val, i * 8, 8)
+                    if get_bit_range(data.vld_mask, i * 8, 8) != 0xff:
+                        raise AssertionError(
+                            "Data not valid but it should be"
+                            f" based on strb/keep B_i:{i:d}, 0x{keep:x}, 0x{data.vld_mask:x}")
+                    data_B.append(d)
 
         if first:
             offset_mask = mask(offset)
@@ -267,6 +273,37 @@ def _axis_send_bytes(axis: AxiStream, data_B: List[int], withStrb, offset)\
         withStrb=withStrb)
 
 
+def _axis_send_bytes_fast(axis: AxiStream, data_B: bytes, withStrb, offset)\
+        -> List[Tuple[int, int, int]]:
+    """
+    Same as :func:`~._axis_send_bytes` but the words are constructed from
+    the slices of the data (and not from the HValue of the byte array)
+    """
+    DATA_WIDTH = axis.DATA_WIDTH
+    D_B = DATA_WIDTH // 8
+    word_t = Bits(DATA_WIDTH)
+    end = offset + len(data_B)
+    data_B = bytes(offset) + data_B + bytes(-end % D_B)
+    word_cnt = len(data_B) // D_B
+    full_word_vld = mask(DATA_WIDTH)
+    res = []
+    for i in range(word_cnt):
+        start = i * D_B
+        vld_start = max(offset, start) - start
+        vld_end = min(end, start + D_B) - start
+        if vld_start == 0 and vld_end == D_B:
+            vld = full_word_vld
+        else:
+            vld = mask((vld_end - vld_start) * 8) << (vld_start * 8)
+        d = word_t.from_py(int.from_bytes(data_B[start:start + D_B], "little"), vld)
+        last = i == word_cnt - 1
+        if withStrb:
+            res.append((d, mask(vld_end - vld_start) << vld_start, last))
+        else:
+            res.append((d, last))
+    return res
+
+
 def axis_send_bytes(axis: AxiStream, data_B: Union[List[int], bytes], offset=0) -> None:
     """
     :param axis: AxiStream master which is driver from the simulation
@@ -281,9 +318,15 @@ def axis_send_bytes(axis: AxiStream, data_B: Union[List[int], bytes], offset=0)
     if axis.USE_KEEP and axis.USE_STRB:
         raise NotImplementedError()
     withStrb = axis.USE_KEEP | axis.USE_STRB
-    if isinstance(data_B, bytes):
-        data_B = [int(x) for x in data_B]
-    f = _axis_send_bytes(axis, data_B, withStrb, offset)
+    if not data_B:
+        f = _axis_send_bytes(axis, [], withStrb, offset)
+    elif isinstance(data_B, (bytes, bytearray)):
+        f = _axis_send_bytes_fast(axis, data_B, withStrb, offset)
+    elif None in data_B:
+        # the frame contains invalid bytes, use HValue to resolve the mask
+        f = _axis_send_bytes(axis, data_B, withStrb, offset)
+    else:
+        f = _axis_send_bytes_fast(axis, bytes(data_B), withStrb, offset)
     axis._ag.data.extend(f)
 
 
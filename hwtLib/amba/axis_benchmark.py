@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Timing of the conversion of bytes to AxiStream frame beats and back
+(the HValue based path and the fast path of :func:`hwtLib.amba.axis.axis_send_bytes`)
+"""
+
+from collections import deque
+from time import perf_counter
+
+from hwtLib.amba.axis import AxiStream, _axis_send_bytes, \
+    _axis_send_bytes_fast, _axis_recieve_bytes
+
+
+def benchmark_axis_send_bytes(size=9000, DATA_WIDTH=512):
+    axis = AxiStream()
+    axis.DATA_WIDTH = DATA_WIDTH
+    data = bytes(i & 0xff for i in range(size))
+
+    t0 = perf_counter()
+    list(_axis_send_bytes(axis, list(data), True, 0))
+    t_slow = perf_counter() - t0
+
+    t0 = perf_counter()
+    beats_fast = _axis_send_bytes_fast(axis, data, True, 0)
+    t_fast = perf_counter() - t0
+
+    t0 = perf_counter()
+    _axis_recieve_bytes(deque(beats_fast), DATA_WIDTH // 8, True, False)
+    t_recv = perf_counter() - t0
+    return t_slow, t_fast, t_recv
+
+
+if __name__ == "__main__":
+    for size, DW in [(64, 64), (1500, 64), (9000, 512)]:
+        t_slow, t_fast, t_recv = benchmark_axis_send_bytes(size, DW)
+        print(f"axis_send_bytes {size:d}B/{DW:d}b: HValue path {t_slow * 1e3:.2f}ms,"
+              f" fast path {t_fast * 1e3:.2f}ms, recieve {t_recv * 1e3:.2f}ms")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import deque
+import unittest
+
+from hwtLib.amba.axis import AxiStream, _axis_send_bytes, \
+    _axis_send_bytes_fast, _axis_recieve_bytes
+
+
+class AxiS_bytes_TC(unittest.TestCase):
+    """
+    Test of conversion of bytes to AxiStream frame beats and back
+    """
+
+    def _axis(self, DATA_WIDTH):
+        axis = AxiStream()
+        axis.DATA_WIDTH = DATA_WIDTH
+        return axis
+
+    def assertBeatsEqual(self, beats0, beats1):
+        beats0 = list(beats0)
+        beats1 = list(beats1)
+        self.assertEqual(len(beats0), len(beats1))
+        for b0, b1 in zip(beats0, beats1):
+            d0, d1 = b0[0], b1[0]
+            self.assertEqual(d0.vld_mask, d1.vld_mask)
+            self.assertEqual(d0.val & d0.vld_mask, d1.val & d1.vld_mask)
+            self.assertSequenceEqual(b0[1:], b1[1:])
+
+    def test_send_fast_path_same_as_HValue_path(self):
+        for DW in (8, 32, 64):
+            axis = self._axis(DW)
+            for withStrb in (False, True):
+                for offset in range(DW // 8):
+                    for size in range(1, 3 * DW // 8 + 2):
+                        data = [(i + 1) & 0xff for i in range(size)]
+                        self.assertBeatsEqual(
+                            _axis_send_bytes_fast(axis, bytes(data), withStrb, offset),
+                            _axis_send_bytes(axis, data, withStrb, offset))
+
+    def test_send_recieve(self):
+        axis = self._axis(64)
+        for offset in range(8):
+            for size in range(1, 30):
+                data = bytes(range(size))
+                beats = deque(_axis_send_bytes_fast(axis, data, True, offset))
+                _offset, data_B = _axis_recieve_bytes(beats, 8, True, False)
+                self.assertEqual(_offset, offset)
+                self.assertEqual(bytes(data_B), data)
+                self.assertEqual(len(beats), 0)
+
+    def test_jumbo_frame(self, size=9000, DATA_WIDTH=512):
+        # :see: hwtLib.amba.axis_benchmark for the timing of the paths
+        axis = self._axis(DATA_WIDTH)
+        data = bytes(i & 0xff for i in range(size))
+        beats_slow = list(_axis_send_bytes(axis, list(data), True, 0))
+        beats_fast = _axis_send_bytes_fast(axis, data, True, 0)
+        _, data_B = _axis_recieve_bytes(deque(beats_fast), DATA_WIDTH // 8, True, False)
+
+        self.assertBeatsEqual(beats_fast, beats_slow)
+        self.assertEqual(bytes(data_B), data)
+
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiS_bytes_TC('test_jumbo_frame'))
+    suite.addTest(unittest.makeSuite(AxiS_bytes_TC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -30,6 +30,12 @@ class AxiDatapumpBase(Unit):
     :ivar ~.MAX_CHUNKS: maximum number of chunks in a transaction
     :ivar ~.ALIGNAS: specifies alignment requirement for a data type t (in bits),
         same functionailty as C++11 alignas specifier, used to discard alignment logic
+    :ivar ~.ID_POOL_SIZE: if non zero the AXI transactions are split to sub-bursts
+        which do not cross the SUB_BURST_LEN aligned blocks (and thus 4KiB pages)
+        and which are spread over ID_POOL_SIZE IDs so the slave can serve them in parallel,
+        the data is returned in original order from a reorder buffer
+        (:class:`hwtLib.amba.datapump.burst_split.AxiBurstSplitReorderBase`)
+    :ivar ~.SUB_BURST_LEN: max number of beats of sub-burst if ID_POOL_SIZE is used
     :ivar ~.driver: interface which is used to drive this datapump
         (AxiRDatapumpIntf or AxiWDatapumpIntf)
     """
@@ -56,6 +62,8 @@ class AxiDatapumpBase(Unit):
         self.QOS_VAL = Param(QOS_DEFAULT)
         self.USE_STRB = Param(True)
         self.AXI_CLS = Param(self._axiCls)
+        self.ID_POOL_SIZE = Param(0)
+        self.SUB_BURST_LEN = Param(16)
 
     def _declr(self):
         addClkRstn(self)
@@ -70,6 +78,30 @@ class AxiDatapumpBase(Unit):
             # address channel to axi
             self.axi = self._axiCls()._m()
 
+    def _declr_burst_split(self, burstSplitCls):
+        """
+        Instantiate the burst splitter with reorder buffer if required
+        (the datapump logic is then connected to its "s" interface instead of "axi")
+        """
+        if self.ID_POOL_SIZE:
+            assert issubclass(self._axiCls, (Axi3, Axi4)), (
+                "ID_POOL_SIZE requires AXI with bursts and ids", self._axiCls)
+            with self._paramsShared():
+                self.burstSplit = burstSplitCls(self._axiCls)
+
+    def getAxi(self):
+        """
+        :return: the AXI interface which should be driven by the datapump logic
+        """
+        if self.ID_POOL_SIZE:
+            return self.burstSplit.s
+        else:
+            return self.axi
+
+    def connectBurstSplit(self):
+        if self.ID_POOL_SIZE:
+            self.axi(self.burstSplit.m)
+
     def getSizeAlignBits(self):
         return log2ceil(self.DATA_WIDTH // 8)
 
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Union
+
+from hwt.code import If, Concat, Switch
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
+from hwt.interfaces.std import Handshaked
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil, isPow2
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.vectorUtils import fitTo
+from hwtLib.abstract.busBridge import BusBridge
+from hwtLib.amba.axi3 import Axi3, Axi3_addr
+from hwtLib.amba.axi4 import Axi4, Axi4_addr
+from hwtLib.amba.constants import RESP_OKAY
+from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.handshaked.streamNode import StreamNode
+from hwtLib.logic.binToOneHot import binToOneHot
+
+
+class AxiBurstSplitReorderBase(BusBridge):
+    """
+    Split the AXI transactions from "s" to sub-bursts which do not cross
+    the SUB_BURST_LEN aligned blocks (and thus the PAGE_SIZE boundary)
+    and spread them over a pool of IDs on "m" so the slave can process them in parallel.
+    The responses are returned on "s" in the original order and with the original id.
+
+    :ivar ~.ID_POOL_SIZE: number of IDs used on "m" interface,
+        each ID has own slot in reorder buffer and may have only a single sub-burst in flight
+    :ivar ~.SUB_BURST_LEN: max number of beats in a single sub-burst
+    :ivar ~.PAGE_SIZE: size of the address page which must not be crossed
+        by any transaction (4KiB for AXI)
+
+    :note: the slots are allocated in round-robin order and the slot is released once
+        its response was passed to "s", the oldest slot is simply pointed by a rd_ptr
+    :note: the transactions are accepted on "s" one by one,
+        the first sub-burst is dispatched in the next clock cycle
+    """
+
+    def __init__(self, intfCls=Axi4):
+        self.intfCls = intfCls
+        super(AxiBurstSplitReorderBase, self).__init__()
+
+    def _config(self):
+        self.INTF_CLS = Param(self.intfCls)
+        self.intfCls._config(self)
+        self.ID_POOL_SIZE = Param(4)
+        self.SUB_BURST_LEN = Param(16)
+        self.PAGE_SIZE = Param(4096)
+
+    def _declr(self):
+        addClkRstn(self)
+        assert issubclass(self.intfCls, (Axi3, Axi4)), (
+            "Requires AXI with bursts and ids", self.intfCls)
+        assert self.ID_POOL_SIZE > 1 and isPow2(self.ID_POOL_SIZE), self.ID_POOL_SIZE
+        assert self.ID_POOL_SIZE <= 2 ** self.ID_WIDTH, (
+            "The pool of IDs does not fit in to id signal", self.ID_POOL_SIZE, self.ID_WIDTH)
+        assert self.SUB_BURST_LEN > 1 and isPow2(self.SUB_BURST_LEN), self.SUB_BURST_LEN
+        assert self.SUB_BURST_LEN <= 2 ** self.intfCls.LEN_WIDTH, self.SUB_BURST_LEN
+        assert isPow2(self.PAGE_SIZE), self.PAGE_SIZE
+        # the aligned block of SUB_BURST_LEN beats never crosses the page boundary
+        assert self.SUB_BURST_LEN * self.DATA_WIDTH // 8 <= self.PAGE_SIZE, (
+            self.SUB_BURST_LEN, self.DATA_WIDTH, self.PAGE_SIZE)
+
+        with self._paramsShared():
+            self.s = self.intfCls()
+            self.m = self.intfCls()._m()
+
+        self.SLOT_W = log2ceil(self.ID_POOL_SIZE)
+        self.SUB_LEN_W = log2ceil(self.SUB_BURST_LEN)
+
+    def _slot_mux(self, name: str, sel: RtlSignal, items: List[RtlSignal]):
+        """
+        :return: signal with the value of items[sel]
+        """
+        res = self._sig(name, items[0]._dtype)
+        Switch(sel).add_cases(
+            (i, res(item))
+            for i, item in enumerate(items)
+        )
+        return res
+
+    def _slot_of_id(self, _id: RtlSignal):
+        if self.ID_WIDTH == self.SLOT_W:
+            return _id
+        else:
+            return _id[self.SLOT_W:]
+
+    def addr_split(self, a_in: Union[Axi3_addr, Axi4_addr],
+                   a_out: Union[Axi3_addr, Axi4_addr],
+                   slot_busy: RtlSignal, alloc_ptr: RtlSignal,
+                   out_en: RtlSignal):
+        """
+        Split the transactions from a_in to a sub-bursts on a_out,
+        each sub-burst uses the id of the slot on alloc_ptr
+
+        :param out_en: extra enable for a_out channel
+        :return: tuple (alloc flag, a_out enable without a_out.ready, length of the sub-burst - 1,
+            flag which tells that this is the last sub-burst of the transaction, original id)
+        """
+        r, s = self._reg, self._sig
+        SUB_LEN_W = self.SUB_LEN_W
+        WORD_BITS = log2ceil(self.DATA_WIDTH // 8)
+        BLOCK_BITS = WORD_BITS + SUB_LEN_W
+
+        pending = r("pending", def_val=0)
+        addr = r("addr", a_in.addr._dtype)
+        rem = r("rem_len", a_in.len._dtype)
+        orig_id = r("orig_id", a_in.id._dtype)
+        # the rest of the signals is just copied from original transaction
+        other = [(i, r(f"{i._name:s}_tmp", i._dtype))
+                 for i in a_in._interfaces
+                 if i not in (a_in.valid, a_in.ready, a_in.addr, a_in.len, a_in.id)]
+
+        # number of beats to the end of aligned block - 1
+        block_len = s("block_len", Bits(SUB_LEN_W))
+        block_len(~addr[BLOCK_BITS:WORD_BITS])
+        is_last_part = s("is_last_part")
+        is_last_part(rem <= fitTo(block_len, rem))
+        part_len = s("part_len", Bits(SUB_LEN_W))
+        If(is_last_part,
+           part_len(rem[SUB_LEN_W:]),
+        ).Else(
+           part_len(block_len),
+        )
+
+        a_in.ready(~pending)
+        a_out.addr(addr)
+        a_out.len(fitTo(part_len, a_out.len))
+        a_out.id(fitTo(alloc_ptr, a_out.id))
+        for i, tmp in other:
+            getattr(a_out, i._name)(tmp)
+
+        en = s("addr_split_en")
+        en(pending & ~slot_busy[alloc_ptr] & out_en)
+        a_out.valid(en)
+        alloc = s("alloc")
+        alloc(en & a_out.ready)
+
+        If(~pending,
+            If(a_in.valid,
+                pending(1),
+                addr(a_in.addr),
+                rem(a_in.len),
+                orig_id(a_in.id),
+                *(tmp(i) for i, tmp in other),
+            )
+        ).Elif(alloc,
+            If(is_last_part,
+                pending(0),
+            ).Else(
+                # continue on the beginning of the next block
+                addr(Concat(addr[:BLOCK_BITS] + 1, Bits(BLOCK_BITS).from_py(0))),
+                rem(rem - (fitTo(part_len, rem) + 1)),
+            ),
+        )
+        If(alloc,
+           alloc_ptr(alloc_ptr + 1)
+        )
+
+        return alloc, en, part_len, is_last_part, orig_id
+
+    def resp_handler(self, rd_ptr: RtlSignal, slot_busy: RtlSignal,
+                     slot_len: RtlSignal, slot_last_part: RtlSignal, slot_id: RtlSignal) -> RtlSignal:
+        """
+        Collect the responses from "m" and pass them to "s" in original order
+
+        :param slot_len: array of lengths of sub-bursts for each slot
+        :param slot_last_part: array of flags which tells that the slot is the last sub-burst
+            of the original transaction
+        :param slot_id: array of the original ids for each slot
+        :return: one-hot encoded vector of the slots which are released in this clock cycle
+        """
+        raise NotImplementedError("Implement in implementation class", self)
+
+    def addr_out_en(self) -> RtlSignal:
+        """
+        :return: extra enable for the address channel on "m"
+        """
+        raise NotImplementedError("Implement in implementation class", self)
+
+    def _impl(self):
+        POOL = self.ID_POOL_SIZE
+        SLOT_W = self.SLOT_W
+        r, s = self._reg, self._sig
+
+        slot_busy = r("slot_busy", Bits(POOL), 0)
+        alloc_ptr = r("alloc_ptr", Bits(SLOT_W), 0)
+        rd_ptr = r("rd_ptr", Bits(SLOT_W), 0)
+
+        a_in, a_out = self.get_addr_channels()
+        alloc, en, part_len, is_last_part, orig_id = self.addr_split(
+            a_in, a_out, slot_busy, alloc_ptr, self.addr_out_en())
+
+        # the information about each sub-burst is stored until its response is passed to "s"
+        slot_len = s("slot_len", part_len._dtype[POOL])
+        slot_last_part = s("slot_last_part", BIT[POOL])
+        slot_id = s("slot_id", orig_id._dtype[POOL])
+        If(self.clk._onRisingEdge(),
+            If(alloc,
+               slot_len[alloc_ptr](part_len),
+               slot_last_part[alloc_ptr](is_last_part),
+               slot_id[alloc_ptr](orig_id),
+            )
+        )
+
+        release = self.resp_handler(rd_ptr, slot_busy, slot_len, slot_last_part, slot_id)
+        slot_busy((slot_busy | binToOneHot(alloc_ptr, en=alloc)) & ~release)
+        propagateClkRstn(self)
+
+
+@serializeParamsUniq
+class Axi_rBurstSplitReorder(AxiBurstSplitReorderBase):
+    """
+    :class:`~.AxiBurstSplitReorderBase` for read channels,
+    the read data of each slot is stored in reorder buffer and passed to "s"
+    in the order of original transactions
+
+    .. hwt-autodoc:: _example_Axi_rBurstSplitReorder
+    """
+
+    def _declr(self):
+        super(Axi_rBurstSplitReorder, self)._declr()
+        self.s.HAS_W = False
+        self.m.HAS_W = False
+
+    def get_addr_channels(self):
+        return self.s.ar, self.m.ar
+
+    def addr_out_en(self):
+        # the reorder buffer has space for whole sub-burst reserved
+        return 1
+
+    def resp_handler(self, rd_ptr: RtlSignal, slot_busy: RtlSignal,
+                     slot_len: RtlSignal, slot_last_part: RtlSignal, slot_id: RtlSignal):
+        r, s = self._reg, self._sig
+        POOL = self.ID_POOL_SIZE
+        SUB_LEN_W = self.SUB_LEN_W
+        r_in = self.m.r
+        r_out = self.s.r
+        DW = self.DATA_WIDTH
+        RESP_W = r_in.resp._dtype.bit_length()
+        cnt_t = Bits(SUB_LEN_W + 1)
+
+        # number of beats received for each slot
+        wr_cnt = [r(f"slot_{i:d}_wr_cnt", cnt_t, 0) for i in range(POOL)]
+        rob = s("reorder_buff", Bits(RESP_W + DW)[POOL * self.SUB_BURST_LEN])
+
+        # store the incoming data, the data may be interleaved between ids
+        r_in.ready(1)
+        wr_slot = self._slot_of_id(r_in.id)
+        wr_slot_cnt = self._slot_mux("wr_slot_cnt", wr_slot, wr_cnt)
+        If(self.clk._onRisingEdge(),
+            If(r_in.valid,
+               rob[Concat(wr_slot, wr_slot_cnt[SUB_LEN_W:])](Concat(r_in.resp, r_in.data))
+            )
+        )
+
+        # read the data of the oldest slot
+        rd_cnt = r("rd_cnt", cnt_t, 0)
+        rd_slot_len = slot_len[rd_ptr]
+        part_end = rename_signal(self, rd_cnt._eq(fitTo(rd_slot_len, rd_cnt)), "part_end")
+        rd_slot_wr_cnt = self._slot_mux("rd_slot_wr_cnt", rd_ptr, wr_cnt)
+        r_out.valid(slot_busy[rd_ptr] & (rd_slot_wr_cnt > rd_cnt))
+        d = rob[Concat(rd_ptr, rd_cnt[SUB_LEN_W:])]
+        r_out.data(d[DW:])
+        r_out.resp(d[DW + RESP_W:DW])
+        r_out.id(slot_id[rd_ptr])
+        r_out.last(part_end & slot_last_part[rd_ptr])
+
+        r_ack = r_out.valid & r_out.ready
+        If(r_ack,
+            If(part_end,
+               rd_cnt(0),
+               rd_ptr(rd_ptr + 1),
+            ).Else(
+               rd_cnt(rd_cnt + 1),
+            )
+        )
+        release = rename_signal(self, binToOneHot(rd_ptr, en=r_ack & part_end), "release")
+
+        for i, c in enumerate(wr_cnt):
+            If(r_in.valid & wr_slot._eq(i),
+               c(c + 1)
+            ).Elif(release[i],
+               c(0)
+            )
+
+        return release
+
+
+@serializeParamsUniq
+class Axi_wBurstSplitReorder(AxiBurstSplitReorderBase):
+    """
+    :class:`~.AxiBurstSplitReorderBase` for write channels,
+    the w.last is generated for each sub-burst, the write responses of all sub-bursts
+    of the original transaction are merged in to a single one (the worst resp is used)
+
+    .. hwt-autodoc:: _example_Axi_wBurstSplitReorder
+    """
+
+    def _declr(self):
+        super(Axi_wBurstSplitReorder, self)._declr()
+        self.s.HAS_R = False
+        self.m.HAS_R = False
+        # len and slot of each dispatched sub-burst for w channel
+        f = self.wInfoFifo = HandshakedFifo(Handshaked)
+        f.DATA_WIDTH = self.SUB_LEN_W + self.SLOT_W
+        f.DEPTH = self.ID_POOL_SIZE
+
+    def get_addr_channels(self):
+        return self.s.aw, self.m.aw
+
+    def addr_out_en(self):
+        return self.wInfoFifo.dataIn.rd
+
+    def addr_split(self, a_in, a_out, slot_busy, alloc_ptr, out_en):
+        res = super(Axi_wBurstSplitReorder, self).addr_split(
+            a_in, a_out, slot_busy, alloc_ptr, out_en)
+        _, en, part_len, _, _ = res
+        w_info = self.wInfoFifo.dataIn
+        w_info.data(Concat(alloc_ptr, part_len))
+        w_info.vld(en & a_out.ready)
+        return res
+
+    def w_handler(self):
+        SUB_LEN_W = self.SUB_LEN_W
+        w_in = self.s.w
+        w_out = self.m.w
+        w_info = self.wInfoFifo.dataOut
+
+        w_cnt = self._reg("w_cnt", Bits(SUB_LEN_W), 0)
+        last = rename_signal(self, w_cnt._eq(w_info.data[SUB_LEN_W:]), "w_last")
+        excl = {w_in.valid, w_in.ready, w_in.last}
+        if hasattr(w_in, "id"):
+            excl.add(w_in.id)
+            w_out.id(fitTo(w_info.data[:SUB_LEN_W], w_out.id))
+        w_out(w_in, exclude=excl)
+        w_out.last(last)
+
+        StreamNode(
+            [w_in, w_info],
+            [w_out],
+            extraConds={w_info: last}
+        ).sync()
+        If(StreamNode([w_in, w_info], [w_out]).ack(),
+            If(last,
+               w_cnt(0)
+            ).Else(
+               w_cnt(w_cnt + 1)
+            )
+        )
+
+    def resp_handler(self, rd_ptr: RtlSignal, slot_busy: RtlSignal,
+                     slot_len: RtlSignal, slot_last_part: RtlSignal, slot_id: RtlSignal):
+        self.w_handler()
+        r, s = self._reg, self._sig
+        POOL = self.ID_POOL_SIZE
+        b_in = self.m.b
+        b_out = self.s.b
+        resp_t = b_in.resp._dtype
+
+        b_in.ready(1)
+        b_slot = self._slot_of_id(b_in.id)
+        slot_done = r("slot_done", Bits(POOL), 0)
+        slot_resp = s("slot_resp", resp_t[POOL])
+        If(self.clk._onRisingEdge(),
+            If(b_in.valid,
+               slot_resp[b_slot](b_in.resp)
+            )
+        )
+
+        # the worst resp from previous sub-bursts of current transaction
+        resp_acc = r("resp_acc", resp_t, RESP_OKAY)
+        cur_resp = slot_resp[rd_ptr]
+        resp = rename_signal(self, (cur_resp > resp_acc)._ternary(cur_resp, resp_acc), "resp")
+        done = slot_busy[rd_ptr] & slot_done[rd_ptr]
+        is_last_part = slot_last_part[rd_ptr]
+
+        b_out.valid(done & is_last_part)
+        b_out.resp(resp)
+        b_out.id(slot_id[rd_ptr])
+
+        # the slots with non-last sub-bursts are released without response on "s"
+        consume = rename_signal(self, done & (~is_last_part | b_out.ready), "consume")
+        If(consume,
+            rd_ptr(rd_ptr + 1),
+            If(is_last_part,
+               resp_acc(RESP_OKAY),
+            ).Else(
+               resp_acc(resp),
+            )
+        )
+        release = rename_signal(self, binToOneHot(rd_ptr, en=consume), "release")
+        slot_done((slot_done | binToOneHot(b_slot, en=b_in.valid)) & ~release)
+
+        return release
+
+
+def _example_Axi_rBurstSplitReorder():
+    u = Axi_rBurstSplitReorder()
+    u.ID_WIDTH = 2
+    return u
+
+
+def _example_Axi_wBurstSplitReorder():
+    u = Axi_wBurstSplitReorder()
+    u.ID_WIDTH = 2
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_Axi_rBurstSplitReorder()
+    print(to_rtl_str(u))
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axi3 import Axi3
+from hwtLib.amba.axi4 import Axi4
+from hwtLib.amba.axi_comp.sim.ram import AxiSimRam
+from hwtLib.amba.constants import RESP_OKAY
+from hwtLib.amba.datapump.burst_split import Axi_rBurstSplitReorder, \
+    Axi_wBurstSplitReorder
+from hwtLib.amba.datapump.r import Axi_rDatapump
+from hwtLib.amba.datapump.w import Axi_wDatapump
+from hwtLib.amba.datapump.sim_ram_timing import AxiSimRamTimingModel
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+from pyMathBitPrecise.bit_utils import mask
+
+
+class Axi_rBurstSplitReorderTC(SimTestCase):
+    DATA_WIDTH = 64
+    ID_POOL_SIZE = 4
+    SUB_BURST_LEN = 16
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = Axi_rBurstSplitReorder(Axi4)
+        u.DATA_WIDTH = cls.DATA_WIDTH
+        u.ID_WIDTH = 3
+        u.ID_POOL_SIZE = cls.ID_POOL_SIZE
+        u.SUB_BURST_LEN = cls.SUB_BURST_LEN
+        cls.compileSim(u)
+
+    def _mk_mem(self, **timing_kwargs):
+        timing = AxiSimRamTimingModel(**timing_kwargs)
+        self.m = AxiSimRam(axi=self.u.m, timing=timing)
+        return timing
+
+    def _test_read(self, trans, timing_kwargs={}, clk_cnt=None):
+        """
+        :param trans: list of tuples (id, address, number of words)
+        :return: report of the timing model of the memory
+        """
+        u = self.u
+        timing = self._mk_mem(**timing_kwargs)
+        DW_B = self.DATA_WIDTH // 8
+        ar = u.s.ar._ag
+        r_ref = []
+        for _id, addr, size in trans:
+            data = [addr + i for i in range(size)]
+            self.m.data.update({addr // DW_B + i: d for i, d in enumerate(data)})
+            ar.data.append(ar.create_addr_req(addr, size - 1, _id=_id))
+            r_ref.extend((_id, d, RESP_OKAY, int(i == size - 1))
+                         for i, d in enumerate(data))
+
+        if clk_cnt is None:
+            clk_cnt = sum(t[2] for t in trans) * 4 + 100
+        self.runSim(clk_cnt * CLK_PERIOD)
+        self.assertValSequenceEqual(u.s.r._ag.data, r_ref)
+        return timing.report()
+
+    def sub_burst_cnt(self, addr: int, size: int):
+        SUB_BURST_LEN = self.SUB_BURST_LEN
+        offset = addr // (self.DATA_WIDTH // 8) % SUB_BURST_LEN
+        return (offset + size + SUB_BURST_LEN - 1) // SUB_BURST_LEN
+
+    def test_nop(self):
+        self._mk_mem()
+        self.runSim(20 * CLK_PERIOD)
+        self.assertEmpty(self.u.m.ar._ag.data)
+        self.assertEmpty(self.u.s.r._ag.data)
+
+    def test_single_word(self):
+        rep = self._test_read([(1, 0x100, 1)])
+        self.assertEqual(rep["read_cnt"], 1)
+
+    def test_split_aligned(self):
+        rep = self._test_read([(2, 0x1000, 4 * self.SUB_BURST_LEN)])
+        self.assertEqual(rep["read_cnt"], 4)
+
+    def test_page_crossing_data(self):
+        DW_B = self.DATA_WIDTH // 8
+        trans = [(0, 0x1000 - 3 * DW_B, self.SUB_BURST_LEN + 6),
+                 (5, 0x3000 - 5 * DW_B, 3 * self.SUB_BURST_LEN)]
+        rep = self._test_read(trans)
+        self.assertEqual(rep["read_cnt"], sum(self.sub_burst_cnt(a, size) for _, a, size in trans))
+
+    def test_page_crossing(self):
+        u = self.u
+        DW_B = self.DATA_WIDTH // 8
+        ar = u.s.ar._ag
+        # starts 3 words before the end of the page and ends 3 words after the end of next block
+        ar.data.append(ar.create_addr_req(0x1000 - 3 * DW_B, self.SUB_BURST_LEN + 6 - 1, _id=5))
+        # there is no memory, the slots are never released, but there are just enough of them
+        ar.data.append(ar.create_addr_req(0x2000, 0, _id=6))
+        self.runSim(40 * CLK_PERIOD)
+
+        self.assertEqual(len(ar.data), 0)
+        ref = [
+            # id, addr, len
+            (0, 0x1000 - 3 * DW_B, 2),
+            (1, 0x1000, self.SUB_BURST_LEN - 1),
+            (2, 0x1000 + self.SUB_BURST_LEN * DW_B, 2),
+            (3, 0x2000, 0),
+        ]
+        self.assertValSequenceEqual(
+            [(int(a[0]), int(a[1]), int(a[4])) for a in u.m.ar._ag.data],
+            ref)
+
+    def test_reordered_by_slave(self):
+        # the slave completes the sub-bursts with a random latency and out of order
+        trans = [(i % 8, 0x2000 + i * 0x300, 1 + (i * 7) % 40) for i in range(12)]
+        rep = self._test_read(trans, {
+            "read_latency": 10,
+            "read_latency_jitter": 30,
+            "allow_reordering": True,
+            "seed": 3,
+        })
+        self.assertEqual(rep["read_cnt"], sum(self.sub_burst_cnt(a, size) for _, a, size in trans))
+
+    def test_randomized(self):
+        self.randomize(self.u.s.ar)
+        self.randomize(self.u.s.r)
+        trans = [(i % 8, 0x4000 - 0x20 + i * 0x200, 1 + (i * 5) % 33) for i in range(10)]
+        self._test_read(trans, {
+            "read_latency": 4,
+            "read_latency_jitter": 8,
+            "allow_reordering": True,
+        }, clk_cnt=2000)
+
+
+class Axi_wBurstSplitReorderTC(Axi_rBurstSplitReorderTC):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = Axi_wBurstSplitReorder(Axi4)
+        u.DATA_WIDTH = cls.DATA_WIDTH
+        u.ID_WIDTH = 3
+        u.ID_POOL_SIZE = cls.ID_POOL_SIZE
+        u.SUB_BURST_LEN = cls.SUB_BURST_LEN
+        cls.compileSim(u)
+
+    def _test_write(self, trans, timing_kwargs={}, clk_cnt=None):
+        """
+        :param trans: list of tuples (id, address, number of words)
+        :return: report of the timing model of the memory
+        """
+        u = self.u
+        timing = self._mk_mem(**timing_kwargs)
+        DW_B = self.DATA_WIDTH // 8
+        aw = u.s.aw._ag
+        b_ref = []
+        for _id, addr, size in trans:
+            aw.data.append(aw.create_addr_req(addr, size - 1, _id=_id))
+            u.s.w._ag.data.extend((addr + i, mask(DW_B), int(i == size - 1))
+                                  for i in range(size))
+            b_ref.append((_id, RESP_OKAY))
+
+        if clk_cnt is None:
+            clk_cnt = sum(t[2] for t in trans) * 4 + 100
+        self.runSim(clk_cnt * CLK_PERIOD)
+        self.assertValSequenceEqual(u.s.b._ag.data, b_ref)
+        for _, addr, size in trans:
+            self.assertValSequenceEqual(
+                self.m.getArray(addr, DW_B, size),
+                [addr + i for i in range(size)])
+        return timing.report()
+
+    def test_nop(self):
+        self._mk_mem()
+        self.runSim(20 * CLK_PERIOD)
+        self.assertEmpty(self.u.m.aw._ag.data)
+        self.assertEmpty(self.u.m.w._ag.data)
+        self.assertEmpty(self.u.s.b._ag.data)
+
+    def test_single_word(self):
+        rep = self._test_write([(1, 0x100, 1)])
+        self.assertEqual(rep["write_cnt"], 1)
+
+    def test_split_aligned(self):
+        rep = self._test_write([(2, 0x1000, 4 * self.SUB_BURST_LEN)])
+        self.assertEqual(rep["write_cnt"], 4)
+
+    def test_page_crossing_data(self):
+        DW_B = self.DATA_WIDTH // 8
+        trans = [(0, 0x1000 - 3 * DW_B, self.SUB_BURST_LEN + 6),
+                 (5, 0x3000 - 5 * DW_B, 3 * self.SUB_BURST_LEN)]
+        rep = self._test_write(trans)
+        self.assertEqual(rep["write_cnt"], sum(self.sub_burst_cnt(a, size) for _, a, size in trans))
+
+    def test_page_crossing(self):
+        u = self.u
+        DW_B = self.DATA_WIDTH // 8
+        aw = u.s.aw._ag
+        aw.data.append(aw.create_addr_req(0x1000 - 3 * DW_B, self.SUB_BURST_LEN + 6 - 1, _id=5))
+        aw.data.append(aw.create_addr_req(0x2000, 0, _id=6))
+        u.s.w._ag.data.extend((i, mask(DW_B), int(i == self.SUB_BURST_LEN + 5))
+                              for i in range(self.SUB_BURST_LEN + 6))
+        u.s.w._ag.data.append((0, mask(DW_B), 1))
+        self.runSim(60 * CLK_PERIOD)
+
+        self.assertEqual(len(aw.data), 0)
+        ref = [
+            # id, addr, len
+            (0, 0x1000 - 3 * DW_B, 2),
+            (1, 0x1000, self.SUB_BURST_LEN - 1),
+            (2, 0x1000 + self.SUB_BURST_LEN * DW_B, 2),
+            (3, 0x2000, 0),
+        ]
+        self.assertValSequenceEqual(
+            [(int(a[0]), int(a[1]), int(a[4])) for a in u.m.aw._ag.data],
+            ref)
+        # w.last is generated for each sub-burst
+        self.assertSequenceEqual(
+            [i for i, w in enumerate(u.m.w._ag.data) if int(w[-1])],
+            [2, 2 + self.SUB_BURST_LEN, 5 + self.SUB_BURST_LEN, 6 + self.SUB_BURST_LEN])
+
+    def test_reordered_by_slave(self):
+        trans = [(i % 8, 0x2000 + i * 0x300, 1 + (i * 7) % 40) for i in range(12)]
+        rep = self._test_write(trans, {
+            "write_latency": 10,
+            "write_latency_jitter": 30,
+            "seed": 3,
+        })
+        self.assertEqual(rep["write_cnt"], sum(self.sub_burst_cnt(a, size) for _, a, size in trans))
+
+    def test_randomized(self):
+        self.randomize(self.u.s.aw)
+        self.randomize(self.u.s.w)
+        self.randomize(self.u.s.b)
+        trans = [(i % 8, 0x4000 - 0x20 + i * 0x200, 1 + (i * 5) % 33) for i in range(10)]
+        self._test_write(trans, {
+            "write_latency": 4,
+            "write_latency_jitter": 8,
+        }, clk_cnt=2000)
+
+
+class Axi_rDatapump_IdPoolTC(SimTestCase):
+    """
+    :class:`~.Axi_rDatapump` with ID_POOL_SIZE reading from a memory with high latency
+    which allows only a single transaction in flight for each ID
+
+    :note: AXI3 is used because the requests are split to short bursts (16 beats)
+        even without ID_POOL_SIZE, which makes the latency of memory visible
+    """
+    ID_POOL_SIZE = 8
+    DATA_WIDTH = 64
+    TIMING = {
+        "read_latency": 48,
+        "max_outstanding_reads": 1,
+        "allow_reordering": True,
+        "write_latency": 48,
+        "max_outstanding_writes": 1,
+        "bytes_per_clk": DATA_WIDTH // 8,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = Axi_rDatapump(axiCls=Axi3)
+        cls._configure(u)
+        cls.compileSim(u)
+
+    @classmethod
+    def _configure(cls, u):
+        u.DATA_WIDTH = cls.DATA_WIDTH
+        u.CHUNK_WIDTH = cls.DATA_WIDTH
+        u.ALIGNAS = cls.DATA_WIDTH
+        u.MAX_CHUNKS = 512
+        u.ID_POOL_SIZE = cls.ID_POOL_SIZE
+
+    def setUp(self):
+        SimTestCase.setUp(self)
+        self.timing = AxiSimRamTimingModel(**self.TIMING)
+        self.m = AxiSimRam(axi=self.u.axi, timing=self.timing)
+
+    def _trans(self, N=8, size=96):
+        """
+        :return: list of tuples (address, number of words), every transaction crosses a 4KiB page
+        """
+        return [(0x1000 * (i + 1) - 0x40 * (i + 1), size) for i in range(N)]
+
+    def _run_until_done(self, data, expected_len, clk_cnt):
+        """
+        Run the simulation and collect the number of clock cycles
+        until the data has expected_len items
+
+        :return: the number of clock cycles
+        """
+        done_clk = []
+
+        def monitor():
+            clk = 0
+            while not done_clk:
+                yield Timer(CLK_PERIOD)
+                clk += 1
+                if len(data) == expected_len:
+                    done_clk.append(clk)
+
+        self.procs.append(monitor())
+        self.runSim(clk_cnt * CLK_PERIOD)
+        self.assertEqual(len(data), expected_len)
+        return done_clk[0]
+
+    def _test_read(self, N=8, size=96):
+        """
+        :return: bandwidth in words per clock cycle
+        """
+        u = self.u
+        DW_B = self.DATA_WIDTH // 8
+        trans = self._trans(N, size)
+        r_ref = []
+        for addr, size in trans:
+            data = [addr + i for i in range(size)]
+            self.m.data.update({addr // DW_B + i: d for i, d in enumerate(data)})
+            u.driver.req._ag.data.append((addr, size - 1, 0))
+            r_ref.extend((d, mask(DW_B), int(i == size - 1)) for i, d in enumerate(data))
+
+        clk_cnt = self._run_until_done(u.driver.r._ag.data, len(r_ref), N * size * 4 + 200)
+        self.assertValSequenceEqual(u.driver.r._ag.data, r_ref)
+        # words per clock cycle
+        return len(r_ref) / clk_cnt
+
+    def test_read(self):
+        self._test_read(N=3, size=40)
+
+    def test_bandwidth(self):
+        bw = self._test_read()
+        # the bus limit is 1 word per clock cycle
+        self.assertGreater(bw, 0.85)
+
+
+class Axi_rDatapump_noIdPoolTC(Axi_rDatapump_IdPoolTC):
+    """
+    Reference for :class:`~.Axi_rDatapump_IdPoolTC`, all transactions are using a single ID
+    """
+    ID_POOL_SIZE = 0
+
+    def test_bandwidth(self):
+        bw = self._test_read()
+        # each transaction waits on the read latency
+        self.assertLess(bw, 0.5)
+
+
+class Axi_wDatapump_IdPoolTC(Axi_rDatapump_IdPoolTC):
+    """
+    Same as :class:`~.Axi_rDatapump_IdPoolTC` just for :class:`~.Axi_wDatapump`
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = Axi_wDatapump(axiCls=Axi3)
+        cls._configure(u)
+        cls.compileSim(u)
+
+    def test_read(self):
+        pass
+
+    def _test_write(self, N=8, size=96):
+        """
+        :return: bandwidth in words per clock cycle
+        """
+        u = self.u
+        DW_B = self.DATA_WIDTH // 8
+        trans = self._trans(N, size)
+        for addr, size in trans:
+            u.driver.req._ag.data.append((addr, size - 1, 0))
+            u.driver.w._ag.data.extend((addr + i, mask(DW_B), int(i == size - 1))
+                                       for i in range(size))
+
+        clk_cnt = self._run_until_done(u.driver.ack._ag.data, N, N * size * 4 + 200)
+        for addr, size in trans:
+            self.assertValSequenceEqual(
+                self.m.getArray(addr, DW_B, size),
+                [addr + i for i in range(size)])
+
+        return N * size / clk_cnt
+
+    def test_write(self):
+        self._test_write(N=3, size=40)
+
+    def test_bandwidth(self):
+        bw = self._test_write()
+        self.assertGreater(bw, 0.85)
+
+
+class Axi_wDatapump_noIdPoolTC(Axi_wDatapump_IdPoolTC):
+    ID_POOL_SIZE = 0
+
+    def test_bandwidth(self):
+        bw = self._test_write()
+        self.assertLess(bw, 0.5)
+
+
+Axi_BurstSplitReorder_TCs = [
+    Axi_rBurstSplitReorderTC,
+    Axi_wBurstSplitReorderTC,
+    Axi_rDatapump_IdPoolTC,
+    Axi_rDatapump_noIdPoolTC,
+    Axi_wDatapump_IdPoolTC,
+    Axi_wDatapump_noIdPoolTC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    for tc in Axi_BurstSplitReorder_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -15,6 +15,7 @@ from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwtLib.amba.axis_comp.frame_join import AxiS_FrameJoin
 from hwtLib.amba.constants import RESP_OKAY
 from hwtLib.amba.datapump.base import AxiDatapumpBase
+from hwtLib.amba.datapump.burst_split import Axi_rBurstSplitReorder
 from hwtLib.amba.datapump.intf import AxiRDatapumpIntf
 from hwtLib.handshaked.fifo import HandshakedFifo
 from hwtLib.handshaked.streamNode import StreamNode
@@ -88,6 +89,8 @@ class Axi_rDatapump(AxiDatapumpBase):
             f.DEPTH = self.MAX_TRANS_OVERLAP
             f.SHIFT_OPTIONS = self.getShiftOptions()
 
+        self._declr_burst_split(Axi_rBurstSplitReorder)
+
     def storeTransInfo(self, transInfo: TransEndInfo, isLast: bool):
         if isLast:
             rem = self.driver.req.rem
@@ -172,10 +175,11 @@ class Axi_rDatapump(AxiDatapumpBase):
                 )
 
     def dataHandler(self, rErrFlag: RtlSignal, rmSizeOut: TransEndInfo):
-        rIn = self.axi.r
+        axi = self.getAxi()
+        rIn = axi.r
         rOut = self.driver.r
 
-        if self.axi.LEN_WIDTH:
+        if axi.LEN_WIDTH:
             last = rIn.last
         else:
             last = BIT.from_py(1)
@@ -250,7 +254,8 @@ class Axi_rDatapump(AxiDatapumpBase):
             ).sync()
 
     def _impl(self):
-        r = self.axi.r
+        axi = self.getAxi()
+        r = axi.r
         errorRead = self._reg("errorRead", def_val=0)
         If(r.valid & (r.resp != RESP_OKAY),
            errorRead(1)
@@ -267,8 +272,9 @@ class Axi_rDatapump(AxiDatapumpBase):
             self.errorAlignment(errorAlignment)
             err = err | errorAlignment
 
-        self.addrHandler(self.driver.req, self.axi.ar, self.sizeRmFifo.dataIn, err)
+        self.addrHandler(self.driver.req, axi.ar, self.sizeRmFifo.dataIn, err)
         self.dataHandler(err, self.sizeRmFifo.dataOut)
+        self.connectBurstSplit()
 
         propagateClkRstn(self)
 
@@ -10,6 +10,7 @@ from hwtLib.amba.axiLite_comp.sim.ram import Axi4LiteSimRam
 from hwtLib.amba.axi_comp.sim.ram import AxiSimRam
 from hwtLib.amba.constants import RESP_OKAY
 from hwtLib.amba.datapump.r import Axi_rDatapump
+from hwtLib.amba.datapump.sim_ram_timing import AxiSimRamTimingModel
 from hwtLib.amba.datapump.test import Axi_datapumpTC
 from hwtSimApi.constants import CLK_PERIOD
 from pyMathBitPrecise.bit_utils import mask
@@ -136,13 +137,13 @@ class Axi4_rDatapumpTC(Axi_datapumpTC):
         self.runSim((len(driver_r_ref) + 5) * CLK_PERIOD)
         self.check_r_trans(ar_ref, driver_r_ref)
 
-    def test_randomized(self, N=24):
+    def test_randomized(self, N=24, timing=None):
         u = self.u
 
         if u.AXI_CLS in (Axi3Lite, Axi4Lite):
-            m = Axi4LiteSimRam(axi=u.axi)
+            m = Axi4LiteSimRam(axi=u.axi, timing=timing)
         else:
-            m = AxiSimRam(axi=u.axi)
+            m = AxiSimRam(axi=u.axi, timing=timing)
 
         MAGIC = 99
         self.randomize(u.driver.r)
@@ -165,6 +166,14 @@ class Axi4_rDatapumpTC(Axi_datapumpTC):
         self.assertEmpty(u.driver.req._ag.data)
         self.assertValSequenceEqual(u.driver.r._ag.data, r_ref)
 
+    def test_randomized_with_latency(self):
+        timing = AxiSimRamTimingModel(
+            read_latency=8, read_latency_jitter=8, max_outstanding_reads=4)
+        self.test_randomized(timing=timing)
+        self.assertEmpty(self.u.axi.ar._ag.data)
+        st = timing.stats
+        self.assertGreaterEqual(st["read_latency_sum"], 8 * st["read_cnt"])
+
     def test_simpleUnalignedWithData(self, N=1, WORDS=1, OFFSET_B=None, randomize=False):
         u = self.u
 
@@ -1,8 +1,10 @@
 from collections import deque
+from typing import Optional
 
 from hwtLib.abstract.sim_ram import SimRam
+from hwtLib.amba.datapump.sim_ram_timing import AxiSimRamTimingModel
 from pyMathBitPrecise.bit_utils import mask, ValidityError
-from hwtSimApi.triggers import WaitWriteOnly
+from hwtSimApi.triggers import WaitWriteOnly, WaitCombRead
 
 
 class AxiDpSimRam(SimRam):
@@ -13,15 +15,20 @@ class AxiDpSimRam(SimRam):
     """
 
     def __init__(self, cellWidth, clk, rDatapumpIntf=None,
-                 wDatapumpIntf=None, parent=None):
+                 wDatapumpIntf=None, parent=None, paged=False,
+                 timing: Optional[AxiSimRamTimingModel]=None):
         """
         :param cellWidth: width of items in memmory
         :param clk: clk signal for synchronization
         :param parent: parent instance of SimRam
                        (memory will be shared with this instance)
+        :param paged: use :class:`hwtLib.abstract.sim_ram.SimRamPagedStorage`
+            for memory data
+        :param timing: optional timing model (latency, bandwidth, ...),
+            if None the requests are resolved immediately
         """
         assert cellWidth % 8 == 0
-        super(AxiDpSimRam, self).__init__(cellWidth // 8, parent=parent)
+        super(AxiDpSimRam, self).__init__(cellWidth // 8, parent=parent, paged=paged)
         self.allMask = mask(self.cellSize)
 
         assert rDatapumpIntf is not None or wDatapumpIntf is not None, \
@@ -62,6 +69,7 @@ class AxiDpSimRam(SimRam):
             raise AssertionError("Need at least some interface")
         self.ID_WIDTH = intf.ID_WIDTH
         self.MAX_LEN = intf.MAX_LEN
+        self.timing = timing
 
         self._registerOnClock()
 
@@ -72,20 +80,28 @@ class AxiDpSimRam(SimRam):
         """
         Check if any request has appeared on interfaces
         """
-        yield WaitWriteOnly()
-        if self.arAg is not None:
-            if self.arAg.data:
-                self.onReadReq()
+        if self.timing is not None:
+            # the process is woken on both clock edges, but the timing model counts clock cycles
+            yield WaitCombRead()
+            isRisingEdge = bool(self.clk._sigInside.read())
+            yield WaitWriteOnly()
+            if isRisingEdge:
+                self.timing.on_clk(self)
+        else:
+            yield WaitWriteOnly()
+            if self.arAg is not None:
+                if self.arAg.data:
+                    self.onReadReq()
 
-            if self.rPending:
-                self.doRead()
+                if self.rPending:
+                    self.doRead()
 
-        if self.awAg is not None:
-            if self.awAg.data:
-                self.onWriteReq()
+            if self.awAg is not None:
+                if self.awAg.data:
+                    self.onWriteReq()
 
-            if self.wPending and self.wPending[0][2] <= len(self.wAg.data):
-                self.doWrite()
+                if self.wPending and self.wPending[0][2] <= len(self.wAg.data):
+                    self.doWrite()
         self._registerOnClock()
 
     def parseReq(self, req):
@@ -0,0 +1,216 @@
+from collections import deque
+from math import ceil
+from random import Random
+from typing import Optional
+
+
+class AxiSimRamTimingModel():
+    """
+    Timing model for :class:`hwtLib.amba.datapump.sim_ram.AxiDpSimRam`
+    and :class:`hwtLib.amba.axi_comp.sim.ram.AxiSimRam`
+
+    Without this model the memory answers every request in the clock cycle
+    it sees it. With this model the requests are delayed by a latency,
+    the number of transactions in flight is limited per ID, data channels
+    are occupied for a time given by the bandwidth and a simple DDR-like
+    model of open rows (pages) adds latency on page miss.
+    The random part of the latency is generated from a seeded generator,
+    the timing of the simulation is deterministic.
+
+    :note: The requests over outstanding transaction limit remain in the
+        data of the agent of the address channel until some transaction
+        with the same ID is finished.
+    :note: The transaction is completed when the data is passed to the
+        agent of the data channel (read) or when all data was received
+        from the agent of the data channel (write).
+
+    :ivar ~.now: number of clock cycles from the start of simulation
+    :ivar ~.rInFlight: list of accepted read transactions
+        which are waiting on its latency or on data channel
+        (tuple (ready time, accept time, request))
+    :ivar ~.wInFlight: same as rInFlight just for write transactions
+    :ivar ~.stats: dict with counters of transactions, bytes, latencies,
+        page hits/misses and the clock cycle of the last completed transaction
+    """
+
+    def __init__(self, read_latency: int=0, write_latency: int=0,
+                 read_latency_jitter: int=0, write_latency_jitter: int=0,
+                 max_outstanding_reads: Optional[int]=None,
+                 max_outstanding_writes: Optional[int]=None,
+                 bytes_per_clk: Optional[int]=None,
+                 allow_reordering: bool=False,
+                 page_size: Optional[int]=None, bank_cnt: int=1,
+                 page_hit_latency: int=0, page_miss_latency: int=0,
+                 seed: int=0):
+        """
+        :param read_latency: fixed number of clock cycles between the read
+            request and the data
+        :param write_latency: fixed number of clock cycles between the write
+            request and the write response
+        :param read_latency_jitter: max number of clock cycles which are
+            randomly added to read_latency (uniform distribution)
+        :param write_latency_jitter: same as read_latency_jitter
+            just for write_latency
+        :param max_outstanding_reads: max number of read transactions
+            in flight for each ID (None = unlimited)
+        :param max_outstanding_writes: same as max_outstanding_reads
+            just for writes
+        :param bytes_per_clk: max number of bytes transferred by each data
+            channel in a single clock cycle (None = unlimited)
+        :param allow_reordering: if True the read transactions with different
+            IDs may be completed in a different order than the requests
+            arrived (the order of transactions with the same ID is kept)
+        :param page_size: size of the DDR row (page) in bytes,
+            (None = page hit/miss model disabled)
+        :param bank_cnt: number of DDR banks, each bank has own open row
+        :param page_hit_latency: latency added if the row is already open
+        :param page_miss_latency: latency added if the row has to be opened
+        :param seed: seed for random generator of latency jitter
+        """
+        self.read_latency = read_latency
+        self.write_latency = write_latency
+        self.read_latency_jitter = read_latency_jitter
+        self.write_latency_jitter = write_latency_jitter
+        self.max_outstanding_reads = max_outstanding_reads
+        self.max_outstanding_writes = max_outstanding_writes
+        self.bytes_per_clk = bytes_per_clk
+        self.allow_reordering = allow_reordering
+        self.page_size = page_size
+        self.bank_cnt = bank_cnt
+        self.page_hit_latency = page_hit_latency
+        self.page_miss_latency = page_miss_latency
+        self._rand = Random(seed)
+
+        self.now = 0
+        self.rInFlight = []
+        self.wInFlight = deque()
+        self.rBusyUntil = 0
+        self.wBusyUntil = 0
+        self.openRows = {}
+        self.stats = {
+            "read_cnt": 0,
+            "write_cnt": 0,
+            "read_bytes": 0,
+            "write_bytes": 0,
+            "read_latency_sum": 0,
+            "write_latency_sum": 0,
+            "read_last_clk": 0,
+            "write_last_clk": 0,
+            "page_hit_cnt": 0,
+            "page_miss_cnt": 0,
+        }
+
+    def _page_latency(self, addr: int) -> int:
+        if self.page_size is None:
+            return 0
+        page = addr // self.page_size
+        bank = page % self.bank_cnt
+        row = page // self.bank_cnt
+        if self.openRows.get(bank, None) == row:
+            self.stats["page_hit_cnt"] += 1
+            return self.page_hit_latency
+        else:
+            self.openRows[bank] = row
+            self.stats["page_miss_cnt"] += 1
+            return self.page_miss_latency
+
+    def _latency(self, addr: int, latency: int, jitter: int) -> int:
+        if jitter:
+            latency += self._rand.randint(0, jitter)
+        return latency + self._page_latency(addr)
+
+    def _transfer_clks(self, byte_cnt: int) -> int:
+        if self.bytes_per_clk is None:
+            return 0
+        return ceil(byte_cnt / self.bytes_per_clk)
+
+    @staticmethod
+    def _can_accept(in_flight, _id: int, max_outstanding: Optional[int]) -> bool:
+        if max_outstanding is None:
+            return True
+        return sum(1 for (_, _, req) in in_flight if req[0] == _id) < max_outstanding
+
+    def _select_read(self) -> Optional[int]:
+        """
+        :return: index of the read transaction which should be completed now
+        """
+        now = self.now
+        seen_ids = set()
+        for i, (ready, _, req) in enumerate(self.rInFlight):
+            _id = req[0]
+            if ready <= now and _id not in seen_ids:
+                return i
+            if not self.allow_reordering:
+                return None
+            seen_ids.add(_id)
+        return None
+
+    def on_clk(self, ram):
+        """
+        Accept and complete the transactions of the memory for this clock cycle
+
+        :attention: has to be called once per clock cycle (on the rising edge of the clock)
+            as all latencies are in clock cycles
+        """
+        self.now += 1
+        now = self.now
+        cellSize = ram.cellSize
+        st = self.stats
+
+        if ram.arAg is not None:
+            reqs = ram.arAg.data
+            if reqs:
+                req = ram.parseReq(reqs[0])
+                if self._can_accept(self.rInFlight, req[0], self.max_outstanding_reads):
+                    reqs.popleft()
+                    ready = now + self._latency(req[1], self.read_latency, self.read_latency_jitter)
+                    self.rInFlight.append((ready, now, req))
+
+            if now >= self.rBusyUntil:
+                i = self._select_read()
+                if i is not None:
+                    _, accepted, req = self.rInFlight.pop(i)
+                    ram.rPending.append(req)
+                    ram.doRead()
+                    byte_cnt = req[2] * cellSize
+                    self.rBusyUntil = now + self._transfer_clks(byte_cnt)
+                    st["read_cnt"] += 1
+                    st["read_bytes"] += byte_cnt
+                    st["read_latency_sum"] += now - accepted
+                    st["read_last_clk"] = now
+
+        if ram.awAg is not None:
+            reqs = ram.awAg.data
+            if reqs:
+                req = ram.parseReq(reqs[0])
+                if self._can_accept(self.wInFlight, req[0], self.max_outstanding_writes):
+                    reqs.popleft()
+                    ready = now + self._latency(req[1], self.write_latency, self.write_latency_jitter)
+                    self.wInFlight.append((ready, now, req))
+
+            if self.wInFlight and now >= self.wBusyUntil:
+                ready, accepted, req = self.wInFlight[0]
+                # writes are completed in order as the data comes in order
+                if ready <= now and req[2] <= len(ram.wAg.data):
+                    self.wInFlight.popleft()
+                    ram.wPending.append(req)
+                    ram.doWrite()
+                    byte_cnt = req[2] * cellSize
+                    self.wBusyUntil = now + self._transfer_clks(byte_cnt)
+                    st["write_cnt"] += 1
+                    st["write_bytes"] += byte_cnt
+                    st["write_latency_sum"] += now - accepted
+                    st["write_last_clk"] = now
+
+    def report(self) -> dict:
+        """
+        :return: dict with the stats and average latencies and bandwidths
+        """
+        st = self.stats
+        res = dict(st)
+        res["clk_cnt"] = self.now
+        for rw in ("read", "write"):
+            cnt = st[f"{rw}_cnt"]
+            res[f"{rw}_latency_avg"] = st[f"{rw}_latency_sum"] / cnt if cnt else None
+            res[f"{rw}_bytes_per_clk"] = st[f"{rw}_bytes"] / self.now if self.now else None
+        return res
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axi4 import Axi4
+from hwtLib.amba.axi_comp.sim.ag_test import AxiTestJunction
+from hwtLib.amba.axi_comp.sim.ram import AxiSimRam
+from hwtLib.amba.constants import RESP_OKAY
+from hwtLib.amba.datapump.sim_ram_timing import AxiSimRamTimingModel
+from hwtSimApi.constants import CLK_PERIOD
+
+
+class AxiSimRamTimingModel_TC(SimTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = AxiTestJunction(Axi4)
+        u.ID_WIDTH = 2
+        u.DATA_WIDTH = 32
+        cls.compileSim(u)
+
+    def _mk_mem(self, N, LEN, **timing_kwargs):
+        u = self.u
+        timing = AxiSimRamTimingModel(**timing_kwargs)
+        m = AxiSimRam(axi=u.m, timing=timing)
+        addrs = [m.calloc(LEN, 4, initValues=[i * LEN + i2 for i2 in range(LEN)])
+                 for i in range(N)]
+        return m, addrs
+
+    def _check_r_data(self, addrs, LEN, ids):
+        r_ref = []
+        for i, _id in enumerate(ids):
+            for i2 in range(LEN):
+                r_ref.append((_id, i * LEN + i2, RESP_OKAY, int(i2 == LEN - 1)))
+        self.assertValSequenceEqual(self.u.s.r._ag.data, r_ref)
+
+    def _test_read(self, N, LEN, ids, **timing_kwargs):
+        u = self.u
+        m, addrs = self._mk_mem(N, LEN, **timing_kwargs)
+        ar = u.s.ar._ag
+        for _id, a in zip(ids, addrs):
+            ar.data.append(ar.create_addr_req(a, LEN - 1, _id=_id))
+
+        self.runSim((N * (LEN + 60) + 20) * CLK_PERIOD)
+        self._check_r_data(addrs, LEN, ids)
+        return m.timing.report()
+
+    def test_no_latency(self):
+        r = self._test_read(4, 2, [0, 0, 0, 0])
+        self.assertEqual(r["read_cnt"], 4)
+        self.assertEqual(r["read_latency_avg"], 0)
+
+    def test_clk_cnt(self):
+        # the timing model is evaluated once per clock cycle (on rising edge only)
+        u = self.u
+        m = AxiSimRam(axi=u.m, timing=AxiSimRamTimingModel())
+        self.runSim(20 * CLK_PERIOD)
+        self.assertEqual(m.timing.report()["clk_cnt"], 20)
+
+    def test_read_latency(self):
+        r = self._test_read(4, 2, [0, 0, 0, 0], read_latency=10)
+        self.assertEqual(r["read_cnt"], 4)
+        self.assertEqual(r["read_bytes"], 4 * 2 * 4)
+        self.assertEqual(r["read_latency_avg"], 10)
+        t0 = r["read_last_clk"]
+
+        self.restartSim()
+        r = self._test_read(4, 2, [0, 0, 0, 0], read_latency=10, max_outstanding_reads=1)
+        self.assertEqual(r["read_latency_avg"], 10)
+        # requests are not overlapping
+        self.assertLess(t0, 4 * 10)
+        self.assertGreaterEqual(r["read_last_clk"], 4 * 10)
+
+    def test_bandwidth(self):
+        r = self._test_read(4, 8, [0, 1, 2, 3], bytes_per_clk=2)
+        # each transaction occupies the channel for 8 * 4 / 2 clk
+        self.assertGreaterEqual(r["read_last_clk"], 3 * 16)
+
+    def test_reordering(self):
+        u = self.u
+        timing = AxiSimRamTimingModel(
+            read_latency=5, page_size=64, bank_cnt=2, page_miss_latency=20,
+            allow_reordering=True)
+        m = AxiSimRam(axi=u.m, timing=timing)
+        a0 = m.calloc(1, 4, initValues=[10])
+        # open the page of a0 so the second read hits
+        timing._page_latency(a0)
+        a1 = m.calloc(1, 4, keepOut=1024 + 64, initValues=[11])
+        ar = u.s.ar._ag
+        ar.data.extend([
+            ar.create_addr_req(a1, 0, _id=1),
+            ar.create_addr_req(a0, 0, _id=2),
+        ])
+        self.runSim(60 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.s.r._ag.data, [
+            (2, 10, RESP_OKAY, 1),
+            (1, 11, RESP_OKAY, 1),
+        ])
+        r = timing.report()
+        self.assertEqual(r["page_hit_cnt"], 1)
+        self.assertEqual(r["page_miss_cnt"], 2)
+
+    def test_deterministic_jitter(self):
+        r0 = self._test_read(4, 1, [0, 1, 2, 3], read_latency=2, read_latency_jitter=8, seed=5)
+        self.restartSim()
+        r1 = self._test_read(4, 1, [0, 1, 2, 3], read_latency=2, read_latency_jitter=8, seed=5)
+        self.assertDictEqual(r0, r1)
+
+    def test_write_latency(self):
+        u = self.u
+        timing = AxiSimRamTimingModel(write_latency=7)
+        m = AxiSimRam(axi=u.m, timing=timing)
+        N = 4
+        addrs = [m.malloc(4) for _ in range(N)]
+        aw = u.s.aw._ag
+        for i, a in enumerate(addrs):
+            aw.data.append(aw.create_addr_req(a, 0, _id=i))
+            u.s.w._ag.data.append((i + 1, 0xf, 1))
+
+        self.runSim(80 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.s.b._ag.data,
+                                    [(i, RESP_OKAY) for i in range(N)])
+        self.assertValSequenceEqual(m.getArray(addrs[0], 4, N), [1, 2, 3, 4])
+        r = timing.report()
+        self.assertEqual(r["write_cnt"], N)
+        self.assertGreaterEqual(r["write_latency_avg"], 7)
+
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiSimRamTimingModel_TC('test_reordering'))
+    suite.addTest(unittest.makeSuite(AxiSimRamTimingModel_TC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
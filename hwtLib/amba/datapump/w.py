@@ -16,6 +16,7 @@ from hwt.synthesizer.param import Param
 from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwtLib.amba.constants import RESP_OKAY
 from hwtLib.amba.datapump.base import AxiDatapumpBase
+from hwtLib.amba.datapump.burst_split import Axi_wBurstSplitReorder
 from hwtLib.amba.datapump.intf import AxiWDatapumpIntf
 from hwtLib.handshaked.fifo import HandshakedFifo
 from hwtLib.handshaked.streamNode import StreamNode
@@ -95,6 +96,8 @@ class Axi_wDatapump(AxiDatapumpBase):
             bf = self.bInfoFifo = HandshakedFifo(BFifoIntf)
             bf.DEPTH = self.MAX_TRANS_OVERLAP
 
+        self._declr_burst_split(Axi_wBurstSplitReorder)
+
     def storeTransInfo(self, transInfo: WFifoIntf, isLast: bool):
         if self.isAlwaysAligned():
             return []
@@ -108,7 +111,8 @@ class Axi_wDatapump(AxiDatapumpBase):
             ]
 
     def axiWHandler(self, wErrFlag: RtlSignal):
-        w = self.axi.w
+        axi = self.getAxi()
+        w = axi.w
         wIn = self.driver.w
         wInfo = self.writeInfoFifo.dataOut
         bInfo = self.bInfoFifo.dataIn
@@ -122,7 +126,7 @@ class Axi_wDatapump(AxiDatapumpBase):
         if self.isAlwaysAligned():
             w.data(wIn.data)
             w.strb(wIn.strb)
-            if self.axi.LEN_WIDTH:
+            if axi.LEN_WIDTH:
                 doSplit = wIn.last
             else:
                 doSplit = BIT.from_py(1)
@@ -226,7 +230,7 @@ class Axi_wDatapump(AxiDatapumpBase):
         dataNode.sync()
 
     def axiBHandler(self):
-        b = self.axi.b
+        b = self.getAxi().b
         ack = self.driver.ack
         lastFlags = self.bInfoFifo.dataOut
         StreamNode(
@@ -239,7 +243,8 @@ class Axi_wDatapump(AxiDatapumpBase):
 
     def _impl(self):
         propagateClkRstn(self)
-        b = self.axi.b
+        axi = self.getAxi()
+        b = axi.b
         wErrFlag = self._reg("wErrFlag", def_val=0)
         If(b.valid & (b.resp != RESP_OKAY),
            wErrFlag(1)
@@ -254,9 +259,10 @@ class Axi_wDatapump(AxiDatapumpBase):
             self.errorAlignment(wErrAlignFlag)
             wErrFlag = wErrFlag | wErrAlignFlag
 
-        self.addrHandler(self.driver.req, self.axi.aw, self.writeInfoFifo.dataIn, wErrFlag)
+        self.addrHandler(self.driver.req, axi.aw, self.writeInfoFifo.dataIn, wErrFlag)
         self.axiWHandler(wErrFlag)
         self.axiBHandler()
+        self.connectBurstSplit()
 
 
 if __name__ == "__main__":
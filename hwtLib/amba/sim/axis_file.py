@@ -0,0 +1,267 @@
+"""
+Simulation utilities which are streaming frames between files
+(pcap, pcapng, length-prefixed binary) and AxiStream agents.
+
+The frames are read lazily and only a bounded number of frames is stored
+in the agent at once, the received frames are written to file immediately,
+so the memory consumption does not depend on the size of the capture.
+"""
+from collections import deque
+import struct
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from hwtLib.amba.axis import AxiStream, axis_send_bytes, axis_recieve_bytes
+from hwtSimApi.triggers import WaitWriteOnly
+
+PCAP_MAGIC_US = 0xa1b2c3d4
+PCAP_MAGIC_NS = 0xa1b23c4d
+PCAPNG_SECTION_HEADER_BLOCK = 0x0A0D0D0A
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+PCAPNG_SIMPLE_PACKET_BLOCK = 0x00000003
+PCAPNG_ENHANCED_PACKET_BLOCK = 0x00000006
+LINKTYPE_ETHERNET = 1
+
+
+def _read_exactly(f: BinaryIO, size: int) -> Optional[bytes]:
+    """
+    :return: bytes or None if there is end of file before first byte
+    """
+    d = f.read(size)
+    if not d:
+        return None
+    if len(d) != size:
+        raise ValueError("Truncated file", size, len(d))
+    return d
+
+
+def _read_payload(f: BinaryIO, size: int) -> bytes:
+    """
+    Read data which has to follow an already read header
+
+    :return: bytes (empty bytes if the size is 0)
+    """
+    if size == 0:
+        return b""
+    d = _read_exactly(f, size)
+    if d is None:
+        raise ValueError("Truncated file", size, 0)
+    return d
+
+
+def _iter_pcap_frames(f: BinaryIO, header: bytes) -> Iterator[bytes]:
+    magic = struct.unpack("<I", header[:4])[0]
+    if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+        endian = "<"
+    else:
+        endian = ">"
+    # rest of global header: thiszone, sigfigs, snaplen, network
+    _read_exactly(f, 16)
+    rec_hdr = struct.Struct(endian + "IIII")
+    while True:
+        h = _read_exactly(f, rec_hdr.size)
+        if h is None:
+            return
+        _, _, incl_len, _ = rec_hdr.unpack(h)
+        yield _read_payload(f, incl_len)
+
+
+def _iter_pcapng_frames(f: BinaryIO, header: bytes) -> Iterator[bytes]:
+    endian = "<"
+    block_type = PCAPNG_SECTION_HEADER_BLOCK
+    while True:
+        if block_type == PCAPNG_SECTION_HEADER_BLOCK:
+            # byte order is specified in each section
+            bom = _read_exactly(f, 4)
+            if struct.unpack("<I", bom)[0] == PCAPNG_BYTE_ORDER_MAGIC:
+                endian = "<"
+            else:
+                endian = ">"
+            block_len = struct.unpack(endian + "I", header[4:8])[0]
+            _read_exactly(f, block_len - 12)
+        else:
+            block_len = struct.unpack(endian + "I", header[4:8])[0]
+            body = _read_payload(f, block_len - 8)
+            if block_type == PCAPNG_ENHANCED_PACKET_BLOCK:
+                # interface_id, ts_high, ts_low, captured_len, original_len
+                captured_len = struct.unpack(endian + "I", body[12:16])[0]
+                yield body[20:20 + captured_len]
+            elif block_type == PCAPNG_SIMPLE_PACKET_BLOCK:
+                original_len = struct.unpack(endian + "I", body[0:4])[0]
+                yield body[4:4 + min(original_len, block_len - 16)]
+
+        header = _read_exactly(f, 8)
+        if header is None:
+            return
+        block_type = struct.unpack(endian + "I", header[0:4])[0]
+
+
+def iter_pcap_frames(f: BinaryIO) -> Iterator[bytes]:
+    """
+    Lazily read frames from pcap or pcapng file
+
+    :param f: file opened in binary mode
+    """
+    header = _read_exactly(f, 8)
+    if header is None:
+        return
+    magic = struct.unpack("<I", header[:4])[0]
+    if magic == PCAPNG_SECTION_HEADER_BLOCK:
+        yield from _iter_pcapng_frames(f, header)
+    elif magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS) or \
+            struct.unpack(">I", header[:4])[0] in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+        yield from _iter_pcap_frames(f, header)
+    else:
+        raise ValueError("Not a pcap/pcapng file", header[:4])
+
+
+def iter_length_prefixed_frames(f: BinaryIO, len_size: int=4, byteorder: str="little") -> Iterator[bytes]:
+    """
+    Lazily read frames from binary file where each frame is prefixed
+    with its length
+
+    :param f: file opened in binary mode
+    :param len_size: number of bytes of the length field
+    :param byteorder: byte order of the length field
+    """
+    while True:
+        h = _read_exactly(f, len_size)
+        if h is None:
+            return
+        size = int.from_bytes(h, byteorder)
+        yield _read_payload(f, size)
+
+
+class PcapWriter():
+    """
+    Writer of the pcap file (with microsecond timestamps)
+    """
+
+    def __init__(self, f: BinaryIO, linktype: int=LINKTYPE_ETHERNET, snaplen: int=0xffff):
+        self.f = f
+        f.write(struct.pack("<IHHiIII", PCAP_MAGIC_US, 2, 4, 0, 0, snaplen, linktype))
+
+    def write(self, frame: bytes, time_us: int=0):
+        sec, usec = divmod(time_us, 1000000)
+        self.f.write(struct.pack("<IIII", sec, usec, len(frame), len(frame)))
+        self.f.write(frame)
+
+
+class LengthPrefixedWriter():
+    """
+    Writer of the binary file where each frame is prefixed with its length
+
+    :see: :func:`~.iter_length_prefixed_frames`
+    """
+
+    def __init__(self, f: BinaryIO, len_size: int=4, byteorder: str="little"):
+        self.f = f
+        self.len_size = len_size
+        self.byteorder = byteorder
+
+    def write(self, frame: bytes, time_us: int=0):
+        self.f.write(len(frame).to_bytes(self.len_size, self.byteorder))
+        self.f.write(frame)
+
+
+class AxiStreamFrameSource():
+    """
+    Simulation driver which lazily pulls frames from the iterator
+    to the data of AxiStream agent, only as the agent consumes them.
+
+    :ivar ~.lookahead: max number of frames in agent at once
+    :ivar ~.sent_frames: number of frames which were completely consumed
+        by the agent
+    :ivar ~.finished: True if all frames were passed to the agent
+    """
+
+    def __init__(self, axis: AxiStream, frames: Iterable[bytes], lookahead: int=2, clk=None):
+        """
+        :param axis: AxiStream interface which is driven by the simulation
+        :param frames: iterable of frames (e.g. :func:`~.iter_pcap_frames`)
+        :param lookahead: max number of frames in agent at once
+        :param clk: clock signal for synchronization
+            (if None the clk associated with an interface is used)
+        """
+        assert lookahead > 0, lookahead
+        self.axis = axis
+        self.frames = iter(frames)
+        self.lookahead = lookahead
+        if clk is None:
+            clk = axis._getAssociatedClk()
+        self.clk = clk
+        # number of beats of frames which are in agent
+        self._frame_beats = deque()
+        self._queued_beats = 0
+        self.sent_frames = 0
+        self.finished = False
+        self._fill()
+        self._registerOnClock()
+
+    def _registerOnClock(self):
+        self.clk._sigInside.wait(self.checkRequests())
+
+    def _fill(self):
+        ag_data = self.axis._ag.data
+        consumed = self._queued_beats - len(ag_data)
+        fb = self._frame_beats
+        while fb and consumed >= fb[0]:
+            beats = fb.popleft()
+            consumed -= beats
+            self._queued_beats -= beats
+            self.sent_frames += 1
+
+        while not self.finished and len(fb) < self.lookahead:
+            try:
+                frame = next(self.frames)
+            except StopIteration:
+                self.finished = True
+                break
+            before = len(ag_data)
+            axis_send_bytes(self.axis, frame)
+            beats = len(ag_data) - before
+            fb.append(beats)
+            self._queued_beats += beats
+
+    def checkRequests(self):
+        yield WaitWriteOnly()
+        self._fill()
+        if not self.finished or self._frame_beats:
+            self._registerOnClock()
+
+
+class AxiStreamFrameSink():
+    """
+    Simulation monitor which writes frames received by the AxiStream agent
+    to a file writer immediately (and removes them from agent)
+
+    :ivar ~.recieved_frames: number of written frames
+    """
+
+    def __init__(self, axis: AxiStream, writer, clk=None):
+        """
+        :param axis: AxiStream interface which is read by the simulation
+        :param writer: object with write(frame: bytes, time_us: int) method
+            (e.g. :class:`~.PcapWriter`)
+        :param clk: clock signal for synchronization
+            (if None the clk associated with an interface is used)
+        """
+        self.axis = axis
+        self.writer = writer
+        if clk is None:
+            clk = axis._getAssociatedClk()
+        self.clk = clk
+        self.recieved_frames = 0
+        self._registerOnClock()
+
+    def _registerOnClock(self):
+        self.clk._sigInside.wait(self.checkRequests())
+
+    def checkRequests(self):
+        yield WaitWriteOnly()
+        ag = self.axis._ag
+        while any(int(beat[-1]) for beat in ag.data):
+            # there is a complete frame in agent data
+            frame = axis_recieve_bytes(self.axis)[-1]
+            self.writer.write(bytes(frame), ag.sim.now // 1000000)
+            self.recieved_frames += 1
+        self._registerOnClock()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import BytesIO
+import struct
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axis_comp.fifo import AxiSFifo
+from hwtLib.amba.sim.axis_file import AxiStreamFrameSource, \
+    AxiStreamFrameSink, PcapWriter, iter_pcap_frames, LengthPrefixedWriter, \
+    iter_length_prefixed_frames, PCAPNG_SECTION_HEADER_BLOCK, \
+    PCAPNG_BYTE_ORDER_MAGIC, PCAPNG_ENHANCED_PACKET_BLOCK, \
+    PCAPNG_SIMPLE_PACKET_BLOCK
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+
+
+def pcapng_block(block_type: int, body: bytes):
+    body += bytes(-len(body) % 4)
+    block_len = len(body) + 12
+    return struct.pack("<II", block_type, block_len) + body + struct.pack("<I", block_len)
+
+
+class AxiStreamFrameFile_TC(SimTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = AxiSFifo()
+        u.DATA_WIDTH = 32
+        u.USE_KEEP = True
+        u.DEPTH = 4
+        cls.compileSim(u)
+
+    def _frames(self, N):
+        return [bytes((i + j) & 0xff for j in range(1 + (i * 7) % 23))
+                for i in range(N)]
+
+    def test_pcap_read_write(self):
+        frames = self._frames(10)
+        f = BytesIO()
+        w = PcapWriter(f)
+        for fr in frames:
+            w.write(fr)
+        f.seek(0)
+        self.assertSequenceEqual(list(iter_pcap_frames(f)), frames)
+
+    def test_pcap_zero_length_record(self):
+        frames = [b"\x01\x02", b"", b"\x03"]
+        f = BytesIO()
+        w = PcapWriter(f)
+        for fr in frames:
+            w.write(fr)
+        f.seek(0)
+        self.assertSequenceEqual(list(iter_pcap_frames(f)), frames)
+
+    def test_pcap_truncated_record(self):
+        f = BytesIO()
+        w = PcapWriter(f)
+        w.write(b"\x01\x02")
+        # record header without the payload
+        f.write(struct.pack("<IIII", 0, 0, 4, 4))
+        f.seek(0)
+        frames = iter_pcap_frames(f)
+        self.assertEqual(next(frames), b"\x01\x02")
+        with self.assertRaises(ValueError):
+            next(frames)
+
+    def test_pcapng_read(self):
+        frames = self._frames(5)
+        f = BytesIO()
+        f.write(pcapng_block(PCAPNG_SECTION_HEADER_BLOCK,
+                             struct.pack("<IHHq", PCAPNG_BYTE_ORDER_MAGIC, 1, 0, -1)))
+        # interface description block
+        f.write(pcapng_block(0x1, struct.pack("<HHI", 1, 0, 0xffff)))
+        for i, fr in enumerate(frames):
+            if i % 2:
+                f.write(pcapng_block(PCAPNG_SIMPLE_PACKET_BLOCK,
+                                     struct.pack("<I", len(fr)) + fr))
+            else:
+                f.write(pcapng_block(PCAPNG_ENHANCED_PACKET_BLOCK,
+                                     struct.pack("<IIIII", 0, 0, i, len(fr), len(fr)) + fr))
+        f.seek(0)
+        self.assertSequenceEqual(list(iter_pcap_frames(f)), frames)
+
+    def test_stream_pcap_through_dut(self, N=40, LOOKAHEAD=2):
+        u = self.u
+        frames = self._frames(N)
+        f_in = BytesIO()
+        w = PcapWriter(f_in)
+        for fr in frames:
+            w.write(fr)
+        f_in.seek(0)
+
+        src = AxiStreamFrameSource(u.dataIn, iter_pcap_frames(f_in), lookahead=LOOKAHEAD)
+        f_out = BytesIO()
+        sink = AxiStreamFrameSink(u.dataOut, PcapWriter(f_out))
+
+        max_frames_in_ag = [0]
+
+        def monitor():
+            while True:
+                max_frames_in_ag[0] = max(max_frames_in_ag[0], len(src._frame_beats))
+                yield Timer(CLK_PERIOD)
+
+        self.procs.append(monitor())
+        beats = sum((len(fr) + 3) // 4 for fr in frames)
+        self.runSim((beats + 2 * N + 10) * CLK_PERIOD)
+
+        self.assertTrue(src.finished)
+        self.assertEqual(src.sent_frames, N)
+        self.assertEqual(sink.recieved_frames, N)
+        self.assertLessEqual(max_frames_in_ag[0], LOOKAHEAD)
+        self.assertEmpty(u.dataOut._ag.data)
+        f_out.seek(0)
+        self.assertSequenceEqual(list(iter_pcap_frames(f_out)), frames)
+
+    def test_stream_length_prefixed(self, N=10):
+        u = self.u
+        frames = self._frames(N)
+        f_in = BytesIO()
+        w = LengthPrefixedWriter(f_in, len_size=2)
+        for fr in frames:
+            w.write(fr)
+        f_in.seek(0)
+
+        self.randomize(u.dataIn)
+        self.randomize(u.dataOut)
+        AxiStreamFrameSource(u.dataIn, iter_length_prefixed_frames(f_in, len_size=2))
+        f_out = BytesIO()
+        AxiStreamFrameSink(u.dataOut, LengthPrefixedWriter(f_out))
+
+        self.runSim(N * 40 * CLK_PERIOD)
+        f_out.seek(0)
+        self.assertSequenceEqual(list(iter_length_prefixed_frames(f_out)), frames)
+
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiStreamFrameFile_TC('test_stream_pcap_through_dut'))
+    suite.addTest(unittest.makeSuite(AxiStreamFrameFile_TC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
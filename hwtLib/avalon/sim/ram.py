@@ -15,7 +15,8 @@ class AvalonMmSimRam(SimRam):
     Simulation memory for AvalonMM interfaces (slave component)
     """
 
-    def __init__(self, avalon_mm: AvalonMM, parent=None, clk=None, allow_unaligned_addr=False):
+    def __init__(self, avalon_mm: AvalonMM, parent=None, clk=None, allow_unaligned_addr=False,
+                 paged=False):
         """
         :param clk: clk which should this memory use in simulation
             (if None the clk associated with an interface is used)
@@ -24,11 +25,13 @@ class AvalonMmSimRam(SimRam):
             with same memory as parent one
         :attention: memories are commiting into memory in "data" property
             after transaction is complete
+        :param paged: use :class:`hwtLib.abstract.sim_ram.SimRamPagedStorage`
+            for memory data
         """
 
         DW = avalon_mm.DATA_WIDTH
         self.allow_unaligned_addr = allow_unaligned_addr
-        SimRam.__init__(self, DW // 8, parent=parent)
+        SimRam.__init__(self, DW // 8, parent=parent, paged=paged)
 
         self.allMask = mask(self.cellSize)
         self.word_t = Bits(self.cellSize * 8)
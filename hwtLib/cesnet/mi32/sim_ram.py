@@ -7,8 +7,8 @@ from hwtSimApi.triggers import WaitWriteOnly
 
 class Mi32SimRam(SimRam):
 
-    def __init__(self, mi32: Mi32, parent=None):
-        super(Mi32SimRam, self).__init__(mi32.DATA_WIDTH // 8, parent=parent)
+    def __init__(self, mi32: Mi32, parent=None, paged=False):
+        super(Mi32SimRam, self).__init__(mi32.DATA_WIDTH // 8, parent=parent, paged=paged)
         self.intf = mi32
         self.clk = mi32._getAssociatedClk()
         self._word_bytes = mi32.DATA_WIDTH // 8
@@ -62,10 +62,16 @@ class Crc(Unit):
         """
         build xor tree for CRC computation
         """
-        crcMatrix = CrcComb.buildCrcXorMatrix(len(data_in_bits), poly_bits)
+        DW = len(data_in_bits)
+        crcMatrix = CrcComb.buildCrcXorMatrixPacked(DW, poly_bits)
+        if self.OPTIMIZE_XOR_TREE:
+            xorNetwork = CrcComb.buildCrcXorNetwork(DW, poly_bits)
+        else:
+            xorNetwork = None
         res = CrcComb.applyCrcXorMatrix(
             crcMatrix, data_in_bits,
-            state_in_bits, self.REFIN)
+            state_in_bits, self.REFIN, xorNetwork, self,
+            f"crc_xor_{DW:d}b")
 
         # next state logic
         # wrap crc next signals to separate signal to have nice code
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from collections import deque
-from typing import List, Tuple, Union
+from functools import lru_cache
+from typing import List, Tuple, Union, Optional
 
+from hwt.code_utils import rename_signal
 from hwt.interfaces.std import VectSignal
 from hwt.interfaces.utils import addClkRstn
 from hwt.synthesizer.param import Param
@@ -17,6 +18,8 @@ from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwt.hdl.types.bitsVal import BitsVal
 from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.defs import BIT
+from hwt.hdl.value import HValue
+from hwtLib.logic.xorNetwork import XorNetwork
 
 
 # http://www.sunshine2k.de/coding/javascript/crc/crc_js.html
@@ -37,6 +40,9 @@ class CrcComb(Unit):
         each byte is reflected before being processed.
     :ivar ~.REFOUT: Same as REFIN except for output
     :ivar ~.XOROUT: value to xor result with
+    :ivar ~.OPTIMIZE_XOR_TREE: if True the XOR subexpressions are shared between
+        output bits and the XOR trees are balanced (:class:`~.XorNetwork`),
+        otherwise each output bit is a linear chain of XORs
 
     .. hwt-autodoc::
     """
@@ -44,6 +50,7 @@ class CrcComb(Unit):
     def _config(self):
         self.DATA_WIDTH = Param(7 + 4)
         self.IN_IS_BIGENDIAN = Param(False)
+        self.OPTIMIZE_XOR_TREE = Param(False)
         self.setConfig(CRC_5_USB)
 
     def setConfig(self, crcConfigCls):
@@ -83,12 +90,10 @@ class CrcComb(Unit):
         # LSB is usuaaly 1
         return polyCoefs, PW
 
-    # based on
-    # hhttps://github.com/alexforencich/fpga-utils/blob/master/crcgen.py
     @staticmethod
     def buildCrcXorMatrix(data_width: int,
-                          polyBits: List[bool]) -> List[Tuple[List[bool],
-                                                              List[bool]]]:
+                          polyBits: List[bool]) -> List[Tuple[List[int],
+                                                              List[int]]]:
         """
         :param data_width: number of bits in input
             (excluding bits of signal wit current crc state)
@@ -97,55 +102,86 @@ class CrcComb(Unit):
         :return: crc_mask contains rows where each row describes which bits
             should be XORed to get bit of resut
             row is [mask_for_state_reg, mask_for_data]
+
+        :note: This is an unpacked variant of :meth:`~.buildCrcXorMatrixPacked`
         """
         DW = data_width
         PW = len(polyBits)
-        # list index is output bit index
-        # initial state is 1:1 mapping from previous state to next state
-        crc_mask = deque([
-            [[int(x == y) for y in range(PW)], [0] * DW]
-            for x in range(PW)
-        ])
-
-        for i in range(DW - 1, -1, -1):
-            # determine shift in value
-            # current value in last FF, XOR with input data bit (MSB first)
-            val = crc_mask[-1]
-            val[1][i] = int(not val[1][i])
-
-            # shift
-            crc_mask.appendleft(val)
-            crc_mask.pop()
-
-            # add XOR inputs at correct indicies
-            first = True
-            val_s, val_d = val
-            for cm, pb in zip(crc_mask, polyBits):
-                if first:
-                    first = False
-                elif pb:
-                    cm[0] = [a ^ b for a, b in zip(cm[0], val_s)]
-                    cm[1] = [a ^ b for a, b in zip(cm[1], val_d)]
-
-        return crc_mask
+        return [[[get_bit(stateMask, y) for y in range(PW)],
+                 [get_bit(dataMask, x) for x in range(DW)]]
+                for stateMask, dataMask in CrcComb.buildCrcXorMatrixPacked(DW, polyBits)]
+
+    @staticmethod
+    def buildCrcXorMatrixPacked(data_width: int,
+                                polyBits: List[bool]) -> Tuple[Tuple[int, int], ...]:
+        """
+        Same as :meth:`~.buildCrcXorMatrix` but the masks in rows are packed in to ints
+        (bit i of the mask corresponds to item i in unpacked list)
+
+        :note: the result is cached per (data_width, polyBits)
+        """
+        return _buildCrcXorMatrixPacked(int(data_width), tuple(int(b) for b in polyBits))
+
+    @staticmethod
+    def buildCrcXorNetwork(data_width: int, polyBits: List[bool]) -> XorNetwork:
+        """
+        Build network of XOR gates with shared subexpressions for the matrix
+        from :meth:`~.buildCrcXorMatrixPacked`, inputs of the network are the state bits
+        followed by the data bits, (:meth:`XorNetwork.report` for gate count and depth)
+
+        :note: the result is cached per (data_width, polyBits)
+        """
+        return _buildCrcXorNetwork(int(data_width), tuple(int(b) for b in polyBits))
 
     @classmethod
-    def applyCrcXorMatrix(cls, crcMatrix: List[List[List[int]]],
+    def applyCrcXorMatrix(cls, crcMatrix: Union[Tuple[Tuple[int, int], ...], List[List[List[int]]]],
                           inBits: List[RtlSignal], stateBits: List[Union[RtlSignal, BitsVal]],
-                          refin: bool) -> List:
+                          refin: bool, xorNetwork: Optional[XorNetwork]=None,
+                          parent: Optional[Unit]=None, name_prefix: str="crc_xor") -> List:
+        """
+        :param crcMatrix: matrix from :meth:`~.buildCrcXorMatrixPacked` (rows of int masks)
+            or from :meth:`~.buildCrcXorMatrix` (rows of lists of bits)
+        :param xorNetwork: optional network from :meth:`~.buildCrcXorNetwork`
+            for this matrix, if specified it is used instead of XOR chains
+        :param parent: if specified the shared XOR subexpressions of xorNetwork
+            are wrapped in to signals in this unit (otherwise they are duplicated in HDL)
+        :param name_prefix: name prefix for the signals of shared XOR subexpressions
+        """
         if refin:
             inBits = bit_list_reversed_bits_in_bytes(inBits, extend=False)
+
+        if xorNetwork is not None:
+            assert xorNetwork.input_cnt == len(stateBits) + len(inBits), (
+                xorNetwork.input_cnt, len(stateBits), len(inBits))
+            if parent is None:
+                wrap_shared = None
+            else:
+
+                def wrap_shared(v, i):
+                    if isinstance(v, HValue):
+                        return v
+                    return rename_signal(parent, v, f"{name_prefix:s}_{i:d}")
+
+            outBits = xorNetwork.build(list(stateBits) + list(inBits),
+                                       xor=_xor_const_folding,
+                                       zero=BIT.from_py(0),
+                                       wrap_shared=wrap_shared)
+            assert len(outBits) == len(stateBits)
+            return outBits
+
         outBits = []
         for (stateMask, dataMask) in crcMatrix:
+            stateMask = _packMask(stateMask, len(stateBits))
+            dataMask = _packMask(dataMask, len(inBits))
             v = BIT.from_py(0)  # neutral value for XOR
-            assert len(stateMask) == len(stateBits)
-            for useBit, b in zip(stateMask, stateBits):
-                if useBit:
+            assert stateMask >> len(stateBits) == 0, (stateMask, len(stateBits))
+            for i, b in enumerate(stateBits):
+                if (stateMask >> i) & 1:
                     v = v ^ b
 
-            assert len(dataMask) == len(inBits), (len(dataMask), len(inBits))
-            for useBit, b in zip(dataMask, inBits):
-                if useBit:
+            assert dataMask >> len(inBits) == 0, (dataMask, len(inBits))
+            for i, b in enumerate(inBits):
+                if (dataMask >> i) & 1:
                     v = v ^ b
 
             outBits.append(v)
@@ -172,10 +208,14 @@ class CrcComb(Unit):
             # we need to process lower byte first
             inBits = bit_list_reversed_endianity(inBits, extend=False)
 
-        crcMatrix = self.buildCrcXorMatrix(DW, polyBits)
+        crcMatrix = self.buildCrcXorMatrixPacked(DW, polyBits)
+        if self.OPTIMIZE_XOR_TREE:
+            xorNetwork = self.buildCrcXorNetwork(DW, polyBits)
+        else:
+            xorNetwork = None
         res = self.applyCrcXorMatrix(
             crcMatrix, inBits,
-            initBits, bool(self.REFIN))
+            initBits, bool(self.REFIN), xorNetwork, self)
 
         if self.REFOUT:
             res = list(reversed(res))
@@ -186,6 +226,126 @@ class CrcComb(Unit):
             ob(b ^ fb)
 
 
+def _gf2_mat_mul(a: List[int], b: List[int]) -> List[int]:
+    """
+    Multiply two square GF(2) matrices with rows packed in ints (a * b)
+    """
+    res = []
+    for row in a:
+        r = 0
+        j = 0
+        while row:
+            if row & 1:
+                r ^= b[j]
+            row >>= 1
+            j += 1
+        res.append(r)
+    return res
+
+
+# based on
+# hhttps://github.com/alexforencich/fpga-utils/blob/master/crcgen.py
+@lru_cache(maxsize=None)
+def _buildCrcXorMatrixPacked(DW: int, polyBits: Tuple[int, ...]) -> Tuple[Tuple[int, int], ...]:
+    """
+    :see: :meth:`CrcComb.buildCrcXorMatrixPacked`
+
+    The CRC register is a Galois LFSR processing data MSB first (data bit DW-1 first).
+    Next state matrix for a single input bit is A, the state part of the result is A^DW
+    (computed by repeated squaring), data bit i is added to the state before the last
+    i steps, that means its column in the matrix is A^i * poly.
+    """
+    PW = len(polyBits)
+    msb = PW - 1
+    # bit 0 is always used as a feedback (the LSB of the polynome is expected to be 1)
+    poly = 1
+    for i, b in enumerate(polyBits):
+        if b and i > 0:
+            poly |= 1 << i
+    word_mask = (1 << PW) - 1
+
+    # one bit step matrix
+    step = [1 << msb]
+    for i in range(1, PW):
+        r = 1 << (i - 1)
+        if (poly >> i) & 1:
+            r |= 1 << msb
+        step.append(r)
+
+    # state part: step^DW
+    state = [1 << i for i in range(PW)]
+    p = step
+    e = DW
+    while e:
+        if e & 1:
+            state = _gf2_mat_mul(state, p)
+        e >>= 1
+        if e:
+            p = _gf2_mat_mul(p, p)
+
+    # data part, column i is step^i * poly, transpose it to rows
+    data = [0 for _ in range(PW)]
+    col = poly
+    for i in range(DW):
+        c = col
+        r = 0
+        while c:
+            if c & 1:
+                data[r] |= 1 << i
+            c >>= 1
+            r += 1
+        if col >> msb:
+            col = ((col << 1) & word_mask) ^ poly
+        else:
+            col <<= 1
+
+    return tuple(zip(state, data))
+
+
+def _packMask(mask: Union[int, List[int]], width: int) -> int:
+    """
+    Convert the list of bits (the format of :meth:`CrcComb.buildCrcXorMatrix`)
+    to int mask (the format of :meth:`CrcComb.buildCrcXorMatrixPacked`)
+    """
+    if isinstance(mask, int):
+        return mask
+    assert len(mask) == width, (len(mask), width)
+    res = 0
+    for i, b in enumerate(mask):
+        if b:
+            res |= 1 << i
+    return res
+
+
+@lru_cache(maxsize=None)
+def _buildCrcXorNetwork(DW: int, polyBits: Tuple[int, ...]) -> XorNetwork:
+    PW = len(polyBits)
+    rows = [stateMask | (dataMask << PW)
+            for stateMask, dataMask in _buildCrcXorMatrixPacked(DW, polyBits)]
+    return XorNetwork(rows, PW + DW)
+
+
+def _xor_const_folding(a: Union[RtlSignal, HValue], b: Union[RtlSignal, HValue]):
+    """
+    XOR of two bits, constant inputs are resolved
+    (e.g. the state of :class:`~.CrcComb` is a constant)
+    """
+    a_is_const = isinstance(a, HValue)
+    b_is_const = isinstance(b, HValue)
+    if a_is_const and b_is_const:
+        return a ^ b
+    elif b_is_const:
+        a, b = b, a
+    elif not a_is_const:
+        return a ^ b
+
+    # a is constant
+    if int(a):
+        return ~b
+    else:
+        return b
+
+
 if __name__ == "__main__":
     from hwt.synthesizer.utils import to_rtl_str
     # from hwtLib.logic.crcPoly import CRC_32
@@ -199,6 +359,7 @@ if __name__ == "__main__":
     # https://github.com/hdl4fpga/hdl4fpga/blob/2a18e546cfcd1f1c38e19705842243e776e019d1/library/usb/usbhost/usbh_crc5.v
     u.setConfig(CRC_5_USB)
     u.DATA_WIDTH = 7 + 4
+    # u.OPTIMIZE_XOR_TREE = True
     # u.REFIN = u.REFOUT = False
     # u.IN_IS_BIGENDIAN = True
     # https://github.com/nandland/nandland/blob/master/CRC/Verilog/source/CRC_16_CCITT_Parallel.v
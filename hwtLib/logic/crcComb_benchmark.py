@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Timing of the construction of the CRC XOR matrix
+(the bit serial list based construction and :func:`hwtLib.logic.crcComb._buildCrcXorMatrixPacked`)
+"""
+
+from time import perf_counter
+
+from hwtLib.logic.crcComb import CrcComb, _buildCrcXorMatrixPacked
+from hwtLib.logic.crcComb_test import buildCrcXorMatrix_bit_serial, crcToBf
+from hwtLib.logic.crcPoly import CRC_32, CRC_64_ECMA
+
+
+def benchmark_crc_xor_matrix(poly, DW=512):
+    polyBits = crcToBf(poly)
+    t0 = perf_counter()
+    buildCrcXorMatrix_bit_serial(DW, polyBits)
+    t_lists = perf_counter() - t0
+
+    _buildCrcXorMatrixPacked.cache_clear()
+    t0 = perf_counter()
+    CrcComb.buildCrcXorMatrixPacked(DW, polyBits)
+    t_packed = perf_counter() - t0
+
+    t0 = perf_counter()
+    CrcComb.buildCrcXorMatrixPacked(DW, polyBits)
+    t_packed_cached = perf_counter() - t0
+    return t_lists, t_packed, t_packed_cached
+
+
+if __name__ == "__main__":
+    for poly in [CRC_32, CRC_64_ECMA]:
+        for DW in [512, 1024]:
+            t_lists, t_packed, t_packed_cached = benchmark_crc_xor_matrix(poly, DW)
+            print(f"{poly.__name__:s} {DW:d}b xor matrix: bit lists {t_lists * 1e3:.2f}ms,"
+                  f" packed {t_packed * 1e3:.2f}ms, packed (cached) {t_packed_cached * 1e3:.3f}ms")
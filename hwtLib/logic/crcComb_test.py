@@ -2,13 +2,16 @@
 # -*- coding: utf-8 -*-
 
 from binascii import crc32, crc_hqx
+from collections import deque
 import os
 
 from hwt.hdl.constants import Time
+from hwt.hdl.types.defs import BIT
 from hwt.simulator.simTestCase import SimTestCase
 from hwtLib.logic.crcComb import CrcComb
 from hwtLib.logic.crcPoly import CRC_1, CRC_8_CCITT, CRC_16_CCITT, CRC_32, \
-    CRC_8_SAE_J1850, CRC_5_USB
+    CRC_8_SAE_J1850, CRC_5_USB, CRC_32C, CRC_16_DNP, CRC_64_ECMA
+from hwtLib.logic.crcSw import crc_sw
 from pyMathBitPrecise.bit_utils import get_bit, bit_list_to_int, mask, \
     bit_list_reversed_endianity, bit_list_reversed_bits_in_bytes, reverse_bits
 from hwt.hdl.types.bits import Bits
@@ -24,6 +27,43 @@ def crcToBf(crc):
     return [get_bit(crc.POLY, i) for i in range(crc.WIDTH)]
 
 
+def buildCrcXorMatrix_bit_serial(data_width, polyBits):
+    """
+    Reference implementation of :meth:`CrcComb.buildCrcXorMatrix`
+    which is simulating the LFSR bit by bit on lists of bits
+    """
+    DW = data_width
+    PW = len(polyBits)
+    # list index is output bit index
+    # initial state is 1:1 mapping from previous state to next state
+    crc_mask = deque([
+        [[int(x == y) for y in range(PW)], [0] * DW]
+        for x in range(PW)
+    ])
+
+    for i in range(DW - 1, -1, -1):
+        # determine shift in value
+        # current value in last FF, XOR with input data bit (MSB first)
+        val = crc_mask[-1]
+        val[1][i] = int(not val[1][i])
+
+        # shift
+        crc_mask.appendleft(val)
+        crc_mask.pop()
+
+        # add XOR inputs at correct indicies
+        first = True
+        val_s, val_d = val
+        for cm, pb in zip(crc_mask, polyBits):
+            if first:
+                first = False
+            elif pb:
+                cm[0] = [a ^ b for a, b in zip(cm[0], val_s)]
+                cm[1] = [a ^ b for a, b in zip(cm[1], val_d)]
+
+    return list(crc_mask)
+
+
 def naive_crc(dataBits, crcBits, polyBits,
               refin=False, refout=False):
     crc_mask = CrcComb.buildCrcXorMatrix(len(dataBits), polyBits)
@@ -70,7 +110,8 @@ class CrcCombTC(SimTestCase):
                  refout=None,
                  initval=None,
                  finxor=None,
-                 bigendian=False):
+                 bigendian=False,
+                 optimize_xor_tree=False):
         if dataWidth is None:
             dataWidth = poly.WIDTH
 
@@ -86,6 +127,7 @@ class CrcCombTC(SimTestCase):
         if finxor is not None:
             u.XOROUT = Bits(poly.WIDTH).from_py(finxor)
         u.IN_IS_BIGENDIAN = bigendian
+        u.OPTIMIZE_XOR_TREE = optimize_xor_tree
         self.compileSimAndStart(u)
         return u
 
@@ -203,6 +245,45 @@ class CrcCombTC(SimTestCase):
         ref = crc32(inp) & 0xffffffff
         self.assertEqual(out, ref, f"0x{out:08X} 0x{ref:08X}")
 
+    def test_crc_sw(self, optimize_xor_tree=False):
+        for i, (poly, inp) in enumerate([(CRC_32C, b"abcd"),
+                                         (CRC_8_SAE_J1850, b"x"),
+                                         (CRC_16_DNP, b"ab"),
+                                         (CRC_32, b"abcdefgh")]):
+            u = self.setUpCrc(poly, dataWidth=len(inp) * 8,
+                              optimize_xor_tree=optimize_xor_tree)
+            u.dataIn._ag.data.append(stoi(inp))
+            self.runSim(20 * Time.ns, name=os.path.join(self.DEFAULT_LOG_DIR,
+                                                        f"test_crc_sw_{i:d}.vcd"))
+            out = int(u.dataOut._ag.data[-1])
+            ref = crc_sw(poly, inp)
+            self.assertEqual(out, ref, f"{poly.__name__:s} 0x{out:X} 0x{ref:X}")
+
+    def test_crc_sw_optimized_xor_tree(self):
+        self.test_crc_sw(optimize_xor_tree=True)
+
+    def test_xor_matrix_same_as_bit_serial(self):
+        for poly in [CRC_1, CRC_5_USB, CRC_8_CCITT, CRC_16_CCITT, CRC_32, CRC_64_ECMA]:
+            polyBits = crcToBf(poly)
+            for DW in [1, 5, 8, 13, 32, 64, 100]:
+                self.assertSequenceEqual(
+                    CrcComb.buildCrcXorMatrix(DW, polyBits),
+                    buildCrcXorMatrix_bit_serial(DW, polyBits),
+                    (poly, DW))
+
+    def test_xor_matrix_both_formats(self, DW=64):
+        # applyCrcXorMatrix accepts the packed matrix and the matrix of bit lists
+        for poly in [CRC_32, CRC_64_ECMA]:
+            polyBits = crcToBf(poly)
+            PW = len(polyBits)
+            stateBits = [BIT.from_py(get_bit(0x1234567890abcdef, i)) for i in range(PW)]
+            inBits = [BIT.from_py(get_bit(0xfedcba0987654321, i)) for i in range(DW)]
+            res_packed = CrcComb.applyCrcXorMatrix(
+                CrcComb.buildCrcXorMatrixPacked(DW, polyBits), inBits, stateBits, False)
+            res_lists = CrcComb.applyCrcXorMatrix(
+                CrcComb.buildCrcXorMatrix(DW, polyBits), inBits, stateBits, False)
+            self.assertSequenceEqual([int(b) for b in res_packed], [int(b) for b in res_lists])
+
     def test_crc16(self):
         for i, inp in enumerate([b"aa", b"ab", b"x6"]):
             self.setUpCrc(CRC_16_CCITT)
@@ -0,0 +1,222 @@
+"""
+Table driven software implementation of CRC for any :class:`~.CRC_POLY`
+configuration, meant to be used as a golden model in tests.
+
+The lookup tables for slicing-by-N algorithm are generated from the CRC_POLY
+class and cached per (WIDTH, POLY, REFIN, N), INIT, REFOUT and XOROUT are applied
+only on the register value and do not affect the tables.
+
+:note: The configurations which are covered by :mod:`binascii`
+    (reflected CRC-32 with POLY=0x04C11DB7 and non-reflected 16b POLY=0x1021)
+    are computed by :func:`binascii.crc32`/:func:`binascii.crc_hqx`
+    as this is substantially faster than anything else in pure Python.
+"""
+from binascii import crc32, crc_hqx
+from functools import lru_cache
+from typing import Tuple, Type, Union
+
+from hwtLib.logic.crcPoly import CRC_POLY
+from pyMathBitPrecise.bit_utils import mask, reverse_bits
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+@lru_cache(maxsize=None)
+def crc_table(WIDTH: int, POLY: int, REFIN: bool, SLICES: int=8) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Build lookup tables for slicing-by-SLICES CRC algorithm
+
+    :param WIDTH: width of CRC register
+    :param POLY: CRC polynome in normal (MSB first) notation without the leading 1
+    :param REFIN: if True the tables are for reflected (LSB first) algorithm
+    :param SLICES: number of tables (number of bytes processed in a single step)
+    :return: tuple of SLICES tables, each with 256 items, table[k][b] is the CRC register
+        after processing of the byte b followed by k zero bytes
+        (starting with zero register)
+
+    :note: for non-reflected CRC with WIDTH < 8 the register is shifted
+        to the top of 8b register (tables are for max(WIDTH, 8) wide register)
+    """
+    if REFIN:
+        W = WIDTH
+        poly = reverse_bits(POLY, WIDTH)
+        t0 = []
+        for b in range(256):
+            r = b
+            for _ in range(8):
+                if r & 1:
+                    r = (r >> 1) ^ poly
+                else:
+                    r >>= 1
+            t0.append(r)
+    else:
+        W = max(WIDTH, 8)
+        poly = POLY << (W - WIDTH)
+        top = 1 << (W - 1)
+        m = mask(W)
+        t0 = []
+        for b in range(256):
+            r = b << (W - 8)
+            for _ in range(8):
+                if r & top:
+                    r = ((r << 1) & m) ^ poly
+                else:
+                    r <<= 1
+            t0.append(r)
+
+    tables = [tuple(t0), ]
+    prev = t0
+    for _ in range(SLICES - 1):
+        if REFIN:
+            t = [(r >> 8) ^ t0[r & 0xff] for r in prev]
+        else:
+            t = [((r << 8) & m) ^ t0[r >> (W - 8)] for r in prev]
+        tables.append(tuple(t))
+        prev = t
+
+    return tuple(tables)
+
+
+class CrcSw():
+    """
+    Software CRC engine (table driven, slicing-by-N)
+
+    .. code-block:: python
+
+        crc = CrcSw(CRC_32C)
+        crc(b"123456789") == CRC_32C.CHECK
+
+        # incremental processing
+        s = crc.init_state()
+        s = crc.update(b"1234", s)
+        s = crc.update(memoryview(b"56789"), s)
+        crc.finalize(s) == CRC_32C.CHECK
+
+    :ivar ~.state: the state is the value of CRC register (reflected if REFIN,
+        shifted to 8b if not REFIN and WIDTH < 8)
+    """
+
+    def __init__(self, crc_cls: Type[CRC_POLY], slices: int=8,
+                 use_binascii: bool=True):
+        """
+        :param crc_cls: CRC configuration
+        :param slices: number of bytes processed in a single step (typically 8 or 16)
+        :param use_binascii: if True the configurations supported by :mod:`binascii`
+            are computed using binascii
+        """
+        assert slices >= 1, slices
+        self.crc_cls = crc_cls
+        self.WIDTH = W = crc_cls.WIDTH
+        self.POLY = crc_cls.POLY
+        self.REFIN = bool(crc_cls.REFIN)
+        self.REFOUT = bool(crc_cls.REFOUT)
+        self.INIT = int(crc_cls.INIT)
+        self.XOROUT = int(crc_cls.XOROUT)
+        self.slices = slices
+        self.tables = crc_table(W, self.POLY, self.REFIN, slices)
+        if self.REFIN:
+            self._shift = 0
+        else:
+            self._shift = max(W, 8) - W
+
+        self._binascii_update = None
+        if use_binascii:
+            if W == 32 and self.POLY == 0x04C11DB7 and self.REFIN:
+                self._binascii_update = self._update_crc32
+            elif W == 16 and self.POLY == 0x1021 and not self.REFIN:
+                self._binascii_update = self._update_crc_hqx
+
+    def init_state(self) -> int:
+        init = self.INIT
+        if self.REFIN:
+            return reverse_bits(init, self.WIDTH)
+        else:
+            return init << self._shift
+
+    def finalize(self, state: int) -> int:
+        """
+        Convert the CRC register to a CRC value (apply REFOUT and XOROUT)
+        """
+        W = self.WIDTH
+        v = state >> self._shift
+        if self.REFIN != self.REFOUT:
+            v = reverse_bits(v, W)
+        return v ^ self.XOROUT
+
+    @staticmethod
+    def _update_crc32(data: BytesLike, state: int) -> int:
+        # binascii.crc32 complements the register on input and output
+        return crc32(data, state ^ 0xffffffff) ^ 0xffffffff
+
+    @staticmethod
+    def _update_crc_hqx(data: BytesLike, state: int) -> int:
+        return crc_hqx(data, state)
+
+    def update(self, data: BytesLike, state: int) -> int:
+        """
+        Process the data and return the new state of CRC register
+
+        :param data: bytes, bytearray or memoryview (of bytes)
+        :param state: CRC register value (:meth:`~.init_state` for new CRC)
+        """
+        if self._binascii_update is not None:
+            return self._binascii_update(data, state)
+
+        if isinstance(data, memoryview) and data.itemsize != 1:
+            data = data.cast("B")
+
+        tables = self.tables
+        t0 = tables[0]
+        N = self.slices
+        size = len(data)
+        i = 0
+        if self.REFIN:
+            W = self.WIDTH
+            byteorder = "little"
+            s_shift = 0
+        else:
+            W = self.WIDTH + self._shift
+            byteorder = "big"
+            s_shift = 8 * N - W
+
+        if W <= 8 * N and size >= N:
+            # slicing-by-N, the first byte is processed by the last table
+            tables_rev = tables[::-1]
+            end = size - size % N
+            from_bytes = int.from_bytes
+            while i < end:
+                x = from_bytes(data[i:i + N], byteorder) ^ (state << s_shift)
+                state = 0
+                for t, b in zip(tables_rev, x.to_bytes(N, byteorder)):
+                    state ^= t[b]
+                i += N
+
+        # the remaining bytes byte by byte
+        if self.REFIN:
+            for b in data[i:]:
+                state = (state >> 8) ^ t0[(state ^ b) & 0xff]
+        else:
+            m = mask(W)
+            top_shift = W - 8
+            for b in data[i:]:
+                state = ((state << 8) & m) ^ t0[(state >> top_shift) ^ b]
+
+        return state
+
+    def __call__(self, data: BytesLike) -> int:
+        """
+        Compute CRC of the data
+        """
+        return self.finalize(self.update(data, self.init_state()))
+
+
+@lru_cache(maxsize=None)
+def _crc_sw_cached(crc_cls: Type[CRC_POLY], slices: int) -> CrcSw:
+    return CrcSw(crc_cls, slices)
+
+
+def crc_sw(crc_cls: Type[CRC_POLY], data: BytesLike, slices: int=8) -> int:
+    """
+    Compute CRC of the data using cached :class:`~.CrcSw` instance for this configuration
+    """
+    return _crc_sw_cached(crc_cls, slices)(data)
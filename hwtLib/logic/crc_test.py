@@ -9,7 +9,8 @@ from hwt.pyUtils.arrayQuery import grouper
 from hwt.simulator.simTestCase import SimTestCase
 from hwtLib.logic.crc import Crc
 from hwtLib.logic.crcComb_test import stoi
-from hwtLib.logic.crcPoly import CRC_32
+from hwtLib.logic.crcPoly import CRC_32, CRC_32C, CRC_64_ECMA
+from hwtLib.logic.crcSw import crc_sw
 from pyMathBitPrecise.bit_utils import mask
 from hwt.hdl.types.bits import Bits
 
@@ -44,7 +45,8 @@ class CrcTC(SimTestCase):
                  refin=None, refout=None,
                  initval=None, finxor=None,
                  use_mask=False,
-                 is_bigendian=False):
+                 is_bigendian=False,
+                 optimize_xor_tree=False):
         if dataWidth is None:
             dataWidth = poly.WIDTH
 
@@ -61,6 +63,7 @@ class CrcTC(SimTestCase):
             u.XOROUT = Bits(poly.WIDTH).from_py(finxor)
         u.MASK_GRANULARITY = 8 if use_mask else None
         u.IN_IS_BIGENDIAN = is_bigendian
+        u.OPTIMIZE_XOR_TREE = optimize_xor_tree
 
         self.compileSimAndStart(u)
         return u
@@ -266,6 +269,36 @@ class CrcTC(SimTestCase):
         self.assertEqual(out, ref, "0x{:08X} 0x{:08X}".format(out, ref))
 
 
+    def test_240B_CRC32C(self, optimize_xor_tree=False):
+        u = self.setUpCrc(CRC_32C, optimize_xor_tree=optimize_xor_tree)
+
+        u.dataIn._ag.data += [stoi(d) for d in grouper(4, C_240B)]
+        self.runSim((3 + len(u.dataIn._ag.data)) * 10 * Time.ns)
+        out = int(u.dataOut._ag.data[-1])
+        ref = crc_sw(CRC_32C, C_240B)
+        self.assertEqual(out, ref, "0x{:08X} 0x{:08X}".format(out, ref))
+
+    def test_240B_CRC32C_optimized_xor_tree(self):
+        self.test_240B_CRC32C(optimize_xor_tree=True)
+
+    def test_CRC64_ECMA_mask(self, optimize_xor_tree=False):
+        u = self.setUpCrc(CRC_64_ECMA, dataWidth=32, use_mask=True,
+                          optimize_xor_tree=optimize_xor_tree)
+        inp = b"abcdefg"
+
+        u.dataIn._ag.data.extend([
+            (stoi(inp[0:4]), mask(32 // 8), 0),
+            (stoi(inp[4:]), mask(24 // 8), 1)
+        ])
+        self.runSim(40 * Time.ns)
+        out = int(u.dataOut._ag.data[-1])
+        ref = crc_sw(CRC_64_ECMA, inp)
+        self.assertEqual(out, ref, "0x{:016X} 0x{:016X}".format(out, ref))
+
+    def test_CRC64_ECMA_mask_optimized_xor_tree(self):
+        self.test_CRC64_ECMA_mask(optimize_xor_tree=True)
+
+
 if __name__ == "__main__":
     import unittest
     suite = unittest.TestSuite()
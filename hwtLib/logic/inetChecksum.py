@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List
+
+from hwt.code import If, Concat
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
+from hwt.interfaces.std import Handshaked
+from hwt.interfaces.utils import addClkRstn
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axis import AxiStream
+
+
+def zext(sig: RtlSignal, width: int) -> RtlSignal:
+    """
+    Zero extend the unsigned signal to specified width
+    """
+    w = sig._dtype.bit_length()
+    if w == width:
+        return sig
+    assert w < width, (sig, width)
+    return Concat(Bits(width - w).from_py(0), sig)
+
+
+def ones_complement_fold(s: RtlSignal) -> RtlSignal:
+    """
+    Fold the carries of the sum of 16b words back to the lower 16b
+    (end-around carry)
+
+    :return: 16b ones' complement sum
+    """
+    w = s._dtype.bit_length()
+    # the max value which can appear in s
+    max_val = (1 << w) - 1
+    while max_val > 0xffff:
+        hi = max_val >> 16
+        max_val = max((max_val & 0xffff) + hi, 0xffff + hi - 1)
+        res_w = max(max_val.bit_length(), 16)
+        s = zext(s[16:], res_w) + zext(s[:16], res_w)
+        w = res_w
+    if w > 16:
+        s = s[16:]
+    return s
+
+
+def ones_complement_add(a: RtlSignal, b: RtlSignal) -> RtlSignal:
+    """
+    16b ones' complement addition
+    """
+    return ones_complement_fold(zext(a, 17) + zext(b, 17))
+
+
+def sum_tree(items: List[RtlSignal]) -> RtlSignal:
+    """
+    Build balanced tree of adders, each level of tree extends the width by 1b
+    so the sum never overflows
+    """
+    assert items
+    while len(items) > 1:
+        w = max(i._dtype.bit_length() for i in items) + 1
+        _items = []
+        for i in range(0, len(items) - 1, 2):
+            _items.append(zext(items[i], w) + zext(items[i + 1], w))
+        if len(items) % 2:
+            _items.append(zext(items[-1], w))
+        items = _items
+    return items[0]
+
+
+class InetChecksum(Unit):
+    """
+    16b ones' complement sum of a frame (Internet checksum, RFC 1071, used in IPv4/UDP/TCP/ICMP)
+    for AxiStream of any DATA_WIDTH which is a multiple of 16.
+
+    All 16b words of the input data word are summed in a wide adder tree
+    in a single clock cycle, the sum of the data word is then registered
+    and accumulated, the component accepts one data word per clock cycle.
+
+    The bytes with keep=0 are ignored (as if they were not present in frame),
+    the frame may start on any byte of the data word (the frame may also start with
+    data words which have all bytes disabled), the pairing of bytes to 16b words
+    is always relative to the first byte of the frame. Byte 0 of the frame is in LSB
+    of the data and it is the MSB of the first 16b word (network byte order).
+
+    :ivar ~.dataOut: ones' complement sum of the frame (not inverted),
+        the checksum of the data is ~sum, the sum of the frame with a correct checksum is 0xffff
+
+    :note: the accumulator is 32b, the frame may have up to 64Ki of 16b words
+    :note: the pseudo header of UDP/TCP can be added to the sum using :func:`~.ones_complement_add`
+        (:see: :class:`hwtLib.peripheral.ethernet.inet_checksum_offload.Ipv4ChecksumVerify`)
+
+    .. hwt-autodoc:: _example_InetChecksum
+    """
+
+    def _config(self):
+        AxiStream._config(self)
+        self.USE_KEEP = True
+        self.DATA_WIDTH = 64
+
+    def _declr(self):
+        assert self.DATA_WIDTH % 16 == 0, ("Data word has to be composed of whole 16b words", self.DATA_WIDTH)
+        assert not (self.USE_KEEP and self.USE_STRB), "Only one of the byte masks is supported"
+        addClkRstn(self)
+        with self._paramsShared():
+            self.dataIn = AxiStream()
+        self.dataOut = Handshaked()._m()
+        self.dataOut.DATA_WIDTH = 16
+
+    def _impl(self):
+        din = self.dataIn
+        dout = self.dataOut
+        B_CNT = self.DATA_WIDTH // 8
+        if self.USE_KEEP:
+            m = din.keep
+        elif self.USE_STRB:
+            m = din.strb
+        else:
+            m = Bits(B_CNT).from_py(-1)
+
+        # sum of the data word (bytes with keep=0 are replaced by 0)
+        byte_t = Bits(8)
+        bytes_ = []
+        for i in range(B_CNT):
+            b = din.data[(i + 1) * 8:i * 8]
+            if self.USE_KEEP or self.USE_STRB:
+                b = m[i]._ternary(b, byte_t.from_py(0))
+            bytes_.append(b)
+        words = [Concat(bytes_[i], bytes_[i + 1]) for i in range(0, B_CNT, 2)]
+        word_sum = rename_signal(self, sum_tree(words), "word_sum")
+
+        # the first byte of the frame is on odd position
+        # (the bytes of the 16b words are swapped, the result has to be swapped as well)
+        first_odd = BIT.from_py(0)
+        for i in reversed(range(B_CNT)):
+            first_odd = m[i]._ternary(BIT.from_py(i % 2), first_odd)
+        first_odd = rename_signal(self, first_odd, "first_odd")
+
+        frame_started = self._reg("frame_started", def_val=0)
+        frame_odd = self._reg("frame_odd", def_val=0)
+        odd = frame_started._ternary(frame_odd, first_odd)
+
+        # stage 1, registered sum of the data word
+        st1_vld = self._reg("st1_vld", def_val=0)
+        st1_sum = self._reg("st1_sum", word_sum._dtype)
+        st1_last = self._reg("st1_last")
+        st1_odd = self._reg("st1_odd")
+
+        # stage 2, accumulator and output register
+        acc = self._reg("acc", Bits(32), def_val=0)
+        out_vld = self._reg("out_vld", def_val=0)
+        out_sum = self._reg("out_sum", Bits(16))
+        out_free = ~out_vld | dout.rd
+        st1_ack = ~st1_last | out_free
+        st1_en = rename_signal(self, ~st1_vld | st1_ack, "st1_en")
+
+        din.ready(st1_en)
+        din_ack = din.valid & st1_en
+        If(din_ack,
+            If(din.last,
+               frame_started(0),
+            ).Elif(~frame_started & (m != 0),
+               frame_started(1),
+               frame_odd(first_odd),
+            )
+        )
+        If(st1_en,
+           st1_vld(din.valid),
+           st1_sum(word_sum),
+           st1_last(din.last),
+           st1_odd(odd),
+        )
+
+        acc_next = rename_signal(self, acc + zext(st1_sum, 32), "acc_next")
+        res = rename_signal(self, ones_complement_fold(acc_next), "res")
+        If(st1_vld & st1_ack,
+            If(st1_last,
+               acc(0),
+               out_sum(st1_odd._ternary(Concat(res[8:], res[16:8]), res)),
+            ).Else(
+               acc(acc_next),
+            )
+        )
+        If(st1_vld & st1_last & out_free,
+           out_vld(1),
+        ).Elif(dout.rd,
+           out_vld(0),
+        )
+        dout.vld(out_vld)
+        dout.data(out_sum)
+
+
+def _example_InetChecksum():
+    u = InetChecksum()
+    u.DATA_WIDTH = 64
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_InetChecksum()
+    print(to_rtl_str(u))
@@ -0,0 +1,38 @@
+"""
+Software implementation of the Internet checksum (RFC 1071),
+meant to be used as a golden model in tests.
+"""
+from typing import Union
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def ones_complement_add(a: int, b: int) -> int:
+    """
+    16b ones' complement addition
+    """
+    s = a + b
+    while s > 0xffff:
+        s = (s & 0xffff) + (s >> 16)
+    return s
+
+
+def ones_complement_sum(data: BytesLike, init: int=0) -> int:
+    """
+    16b ones' complement sum of big-endian 16b words of data,
+    odd number of bytes is padded with 0
+
+    :param init: value which is added to the sum (e.g. the sum of a pseudo header)
+    """
+    if len(data) % 2:
+        data = bytes(data) + b"\x00"
+    s = init + sum(int.from_bytes(data[i:i + 2], "big") for i in range(0, len(data), 2))
+    return ones_complement_add(s, 0)
+
+
+def inet_checksum(data: BytesLike, init: int=0) -> int:
+    """
+    :return: the Internet checksum of the data (the value of the checksum field
+        has to be 0 in data)
+    """
+    return ~ones_complement_sum(data, init) & 0xffff
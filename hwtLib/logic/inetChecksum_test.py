@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axis import axis_send_bytes
+from hwtLib.logic.inetChecksum import InetChecksum
+from hwtLib.logic.inetChecksumSw import ones_complement_sum, inet_checksum
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitCombStable
+
+
+class InetChecksum_64b_TC(SimTestCase):
+    DW = 64
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = InetChecksum()
+        u.DATA_WIDTH = cls.DW
+        cls.compileSim(u)
+
+    def send_frames(self, frames, offsets=None):
+        u = self.u
+        for i, f in enumerate(frames):
+            axis_send_bytes(u.dataIn, f, offset=0 if offsets is None else offsets[i])
+
+    def test_nop(self):
+        self.runSim(CLK_PERIOD * 10)
+        self.assertEmpty(self.u.dataOut._ag.data)
+
+    def test_sw_reference(self):
+        # RFC 1071 example
+        data = bytes([0x00, 0x01, 0xf2, 0x03, 0xf4, 0xf5, 0xf6, 0xf7])
+        self.assertEqual(ones_complement_sum(data), 0xddf2)
+        self.assertEqual(inet_checksum(data), 0x220d)
+
+    def test_single(self):
+        u = self.u
+        f = bytes(range(1, 33))
+        self.send_frames([f])
+        self.runSim(CLK_PERIOD * (len(u.dataIn._ag.data) + 10))
+        self.assertValSequenceEqual(u.dataOut._ag.data, [ones_complement_sum(f)])
+
+    def _test_frames(self, frames, offsets=None, randomize=False):
+        u = self.u
+        self.send_frames(frames, offsets)
+        t = len(u.dataIn._ag.data) + 10
+        if randomize:
+            self.randomize(u.dataIn)
+            self.randomize(u.dataOut)
+            t *= 4
+        self.runSim(CLK_PERIOD * t)
+        self.assertValSequenceEqual(u.dataOut._ag.data,
+                                    [ones_complement_sum(f) for f in frames])
+
+    def test_lengths(self):
+        r = Random(0)
+        frames = [bytes(r.getrandbits(8) for _ in range(L)) for L in range(1, 3 * self.DW // 8 + 2)]
+        self._test_frames(frames)
+
+    def test_unaligned_start(self):
+        r = Random(1)
+        D_B = self.DW // 8
+        frames = []
+        offsets = []
+        for off in range(D_B):
+            for L in (1, 2, 3, D_B, D_B + 1, 2 * D_B + 3):
+                frames.append(bytes(r.getrandbits(8) for _ in range(L)))
+                offsets.append(off)
+        self._test_frames(frames, offsets)
+
+    def test_randomized(self):
+        r = Random(2)
+        frames = [bytes(r.getrandbits(8) for _ in range(r.randint(1, 200))) for _ in range(20)]
+        offsets = [r.randint(0, self.DW // 8 - 1) for _ in frames]
+        self._test_frames(frames, offsets, randomize=True)
+
+    def test_all_ones(self):
+        # the carry has to be propagated correctly
+        frames = [bytes([0xff] * L) for L in (2, 64, 1500)] + [bytes([0xff, 0xfe] * 100)]
+        self._test_frames(frames)
+
+    def _count_ack(self, intf, res: list):
+        while True:
+            yield Timer(CLK_PERIOD)
+            yield WaitCombStable()
+            if intf.valid.read() and intf.ready.read():
+                res.append(self.hdl_simulator.now)
+
+    def test_throughput(self, N=16):
+        """
+        One data word per clock cycle, also for frames which are not longer than a single data word
+        """
+        u = self.u
+        r = Random(3)
+        D_B = self.DW // 8
+        frames = [bytes(r.getrandbits(8) for _ in range(r.randint(1, 3 * D_B))) for _ in range(N)]
+        self.send_frames(frames)
+        words = len(u.dataIn._ag.data)
+        acks = []
+        self.procs.append(self._count_ack(u.dataIn, acks))
+        self.runSim(CLK_PERIOD * (words + 10))
+        self.assertValSequenceEqual(u.dataOut._ag.data,
+                                    [ones_complement_sum(f) for f in frames])
+        self.assertEqual(len(acks), words)
+        self.assertEqual(acks[-1] - acks[0], (words - 1) * CLK_PERIOD)
+
+
+class InetChecksum_16b_TC(InetChecksum_64b_TC):
+    DW = 16
+
+
+class InetChecksum_512b_TC(InetChecksum_64b_TC):
+    DW = 512
+
+
+InetChecksum_TCs = [
+    InetChecksum_16b_TC,
+    InetChecksum_64b_TC,
+    InetChecksum_512b_TC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(InetChecksum_64b_TC('test_single'))
+    for tc in InetChecksum_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,63 @@
+from functools import lru_cache
+from typing import List, Tuple
+
+from hwt.code import Concat
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.defs import BIT
+from hwt.hdl.value import HValue
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwtLib.logic.xorNetwork import XorNetwork
+
+
+def toeplitz_hash_matrix(key: bytes, data_width: int, width: int=32) -> List[int]:
+    """
+    Build XOR matrix of the Toeplitz hash (:see: :func:`hwtLib.logic.toeplitzHashSw.toeplitz_hash`)
+
+    :param data_width: number of bits of the hashed data, the data bit 0 is the LSB
+        of the last byte (the first byte of the data is in MSB)
+    :return: list of rows for each bit of the result (LSB first),
+        bit i of the row is set if the data bit i is XORed in to this bit of the result
+    """
+    key_w = len(key) * 8
+    assert key_w >= data_width + width - 1, ("Key is too short for this data", key_w, data_width, width)
+    k = int.from_bytes(key, "big")
+    rows = []
+    for r in range(width):
+        row = 0
+        for i in range(data_width):
+            # i-th bit of the data (MSB first) selects the key window starting at bit i,
+            # r-th bit of the window is the (i + width - 1 - r)-th bit of the key (MSB first)
+            if (k >> (key_w - 1 - (i + width - 1 - r))) & 1:
+                row |= 1 << (data_width - 1 - i)
+        rows.append(row)
+    return rows
+
+
+@lru_cache(maxsize=None)
+def _buildToeplitzXorNetwork(key: Tuple[int, ...], data_width: int, width: int) -> XorNetwork:
+    return XorNetwork(toeplitz_hash_matrix(bytes(key), data_width, width), data_width)
+
+
+def toeplitz_hash(parent: Unit, data: RtlSignal, key: bytes, width: int=32,
+                  name_prefix: str="toeplitz_xor") -> RtlSignal:
+    """
+    Combinational Toeplitz hash of the data signal with a constant key,
+    each bit of the result is an XOR of the data bits selected by the key
+    (the XOR subexpressions are shared between the bits of the result, :see: :class:`~.XorNetwork`)
+
+    :param data: the hashed data, the first byte of the data is in MSB (network byte order)
+    :param name_prefix: name prefix for the signals of shared XOR subexpressions
+    """
+    DW = data._dtype.bit_length()
+    xn = _buildToeplitzXorNetwork(tuple(key), DW, width)
+
+    def wrap_shared(v, i):
+        if isinstance(v, HValue):
+            return v
+        return rename_signal(parent, v, f"{name_prefix:s}_{i:d}")
+
+    res_bits = xn.build([data[i] for i in range(DW)],
+                        zero=BIT.from_py(0),
+                        wrap_shared=wrap_shared)
+    return Concat(*reversed(res_bits))
@@ -0,0 +1,36 @@
+"""
+Software implementation of the Toeplitz hash used by Receive Side Scaling (RSS),
+meant to be used as a golden model in tests.
+"""
+from typing import Union
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# the default RSS key from the Microsoft RSS specification (used by most of the NIC drivers)
+RSS_DEFAULT_KEY = bytes([
+    0x6d, 0x5a, 0x56, 0xda, 0x25, 0x5b, 0x0e, 0xc2,
+    0x41, 0x67, 0x25, 0x3d, 0x43, 0xa3, 0x8f, 0xb0,
+    0xd0, 0xca, 0x2b, 0xcb, 0xae, 0x7b, 0x30, 0xb4,
+    0x77, 0xcb, 0x2d, 0xa3, 0x80, 0x30, 0xf2, 0x0c,
+    0x6a, 0x42, 0xb7, 0x3b, 0xbe, 0xac, 0x01, 0xfa,
+])
+
+
+def toeplitz_hash(data: BytesLike, key: BytesLike=RSS_DEFAULT_KEY, width: int=32) -> int:
+    """
+    For each bit of the data which is set (MSB of the first byte first)
+    XOR the width bits of the key starting at the same bit position to the result.
+
+    :attention: the key has to have at least len(data) * 8 + width - 1 bits
+    """
+    data_w = len(data) * 8
+    key_w = len(key) * 8
+    assert key_w >= data_w + width - 1, ("Key is too short for this data", key_w, data_w, width)
+    k = int.from_bytes(key, "big")
+    d = int.from_bytes(data, "big")
+    res = 0
+    win_mask = (1 << width) - 1
+    for i in range(data_w):
+        if (d >> (data_w - 1 - i)) & 1:
+            res ^= (k >> (key_w - width - i)) & win_mask
+    return res
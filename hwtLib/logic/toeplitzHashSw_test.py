@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import socket
+import unittest
+
+from hwtLib.logic.toeplitzHashSw import toeplitz_hash
+
+
+class ToeplitzHashSw_TC(unittest.TestCase):
+
+    def test_spec_vectors(self):
+        # from the verification suite of Microsoft RSS specification
+        src = socket.inet_aton("66.9.149.187")
+        dst = socket.inet_aton("161.142.100.80")
+        self.assertEqual(toeplitz_hash(src + dst), 0x323e8fc2)
+        ports = (2794).to_bytes(2, "big") + (1766).to_bytes(2, "big")
+        self.assertEqual(toeplitz_hash(src + dst + ports), 0x51ccc178)
+
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(ToeplitzHashSw_TC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,167 @@
+from heapq import heappush, heappop
+from typing import List, Optional, Sequence, Callable, Any
+
+
+def popcount(x: int) -> int:
+    """
+    :return: number of set bits in x (int.bit_count() is available only from Python 3.10)
+    """
+    return bin(x).count("1")
+
+
+class XorNetwork():
+    """
+    Network of 2-input XOR gates which computes set of XOR sums of the inputs
+    (e.g. rows of CRC xor matrix) with shared subexpressions and balanced trees.
+
+    The sharing is found by greedy pair extraction (Paar algorithm),
+    the pair of inputs/intermediate signals which is used in most of the rows
+    is replaced by a new intermediate signal, this is repeated until there is no pair
+    used in more than one row. The rest of each row is reduced as a balanced tree
+    (the shallowest signals first).
+
+    :ivar ~.input_cnt: number of inputs, signals with index < input_cnt are the inputs
+    :ivar ~.nodes: list of tuples (a, b), each item is an XOR gate,
+        its output signal index is input_cnt + index in this list
+    :ivar ~.outputs: index of the output signal for each row (None if the row is empty)
+    :ivar ~.depth: list of logic depths of signals
+    :ivar ~.rows: original rows (int, bit i means that input i is used)
+    """
+
+    def __init__(self, rows: Sequence[int], input_cnt: int, share: bool=True):
+        """
+        :param rows: each row is an int, bit i is 1 if the input i should be XORed in to this row
+        :param input_cnt: number of inputs
+        :param share: if False only the balanced trees are generated
+        """
+        self.input_cnt = input_cnt
+        self.rows = list(rows)
+        self.nodes = []
+        self.depth = [0 for _ in range(input_cnt)]
+        # column masks, bit r is set if the signal is used in row r
+        cols = [0 for _ in range(input_cnt)]
+        for r, row in enumerate(self.rows):
+            assert row >> input_cnt == 0, (r, row, input_cnt)
+            i = 0
+            while row:
+                if row & 1:
+                    cols[i] |= 1 << r
+                row >>= 1
+                i += 1
+        if share:
+            self._extract_shared_pairs(cols)
+        self.outputs = [self._build_balanced_tree(cols, r)
+                        for r in range(len(self.rows))]
+
+    def _add_node(self, a: int, b: int) -> int:
+        self.nodes.append((a, b))
+        self.depth.append(max(self.depth[a], self.depth[b]) + 1)
+        return self.input_cnt + len(self.nodes) - 1
+
+    def _extract_shared_pairs(self, cols: List[int]):
+        depth = self.depth
+        # buckets of pairs (a, b) by the number of rows where the pair is used,
+        # the number of rows of the pair can only decrease, the pairs with the old
+        # number of rows are moved to a correct bucket lazily when found,
+        # each bucket is a heap ordered by the depth of the pair to prefer
+        # the shallow signals
+        buckets = [[] for _ in range(max(c.bit_length() for c in cols) + 1)]
+        active = [i for i, c in enumerate(cols) if c]
+        for i, a in enumerate(active):
+            ca = cols[a]
+            for b in active[i + 1:]:
+                cnt = popcount(ca & cols[b])
+                if cnt > 1:
+                    buckets[cnt].append((0, a, b))
+        for bucket in buckets:
+            bucket.sort()
+
+        cnt = len(buckets) - 1
+        while cnt > 1:
+            bucket = buckets[cnt]
+            if not bucket:
+                cnt -= 1
+                continue
+            _, a, b = heappop(bucket)
+            shared = cols[a] & cols[b]
+            real_cnt = popcount(shared)
+            if real_cnt != cnt:
+                if real_cnt > 1:
+                    heappush(buckets[real_cnt], (max(depth[a], depth[b]), a, b))
+                continue
+
+            n = self._add_node(a, b)
+            cols[a] &= ~shared
+            cols[b] &= ~shared
+            cols.append(shared)
+            d = depth[n]
+            for x in active:
+                c = popcount(cols[x] & shared)
+                if c > 1:
+                    heappush(buckets[c], (max(d, depth[x]), x, n))
+            active = [x for x in active if cols[x]]
+            active.append(n)
+
+    def _build_balanced_tree(self, cols: List[int], r: int) -> Optional[int]:
+        depth = self.depth
+        m = 1 << r
+        terms = [(depth[i], i) for i, c in enumerate(cols) if c & m]
+        if not terms:
+            return None
+        terms.sort()
+        while len(terms) > 1:
+            _, a = heappop(terms)
+            _, b = heappop(terms)
+            n = self._add_node(a, b)
+            heappush(terms, (depth[n], n))
+        return terms[0][1]
+
+    def build(self, inputs: Sequence[Any], xor: Callable[[Any, Any], Any]=lambda a, b: a ^ b,
+              zero: Any=0, wrap_shared: Optional[Callable[[Any, int], Any]]=None) -> List[Any]:
+        """
+        Instantiate the network
+
+        :param inputs: input values/signals
+        :param xor: function used to instantiate XOR gate
+        :param zero: value used for empty rows
+        :param wrap_shared: optional function (value, node index) -> value which is applied
+            on outputs of the nodes which are used more than once
+            (e.g. to wrap the expression in to a signal so it is not duplicated in HDL)
+        :return: list of output values/signals for each row
+        """
+        assert len(inputs) == self.input_cnt, (len(inputs), self.input_cnt)
+        if wrap_shared is not None:
+            fanout = self.fanout()
+        vals = list(inputs)
+        for i, (a, b) in enumerate(self.nodes):
+            v = xor(vals[a], vals[b])
+            if wrap_shared is not None and fanout[self.input_cnt + i] > 1:
+                v = wrap_shared(v, i)
+            vals.append(v)
+        return [zero if o is None else vals[o] for o in self.outputs]
+
+    def fanout(self) -> List[int]:
+        """
+        :return: number of uses of each signal (as gate input or as row output)
+        """
+        fanout = [0 for _ in range(self.input_cnt + len(self.nodes))]
+        for a, b in self.nodes:
+            fanout[a] += 1
+            fanout[b] += 1
+        for o in self.outputs:
+            if o is not None:
+                fanout[o] += 1
+        return fanout
+
+    def report(self) -> dict:
+        """
+        :return: dict with the number of 2-input XOR gates and the logic depth
+            for linear XOR chains per row (the original implementation) and for this network
+        """
+        row_sizes = [popcount(row) for row in self.rows]
+        return {
+            "linear_gate_cnt": sum(max(s - 1, 0) for s in row_sizes),
+            "linear_depth": max((max(s - 1, 0) for s in row_sizes), default=0),
+            "gate_cnt": len(self.nodes),
+            "depth": max((self.depth[o] for o in self.outputs if o is not None), default=0),
+        }
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+from random import Random
+
+from hwtLib.logic.crcComb import CrcComb
+from hwtLib.logic.crcComb_test import crcToBf
+from hwtLib.logic.crcPoly import CRC_32, CRC_64_ECMA, CRC_5_USB
+from hwtLib.logic.xorNetwork import XorNetwork
+
+
+def xor_rows_ref(rows, inputs):
+    res = []
+    for row in rows:
+        v = 0
+        for i, x in enumerate(inputs):
+            if (row >> i) & 1:
+                v ^= x
+        res.append(v)
+    return res
+
+
+class XorNetworkTC(unittest.TestCase):
+
+    def test_simple_sharing(self):
+        # a^b^c, a^b^d, a^b
+        rows = [0b0111, 0b1011, 0b0011]
+        n = XorNetwork(rows, 4)
+        self.assertEqual(n.nodes[0], (0, 1))
+        r = n.report()
+        self.assertEqual(r["linear_gate_cnt"], 5)
+        self.assertEqual(r["gate_cnt"], 3)
+        self.assertEqual(r["depth"], 2)
+
+        wrapped = []
+
+        def wrap_shared(v, i):
+            wrapped.append(i)
+            return f"s{i:d}"
+
+        res = n.build(["a", "b", "c", "d"], xor=lambda a, b: f"({a}^{b})",
+                      wrap_shared=wrap_shared)
+        self.assertSequenceEqual(wrapped, [0])
+        self.assertSequenceEqual(res, ["(c^s0)", "(d^s0)", "s0"])
+
+    def test_empty_and_single_rows(self):
+        n = XorNetwork([0, 0b10, 0b11], 2)
+        self.assertSequenceEqual(n.build(["a", "b"], xor=lambda a, b: f"({a}^{b})", zero="0"),
+                                 ["0", "b", "(a^b)"])
+
+    def test_random(self):
+        rand = Random(0)
+        for _ in range(20):
+            input_cnt = rand.randint(1, 40)
+            rows = [rand.getrandbits(input_cnt) for _ in range(rand.randint(1, 20))]
+            for share in (False, True):
+                n = XorNetwork(rows, input_cnt, share=share)
+                for _ in range(4):
+                    inputs = [rand.getrandbits(1) for _ in range(input_cnt)]
+                    self.assertSequenceEqual(n.build(inputs), xor_rows_ref(rows, inputs))
+                r = n.report()
+                self.assertLessEqual(r["gate_cnt"], r["linear_gate_cnt"])
+                self.assertLessEqual(r["depth"], r["linear_depth"])
+
+    def test_crc_report(self):
+        for poly, DW in [(CRC_5_USB, 11), (CRC_32, 32), (CRC_32, 512), (CRC_64_ECMA, 512)]:
+            polyBits = crcToBf(poly)
+            n = CrcComb.buildCrcXorNetwork(DW, polyBits)
+            r = n.report()
+            msg = (poly.__name__, DW, r)
+            self.assertLess(r["gate_cnt"], r["linear_gate_cnt"], msg)
+            self.assertLess(r["depth"], r["linear_depth"], msg)
+            # the rows are reduced as balanced trees, the depth grows with the log of the row size
+            self.assertLessEqual(r["depth"], 2 * (poly.WIDTH + DW).bit_length(), msg)
+
+            PW = poly.WIDTH
+            rows = [s | (d << PW) for s, d in CrcComb.buildCrcXorMatrixPacked(DW, polyBits)]
+            inputs = [(i * 7 + 3) % 5 & 1 for i in range(PW + DW)]
+            self.assertSequenceEqual(n.build(inputs), xor_rows_ref(rows, inputs))
+
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(XorNetworkTC('test_crc_report'))
+    suite.addTest(unittest.makeSuite(XorNetworkTC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
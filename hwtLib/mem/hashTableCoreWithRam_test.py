@@ -1,11 +1,10 @@
 #!/usr/bin/env python3)
 # -*- coding: utf-8 -*-
 
-from binascii import crc_hqx
-
 from hwt.simulator.simTestCase import SimTestCase
 from hwt.simulator.utils import valuesToInts
 from hwtLib.logic.crcPoly import CRC_16_CCITT
+from hwtLib.logic.crcSw import crc_sw
 from hwtLib.mem.hashTableCoreWithRam import HashTableCoreWithRam
 from hwtSimApi.constants import CLK_PERIOD
 from hwtSimApi.triggers import Timer
@@ -57,8 +56,8 @@ class HashTableCoreWithRamTC(SimTestCase):
         getrandbits = self._rand.getrandbits
 
         def get_hash(k: int):
-            return crc_hqx(k.to_bytes(u.KEY_WIDTH // 8, "little"),
-                           CRC_16_CCITT.INIT) & mask(u.io.HASH_WIDTH)
+            return crc_sw(CRC_16_CCITT, k.to_bytes(u.KEY_WIDTH // 8, "little")
+                          ) & mask(u.io.HASH_WIDTH)
 
         # {hash: (key, data)}
         expected_content = {}
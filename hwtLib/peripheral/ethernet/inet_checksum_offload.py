@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from math import ceil
+from typing import List, Tuple, Dict
+
+from hwt.code import If, Concat, Or
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.struct import HStruct
+from hwt.interfaces.std import Handshaked
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axis import AxiStream
+from hwtLib.amba.axis_comp.fifo import AxiSFifo
+from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.handshaked.streamNode import StreamNode
+from hwtLib.logic.inetChecksum import InetChecksum, ones_complement_add, zext
+from hwtLib.peripheral.ethernet.types import Eth2Header_t, ETHER_TYPE
+from hwtLib.types.net.ip import IPv4Header_t, IP_PROTOCOL, IPv4
+from hwtLib.types.net.tcp import TCP_header_t
+from hwtLib.types.net.udp import UDP_header_t
+
+
+def struct_field_offset_B(t: HStruct, name: str) -> int:
+    """
+    :return: offset of the field in bytes
+    """
+    off = 0
+    for f in t.fields:
+        if f.name == name:
+            assert off % 8 == 0, (t, name, off)
+            return off // 8
+        off += f.dtype.bit_length()
+    raise KeyError(name)
+
+
+ETH_HDR_B = Eth2Header_t.bit_length() // 8
+IP_HDR_MIN_B = IPv4Header_t.bit_length() // 8
+IP_OFF = ETH_HDR_B
+IP_TOTAL_LEN_OFF = IP_OFF + struct_field_offset_B(IPv4Header_t, "totalLen")
+IP_FLAGS_OFF = IP_OFF + struct_field_offset_B(IPv4Header_t, "id") + 2
+IP_PROTOCOL_OFF = IP_OFF + struct_field_offset_B(IPv4Header_t, "protocol")
+IP_CHECKSUM_OFF = IP_OFF + struct_field_offset_B(IPv4Header_t, "headerChecksum")
+# src and dst IP are a part of the pseudo header of UDP/TCP
+IP_SRC_OFF = IP_OFF + struct_field_offset_B(IPv4Header_t, "src")
+IP_DST_END = IP_OFF + IP_HDR_MIN_B
+UDP_CHECKSUM_OFF = struct_field_offset_B(UDP_header_t, "checksum")
+TCP_CHECKSUM_OFF = struct_field_offset_B(TCP_header_t, "checksum")
+
+
+class CHECKSUM_ERR():
+    """
+    Bits of the status of :class:`~.Ipv4ChecksumVerify`
+    """
+    IP = 1 << 0
+    L4 = 1 << 1
+
+
+class Ipv4ChecksumBase(Unit):
+    """
+    Base class for components which compute the checksums of the IPv4 header
+    and of the UDP/TCP datagram (including the pseudo header)
+    in Ethernet II frames on AxiStream with one data word per clock cycle.
+
+    The header fields are taken from the fixed offsets in the frame (VLAN tags are not supported),
+    IPv4 options are supported, the padding of the Ethernet frame is ignored.
+    The L4 checksum is computed only for UDP and TCP in the IPv4 packets which are not fragmented.
+
+    :attention: the frame has to contain at least the whole IPv4 header (the Ethernet frame
+        always has at least 60B, this may be an issue only for the frames which are not from MAC)
+    """
+
+    def _config(self):
+        AxiStream._config(self)
+        self.USE_KEEP = True
+        self.DATA_WIDTH = 64
+
+    def _declr(self):
+        addClkRstn(self)
+        with self._paramsShared():
+            self.dataIn = AxiStream()
+            self.dataOut = AxiStream()._m()
+
+    def _lane_offset_cmp(self, word_off: RtlSignal, V: RtlSignal, name: str)\
+            -> Tuple[List[RtlSignal], List[RtlSignal]]:
+        """
+        :return: tuple of lists (lane offset < V, lane offset == V) for each byte lane of the data word
+        """
+        if isinstance(V, int):
+            V = Bits(18).from_py(V)
+        diff = rename_signal(self, zext(V, 18) - zext(word_off, 18), name)
+        not_neg = ~diff[17]
+        D_B = self.DATA_WIDTH // 8
+        lt = [not_neg & (diff[17:] > i) for i in range(D_B)]
+        eq = [diff._eq(i) for i in range(D_B)]
+        return lt, eq
+
+    def _checksum_logic(self, din: AxiStream, others: List[AxiStream], exclude_checksum_fields: bool)\
+            -> Tuple[List[Handshaked], Dict[str, RtlSignal]]:
+        """
+        Instantiate the checksum units and the logic for the selection of the bytes
+        from the header fields
+
+        :param others: the other slaves of the din which should be connected (the data signals are not connected)
+        :param exclude_checksum_fields: if True the checksum fields are not a part of the sums
+            (the sum is used to compute the checksums), else the checksum fields are included
+            (the sum is used to check the checksums)
+        :return: tuple (handshaked interfaces which have to be synchronized for a result of the frame,
+            dictionary of signals of the result of the frame)
+        """
+        D_B = self.DATA_WIDTH // 8
+        if self.USE_KEEP:
+            m = din.keep
+        elif self.USE_STRB:
+            m = din.strb
+        else:
+            m = Bits(D_B).from_py(-1)
+
+        # byte offset of the data word in frame
+        word_off = self._reg("word_off", Bits(16), def_val=0)
+
+        def hdr_byte(off: int) -> RtlSignal:
+            """
+            :return: the byte of the header (the value is valid from the data word with this byte
+                until the end of the frame)
+            """
+            lane = off % D_B
+            b = din.data[(lane + 1) * 8:lane * 8]
+            r = self._reg(f"hdr_b{off:d}", Bits(8))
+            is_in_this_word = word_off._eq(off - lane)
+            If(din.valid & din.ready & is_in_this_word,
+               r(b)
+            )
+            return is_in_this_word._ternary(b, r)
+
+        def hdr_field(off: int, size: int, name: str):
+            return rename_signal(self, Concat(*(hdr_byte(off + i) for i in range(size))), name)
+
+        ether_type = hdr_field(struct_field_offset_B(Eth2Header_t, "type"), 2, "ether_type")
+        ver_ihl = hdr_field(IP_OFF, 1, "ip_ver_ihl")
+        total_len = hdr_field(IP_TOTAL_LEN_OFF, 2, "ip_total_len")
+        flags_frag = hdr_field(IP_FLAGS_OFF, 2, "ip_flags_frag")
+        protocol = hdr_field(IP_PROTOCOL_OFF, 1, "ip_protocol")
+
+        is_ipv4 = rename_signal(self, ether_type._eq(ETHER_TYPE.IPv4) & ver_ihl[8:4]._eq(IPv4), "is_ipv4")
+        # more fragments flag or non-zero fragment offset
+        is_fragment = flags_frag[14:] != 0
+        is_l4 = is_ipv4 & ~is_fragment
+        is_udp = rename_signal(self, is_l4 & protocol._eq(IP_PROTOCOL.UDP), "is_udp")
+        is_tcp = rename_signal(self, is_l4 & protocol._eq(IP_PROTOCOL.TCP), "is_tcp")
+        is_l4 = is_udp | is_tcp
+
+        ip_hdr_len = Concat(Bits(10).from_py(0), ver_ihl[4:0], Bits(2).from_py(0))
+        ip_end = rename_signal(self, ip_hdr_len + IP_OFF, "ip_end")
+        l4_end = rename_signal(self, zext(total_len, 17) + IP_OFF, "l4_end")
+        l4_csum_off = rename_signal(self, ip_end + is_udp._ternary(
+            Bits(16).from_py(UDP_CHECKSUM_OFF),
+            Bits(16).from_py(TCP_CHECKSUM_OFF)), "l4_csum_off")
+        l4_len = total_len - ip_hdr_len
+        # protocol, L4 length (src and dst IP are taken from the IP header in the frame)
+        pseudo_hdr_sum = ones_complement_add(zext(protocol, 16), l4_len)
+
+        # byte masks for the checksum units
+        lt_ip_off, _ = self._lane_offset_cmp(word_off, IP_OFF, "off_ip")
+        lt_ip_end, _ = self._lane_offset_cmp(word_off, ip_end, "off_ip_end")
+        lt_src, _ = self._lane_offset_cmp(word_off, IP_SRC_OFF, "off_ip_src")
+        lt_dst_end, _ = self._lane_offset_cmp(word_off, IP_DST_END, "off_ip_dst_end")
+        lt_l4_end, _ = self._lane_offset_cmp(word_off, l4_end, "off_l4_end")
+        _, eq_ip_csum = self._lane_offset_cmp(word_off, IP_CHECKSUM_OFF, "off_ip_csum")
+        _, eq_l4_csum = self._lane_offset_cmp(word_off, l4_csum_off, "off_l4_csum")
+
+        ip_mask = []
+        l4_mask = []
+        l4_csum_non_zero = []
+        for i in range(D_B):
+            in_ip = ~lt_ip_off[i] & lt_ip_end[i]
+            # all L4 bytes are after the src IP, the fields from the header
+            # are not valid before this offset
+            in_pseudo = lt_dst_end[i]
+            in_l4 = ~lt_src[i] & (in_pseudo | ~lt_ip_end[i]) & lt_l4_end[i]
+            # the first byte of the checksum is on the lane i, the second on i + 1
+            # (the checksums are on even offsets, the data word has whole 16b words,
+            # the checksum is never split between two data words)
+            if i % 2 == 0:
+                is_ip_csum = eq_ip_csum[i]
+                is_l4_csum = eq_l4_csum[i]
+            else:
+                is_ip_csum = eq_ip_csum[i - 1]
+                is_l4_csum = eq_l4_csum[i - 1]
+            is_l4_csum = ~lt_src[i] & is_l4_csum
+
+            if exclude_checksum_fields:
+                in_ip = in_ip & ~is_ip_csum
+                in_l4 = in_l4 & ~is_l4_csum
+            ip_mask.append(m[i] & is_ipv4 & in_ip)
+            l4_mask.append(m[i] & is_l4 & in_l4)
+            l4_csum_non_zero.append(m[i] & is_l4_csum & (din.data[(i + 1) * 8:i * 8] != 0))
+
+        # the UDP checksum 0 means that the checksum was not computed
+        l4_csum_zero = self._reg("l4_csum_zero", def_val=1)
+        l4_csum_zero_now = l4_csum_zero & ~Or(*l4_csum_non_zero)
+        din_ack = din.valid & din.ready
+        If(din_ack,
+            If(din.last,
+               word_off(0),
+               l4_csum_zero(1),
+            ).Else(
+               word_off(word_off + D_B),
+               l4_csum_zero(l4_csum_zero_now),
+            )
+        )
+
+        def checksum_unit(name: str, mask_bits: List[RtlSignal]):
+            u = InetChecksum()
+            u.DATA_WIDTH = self.DATA_WIDTH
+            u.USE_KEEP = True
+            u.USE_STRB = False
+            setattr(self, name, u)
+            u.dataIn.data(din.data)
+            u.dataIn.keep(rename_signal(self, Concat(*reversed(mask_bits)), f"{name:s}_keep"))
+            u.dataIn.last(din.last)
+            return u
+
+        ip_csum = checksum_unit("ip_checksum", ip_mask)
+        l4_csum = checksum_unit("l4_checksum", l4_mask)
+
+        # the header fields of the frame which are required after the checksum of the frame is computed
+        hdr_fields = [
+            ("is_ipv4", is_ipv4, 1),
+            ("is_udp", is_udp, 1),
+            ("is_tcp", is_tcp, 1),
+            ("l4_csum_zero", l4_csum_zero_now, 1),
+            ("pseudo_hdr_sum", pseudo_hdr_sum, 16),
+            ("l4_csum_off", l4_csum_off, 16),
+        ]
+        hdr_info = HandshakedFifo(Handshaked)
+        hdr_info.DATA_WIDTH = sum(w for _, _, w in hdr_fields)
+        # checksum units have 2 stages + output register
+        hdr_info.DEPTH = 4
+        self.hdr_info = hdr_info
+        hdr_info.dataIn.data(Concat(*(s for _, s, _ in reversed(hdr_fields))))
+
+        StreamNode(
+            [din],
+            [ip_csum.dataIn, l4_csum.dataIn, hdr_info.dataIn, *others],
+            extraConds={hdr_info.dataIn: din.last},
+            skipWhen={hdr_info.dataIn: ~din.last},
+        ).sync()
+
+        res = {
+            "ip_sum": ip_csum.dataOut.data,
+            "l4_sum": l4_csum.dataOut.data,
+        }
+        off = 0
+        for name, _, w in hdr_fields:
+            res[name] = hdr_info.dataOut.data[off + w:off]
+            if w == 1:
+                res[name] = res[name][0]
+            off += w
+        return [ip_csum.dataOut, l4_csum.dataOut, hdr_info.dataOut], res
+
+
+class Ipv4ChecksumVerify(Ipv4ChecksumBase):
+    """
+    Check the IPv4 header checksum and the UDP/TCP checksum of the Ethernet II frames.
+    The frames are passed from dataIn to dataOut without any modification and latency,
+    the result of the check is available on status output shortly after the end of the frame.
+
+    :ivar ~.status: the flags of the checksum errors for each frame (:see: :class:`~.CHECKSUM_ERR`),
+        the L4 checksum is not checked for UDP with checksum 0 (checksum not computed)
+
+    .. hwt-autodoc:: _example_Ipv4ChecksumVerify
+    """
+
+    def _declr(self):
+        super(Ipv4ChecksumVerify, self)._declr()
+        self.status = Handshaked()._m()
+        self.status.DATA_WIDTH = 2
+
+    def _impl(self):
+        din = self.dataIn
+        dout = self.dataOut
+        sources, res = self._checksum_logic(din, [dout], False)
+        dout(din, exclude=[din.valid, din.ready])
+
+        ip_err = res["is_ipv4"] & (res["ip_sum"] != 0xffff)
+        l4_sum = ones_complement_add(res["l4_sum"], res["pseudo_hdr_sum"])
+        l4_err = (res["is_udp"] | res["is_tcp"]) & \
+            (l4_sum != 0xffff) & \
+            ~(res["is_udp"] & res["l4_csum_zero"])
+        st = self.status
+        st.data(Concat(l4_err, ip_err))
+        StreamNode(sources, [st]).sync()
+        propagateClkRstn(self)
+
+
+class Ipv4ChecksumInsert(Ipv4ChecksumBase):
+    """
+    Compute and insert the IPv4 header checksum and the UDP/TCP checksum
+    in to Ethernet II frames (checksum offload), the original value of the checksum fields is ignored.
+
+    The frame is stored in the frame buffer until its checksums are computed (store-and-forward),
+    the component processes one data word per clock cycle.
+
+    :ivar ~.FRAME_BUFF_DEPTH: number of the data words in the frame buffer,
+        the buffer has to be able to hold the largest frame
+
+    .. hwt-autodoc:: _example_Ipv4ChecksumInsert
+    """
+
+    def _config(self):
+        super(Ipv4ChecksumInsert, self)._config()
+        self.FRAME_BUFF_DEPTH = Param(None)
+
+    def _declr(self):
+        super(Ipv4ChecksumInsert, self)._declr()
+        if self.FRAME_BUFF_DEPTH is None:
+            # max size of the Ethernet frame without FCS + a space for the next frame
+            self.FRAME_BUFF_DEPTH = ceil(1514 / (self.DATA_WIDTH // 8)) + 4
+
+    def _impl(self):
+        din = self.dataIn
+        dout = self.dataOut
+        D_B = self.DATA_WIDTH // 8
+
+        buff = AxiSFifo()
+        buff._updateParamsFrom(self)
+        buff.DEPTH = self.FRAME_BUFF_DEPTH
+        self.frame_buff = buff
+
+        sources, res = self._checksum_logic(din, [buff.dataIn], True)
+        buff.dataIn(din, exclude=[din.valid, din.ready])
+
+        ip_csum = ~res["ip_sum"]
+        l4_csum = ~ones_complement_add(res["l4_sum"], res["pseudo_hdr_sum"])
+        # UDP checksum 0 means that the checksum was not computed
+        l4_csum = (res["is_udp"] & l4_csum._eq(0))._ternary(Bits(16).from_py(0xffff), l4_csum)
+
+        csum = HandshakedFifo(Handshaked)
+        csum_fields = [
+            ("is_ipv4", res["is_ipv4"], 1),
+            ("is_l4", res["is_udp"] | res["is_tcp"], 1),
+            ("l4_csum_off", res["l4_csum_off"], 16),
+            ("ip_csum", ip_csum, 16),
+            ("l4_csum", l4_csum, 16),
+        ]
+        csum.DATA_WIDTH = sum(w for _, _, w in csum_fields)
+        csum.DEPTH = 2
+        self.csum_buff = csum
+        csum.dataIn.data(Concat(*(s for _, s, _ in reversed(csum_fields))))
+        StreamNode(sources, [csum.dataIn]).sync()
+
+        c = {}
+        off = 0
+        for name, _, w in csum_fields:
+            c[name] = csum.dataOut.data[off + w:off]
+            if w == 1:
+                c[name] = c[name][0]
+            off += w
+
+        # replace the checksums in the frame from the frame buffer
+        frame = buff.dataOut
+        out_word_off = self._reg("out_word_off", Bits(16), def_val=0)
+        _, eq_ip_csum = self._lane_offset_cmp(out_word_off, IP_CHECKSUM_OFF, "out_off_ip_csum")
+        _, eq_l4_csum = self._lane_offset_cmp(out_word_off, c["l4_csum_off"], "out_off_l4_csum")
+        If(frame.valid & frame.ready,
+            If(frame.last,
+               out_word_off(0),
+            ).Else(
+               out_word_off(out_word_off + D_B),
+            ),
+        )
+        out_bytes = []
+        for i in range(D_B):
+            b = frame.data[(i + 1) * 8:i * 8]
+            # checksum is in network byte order (MSB first), on even offset
+            if i % 2 == 0:
+                b = (c["is_ipv4"] & eq_ip_csum[i])._ternary(c["ip_csum"][:8], b)
+                b = (c["is_l4"] & eq_l4_csum[i])._ternary(c["l4_csum"][:8], b)
+            else:
+                b = (c["is_ipv4"] & eq_ip_csum[i - 1])._ternary(c["ip_csum"][8:], b)
+                b = (c["is_l4"] & eq_l4_csum[i - 1])._ternary(c["l4_csum"][8:], b)
+            out_bytes.append(b)
+
+        dout(frame, exclude=[frame.valid, frame.ready, frame.data])
+        dout.data(Concat(*reversed(out_bytes)))
+        StreamNode(
+            [frame, csum.dataOut], [dout],
+            extraConds={csum.dataOut: frame.valid & frame.last},
+            skipWhen={csum.dataOut: frame.valid & ~frame.last},
+        ).sync(csum.dataOut.vld)
+        propagateClkRstn(self)
+
+
+def _example_Ipv4ChecksumVerify():
+    u = Ipv4ChecksumVerify()
+    u.DATA_WIDTH = 64
+    return u
+
+
+def _example_Ipv4ChecksumInsert():
+    u = Ipv4ChecksumInsert()
+    u.DATA_WIDTH = 64
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_Ipv4ChecksumInsert()
+    print(to_rtl_str(u))
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from math import ceil
+from random import Random
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axis import axis_send_bytes, axis_recieve_bytes
+from hwtLib.logic.inetChecksumSw import inet_checksum
+from hwtLib.peripheral.ethernet.inet_checksum_offload import Ipv4ChecksumVerify, \
+    Ipv4ChecksumInsert, CHECKSUM_ERR, IP_CHECKSUM_OFF, IP_OFF
+from hwtLib.peripheral.ethernet.types import ETHER_TYPE
+from hwtLib.types.net.ip import IP_PROTOCOL
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitCombStable
+
+# more fragments flag (in flags field in network bit order)
+IP_FLAG_MF = 0b001
+SRC_IP = bytes([192, 168, 0, 1])
+DST_IP = bytes([192, 168, 0, 2])
+
+
+def eth_ipv4_frame(protocol: int, payload: bytes, ip_options=b"", flags=0, frag_offset=0,
+                   l4_checksum=True, padding=0x00):
+    """
+    Build Ethernet II frame with IPv4 packet with UDP/TCP datagram (or raw payload)
+    with correct checksums
+
+    :return: tuple (frame, offset of the L4 checksum or None)
+    """
+    assert len(ip_options) % 4 == 0
+    if protocol == IP_PROTOCOL.UDP:
+        l4 = bytearray((1234).to_bytes(2, "big") + (5678).to_bytes(2, "big")
+                       + (8 + len(payload)).to_bytes(2, "big") + bytes(2) + payload)
+        csum_off = 6
+    elif protocol == IP_PROTOCOL.TCP:
+        # dataOffset=5, flags=ACK
+        l4 = bytearray((1234).to_bytes(2, "big") + (5678).to_bytes(2, "big")
+                       + (1).to_bytes(4, "big") + (2).to_bytes(4, "big")
+                       + bytes([5 << 4, 0x10]) + (1024).to_bytes(2, "big")
+                       + bytes(2) + bytes(2) + payload)
+        csum_off = 16
+    else:
+        l4 = bytearray(payload)
+        csum_off = None
+
+    if csum_off is not None and l4_checksum:
+        pseudo = SRC_IP + DST_IP + bytes([0, protocol]) + len(l4).to_bytes(2, "big")
+        c = inet_checksum(pseudo + l4)
+        if protocol == IP_PROTOCOL.UDP and c == 0:
+            c = 0xffff
+        l4[csum_off:csum_off + 2] = c.to_bytes(2, "big")
+
+    ihl = 5 + len(ip_options) // 4
+    ip = bytearray(bytes([0x40 | ihl, 0]) + (ihl * 4 + len(l4)).to_bytes(2, "big")
+                   + (0x1234).to_bytes(2, "big") + ((flags << 13) | frag_offset).to_bytes(2, "big")
+                   + bytes([64, protocol]) + bytes(2) + SRC_IP + DST_IP + ip_options)
+    ip[10:12] = inet_checksum(ip).to_bytes(2, "big")
+    eth = bytes([0x0a, 0x0b, 0x0c, 0x0d, 0x0e, 0x0f, 1, 2, 3, 4, 5, 6]) + ETHER_TYPE.IPv4.to_bytes(2, "big")
+    frame = bytearray(eth + ip + l4)
+    if len(frame) < 60:
+        frame += bytes([padding] * (60 - len(frame)))
+    if csum_off is not None:
+        if flags & IP_FLAG_MF or frag_offset:
+            # the L4 checksum is not checked/inserted in fragments
+            csum_off = None
+        else:
+            csum_off += IP_OFF + ihl * 4
+    return frame, csum_off
+
+
+def ref_frames():
+    """
+    :return: list of tuples (frame, L4 checksum offset or None)
+    """
+    r = Random(0)
+
+    def payload(L):
+        return bytes(r.getrandbits(8) for _ in range(L))
+
+    frames = [
+        eth_ipv4_frame(IP_PROTOCOL.UDP, payload(18)),
+        eth_ipv4_frame(IP_PROTOCOL.UDP, payload(0), padding=0xaa),
+        eth_ipv4_frame(IP_PROTOCOL.UDP, payload(101)),
+        eth_ipv4_frame(IP_PROTOCOL.TCP, payload(0)),
+        eth_ipv4_frame(IP_PROTOCOL.TCP, payload(333)),
+        eth_ipv4_frame(IP_PROTOCOL.UDP, payload(57), ip_options=payload(8)),
+        eth_ipv4_frame(IP_PROTOCOL.TCP, payload(3), ip_options=payload(4)),
+        eth_ipv4_frame(IP_PROTOCOL.ICMP, payload(40)),
+        # fragments
+        eth_ipv4_frame(IP_PROTOCOL.UDP, payload(64), flags=IP_FLAG_MF, l4_checksum=False),
+        eth_ipv4_frame(IP_PROTOCOL.UDP, payload(11), frag_offset=8, l4_checksum=False),
+    ]
+    # not an IPv4 frame
+    arp = bytearray([0xff] * 6 + [1, 2, 3, 4, 5, 6]) + ETHER_TYPE.ARP.to_bytes(2, "big") + payload(46)
+    frames.append((arp, None))
+    return frames
+
+
+class Ipv4ChecksumVerify_64b_TC(SimTestCase):
+    DW = 64
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = Ipv4ChecksumVerify()
+        u.DATA_WIDTH = cls.DW
+        cls.compileSim(u)
+
+    def _test(self, frames, ref_status, randomize=False):
+        u = self.u
+        for f in frames:
+            axis_send_bytes(u.dataIn, f)
+        t = len(u.dataIn._ag.data) + 10
+        if randomize:
+            self.randomize(u.dataIn)
+            self.randomize(u.dataOut)
+            self.randomize(u.status)
+            t *= 5
+        self.runSim(CLK_PERIOD * t)
+        self.assertValSequenceEqual(u.status._ag.data, ref_status)
+        for f in frames:
+            off, data = axis_recieve_bytes(u.dataOut)
+            self.assertEqual(off, 0)
+            self.assertValSequenceEqual(data, list(f))
+        self.assertEmpty(u.dataOut._ag.data)
+
+    def test_nop(self):
+        self.runSim(CLK_PERIOD * 10)
+        self.assertEmpty(self.u.dataOut._ag.data)
+        self.assertEmpty(self.u.status._ag.data)
+
+    def test_valid(self):
+        frames = [f for f, _ in ref_frames()]
+        self._test(frames, [0 for _ in frames])
+
+    def test_valid_randomized(self):
+        frames = [f for f, _ in ref_frames()]
+        self._test(frames, [0 for _ in frames], randomize=True)
+
+    def test_udp_no_checksum(self):
+        f, csum_off = eth_ipv4_frame(IP_PROTOCOL.UDP, bytes(range(20)))
+        f[csum_off:csum_off + 2] = bytes(2)
+        self._test([f], [0])
+
+    def test_errors(self):
+        frames = []
+        ref_status = []
+        for f, csum_off in ref_frames():
+            bad_ip = bytearray(f)
+            bad_ip[IP_CHECKSUM_OFF] ^= 0x1
+            frames.append(bad_ip)
+            is_ip = f[12:14] == ETHER_TYPE.IPv4.to_bytes(2, "big")
+            ref_status.append(CHECKSUM_ERR.IP if is_ip else 0)
+            if csum_off is not None:
+                bad_l4 = bytearray(f)
+                bad_l4[csum_off + 1] ^= 0x10
+                frames.append(bad_l4)
+                ref_status.append(CHECKSUM_ERR.L4)
+                # corrupted data
+                bad_data = bytearray(f)
+                bad_data[IP_OFF + 12] ^= 0x20  # src IP is a part of the pseudo header
+                frames.append(bad_data)
+                ref_status.append(CHECKSUM_ERR.IP | CHECKSUM_ERR.L4)
+        self._test(frames, ref_status)
+
+    def _count_ack(self, intf, res: list):
+        while True:
+            yield Timer(CLK_PERIOD)
+            yield WaitCombStable()
+            if intf.valid.read() and intf.ready.read():
+                res.append(self.hdl_simulator.now)
+
+    def test_throughput(self, N=16):
+        u = self.u
+        frames = [eth_ipv4_frame(IP_PROTOCOL.UDP, bytes([i] * (18 + i)))[0] for i in range(N)]
+        for f in frames:
+            axis_send_bytes(u.dataIn, f)
+        words = len(u.dataIn._ag.data)
+        acks = []
+        self.procs.append(self._count_ack(u.dataIn, acks))
+        self.runSim(CLK_PERIOD * (words + 10))
+        self.assertValSequenceEqual(u.status._ag.data, [0 for _ in frames])
+        self.assertEqual(len(acks), words)
+        self.assertEqual(acks[-1] - acks[0], (words - 1) * CLK_PERIOD)
+
+
+class Ipv4ChecksumVerify_16b_TC(Ipv4ChecksumVerify_64b_TC):
+    DW = 16
+
+
+class Ipv4ChecksumVerify_512b_TC(Ipv4ChecksumVerify_64b_TC):
+    DW = 512
+
+
+class Ipv4ChecksumInsert_64b_TC(SimTestCase):
+    DW = 64
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = Ipv4ChecksumInsert()
+        u.DATA_WIDTH = cls.DW
+        cls.compileSim(u)
+
+    def _test(self, frames, randomize=False):
+        """
+        :param frames: list of tuples (frame, L4 checksum offset)
+        """
+        u = self.u
+        for f, csum_off in frames:
+            # the checksums are overwritten
+            f = bytearray(f)
+            if f[12:14] == ETHER_TYPE.IPv4.to_bytes(2, "big"):
+                f[IP_CHECKSUM_OFF:IP_CHECKSUM_OFF + 2] = bytes([0xde, 0xad])
+            if csum_off is not None:
+                f[csum_off:csum_off + 2] = bytes([0xbe, 0xef])
+            axis_send_bytes(u.dataIn, f)
+
+        D_B = self.DW // 8
+        # store-and-forward, the output of the frame starts after the whole frame was received
+        t = len(u.dataIn._ag.data) + max(ceil(len(f) / D_B) for f, _ in frames) + 20
+        if randomize:
+            self.randomize(u.dataIn)
+            self.randomize(u.dataOut)
+            t *= 5
+        self.runSim(CLK_PERIOD * t)
+        for f, _ in frames:
+            off, data = axis_recieve_bytes(u.dataOut)
+            self.assertEqual(off, 0)
+            self.assertValSequenceEqual(data, list(f))
+        self.assertEmpty(u.dataOut._ag.data)
+
+    def test_nop(self):
+        self.runSim(CLK_PERIOD * 10)
+        self.assertEmpty(self.u.dataOut._ag.data)
+
+    def test_frames(self):
+        self._test(ref_frames())
+
+    def test_frames_randomized(self):
+        self._test(ref_frames(), randomize=True)
+
+    def test_udp_zero_checksum(self):
+        # payload which results in the checksum 0 has to be transmitted as 0xffff
+        f, csum_off = eth_ipv4_frame(IP_PROTOCOL.UDP, bytes(2))
+        c = int.from_bytes(f[csum_off:csum_off + 2], "big")
+        # the checksum of the frame is 0xffff if the payload is set so the sum is 0
+        payload = (c ^ 0xffff).to_bytes(2, "big")
+        payload = (~int.from_bytes(payload, "big") & 0xffff).to_bytes(2, "big")
+        f, csum_off = eth_ipv4_frame(IP_PROTOCOL.UDP, payload)
+        self.assertEqual(f[csum_off:csum_off + 2], b"\xff\xff")
+        self._test([(f, csum_off)])
+
+    def _count_ack(self, intf, res: list):
+        while True:
+            yield Timer(CLK_PERIOD)
+            yield WaitCombStable()
+            if intf.valid.read() and intf.ready.read():
+                res.append(self.hdl_simulator.now)
+
+    def test_throughput(self, N=16):
+        u = self.u
+        # the frames have the same length, the longer frame would have to wait until it is stored
+        frames = [eth_ipv4_frame(IP_PROTOCOL.TCP, bytes([i] * 32)) for i in range(N)]
+        for f, _ in frames:
+            axis_send_bytes(u.dataIn, f)
+        words = len(u.dataIn._ag.data)
+        acks = []
+        self.procs.append(self._count_ack(u.dataOut, acks))
+        self.runSim(CLK_PERIOD * (words + words // N + 20))
+        for f, _ in frames:
+            off, data = axis_recieve_bytes(u.dataOut)
+            self.assertValSequenceEqual(data, list(f))
+        self.assertEqual(len(acks), words)
+        # only the first frame waits for its checksum
+        self.assertEqual(acks[-1] - acks[0], (words - 1) * CLK_PERIOD)
+
+
+class Ipv4ChecksumInsert_16b_TC(Ipv4ChecksumInsert_64b_TC):
+    DW = 16
+
+
+class Ipv4ChecksumInsert_512b_TC(Ipv4ChecksumInsert_64b_TC):
+    DW = 512
+
+
+Ipv4ChecksumOffload_TCs = [
+    Ipv4ChecksumVerify_16b_TC,
+    Ipv4ChecksumVerify_64b_TC,
+    Ipv4ChecksumVerify_512b_TC,
+    Ipv4ChecksumInsert_16b_TC,
+    Ipv4ChecksumInsert_64b_TC,
+    Ipv4ChecksumInsert_512b_TC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(Ipv4ChecksumVerify_64b_TC('test_valid'))
+    for tc in Ipv4ChecksumOffload_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
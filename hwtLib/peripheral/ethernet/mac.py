@@ -1,22 +1,30 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from hwt.code import Or, If
+from math import ceil
+from typing import List
+
+from hwt.code import Or, If, Switch
+from hwt.code_utils import rename_signal
 from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.stream import HStream
 from hwt.hdl.types.struct import HStruct
+from hwt.interfaces.std import Handshaked
 from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil
 from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwt.synthesizer.unit import Unit
 from hwtLib.amba.axis import AxiStream
+from hwtLib.amba.axis_comp.fifo import AxiSFifo
 from hwtLib.amba.axis_comp.fifoDrop import AxiSFifoDrop
 from hwtLib.amba.axis_comp.frame_deparser import AxiS_frameDeparser
 from hwtLib.amba.axis_comp.frame_parser import AxiS_frameParser
 from hwtLib.amba.axis_fullduplex import AxiStreamFullDuplex
+from hwtLib.handshaked.fifo import HandshakedFifo
 from hwtLib.handshaked.streamNode import StreamNode
 from hwtLib.logic.crc import Crc
 from hwtLib.logic.crcPoly import CRC_32
-from hwtLib.peripheral.ethernet._axis_eq import AxiS_eq
 from hwtLib.peripheral.ethernet.constants import ETH_BITRATE
 from hwtLib.peripheral.ethernet.types import mac_t, parse_eth_addr
 from hwtLib.peripheral.ethernet.vldsynced_data_err_last import VldSyncedDataErrLast
@@ -41,13 +49,21 @@ class EthernetMac(Unit):
     rest (preamble, SFD, IPG, CDCs, PHY signal protocol, ...)
     is managed by adapter for specified PHY interface.
 
+    :ivar ~.RX_CUT_THROUGH: if False the received frame is stored in RX FIFO
+        and it is dropped if it has a bad FCS (store-and-forward, adds latency of a whole frame),
+        if True the frame is forwarded as soon as dst MAC is checked
+        and the bad FCS is signalized using eth.rx.user=1 on the last word of the frame
+        (eth.rx has to accept the data at the line rate, eth.tx.user is unused)
+    :ivar ~.RX_FIFO_DEPTH: number of words of the RX FIFO (used only if not RX_CUT_THROUGH)
+
     :note: This component does not have any controll registers or statistics etc.
         But the signals are accessible. Inherit from this class and
         add control bus, statistics, address space of of your choice.
         Same applies to a MAC address filter.
     :note: This component Ehternet MAC implementation is efficient for
         bandwidths where it is not required to send multiple packets in same clk tick.
-        (usually 10M - 10G but depends on frequency and data width)
+        (usually 10M - 10G but depends on frequency and data width),
+        for higher bandwidths use :class:`hwtLib.peripheral.ethernet.mac_segmented.EthernetMacSegmented`
 
     .. hwt-autodoc::
     """
@@ -62,6 +78,7 @@ class EthernetMac(Unit):
         self.HAS_RX = Param(True)
         # number of fifo items (size[B] = *DATA_WIDTH/8)
         self.RX_FIFO_DEPTH = Param(2048)
+        self.RX_CUT_THROUGH = Param(False)
 
     def _declr(self):
         addClkRstn(self)
@@ -76,14 +93,52 @@ class EthernetMac(Unit):
             self.eth = AxiStreamFullDuplex()
             self.eth.USE_STRB = self.USE_STRB
             self.eth.IS_BIGENDIAN = True
+            if self.HAS_RX and self.RX_CUT_THROUGH:
+                # error flag on last word of the frame
+                self.eth.USER_WIDTH = 1
+
+    def _rx_mac_filter(self, din):
+        """
+        Compare the dst MAC (first 6B of the frame) with DEFAULT_MAC_ADDR
 
-    def _rx_mac_filter(self):
+        :return: tuple (vld, is_my_mac), vld is 1 for a single word of each frame
+            (the word with the end of the dst MAC)
+        """
         def_mac = parse_eth_addr(self.DEFAULT_MAC_ADDR)
-        def_mac = int.from_bytes(def_mac, 'big')
-        mac_eq = AxiS_eq()
-        mac_eq._updateParamsFrom(self)
-        self.rx_mac_filter = mac_eq
-        return mac_eq.dataIn, mac_eq.dataOut
+        # byte 0 of the frame is on LSB
+        def_mac = mac_t.from_py(int.from_bytes(def_mac, 'little'))
+        MAC_W = mac_t.bit_length()
+        DW = self.DATA_WIDTH
+        word_cnt = ceil(MAC_W / DW)
+
+        # index of the word in frame, word_cnt means that the dst MAC was already checked
+        word_i = self._reg("rx_mac_word_i", Bits(log2ceil(word_cnt + 1)), def_val=0)
+        # true if all previous words of dst MAC were matching
+        match = self._reg("rx_mac_match", def_val=1)
+        word_eq = self._sig("rx_mac_word_eq")
+        word_cases = []
+        for i in range(word_cnt):
+            val_low = i * DW
+            val_high = min(val_low + DW, MAC_W)
+            word_cases.append((i, word_eq(din.data[val_high - val_low:]._eq(def_mac[val_high:val_low]))))
+        Switch(word_i)\
+            .add_cases(word_cases)\
+            .Default(word_eq(0))
+
+        If(din.vld,
+            If(din.last,
+               word_i(0),
+               match(1),
+            ).Elif(word_i != word_cnt,
+               word_i(word_i + 1),
+               match(match & word_eq),
+            )
+        )
+        is_last_mac_word = word_i._eq(word_cnt - 1)
+        # the frame may end before the end of the dst MAC
+        vld = rename_signal(self, din.vld & (is_last_mac_word | (din.last & (word_i != word_cnt))), "rx_mac_vld")
+        is_my_mac = rename_signal(self, match & word_eq & is_last_mac_word, "rx_is_my_mac")
+        return vld, is_my_mac
 
     def _rx_logic(self):
         """
@@ -91,9 +146,10 @@ class EthernetMac(Unit):
         * parse dst mac
         * check fcs
         * cut off fcs
-        * store in output buffer
+        * store in output buffer (only if not RX_CUT_THROUGH)
 
-        The frame can be dropped if:
+        The frame can be dropped if (if RX_CUT_THROUGH only the MAC address filter drops the frame,
+        the other errors are signalized by eth.rx.user on the last word of the frame):
         * there is an error durig recieving on PHY/adapter layer (err_rx_phy)
         * or because of backpressure from eth.rx (err_rx_out_of_mem)
         * or because of incorrect FCS            (err_rx_bad_fcs)
@@ -106,21 +162,10 @@ class EthernetMac(Unit):
         not_my_mac = self.err_rx_not_my_mac = self._sig("err_rx_not_my_mac")
         errors = [fcs_bad, out_of_mem, phy_err, not_my_mac]
 
-        # dst mac is a stream because we want to resize it's channel
-        # according to input interface so we do not waste resoruces
-        # on buffers allong the way to output
-
         def propagate_config(u):
             u.DATA_WIDTH = self.DATA_WIDTH
             u.USE_STRB = self.USE_STRB
 
-        dst_mac_parser = AxiS_frameParser(HStruct(
-            (HStream(mac_t, frame_len=(1, 1)), "dst"),
-            (HStream(Bits(8)), None),  # ignore data at the end
-        ))
-        propagate_config(dst_mac_parser)
-        self.rx_mac_parser = dst_mac_parser
-
         fcs_cutter = AxiS_frameParser(HStruct(
             (HStream(Bits(8)), "data"),
             (Bits(32), None),  # fcs to cut off
@@ -139,13 +184,11 @@ class EthernetMac(Unit):
         # reg added in order to see more glitches in sim more clearly
         din = vldSyncedReg(self, self.phy_rx)
 
-        in_sync = StreamNode(
+        StreamNode(
             [],
-            [dst_mac_parser.dataIn,
-             fcs_cutter.dataIn])
-        in_sync.sync(din.vld)
-        for inp in (dst_mac_parser.dataIn,
-                    fcs_cutter.dataIn,
+            [fcs_cutter.dataIn]
+        ).sync(din.vld)
+        for inp in (fcs_cutter.dataIn,
                     crc.dataIn):
             inp.data(din.data)
             if self.USE_STRB:
@@ -157,45 +200,122 @@ class EthernetMac(Unit):
         crc.dataIn.vld(din.vld)
         # drop fcs, was checked on original stream
 
-        # output fifo for dropping of invalid frames
-        out_fifo = AxiSFifoDrop()
-        out_fifo.DEPTH = self.RX_FIFO_DEPTH
-        propagate_config(out_fifo)
-        self.rx_out_fifo = out_fifo
+        # errors and mac filter
+        mac_vld, is_my_mac = self._rx_mac_filter(din)
+        not_my_mac(mac_vld & ~is_my_mac)
+        phy_err(din.err & din.vld)
+        fcs_good(din.vld & din.last & (crc.dataOut._eq(CRC32_RESIDUE)))
+        fcs_bad(din.vld & din.last & (crc.dataOut != CRC32_RESIDUE))
+        out_of_mem(~fcs_cutter.dataIn.ready & din.vld)
 
-        out_fifo.dataIn(fcs_cutter.dataOut.data)
-        data = AxiSBuilder(self, out_fifo.dataOut).buff(4).end
+        if self.RX_CUT_THROUGH:
+            self._rx_cut_through(din, fcs_cutter.dataOut.data, mac_vld, is_my_mac,
+                                 [fcs_bad, out_of_mem, phy_err])
+        else:
+            self._rx_store_and_forward(din, fcs_cutter.dataOut.data, errors)
+
+        propagateClkRstn(self)
 
+    def _rx_frame_status(self, din, errors: List[RtlSignal], ack: RtlSignal):
+        """
+        Collect the errors of the frames on the input
+
+        :param ack: signal which marks that the status of the oldest frame was consumed
+        :return: tuple (vld, err) the status of the oldest frame which status
+            was not consumed yet (the status is available in the same clock cycle
+            when the last word of the frame is on the input)
+        """
         err_in_this_frame = self._reg("rx_err_in_this_frame", def_val=0)
-        fcs_good_in_this_frame = self._reg("rx_fcs_good_in_this_frame", def_val=0)
-        If(data.valid & data.last,
-           fcs_good_in_this_frame(0),
+        frame_end = din.vld & din.last
+        frame_err = rename_signal(self, err_in_this_frame | (din.vld & Or(*errors)), "rx_frame_err")
+        If(frame_end,
            err_in_this_frame(0),
         ).Else(
-           fcs_good_in_this_frame(fcs_good_in_this_frame | fcs_good),
-           err_in_this_frame(din.vld & Or(*errors))
+           err_in_this_frame(frame_err),
         )
-        out_fifo.dataIn_discard((din.vld & Or(*errors)) | err_in_this_frame)
+        status_vld = self._reg("rx_frame_status_vld", def_val=0)
+        status_err = self._reg("rx_frame_status_err", def_val=0)
+        If(ack,
+           # the status of the next frame may be available in the same clock cycle
+           status_vld(status_vld & frame_end),
+           status_err(frame_err),
+        ).Elif(frame_end,
+           status_vld(1),
+           status_err(frame_err),
+        )
+        st_vld = status_vld | frame_end
+        st_err = status_vld._ternary(status_err, frame_err)
+        return st_vld, st_err
 
+    def _rx_store_and_forward(self, din, data_in: AxiStream, errors: List[RtlSignal]):
+        """
+        Store the frame in to RX FIFO and drop it if there is any error
+        """
+        # output fifo for dropping of invalid frames
+        out_fifo = AxiSFifoDrop()
+        out_fifo.DEPTH = self.RX_FIFO_DEPTH
+        out_fifo.DATA_WIDTH = self.DATA_WIDTH
+        out_fifo.USE_STRB = self.USE_STRB
+        self.rx_out_fifo = out_fifo
 
-        # postpone procesing of last word until we know the result of fcs check
-        dout = self.eth.rx
-        dout(data, exclude=[data.ready, data.valid])
-        not_fcs_check_wait = ~data.last | fcs_good_in_this_frame | err_in_this_frame
+        # the data of the frame are delayed in fcs cutter,
+        # the last word of the frame has to wait for the result of the checks
+        # and the whole frame is discarded if there was any error
+        fifo_in = out_fifo.dataIn
+        st_ack = self._sig("rx_frame_status_ack")
+        st_vld, st_err = self._rx_frame_status(din, errors, st_ack)
+        last_ok = ~data_in.last | st_vld
+        fifo_in(data_in, exclude=[data_in.ready, data_in.valid])
         StreamNode(
-            [data], [dout],
-        ).sync(not_fcs_check_wait)
+            [data_in], [fifo_in],
+        ).sync(last_ok)
+        st_ack(data_in.valid & data_in.last & st_vld & fifo_in.ready)
+        out_fifo.dataIn_discard(data_in.valid & data_in.last & st_vld & st_err)
 
-        # errors and mac filter
-        mac_filter_in, is_my_mac = self._rx_mac_filter()
-        mac_filter_in(dst_mac_parser.dataOut.dst)
-        is_my_mac.rd(1)
-        not_my_mac(is_my_mac.vld & ~is_my_mac.data)
-        phy_err(din.err & din.vld)
-        fcs_good(din.vld & din.last & (crc.dataOut._eq(CRC32_RESIDUE)))
-        fcs_bad(din.vld & din.last & (crc.dataOut != CRC32_RESIDUE))
-        out_of_mem(~fcs_cutter.dataIn.ready & din.vld)
-        propagateClkRstn(self)
+        data = AxiSBuilder(self, out_fifo.dataOut).buff(4).end
+        self.eth.rx(data)
+
+    def _rx_cut_through(self, din, data_in: AxiStream,
+                        mac_vld: RtlSignal, is_my_mac: RtlSignal,
+                        errors: List[RtlSignal]):
+        """
+        Forward the frame as soon as the dst MAC is checked,
+        the errors are signalized using eth.rx.user on last word of the frame
+        """
+        # buffer for the words which are recieved before the dst MAC is checked
+        buff = AxiSFifo()
+        buff.DEPTH = ceil(mac_t.bit_length() / self.DATA_WIDTH) + 2
+        buff.DATA_WIDTH = self.DATA_WIDTH
+        buff.USE_STRB = self.USE_STRB
+        self.rx_buff = buff
+        buff.dataIn(data_in)
+        data = buff.dataOut
+
+        # the result of the dst MAC check for each frame in buffer
+        mac_check = HandshakedFifo(Handshaked)
+        mac_check.DATA_WIDTH = 1
+        mac_check.DEPTH = 2
+        self.rx_mac_check = mac_check
+        # eth.rx has to accept the data at line rate, there is always a space
+        mac_check.dataIn.vld(mac_vld)
+        mac_check.dataIn.data(is_my_mac)
+        is_my_mac = mac_check.dataOut
+
+        # the result of the FCS check for the frame on output
+        # (the last word of the frame has to wait until the whole frame is recieved)
+        out_last = self._sig("rx_frame_status_ack")
+        st_vld, st_err = self._rx_frame_status(din, errors, out_last)
+
+        dout = self.eth.rx
+        fwd = is_my_mac.data
+        last_ok = ~data.last | st_vld
+        data_ack = rename_signal(self, is_my_mac.vld & last_ok & (~fwd | dout.ready), "rx_data_ack")
+        dout(data, exclude=[data.ready, data.valid, dout.user])
+        dout.user(data.last & st_err)
+        dout.valid(data.valid & is_my_mac.vld & last_ok & fwd)
+        data.ready(data_ack)
+        out_last(data.valid & data.last & data_ack)
+        is_my_mac.rd(out_last)
 
     def _tx_logic(self):
         """
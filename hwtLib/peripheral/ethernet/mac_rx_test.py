@@ -1,16 +1,23 @@
+from collections import deque
 from itertools import chain
+from math import ceil
 
 from hwt.simulator.simTestCase import SimTestCase
-from hwtLib.amba.axis import axis_recieve_bytes, packAxiSFrame
+from hwtLib.amba.axis import axis_recieve_bytes, packAxiSFrame, \
+    _axis_recieve_bytes
+from hwtLib.logic.crcPoly import CRC_32
+from hwtLib.logic.crcSw import crc_sw
 from hwtLib.peripheral.ethernet.mac import EthernetMac
 from hwtLib.peripheral.ethernet.mac_tx_test import REF_FRAME, REF_CRC
 from hwtLib.peripheral.ethernet.types import format_eth_addr
 from hwtLib.types.ctypes import uint8_t
 from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitCombStable
 
 
 class EthernetMacRx_8b_TC(SimTestCase):
     DW = 8
+    CUT_THROUGH = False
 
     @classmethod
     def setUpClass(cls):
@@ -19,37 +26,140 @@ class EthernetMacRx_8b_TC(SimTestCase):
         u.HAS_RX = True
         u.HAS_TX = False
         u.DATA_WIDTH = cls.DW
+        u.RX_CUT_THROUGH = cls.CUT_THROUGH
         cls.compileSim(u)
 
-    def test_nop(self):
+    def send_frame(self, rx_frame_bytes, err=0):
         u = self.u
-        self.randomize(u.eth.rx)
-        self.randomize(u.phy_rx)
-        self.runSim(CLK_PERIOD * 10)
-        self.assertEmpty(u.eth.rx._ag.data)
-
-    def test_single(self):
-        u = self.u
-        rx_frame_bytes = list(chain(REF_FRAME, REF_CRC))
         t = uint8_t[len(rx_frame_bytes)]
         # :attention: strb signal is reinterpreted as a keep signal
         rx_data = packAxiSFrame(self.DW, t.from_py(rx_frame_bytes),
                                 withStrb=True)
         if u.USE_STRB:
-            rx_data_for_agent = ((d, m, 0, last) for d, m, last in rx_data)
+            rx_data_for_agent = ((d, m, err, last) for d, m, last in rx_data)
         else:
-            rx_data_for_agent = ((d, 0, last) for d, _, last in rx_data)
+            rx_data_for_agent = ((d, err, last) for d, _, last in rx_data)
 
         u.phy_rx._ag.data.extend(
             rx_data_for_agent
         )
 
+    def pop_rx_frame(self):
+        """
+        :return: tuple (offset, frame bytes, error flag)
+        """
+        rx = self.u.eth.rx
+        if not self.CUT_THROUGH:
+            o, f = axis_recieve_bytes(rx)
+            return o, f, 0
+
+        # remove the user signal (error flag) from the data of the agent
+        ag_data = rx._ag.data
+        words = deque()
+        err = None
+        while ag_data:
+            *d, user, last = ag_data.popleft()
+            words.append((*d, last))
+            if last:
+                err = int(user)
+                break
+        o, f = _axis_recieve_bytes(words, self.DW // 8, self.u.USE_STRB, False)
+        return o, f, err
+
+    def test_nop(self):
+        u = self.u
+        self.randomize(u.eth.rx)
+        self.randomize(u.phy_rx)
+        self.runSim(CLK_PERIOD * 10)
+        self.assertEmpty(u.eth.rx._ag.data)
+
+    def test_single(self):
+        u = self.u
+        self.send_frame(list(chain(REF_FRAME, REF_CRC)))
+
+        self.runSim(CLK_PERIOD * (2 * len(u.phy_rx._ag.data) + 10))
+        o, f, err = self.pop_rx_frame()
+        self.assertEqual(o, 0)
+        self.assertEqual(err, 0)
+        self.assertValSequenceEqual(f, REF_FRAME)
+        self.assertEmpty(u.eth.rx._ag.data)
+
+    def test_not_my_mac(self):
+        u = self.u
+        other_frame = list(REF_FRAME)
+        other_frame[5] ^= 0x1
+        # valid FCS, the frame has to be dropped by the MAC address filter
+        other_crc = crc_sw(CRC_32, bytes(other_frame)).to_bytes(4, "little")
+        self.send_frame(list(chain(other_frame, other_crc)))
+        self.send_frame(list(chain(REF_FRAME, REF_CRC)))
+
         self.runSim(CLK_PERIOD * (2 * len(u.phy_rx._ag.data) + 10))
-        o, f = axis_recieve_bytes(u.eth.rx)
+        o, f, err = self.pop_rx_frame()
         self.assertEqual(o, 0)
+        self.assertEqual(err, 0)
         self.assertValSequenceEqual(f, REF_FRAME)
         self.assertEmpty(u.eth.rx._ag.data)
 
+    def _first_rx_word_time(self, res: list):
+        while True:
+            yield Timer(CLK_PERIOD)
+            yield WaitCombStable()
+            rx = self.u.eth.rx
+            if rx.valid.read() and rx.ready.read():
+                res.append(self.hdl_simulator.now)
+                return
+
+    def measure_latency(self):
+        """
+        :return: number of clock cycles between the first word of the frame on phy_rx
+            and the first word of the frame on eth.rx
+        """
+        u = self.u
+        self.send_frame(list(chain(REF_FRAME, REF_CRC)))
+        frame_words = len(u.phy_rx._ag.data)
+        t = []
+        self.procs.append(self._first_rx_word_time(t))
+        self.runSim(CLK_PERIOD * (2 * frame_words + 10))
+        o, f, err = self.pop_rx_frame()
+        self.assertEqual(err, 0)
+        self.assertValSequenceEqual(f, REF_FRAME)
+        # phy_rx agent starts to send the data in the first clock cycle after reset
+        # (the time is measured in clock cycles from the first clock cycle)
+        return t[0] // CLK_PERIOD, frame_words
+
+    def test_latency(self):
+        latency, frame_words = self.measure_latency()
+        # the whole frame has to be stored before it is forwarded
+        self.assertGreaterEqual(latency, frame_words)
+
+
+class EthernetMacRx_CutThrough_8b_TC(EthernetMacRx_8b_TC):
+    CUT_THROUGH = True
+
+    def test_latency(self):
+        latency, frame_words = self.measure_latency()
+        # the frame is forwarded as soon as the dst MAC is recieved
+        # and the fcs cutter knows that the word is not a part of FCS
+        dst_mac_and_fcs_words = ceil((6 + 4) / (self.DW // 8))
+        self.assertLess(latency, frame_words)
+        self.assertLessEqual(latency, dst_mac_and_fcs_words + 5)
+
+    def test_bad_fcs(self):
+        u = self.u
+        bad_frame = list(chain(REF_FRAME, REF_CRC))
+        bad_frame[-1] ^= 0xff
+        self.send_frame(bad_frame)
+        self.send_frame(list(chain(REF_FRAME, REF_CRC)))
+        self.send_frame(list(chain(REF_FRAME, REF_CRC)), err=1)
+
+        self.runSim(CLK_PERIOD * (2 * len(u.phy_rx._ag.data) + 10))
+        for err_ref in [1, 0, 1]:
+            o, f, err = self.pop_rx_frame()
+            self.assertEqual(o, 0)
+            self.assertEqual(err, err_ref)
+            self.assertValSequenceEqual(f, REF_FRAME)
+        self.assertEmpty(u.eth.rx._ag.data)
+
 
 class EthernetMacRx_32b_TC(EthernetMacRx_8b_TC):
     DW = 32
@@ -59,10 +169,21 @@ class EthernetMacRx_64b_TC(EthernetMacRx_8b_TC):
     DW = 64
 
 
+class EthernetMacRx_CutThrough_32b_TC(EthernetMacRx_CutThrough_8b_TC):
+    DW = 32
+
+
+class EthernetMacRx_CutThrough_64b_TC(EthernetMacRx_CutThrough_8b_TC):
+    DW = 64
+
+
 EthernetMac_rx_TCs = [
     EthernetMacRx_8b_TC,
     EthernetMacRx_32b_TC,
     EthernetMacRx_64b_TC,
+    EthernetMacRx_CutThrough_8b_TC,
+    EthernetMacRx_CutThrough_32b_TC,
+    EthernetMacRx_CutThrough_64b_TC,
 ]
 
 
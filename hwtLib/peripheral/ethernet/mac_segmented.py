@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List
+
+from hwt.code import If, Concat, Switch
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.synthesizer.hObjList import HObjList
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwt.synthesizer.vectorUtils import iterBits
+from hwtLib.logic.crcComb import CrcComb
+from hwtLib.logic.crcPoly import CRC_32
+from hwtLib.peripheral.ethernet._axis_eq import AxiS_eq
+from hwtLib.peripheral.ethernet.constants import ETH_BITRATE
+from hwtLib.peripheral.ethernet.mac import CRC32_RESIDUE, vldSyncedReg
+from hwtLib.peripheral.ethernet.segmented_intf import AxiStreamSegmented, \
+    VldSyncedSegmented, SegmentedStreamFullDuplex
+from hwtLib.peripheral.ethernet.types import parse_eth_addr
+from pyMathBitPrecise.bit_utils import mask, bit_list_reversed_endianity
+
+
+class EthernetMacSegmented(Unit):
+    """
+    Media independent Ethernet MAC (Media Access Control) for a segmented bus
+    (:class:`~.AxiStreamSegmented`), multiple frames can be processed in a single clock cycle.
+    Same as :class:`~.EthernetMac` the preamble, SFD, IPG, CDCs, PHY signal protocol, ...
+    are managed by adapter for specified PHY interface.
+
+    The FCS check/generation, dst MAC address filter and FCS cutter are resolved for each segment,
+    the CRC of the segments of a single data word is computed as a chain of CRC XOR matrices
+    (the CRC state is restarted on start of the frame and the value is checked/appended at the end
+    of each frame).
+
+    :ivar ~.SEGMENT_CNT: number of segments in a data word,
+        the segment has to be at least 8B wide so the dst MAC is in a single segment
+        and there is at most a single end of the frame in the segment
+        (minimal Ethernet frame is 64B)
+
+    :note: The frames with a bad FCS or with an error from PHY are not dropped,
+        they are marked using eth.rx.err on the end of the frame instead
+        (the frames would have to be stored in a buffer in order to be dropped
+        and all frames have to be accepted at the line rate anyway).
+        The frames with a different dst MAC are dropped.
+    :note: The FCS is appended behind the last byte of the frame,
+        if there is less than 4B of free space in the last segment of the frame
+        the next segment has to be unused (eth.tx.keep=0 for that segment).
+        The frames with length % 8 in 1..4 (for a 8B segment)
+        can be sent back to back without any unused segment.
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        self.FREQ = Param(int(322.265625e6))
+        self.BITRATE = Param(ETH_BITRATE.M_100G)
+        self.DATA_WIDTH = Param(512)
+        self.SEGMENT_CNT = Param(8)
+        self.DEFAULT_MAC_ADDR = Param("01:23:45:67:89:AB")
+        self.HAS_TX = Param(True)
+        self.HAS_RX = Param(True)
+
+    def _declr(self):
+        addClkRstn(self)
+        assert self.DATA_WIDTH % self.SEGMENT_CNT == 0, (self.DATA_WIDTH, self.SEGMENT_CNT)
+        self.SEGMENT_WIDTH = self.DATA_WIDTH // self.SEGMENT_CNT
+        assert self.SEGMENT_WIDTH % 8 == 0 and self.SEGMENT_WIDTH >= 64, self.SEGMENT_WIDTH
+        with self._paramsShared():
+            if self.HAS_TX:
+                self.phy_tx = AxiStreamSegmented()._m()
+
+            if self.HAS_RX:
+                self.phy_rx = VldSyncedSegmented()
+
+            self.eth = SegmentedStreamFullDuplex()
+
+        if self.HAS_RX:
+            mac_eq = HObjList()
+            def_mac = parse_eth_addr(self.DEFAULT_MAC_ADDR)
+            # byte 0 of the frame is on LSB
+            def_mac = Bits(8 * len(def_mac)).from_py(int.from_bytes(def_mac, 'little'))
+            for _ in range(self.SEGMENT_CNT):
+                eq = AxiS_eq()
+                eq.DATA_WIDTH = self.SEGMENT_WIDTH
+                eq.VAL = def_mac
+                mac_eq.append(eq)
+            self.rx_mac_filter = mac_eq
+
+    def _segment(self, sig: RtlSignal, i: int, item_width: int):
+        """
+        :return: the part of the signal which belongs to segment i
+        """
+        w = self.SEGMENT_WIDTH // 8 * item_width
+        return sig[(i + 1) * w:i * w]
+
+    def _crc_segmented(self, name: str, data: RtlSignal, keep: RtlSignal,
+                       start: RtlSignal, state: RtlSignal) -> List[RtlSignal]:
+        """
+        Build the chain of CRC XOR matrices for all segments of the data word
+
+        :param state: the CRC state from the previous data word
+        :return: list of the CRC states after each segment (not finalized)
+        """
+        poly_bits, _ = CrcComb.parsePoly(CRC_32.POLY, CRC_32.WIDTH)
+        SEG_B = self.SEGMENT_WIDTH // 8
+        INIT = state._dtype.from_py(CRC_32.INIT)
+        res = []
+        for i in range(self.SEGMENT_CNT):
+            # lower byte is processed first (:see: :class:`hwtLib.logic.crc.Crc`)
+            data_in_bits = bit_list_reversed_endianity(
+                list(iterBits(self._segment(data, i, 8))))
+            state_in = rename_signal(self, start[i]._ternary(INIT, state), f"{name:s}_in_{i:d}")
+            state_in_bits = list(iterBits(state_in))
+            state_out = self._sig(f"{name:s}_{i:d}", state._dtype)
+            cases = []
+            for vld_byte_cnt in range(1, SEG_B + 1):
+                _data_in_bits = data_in_bits[(SEG_B - vld_byte_cnt) * 8:]
+                crcMatrix = CrcComb.buildCrcXorMatrixPacked(len(_data_in_bits), poly_bits)
+                state_next = CrcComb.applyCrcXorMatrix(
+                    crcMatrix, _data_in_bits, state_in_bits, CRC_32.REFIN)
+                cases.append((mask(vld_byte_cnt), state_out(Concat(*reversed(state_next)))))
+
+            Switch(self._segment(keep, i, 1)).add_cases(
+                cases
+            ).Default(
+                # unused segment
+                state_out(state_in)
+            )
+            res.append(state_out)
+            state = state_out
+
+        return res
+
+    @staticmethod
+    def _crc_finalize(state: RtlSignal):
+        """
+        Apply REFOUT and XOROUT on CRC state
+        """
+        XOROUT = state._dtype.from_py(CRC_32.XOROUT)
+        if CRC_32.REFOUT:
+            state = Concat(*iterBits(state))
+        return state ^ XOROUT
+
+    def _rx_logic(self):
+        """
+        Each data word is processed in these steps:
+        * check FCS and dst MAC of each segment, mark the frames with errors, drop frames with a different MAC
+        * cut off FCS (the FCS may be spread over two data words, the word is delayed until the next word
+          is available if it ends with unfinished frame)
+        """
+        S = self.SEGMENT_CNT
+        SEG_B = self.SEGMENT_WIDTH // 8
+        din = vldSyncedReg(self, self.phy_rx)
+
+        crc_state = self._reg("rx_crc", Bits(CRC_32.WIDTH), def_val=CRC_32.INIT)
+        crc = self._crc_segmented("rx_crc", din.data, din.keep, din.start, crc_state)
+        If(din.vld,
+           crc_state(crc[-1])
+        )
+
+        # the flags for the frame are propagated over the segments
+        # and stored in register for the next data word
+        drop_prev = drop = self._reg("rx_drop", def_val=0)
+        err_prev = err = self._reg("rx_phy_err", def_val=0)
+
+        fcs_bad = []
+        fcs_good = []
+        phy_err = []
+        not_my_mac = []
+        # the data word after the MAC filter and FCS check
+        keep_c = []
+        start_c = []
+        end_c = []
+        err_c = []
+        for i, (mac_eq, crc_out) in enumerate(zip(self.rx_mac_filter, crc)):
+            start = din.start[i]
+            end = din.end[i]
+            keep = self._segment(din.keep, i, 1)
+            has_data = keep != 0
+
+            mac_eq.dataIn.data(self._segment(din.data, i, 8))
+            mac_eq.dataIn.last(1)
+            mac_eq.dataIn.valid(din.vld & start)
+            mac_eq.dataOut.rd(1)
+            drop = rename_signal(self, start._ternary(~mac_eq.dataOut.data, drop), f"rx_drop_{i:d}")
+            err = rename_signal(self, (~start & err) | (has_data & din.err[i]), f"rx_phy_err_{i:d}")
+            fcs_ok = rename_signal(self, self._crc_finalize(crc_out)._eq(CRC32_RESIDUE), f"rx_fcs_ok_{i:d}")
+
+            fcs_bad.append(din.vld & end & ~drop & ~fcs_ok)
+            fcs_good.append(din.vld & end & ~drop & fcs_ok)
+            phy_err.append(din.vld & has_data & din.err[i])
+            not_my_mac.append(din.vld & start & drop)
+
+            keep_c.append(drop._ternary(keep._dtype.from_py(0), keep))
+            start_c.append(start & ~drop)
+            end_c.append(end & ~drop)
+            err_c.append(err | ~fcs_ok)
+
+        If(din.vld,
+           drop_prev(drop),
+           err_prev(err),
+        )
+
+        def as_vec(name, bits):
+            return rename_signal(self, Concat(*reversed(bits)), name)
+
+        self.err_rx_fcs_bad = as_vec("err_rx_fcs_bad", fcs_bad)
+        self.err_rx_fcs_good = as_vec("err_rx_fcs_good", fcs_good)
+        self.err_rx_phy = as_vec("err_rx_phy", phy_err)
+        self.err_rx_not_my_mac = as_vec("err_rx_not_my_mac", not_my_mac)
+
+        # cut off the FCS, if there is less than 5B in the last segment of the frame
+        # the end of the frame is moved to previous segment
+        # (which may be in previous data word)
+        short = [rename_signal(self, e & ~k[4], f"rx_fcs_only_{i:d}")
+                 for i, (e, k) in enumerate(zip(end_c, keep_c))]
+
+        def keep_before_short(keep_short):
+            # keep for a full segment followed by the segment with a part of FCS only
+            return Concat(keep_short[4:], Bits(SEG_B - 4).from_py(mask(SEG_B - 4)))
+
+        keep_o = []
+        end_o = []
+        err_o = []
+        for i in range(S):
+            k = self._sig(f"rx_keep_o_{i:d}", keep_c[i]._dtype)
+            k_stm = If(end_c[i],
+                If(short[i],
+                   k(0)
+                ).Else(
+                   k(Concat(Bits(4).from_py(0), keep_c[i][SEG_B:4]))
+                )
+            )
+            e = end_c[i] & ~short[i]
+            er = e & err_c[i]
+            if i != S - 1:
+                k_stm.Elif(short[i + 1],
+                    k(keep_before_short(keep_c[i + 1]))
+                )
+                e = e | short[i + 1]
+                er = er | (short[i + 1] & err_c[i + 1])
+            k_stm.Else(
+                k(keep_c[i])
+            )
+            keep_o.append(k)
+            end_o.append(e)
+            err_o.append(er)
+
+        # buffer for a data word which waits for a next data word
+        # because the end of the frame may be in next data word
+        b_vld = self._reg("rx_buff_vld", def_val=0)
+        b_data = self._reg("rx_buff_data", din.data._dtype)
+        b_keep = self._reg("rx_buff_keep", din.keep._dtype)
+        b_start = self._reg("rx_buff_start", din.start._dtype)
+        b_end = self._reg("rx_buff_end", din.end._dtype)
+        b_err = self._reg("rx_buff_err", din.err._dtype)
+        # the frame in the last segment continues in next data word
+        b_open = self._reg("rx_buff_open", def_val=0)
+
+        If(din.vld,
+            b_vld(1),
+            b_data(din.data),
+            b_keep(Concat(*reversed(keep_o))),
+            b_start(Concat(*reversed(start_c))),
+            b_end(Concat(*reversed(end_o))),
+            b_err(Concat(*reversed(err_o))),
+            b_open((keep_o[-1] != 0) & ~end_o[-1]),
+        ).Elif(~b_open,
+            b_vld(0),
+        )
+
+        # the end of the frame moved from the first segment of the current data word
+        # to the last segment of the buffered data word
+        carry = rename_signal(self, din.vld & short[0], "rx_fcs_carry")
+        b_emit = rename_signal(self, b_vld & (din.vld | ~b_open), "rx_buff_emit")
+        dout = self.eth.rx
+        o_vld = self._reg("rx_out_vld", def_val=0)
+        o_data = self._reg("rx_out_data", din.data._dtype)
+        o_keep = self._reg("rx_out_keep", din.keep._dtype)
+        o_start = self._reg("rx_out_start", din.start._dtype)
+        o_end = self._reg("rx_out_end", din.end._dtype)
+        o_err = self._reg("rx_out_err", din.err._dtype)
+        LAST_KEEP_OFF = (S - 1) * SEG_B
+        o_vld(b_emit)
+        If(b_emit,
+            o_data(b_data),
+            o_start(b_start),
+            If(carry,
+               o_keep(Concat(keep_before_short(keep_c[0]),
+                             b_keep[LAST_KEEP_OFF:])),
+               o_end(Concat(BIT.from_py(1), b_end[S - 1:])),
+               o_err(Concat(err_c[0], b_err[S - 1:])),
+            ).Else(
+               o_keep(b_keep),
+               o_end(b_end),
+               o_err(b_err),
+            )
+        )
+        dout.vld(o_vld)
+        dout.data(o_data)
+        dout.keep(o_keep)
+        dout.start(o_start)
+        dout.end(o_end)
+        dout.err(o_err)
+
+    def _tx_logic(self):
+        """
+        Compute and append FCS to each frame
+        """
+        S = self.SEGMENT_CNT
+        SEG_B = self.SEGMENT_WIDTH // 8
+        din = self.eth.tx
+        dout = self.phy_tx
+
+        crc_state = self._reg("tx_crc", Bits(CRC_32.WIDTH), def_val=CRC_32.INIT)
+        crc = self._crc_segmented("tx_crc", din.data, din.keep, din.start, crc_state)
+
+        # part of the FCS which did not fit in to the last segment of the data word
+        spill = self._reg("tx_spill", def_val=0)
+        spill_data = self._reg("tx_spill_data", Bits(4 * 8))
+        spill_keep = self._reg("tx_spill_keep", Bits(4))
+
+        # the part of FCS from previous segment (data, keep, vld)
+        ov = (spill_data, spill_keep, spill)
+        data_o = []
+        keep_o = []
+        end_o = []
+        for i, crc_out in enumerate(crc):
+            data = self._segment(din.data, i, 8)
+            keep = self._segment(din.keep, i, 1)
+            fcs = rename_signal(self, self._crc_finalize(crc_out), f"tx_fcs_{i:d}")
+            d = self._sig(f"tx_data_o_{i:d}", data._dtype)
+            k = self._sig(f"tx_keep_o_{i:d}", keep._dtype)
+            e = self._sig(f"tx_end_o_{i:d}")
+            ov_data = self._sig(f"tx_fcs_ov_data_{i:d}", spill_data._dtype)
+            ov_keep = self._sig(f"tx_fcs_ov_keep_{i:d}", spill_keep._dtype)
+            ov_vld = self._sig(f"tx_fcs_ov_vld_{i:d}")
+
+            cases = []
+            for vld_byte_cnt in range(1, SEG_B + 1):
+                free_B = SEG_B - vld_byte_cnt
+                if free_B >= 4:
+                    pad_w = (free_B - 4) * 8
+                    _d = Concat(fcs, data[vld_byte_cnt * 8:])
+                    if pad_w:
+                        _d = Concat(Bits(pad_w).from_py(0), _d)
+                    on_end = [
+                        d(_d),
+                        k(mask(vld_byte_cnt + 4)),
+                        e(1),
+                        ov_data(None),
+                        ov_keep(0),
+                        ov_vld(0),
+                    ]
+                else:
+                    # only part of FCS fits in to this segment
+                    if free_B:
+                        _ov_data = Concat(Bits(free_B * 8).from_py(0), fcs[:free_B * 8])
+                        _d = Concat(fcs[free_B * 8:], data[vld_byte_cnt * 8:])
+                    else:
+                        _ov_data = fcs
+                        _d = data
+                    on_end = [
+                        d(_d),
+                        k(mask(SEG_B)),
+                        e(0),
+                        ov_data(_ov_data),
+                        ov_keep(mask(4 - free_B)),
+                        ov_vld(1),
+                    ]
+                cases.append((mask(vld_byte_cnt), If(din.end[i],
+                    on_end
+                ).Else(
+                    d(data),
+                    k(keep),
+                    e(0),
+                    ov_data(None),
+                    ov_keep(0),
+                    ov_vld(0),
+                )))
+
+            prev_ov_data, prev_ov_keep, prev_ov_vld = ov
+            Switch(keep).add_cases(
+                cases
+            ).Default(
+                # unused segment, may contain the rest of FCS from previous segment
+                d(Concat(Bits(self.SEGMENT_WIDTH - 4 * 8).from_py(0), prev_ov_data)),
+                k(Concat(Bits(SEG_B - 4).from_py(0), prev_ov_keep & Concat(*(prev_ov_vld for _ in range(4))))),
+                e(prev_ov_vld),
+                ov_data(None),
+                ov_keep(0),
+                ov_vld(0),
+            )
+            data_o.append(d)
+            keep_o.append(k)
+            end_o.append(e)
+            ov = (ov_data, ov_keep, ov_vld)
+
+        # if there is a rest of FCS from previous data word and the first segment
+        # is not free the rest of FCS is send in a separate data word
+        spill_only = rename_signal(
+            self,
+            spill & ~(din.valid & self._segment(din.keep, 0, 1)._eq(0)),
+            "tx_spill_only")
+        If(spill_only,
+            dout.data(Concat(Bits(self.DATA_WIDTH - 4 * 8).from_py(0), spill_data)),
+            dout.keep(Concat(Bits(self.DATA_WIDTH // 8 - 4).from_py(0), spill_keep)),
+            dout.start(0),
+            dout.end(1),
+        ).Else(
+            dout.data(Concat(*reversed(data_o))),
+            dout.keep(Concat(*reversed(keep_o))),
+            dout.start(din.start),
+            dout.end(Concat(*reversed(end_o))),
+        )
+        dout.valid(din.valid | spill)
+        din.ready(dout.ready & ~spill_only)
+
+        If(dout.valid & dout.ready,
+            If(spill_only,
+               spill(0),
+            ).Else(
+               crc_state(crc[-1]),
+               spill(ov[2]),
+               spill_data(ov[0]),
+               spill_keep(ov[1]),
+            )
+        )
+
+    def _impl(self):
+        if self.HAS_RX:
+            self._rx_logic()
+        if self.HAS_TX:
+            self._tx_logic()
+        propagateClkRstn(self)
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = EthernetMacSegmented()
+    u.DATA_WIDTH = 128
+    u.SEGMENT_CNT = 2
+    print(to_rtl_str(u))
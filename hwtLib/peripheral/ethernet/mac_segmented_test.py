@@ -0,0 +1,185 @@
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.logic.crcPoly import CRC_32
+from hwtLib.logic.crcSw import crc_sw
+from hwtLib.peripheral.ethernet.mac_segmented import EthernetMacSegmented
+from hwtLib.peripheral.ethernet.mac_tx_test import REF_FRAME, REF_CRC
+from hwtLib.peripheral.ethernet.segmented_intf import segmented_send_frames, \
+    segmented_recieve_frames
+from hwtLib.peripheral.ethernet.types import format_eth_addr
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitCombStable
+
+
+def eth_frame(size: int, seed: int):
+    """
+    :return: frame data (without FCS) with the dst MAC of REF_FRAME
+    """
+    return REF_FRAME[:12] + [(seed + i) & 0xff for i in range(size - 12)]
+
+
+def with_fcs(frame):
+    return frame + list(crc_sw(CRC_32, bytes(frame)).to_bytes(4, "little"))
+
+
+class EthernetMacSegmented_TC(SimTestCase):
+    DW = 512
+    SEGMENT_CNT = 8
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = EthernetMacSegmented()
+        u.DEFAULT_MAC_ADDR = format_eth_addr(REF_FRAME[0:6])
+        u.DATA_WIDTH = cls.DW
+        u.SEGMENT_CNT = cls.SEGMENT_CNT
+        cls.compileSim(u)
+
+    def test_nop(self):
+        u = self.u
+        self.runSim(CLK_PERIOD * 10)
+        self.assertEmpty(u.eth.rx._ag.data)
+        self.assertEmpty(u.phy_tx._ag.data)
+
+    def test_rx_single(self):
+        u = self.u
+        segmented_send_frames(u.phy_rx, [REF_FRAME + REF_CRC])
+        self.runSim(CLK_PERIOD * (len(u.phy_rx._ag.data) + 10))
+        self.assertSequenceEqual(segmented_recieve_frames(u.eth.rx), [(REF_FRAME, 0)])
+
+    def test_tx_single(self):
+        u = self.u
+        segmented_send_frames(u.eth.tx, [REF_FRAME])
+        self.runSim(CLK_PERIOD * (len(u.eth.tx._ag.data) + 10))
+        self.assertSequenceEqual(segmented_recieve_frames(u.phy_tx),
+                                 [(REF_FRAME + REF_CRC, 0)])
+
+    def test_rx_frames(self, LENS=[64, 65, 66, 67, 68, 69, 70, 71, 72, 100, 64, 129]):
+        u = self.u
+        frames = [eth_frame(L - 4, i) for i, L in enumerate(LENS)]
+        errs = [0 for _ in frames]
+        segmented_send_frames(u.phy_rx, [with_fcs(f) for f in frames], errs)
+        self.randomize(u.phy_rx)
+        self.runSim(CLK_PERIOD * (len(u.phy_rx._ag.data) * 3 + 10))
+        self.assertSequenceEqual(segmented_recieve_frames(u.eth.rx),
+                                 [(f, 0) for f in frames])
+
+    def test_rx_errors(self):
+        u = self.u
+        frames = [eth_frame(L, i) for i, L in enumerate([60, 61, 62, 63, 64, 65])]
+        rx_frames = [with_fcs(f) for f in frames]
+        # bad FCS
+        rx_frames[1][-1] ^= 0xff
+        # different dst MAC
+        rx_frames[2][0] ^= 0x1
+        # error from PHY
+        errs = [0, 0, 0, 1, 0, 0]
+        # bad FCS in a frame which has the FCS in two segments
+        rx_frames[5][-4] ^= 0x1
+
+        segmented_send_frames(u.phy_rx, rx_frames, errs)
+        self.runSim(CLK_PERIOD * (len(u.phy_rx._ag.data) + 10))
+        self.assertSequenceEqual(segmented_recieve_frames(u.eth.rx), [
+            (frames[0], 0),
+            (frames[1], 1),
+            (frames[3], 1),
+            (frames[4], 0),
+            (frames[5], 1),
+        ])
+
+    def test_tx_frames(self, LENS=[60, 61, 62, 63, 64, 65, 66, 67, 68, 96, 60, 125]):
+        u = self.u
+        frames = [eth_frame(L, i) for i, L in enumerate(LENS)]
+        segmented_send_frames(u.eth.tx, frames, fcs_space=True)
+        self.randomize(u.eth.tx)
+        self.randomize(u.phy_tx)
+        self.runSim(CLK_PERIOD * (len(u.eth.tx._ag.data) * 6 + 10))
+        self.assertSequenceEqual(segmented_recieve_frames(u.phy_tx),
+                                 [(with_fcs(f), 0) for f in frames])
+
+    def _count_vld_words(self, intf, valid, ready, res: list):
+        """
+        Count the number of clock cycles when the data was transfered on the interface
+        """
+        while True:
+            yield Timer(CLK_PERIOD)
+            yield WaitCombStable()
+            if valid.read() and (ready is None or ready.read()):
+                res.append(self.hdl_simulator.now)
+
+    def test_rx_throughput(self, N=32):
+        """
+        Back to back minimum-size frames, one frame per clock cycle
+        """
+        u = self.u
+        frames = [eth_frame(60, i) for i in range(N)]
+        segmented_send_frames(u.phy_rx, [with_fcs(f) for f in frames])
+        out_words = []
+        self.procs.append(self._count_vld_words(u.eth.rx, u.eth.rx.vld, None, out_words))
+        self.runSim(CLK_PERIOD * (N + 10))
+        self.assertSequenceEqual(segmented_recieve_frames(u.eth.rx),
+                                 [(f, 0) for f in frames])
+        # all frames were produced in continuous sequence of clock cycles
+        self.assertEqual(len(out_words), N)
+        self.assertEqual(out_words[-1] - out_words[0], (N - 1) * CLK_PERIOD)
+
+    def test_tx_throughput(self, N=32):
+        """
+        Back to back minimum-size frames, one frame per clock cycle
+        """
+        u = self.u
+        frames = [eth_frame(60, i) for i in range(N)]
+        segmented_send_frames(u.eth.tx, frames, fcs_space=True)
+        out_words = []
+        self.procs.append(self._count_vld_words(u.phy_tx, u.phy_tx.valid, u.phy_tx.ready, out_words))
+        self.runSim(CLK_PERIOD * (N + 10))
+        self.assertSequenceEqual(segmented_recieve_frames(u.phy_tx),
+                                 [(with_fcs(f), 0) for f in frames])
+        self.assertEqual(len(out_words), N)
+        self.assertEqual(out_words[-1] - out_words[0], (N - 1) * CLK_PERIOD)
+
+
+class EthernetMacSegmented_128b_TC(EthernetMacSegmented_TC):
+    """
+    2 segments per data word (frames are spread over multiple data words)
+    """
+    DW = 128
+    SEGMENT_CNT = 2
+
+    def test_rx_throughput(self, N=8):
+        u = self.u
+        frames = [eth_frame(60, i) for i in range(N)]
+        segmented_send_frames(u.phy_rx, [with_fcs(f) for f in frames])
+        words = len(u.phy_rx._ag.data)
+        out_words = []
+        self.procs.append(self._count_vld_words(u.eth.rx, u.eth.rx.vld, None, out_words))
+        self.runSim(CLK_PERIOD * (words + 10))
+        self.assertSequenceEqual(segmented_recieve_frames(u.eth.rx),
+                                 [(f, 0) for f in frames])
+        self.assertEqual(len(out_words), words)
+
+    def test_tx_throughput(self, N=8):
+        u = self.u
+        frames = [eth_frame(60, i) for i in range(N)]
+        segmented_send_frames(u.eth.tx, frames, fcs_space=True)
+        words = len(u.eth.tx._ag.data)
+        out_words = []
+        self.procs.append(self._count_vld_words(u.phy_tx, u.phy_tx.valid, u.phy_tx.ready, out_words))
+        self.runSim(CLK_PERIOD * (words + 10))
+        self.assertSequenceEqual(segmented_recieve_frames(u.phy_tx),
+                                 [(with_fcs(f), 0) for f in frames])
+        self.assertEqual(len(out_words), words)
+
+
+EthernetMacSegmented_TCs = [
+    EthernetMacSegmented_TC,
+    EthernetMacSegmented_128b_TC,
+]
+
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(EthernetMacSegmented_TC('test_rx_single'))
+    for tc in EthernetMacSegmented_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from math import ceil
+from typing import List
+
+from hwt.code import If, Concat
+from hwt.code_utils import rename_signal
+from hwt.hdl.constants import READ_WRITE, READ
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.struct import HStruct
+from hwt.interfaces.std import Handshaked
+from hwt.interfaces.structIntf import StructIntf
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil
+from hwt.synthesizer.hObjList import HObjList
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axi4Lite import Axi4Lite
+from hwtLib.amba.axiLite_comp.endpoint import AxiLiteEndpoint
+from hwtLib.amba.axis import AxiStream
+from hwtLib.amba.axis_comp.builder import AxiSBuilder
+from hwtLib.amba.axis_comp.fifo import AxiSFifo
+from hwtLib.amba.axis_comp.frame_parser import AxiS_frameParser
+from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.handshaked.streamNode import StreamNode
+from hwtLib.logic.inetChecksum import zext
+from hwtLib.logic.toeplitzHash import toeplitz_hash
+from hwtLib.logic.toeplitzHashSw import RSS_DEFAULT_KEY
+from hwtLib.mem.ram import RamSingleClock
+from hwtLib.peripheral.ethernet.types import Eth2Header_t, ETHER_TYPE
+from hwtLib.types.net.ip import IPv4Header_t, IPv4, IHL_DEFAULT, IP_PROTOCOL
+from hwtLib.types.net.udp import UDP_header_t
+
+
+# the headers of the frame which are used for the hash,
+# (the ports of TCP are on the same offset as the ports of UDP)
+rss_frame_header_t = HStruct(
+    (Eth2Header_t, "eth"),
+    (IPv4Header_t, "ipv4"),
+    (UDP_header_t, "l4"),
+    name="rss_frame_header_t"
+)
+
+
+def bytes_in_frame_order(sig: RtlSignal) -> RtlSignal:
+    """
+    The fields of the header structs are stored in the frame in little endian
+    (the first byte of the field in the frame is in LSB), this function swaps the bytes
+    so the first byte of the field in the frame is in MSB (network byte order)
+    """
+    w = sig._dtype.bit_length()
+    assert w % 8 == 0, w
+    return Concat(*(sig[(i + 1) * 8:i * 8] for i in range(w // 8)))
+
+
+class RssHash(Unit):
+    """
+    Toeplitz hash of the flow of the Ethernet II frame compatible with Receive Side Scaling (RSS),
+    the hash is computed from the header fields extracted by :class:`~.AxiS_frameParser`.
+
+    * UDP/TCP in IPv4 (without options, not fragmented):
+      hash of src IP, dst IP, src port, dst port
+    * other IPv4: hash of src IP, dst IP
+    * other frames: hash is 0
+
+    The frame is consumed in a single data word per clock cycle
+    (the input is stalled only if the hash of the previous frame was not consumed yet).
+    The hash is available in the next clock cycle after the data word with the last byte of UDP/TCP ports.
+
+    :ivar ~.KEY: the key of the Toeplitz hash (bytes, at least 16B)
+    :ivar ~.dataOut: hash of each frame
+
+    :attention: the frame has to start on the first byte of the data word and it has
+        to contain at least the Ethernet, IPv4 and UDP header (42B,
+        the Ethernet frame always has at least 60B)
+
+    .. hwt-autodoc:: _example_RssHash
+    """
+
+    def _config(self):
+        AxiStream._config(self)
+        self.USE_KEEP = True
+        self.DATA_WIDTH = 64
+        self.KEY = Param(RSS_DEFAULT_KEY)
+
+    def _declr(self):
+        addClkRstn(self)
+        with self._paramsShared():
+            self.dataIn = AxiStream()
+        self.dataOut = Handshaked()._m()
+        self.dataOut.DATA_WIDTH = 32
+
+        p = self.parser = AxiS_frameParser(rss_frame_header_t)
+        p._updateParamsFrom(self)
+
+    def _field(self, intf: Handshaked, name: str):
+        """
+        :return: the value of the field from the parser
+            (the value is valid from the data word with this field until the end of the header)
+        """
+        r = self._reg(name, intf.data._dtype)
+        If(intf.vld,
+           r(intf.data)
+        )
+        return rename_signal(self, intf.vld._ternary(intf.data, r), name + "_v")
+
+    @classmethod
+    def _ready_all(cls, intf):
+        if isinstance(intf, Handshaked):
+            intf.rd(1)
+        else:
+            assert isinstance(intf, StructIntf), intf
+            for i in intf._interfaces:
+                cls._ready_all(i)
+
+    def _impl(self):
+        din = self.dataIn
+        dout = self.dataOut
+        parser = self.parser
+        HDR_WORDS = ceil(rss_frame_header_t.bit_length() / self.DATA_WIDTH)
+
+        # the parser does not know the end of the frame, only the words with the header
+        # are passed to the parser, the rest of the frame is dropped
+        word_i = self._reg("word_i", Bits(log2ceil(HDR_WORDS + 1)), def_val=0)
+        in_hdr = rename_signal(self, word_i != HDR_WORDS, "in_hdr")
+        is_last_hdr_word = rename_signal(self, word_i._eq(HDR_WORDS - 1), "is_last_hdr_word")
+
+        # all fields are stored in registers, the parser never stalls
+        self._ready_all(parser.dataOut)
+        h = parser.dataOut
+        eth_type = bytes_in_frame_order(self._field(h.eth.type, "eth_type"))
+        ip_ver_ihl = Concat(self._field(h.ipv4.ihl, "ip_b0_hi"), self._field(h.ipv4.version, "ip_b0_lo"))
+        ip_frag = bytes_in_frame_order(
+            Concat(self._field(h.ipv4.fragmentOffset, "ip_frag_offset"), self._field(h.ipv4.flags, "ip_flags")))
+        ip_protocol = self._field(h.ipv4.protocol, "ip_protocol")
+        ip_addrs = Concat(
+            bytes_in_frame_order(self._field(h.ipv4.src, "ip_src")),
+            bytes_in_frame_order(self._field(h.ipv4.dst, "ip_dst")),
+        )
+        l4_ports = Concat(
+            bytes_in_frame_order(self._field(h.l4.srcp, "l4_srcp")),
+            bytes_in_frame_order(self._field(h.l4.dstp, "l4_dstp")),
+        )
+
+        is_ipv4 = rename_signal(self,
+            eth_type._eq(ETHER_TYPE.IPv4) & ip_ver_ihl[8:4]._eq(IPv4), "is_ipv4")
+        # more fragments flag or non-zero fragment offset
+        is_fragment = ip_frag[14:] != 0
+        is_l4 = rename_signal(self,
+            is_ipv4 & ip_ver_ihl[4:0]._eq(IHL_DEFAULT) & ~is_fragment &
+            (ip_protocol._eq(IP_PROTOCOL.UDP) | ip_protocol._eq(IP_PROTOCOL.TCP)), "is_l4")
+
+        # the zeros do not affect the hash, the hash of the prefix of the data is the same
+        hash_in = Concat(
+            is_ipv4._ternary(ip_addrs, Bits(ip_addrs._dtype.bit_length()).from_py(0)),
+            is_l4._ternary(l4_ports, Bits(l4_ports._dtype.bit_length()).from_py(0)),
+        )
+        hash_in = rename_signal(self, hash_in, "hash_in")
+        _hash = rename_signal(self, toeplitz_hash(self, hash_in, self.KEY), "hash")
+
+        out_vld = self._reg("out_vld", def_val=0)
+        out_hash = self._reg("out_hash", Bits(32))
+        en = ~(is_last_hdr_word & out_vld & ~dout.rd)
+        StreamNode(
+            [din], [parser.dataIn],
+            extraConds={parser.dataIn: in_hdr},
+            skipWhen={parser.dataIn: ~in_hdr},
+        ).sync(en)
+        parser.dataIn(din, exclude=[din.valid, din.ready])
+
+        din_ack = din.valid & din.ready
+        If(din_ack,
+            If(din.last,
+               word_i(0),
+            ).Elif(in_hdr,
+               word_i(word_i + 1),
+            )
+        )
+        If(din_ack & is_last_hdr_word,
+           out_vld(1),
+           out_hash(_hash),
+        ).Elif(dout.rd,
+           out_vld(0),
+        )
+        dout.vld(out_vld)
+        dout.data(out_hash)
+        propagateClkRstn(self)
+
+
+class RssDispatcher(Unit):
+    """
+    Steer the Ethernet II frames to one of the output queues based on the RSS hash
+    of the flow of the frame (:see: :class:`~.RssHash`), the lower bits of the hash are used as an index
+    to the indirection table, the item of the table is the index of the output queue.
+    The frames of the same flow are always sent to the same queue.
+
+    The indirection table is accessible over AXI4-Lite (one item on each 32b word),
+    by default the queues are assigned to the items of the table in round-robin manner.
+
+    The component processes one data word per clock cycle, the frame is delayed
+    until its hash is computed.
+
+    :ivar ~.QUEUE_CNT: number of the output queues
+    :ivar ~.INDIRECTION_TABLE_SIZE: number of items of the indirection table (power of 2)
+    :ivar ~.KEY: the key of the Toeplitz hash
+
+    :note: the frames with the value of the table item >= QUEUE_CNT are sent to queue 0
+
+    .. hwt-autodoc:: _example_RssDispatcher
+    """
+
+    def _config(self):
+        AxiStream._config(self)
+        self.USE_KEEP = True
+        self.DATA_WIDTH = 64
+        self.QUEUE_CNT = Param(4)
+        self.INDIRECTION_TABLE_SIZE = Param(128)
+        self.KEY = Param(RSS_DEFAULT_KEY)
+        self.CNTRL_ADDR_WIDTH = Param(12)
+        self.CNTRL_DATA_WIDTH = Param(32)
+
+    def _declr(self):
+        assert self.QUEUE_CNT > 1, self.QUEUE_CNT
+        assert 2 ** log2ceil(self.INDIRECTION_TABLE_SIZE) == self.INDIRECTION_TABLE_SIZE, self.INDIRECTION_TABLE_SIZE
+        addClkRstn(self)
+        with self._paramsShared():
+            self.dataIn = AxiStream()
+            self.dataOut = HObjList(AxiStream()._m() for _ in range(self.QUEUE_CNT))
+
+        with self._paramsShared(prefix="CNTRL_"):
+            self.cntrl = Axi4Lite()
+
+        self.rss_hash = RssHash()
+        self.rss_hash._updateParamsFrom(self)
+
+        t = self.indirection_table = RamSingleClock()
+        t.PORT_CNT = (READ_WRITE, READ)
+        t.ADDR_WIDTH = log2ceil(self.INDIRECTION_TABLE_SIZE)
+        t.DATA_WIDTH = log2ceil(self.QUEUE_CNT)
+        t.INIT_DATA = tuple(i % self.QUEUE_CNT for i in range(self.INDIRECTION_TABLE_SIZE))
+
+    def _queue_index_to_one_hot(self, q: RtlSignal) -> List[RtlSignal]:
+        oh = [q._eq(i) for i in range(self.QUEUE_CNT)]
+        if 2 ** q._dtype.bit_length() != self.QUEUE_CNT:
+            oh[0] = oh[0] | (q >= self.QUEUE_CNT)
+        return oh
+
+    def _impl(self):
+        din = self.dataIn
+        rss_hash = self.rss_hash
+        table = self.indirection_table
+
+        with self._paramsShared(prefix="CNTRL_"):
+            ep = self.cntrl_ep = AxiLiteEndpoint(HStruct(
+                (Bits(self.CNTRL_DATA_WIDTH)[self.INDIRECTION_TABLE_SIZE], "indirection_table"),
+            ))
+        ep.bus(self.cntrl)
+        # the items of the table are narrower than the bus word
+        ep_table = ep.decoded.indirection_table
+        table.port[0](ep_table, exclude=[ep_table.din, ep_table.dout])
+        table.port[0].din(ep_table.din[table.DATA_WIDTH:])
+        ep_table.dout(zext(table.port[0].dout, self.CNTRL_DATA_WIDTH))
+
+        # the frame waits in the buffer until its hash is resolved to the queue index,
+        # the buffer has to be large enough so the input is not stalled
+        # (the header words + latency of the hash, lookup and of the select fifo)
+        HDR_WORDS = ceil(rss_frame_header_t.bit_length() / self.DATA_WIDTH)
+        buff = AxiSFifo()
+        buff._updateParamsFrom(self)
+        buff.DEPTH = HDR_WORDS + 8
+        self.frame_buff = buff
+
+        StreamNode([din], [buff.dataIn, rss_hash.dataIn]).sync()
+        buff.dataIn(din, exclude=[din.valid, din.ready])
+        rss_hash.dataIn(din, exclude=[din.valid, din.ready])
+
+        # lookup of the queue index in the indirection table
+        h = rss_hash.dataOut
+        sel = HandshakedFifo(Handshaked)
+        sel.DATA_WIDTH = self.QUEUE_CNT
+        sel.DEPTH = 4
+        self.queue_sel = sel
+
+        lookup_port = table.port[1]
+        lookup_vld = self._reg("lookup_vld", def_val=0)
+        h.rd(~lookup_vld | sel.dataIn.rd)
+        lookup_port.en(h.vld & h.rd)
+        lookup_port.addr(h.data[table.ADDR_WIDTH:])
+        If(h.rd,
+           lookup_vld(h.vld)
+        )
+        sel.dataIn.vld(lookup_vld)
+        sel.dataIn.data(Concat(*reversed(self._queue_index_to_one_hot(lookup_port.dout))))
+
+        AxiSBuilder(self, buff.dataOut)\
+            .split_select_to(sel.dataOut, *self.dataOut)
+
+        propagateClkRstn(self)
+
+
+def _example_RssHash():
+    u = RssHash()
+    u.DATA_WIDTH = 64
+    return u
+
+
+def _example_RssDispatcher():
+    u = RssDispatcher()
+    u.DATA_WIDTH = 64
+    u.QUEUE_CNT = 4
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_RssDispatcher()
+    print(to_rtl_str(u))
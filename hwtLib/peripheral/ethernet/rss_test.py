@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from math import ceil
+from random import Random
+import socket
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axis import axis_send_bytes, axis_recieve_bytes
+from hwtLib.logic.toeplitzHashSw import toeplitz_hash
+from hwtLib.peripheral.ethernet.rss import RssHash, RssDispatcher
+from hwtLib.peripheral.ethernet.types import ETHER_TYPE
+from hwtLib.types.net.ip import IP_PROTOCOL
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitCombStable
+from pyMathBitPrecise.bit_utils import mask
+
+# more fragments flag (in flags field in network bit order)
+IP_FLAG_MF = 0b001
+
+
+def rss_frame(src_ip: bytes, dst_ip: bytes, protocol: int, sport: int, dport: int,
+              payload: bytes=b"", ip_options=b"", flags=0, frag_offset=0):
+    """
+    Build Ethernet II frame with IPv4 packet with UDP/TCP header (only the ports are set,
+    the checksums are not computed)
+    """
+    assert len(ip_options) % 4 == 0
+    l4 = sport.to_bytes(2, "big") + dport.to_bytes(2, "big")
+    if protocol == IP_PROTOCOL.TCP:
+        l4 += bytes(16)
+    else:
+        l4 += bytes(4)
+    l4 += payload
+    ihl = 5 + len(ip_options) // 4
+    ip = bytes([0x40 | ihl, 0]) + (ihl * 4 + len(l4)).to_bytes(2, "big")\
+        +(0x1234).to_bytes(2, "big") + ((flags << 13) | frag_offset).to_bytes(2, "big")\
+        +bytes([64, protocol]) + bytes(2) + src_ip + dst_ip + ip_options
+    eth = bytes([0x0a, 0x0b, 0x0c, 0x0d, 0x0e, 0x0f, 1, 2, 3, 4, 5, 6]) + ETHER_TYPE.IPv4.to_bytes(2, "big")
+    frame = eth + ip + l4
+    if len(frame) < 60:
+        frame += bytes(60 - len(frame))
+    return frame
+
+
+def rss_hash_of_frame(frame: bytes, key: bytes=None) -> int:
+    """
+    Reference model of :class:`hwtLib.peripheral.ethernet.rss.RssHash`
+    """
+    kwargs = {} if key is None else {"key": key}
+    if frame[12:14] != ETHER_TYPE.IPv4.to_bytes(2, "big") or frame[14] >> 4 != 4:
+        return 0
+    ip_addrs = frame[26:34]
+    ihl = frame[14] & 0xf
+    protocol = frame[23]
+    is_fragment = int.from_bytes(frame[20:22], "big") & mask(14)
+    if ihl == 5 and not is_fragment and protocol in (IP_PROTOCOL.UDP, IP_PROTOCOL.TCP):
+        return toeplitz_hash(ip_addrs + frame[34:38], **kwargs)
+    else:
+        return toeplitz_hash(ip_addrs, **kwargs)
+
+
+def ref_frames(r: Random, N: int):
+    """
+    :return: list of N frames of random flows (mostly UDP/TCP)
+    """
+
+    def ip():
+        return bytes([10, r.getrandbits(8), r.getrandbits(8), r.getrandbits(8)])
+
+    def port():
+        return r.getrandbits(16)
+
+    def payload():
+        return bytes(r.getrandbits(8) for _ in range(r.randint(0, 100)))
+
+    frames = []
+    for _ in range(N):
+        kind = r.randint(0, 9)
+        if kind < 4:
+            f = rss_frame(ip(), ip(), IP_PROTOCOL.UDP, port(), port(), payload())
+        elif kind < 7:
+            f = rss_frame(ip(), ip(), IP_PROTOCOL.TCP, port(), port(), payload())
+        elif kind == 7:
+            f = rss_frame(ip(), ip(), IP_PROTOCOL.ICMP, port(), port(), payload())
+        elif kind == 8:
+            f = rss_frame(ip(), ip(), IP_PROTOCOL.UDP, port(), port(), payload(),
+                          flags=IP_FLAG_MF if r.getrandbits(1) else 0,
+                          frag_offset=0 if r.getrandbits(1) else 8)
+        else:
+            # not an IPv4 frame
+            f = bytes([0xff] * 6 + [1, 2, 3, 4, 5, 6]) + ETHER_TYPE.ARP.to_bytes(2, "big")\
+                +bytes(r.getrandbits(8) for _ in range(46))
+        frames.append(f)
+    return frames
+
+
+def count_ack(tc: SimTestCase, intf, res: list):
+    """
+    Simulation process which collects the times of the transactions on the interface
+    """
+    while True:
+        yield Timer(CLK_PERIOD)
+        yield WaitCombStable()
+        if intf.valid.read() and intf.ready.read():
+            res.append(tc.hdl_simulator.now)
+
+
+class RssHash_64b_TC(SimTestCase):
+    DW = 64
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = RssHash()
+        u.DATA_WIDTH = cls.DW
+        cls.compileSim(u)
+
+    def test_nop(self):
+        self.runSim(CLK_PERIOD * 10)
+        self.assertEmpty(self.u.dataOut._ag.data)
+
+    def _test(self, frames, randomize=False):
+        u = self.u
+        for f in frames:
+            axis_send_bytes(u.dataIn, f)
+        t = len(u.dataIn._ag.data) + 10
+        if randomize:
+            self.randomize(u.dataIn)
+            self.randomize(u.dataOut)
+            t *= 5
+        self.runSim(CLK_PERIOD * t)
+        self.assertValSequenceEqual(u.dataOut._ag.data,
+                                    [rss_hash_of_frame(f) for f in frames])
+
+    def test_spec_vector(self):
+        src = socket.inet_aton("66.9.149.187")
+        dst = socket.inet_aton("161.142.100.80")
+        frames = [
+            rss_frame(src, dst, IP_PROTOCOL.TCP, 2794, 1766),
+            rss_frame(src, dst, IP_PROTOCOL.ICMP, 2794, 1766),
+        ]
+        self._test(frames)
+        self.assertValSequenceEqual(self.u.dataOut._ag.data, [0x51ccc178, 0x323e8fc2])
+
+    def test_ip_options(self):
+        r = Random(1)
+        frames = [
+            rss_frame(bytes([10, 0, 0, i]), bytes([10, 0, 1, i]), IP_PROTOCOL.UDP, 1000 + i, 2000 + i,
+                      ip_options=bytes(r.getrandbits(8) for _ in range(4 * i)))
+            for i in range(4)
+        ]
+        self._test(frames)
+
+    def test_flows(self):
+        self._test(ref_frames(Random(2), 40))
+
+    def test_flows_randomized(self):
+        self._test(ref_frames(Random(3), 40), randomize=True)
+
+    def test_throughput(self, N=16):
+        u = self.u
+        frames = ref_frames(Random(4), N)
+        for f in frames:
+            axis_send_bytes(u.dataIn, f)
+        words = len(u.dataIn._ag.data)
+        acks = []
+        self.procs.append(count_ack(self, u.dataIn, acks))
+        self.runSim(CLK_PERIOD * (words + 10))
+        self.assertValSequenceEqual(u.dataOut._ag.data,
+                                    [rss_hash_of_frame(f) for f in frames])
+        self.assertEqual(len(acks), words)
+        self.assertEqual(acks[-1] - acks[0], (words - 1) * CLK_PERIOD)
+
+
+class RssHash_16b_TC(RssHash_64b_TC):
+    DW = 16
+
+
+class RssHash_512b_TC(RssHash_64b_TC):
+    DW = 512
+
+
+class RssDispatcher_64b_TC(SimTestCase):
+    DW = 64
+    QUEUE_CNT = 4
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = RssDispatcher()
+        u.DATA_WIDTH = cls.DW
+        u.QUEUE_CNT = cls.QUEUE_CNT
+        cls.compileSim(u)
+
+    def test_nop(self):
+        self.runSim(CLK_PERIOD * 10)
+        for q in self.u.dataOut:
+            self.assertEmpty(q._ag.data)
+
+    def write_table(self, table):
+        """
+        Write the indirection table over AXI4-Lite
+        """
+        cntrl = self.u.cntrl
+        cntrl.aw._ag.data.extend(cntrl.aw._ag.create_addr_req(i * 4) for i in range(len(table)))
+        cntrl.w._ag.data.extend((v, mask(4)) for v in table)
+
+    def send_frames_after_table_write(self, frames, table_items: int):
+        """
+        Send the frames after the write of the indirection table is finished
+        """
+        b = self.u.cntrl.b._ag.data
+        while len(b) < table_items:
+            yield Timer(CLK_PERIOD)
+        for f in frames:
+            axis_send_bytes(self.u.dataIn, f)
+
+    def _test(self, frames, table, randomize=False, write_table=False):
+        u = self.u
+        t = len(frames) * ceil(200 / (self.DW // 8)) + 20
+        if write_table:
+            self.write_table(table)
+            self.procs.append(self.send_frames_after_table_write(frames, len(table)))
+            t += len(table) * 4
+        else:
+            for f in frames:
+                axis_send_bytes(u.dataIn, f)
+
+        if randomize:
+            self.randomize(u.dataIn)
+            for q in u.dataOut:
+                self.randomize(q)
+            t *= 5
+
+        self.runSim(CLK_PERIOD * t)
+
+        expected = [[] for _ in range(self.QUEUE_CNT)]
+        for f in frames:
+            q = table[rss_hash_of_frame(f) % len(table)]
+            if q >= self.QUEUE_CNT:
+                q = 0
+            expected[q].append(f)
+
+        for q, (q_intf, q_expected) in enumerate(zip(u.dataOut, expected)):
+            for f in q_expected:
+                off, data = axis_recieve_bytes(q_intf)
+                self.assertEqual(off, 0)
+                self.assertValSequenceEqual(data, list(f), q)
+            self.assertEmpty(q_intf._ag.data, q)
+
+    def default_table(self):
+        return [i % self.QUEUE_CNT for i in range(self.u.INDIRECTION_TABLE_SIZE)]
+
+    def test_default_table(self):
+        frames = ref_frames(Random(5), 40)
+        self._test(frames, self.default_table())
+
+    def test_default_table_randomized(self):
+        frames = ref_frames(Random(6), 40)
+        self._test(frames, self.default_table(), randomize=True)
+
+    def test_table_write(self):
+        r = Random(7)
+        # including the values which are not a valid queue index
+        table = [r.randint(0, 2 ** (self.QUEUE_CNT - 1).bit_length() - 1)
+                 for _ in range(self.u.INDIRECTION_TABLE_SIZE)]
+        frames = ref_frames(Random(8), 40)
+        self._test(frames, table, write_table=True)
+        self.assertValSequenceEqual(self.u.cntrl.b._ag.data, [0 for _ in table])
+
+    def test_single_flow(self):
+        # all frames of the same flow are in the same queue in the original order
+        r = Random(9)
+        src = bytes([10, 0, 0, 1])
+        dst = bytes([10, 0, 0, 2])
+        frames = [rss_frame(src, dst, IP_PROTOCOL.UDP, 1234, 5678,
+                            bytes(r.getrandbits(8) for _ in range(r.randint(0, 100))))
+                  for _ in range(10)]
+        self._test(frames, self.default_table(), randomize=True)
+
+    def test_throughput(self, N=16):
+        u = self.u
+        frames = ref_frames(Random(10), N)
+        for f in frames:
+            axis_send_bytes(u.dataIn, f)
+        words = len(u.dataIn._ag.data)
+        acks = []
+        self.procs.append(count_ack(self, u.dataIn, acks))
+        self.runSim(CLK_PERIOD * (words + 40))
+        self.assertEqual(len(acks), words)
+        self.assertEqual(acks[-1] - acks[0], (words - 1) * CLK_PERIOD)
+        table = self.default_table()
+        used_queues = [q for q in u.dataOut if q._ag.data]
+        self.assertGreater(len(used_queues), 1, "frames should be spread over multiple queues")
+        for f in frames:
+            q = table[rss_hash_of_frame(f) % len(table)]
+            off, data = axis_recieve_bytes(u.dataOut[q])
+            self.assertValSequenceEqual(data, list(f))
+
+
+class RssDispatcher_3q_16b_TC(RssDispatcher_64b_TC):
+    DW = 16
+    QUEUE_CNT = 3
+
+
+Rss_TCs = [
+    RssHash_16b_TC,
+    RssHash_64b_TC,
+    RssHash_512b_TC,
+    RssDispatcher_64b_TC,
+    RssDispatcher_3q_16b_TC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(RssHash_64b_TC('test_flows'))
+    for tc in Rss_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
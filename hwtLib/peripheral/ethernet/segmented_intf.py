@@ -0,0 +1,297 @@
+from math import ceil
+from typing import List, Tuple, Optional, Union
+
+from hwt.hdl.constants import DIRECTION
+from hwt.interfaces.agents.vldSynced import VldSyncedAgent
+from hwt.interfaces.std import VectSignal, VldSynced, Signal
+from hwt.synthesizer.interface import Interface
+from hwt.synthesizer.param import Param
+from hwtLib.amba.axi_intf_common import Axi_hs
+from hwtLib.amba.sim.agentCommon import BaseAxiAgent
+from hwtSimApi.agents.base import AgentBase
+from hwtSimApi.hdlSimulator import HdlSimulator
+from pyMathBitPrecise.bit_utils import get_bit_range, mask
+
+
+def _segmented_config(intf):
+    intf.DATA_WIDTH = Param(512)
+    intf.SEGMENT_CNT = Param(8)
+    intf.USE_ERR = Param(False)
+
+
+def _segmented_declr(intf):
+    assert intf.DATA_WIDTH % (intf.SEGMENT_CNT * 8) == 0, (
+        "Segment has to be composed of whole bytes", intf.DATA_WIDTH, intf.SEGMENT_CNT)
+    intf.SEGMENT_WIDTH = intf.DATA_WIDTH // intf.SEGMENT_CNT
+    intf.data = VectSignal(intf.DATA_WIDTH)
+    intf.keep = VectSignal(intf.DATA_WIDTH // 8)
+    intf.start = VectSignal(intf.SEGMENT_CNT)
+    intf.end = VectSignal(intf.SEGMENT_CNT)
+    if intf.USE_ERR:
+        intf.err = VectSignal(intf.SEGMENT_CNT)
+
+
+class AxiStreamSegmented(Axi_hs):
+    """
+    Stream where the data word is divided in to SEGMENT_CNT segments
+    and each segment can contain data of a different frame.
+    This allows to transfer the end of one frame and the start of the next
+    frame in a single data word (used for Ethernet 100G+ where the data word
+    is wider than a minimal frame).
+
+    :ivar ~.DATA_WIDTH: width of the data signal
+    :ivar ~.SEGMENT_CNT: number of segments in a data word
+    :ivar ~.USE_ERR: if True the err signal is present
+    :ivar ~.data: data signal, the byte 0 of the segment 0 is on LSB
+    :ivar ~.keep: byte enable signal, the valid bytes of the segment are
+        always in the lower bytes of the segment and only the segment
+        with the end of a frame may have some bytes disabled,
+        the unused segments have all bytes disabled
+    :ivar ~.start: flag for each segment, if set the frame starts at the beginning
+        of this segment
+    :ivar ~.end: flag for each segment, if set the frame ends in this segment
+    :ivar ~.err: flag for each segment, if set together with end the frame
+        is corrupted
+
+    :note: The segments of the frame are continuous, the frame which does not
+        end in this data word continues in segment 0 of the next data word.
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        _segmented_config(self)
+
+    def _declr(self):
+        _segmented_declr(self)
+        super(AxiStreamSegmented, self)._declr()
+
+    def _initSimAgent(self, sim: HdlSimulator):
+        self._ag = AxiStreamSegmentedAgent(sim, self)
+
+
+class AxiStreamSegmentedAgent(BaseAxiAgent):
+    """
+    Simulation agent for :class:`.AxiStreamSegmented` interface
+
+    data format: tuple (data, keep, start, end) or (data, keep, start, end, err)
+    """
+
+    def __init__(self, sim: HdlSimulator, intf, allowNoReset=False):
+        BaseAxiAgent.__init__(self, sim, intf, allowNoReset=allowNoReset)
+        self._signals = _segmented_signals(intf)
+
+    def get_data(self):
+        return tuple(s.read() for s in self._signals)
+
+    def set_data(self, data):
+        if data is None:
+            data = [None for _ in self._signals]
+        for s, d in zip(self._signals, data):
+            s.write(d)
+
+
+class VldSyncedSegmented(VldSynced):
+    """
+    Same as :class:`~.AxiStreamSegmented` but without the ready signal
+    (the slave has to accept the data in every clock cycle)
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        _segmented_config(self)
+        self.USE_ERR = True
+
+    def _declr(self):
+        _segmented_declr(self)
+        self.vld = Signal()
+
+    def _initSimAgent(self, sim: HdlSimulator):
+        self._ag = VldSyncedSegmentedAgent(sim, self)
+
+
+class VldSyncedSegmentedAgent(VldSyncedAgent):
+    """
+    Simulation agent for :class:`.VldSyncedSegmented` interface
+
+    data format: same as :class:`~.AxiStreamSegmentedAgent`
+    """
+
+    def __init__(self, sim: HdlSimulator, intf, allowNoReset=False):
+        VldSyncedAgent.__init__(self, sim, intf, allowNoReset=allowNoReset)
+        self._signals = _segmented_signals(intf)
+
+    get_data = AxiStreamSegmentedAgent.get_data
+    set_data = AxiStreamSegmentedAgent.set_data
+
+
+def _segmented_signals(intf):
+    signals = [intf.data, intf.keep, intf.start, intf.end]
+    if intf.USE_ERR:
+        signals.append(intf.err)
+    return tuple(signals)
+
+
+class SegmentedStreamFullDuplex(Interface):
+    """
+    Pair of segmented streams, tx is :class:`~.AxiStreamSegmented`,
+    rx is :class:`~.VldSyncedSegmented` with the err signal
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        _segmented_config(self)
+        self.HAS_RX = Param(True)
+        self.HAS_TX = Param(True)
+
+    def _declr(self):
+        with self._paramsShared(exclude=({"USE_ERR"}, set())):
+            if self.HAS_TX:
+                self.tx = AxiStreamSegmented()
+                self.tx.USE_ERR = self.USE_ERR
+
+            if self.HAS_RX:
+                self.rx = VldSyncedSegmented(masterDir=DIRECTION.IN)
+
+    def _initSimAgent(self, sim: HdlSimulator):
+        self._ag = SegmentedStreamFullDuplexAgent(sim, self)
+
+
+class SegmentedStreamFullDuplexAgent(AgentBase):
+
+    def __init__(self, sim: HdlSimulator, intf: SegmentedStreamFullDuplex):
+        super(SegmentedStreamFullDuplexAgent, self).__init__(sim, intf)
+        if intf.HAS_TX:
+            intf.tx._initSimAgent(sim)
+        if intf.HAS_RX:
+            intf.rx._initSimAgent(sim)
+
+    def getDrivers(self):
+        i = self.intf
+        d = []
+        if i.HAS_TX:
+            d.extend(i.tx._ag.getDrivers())
+        if i.HAS_RX:
+            d.extend(i.rx._ag.getMonitors())
+        return d
+
+    def getMonitors(self):
+        i = self.intf
+        d = []
+        if i.HAS_TX:
+            d.extend(i.tx._ag.getMonitors())
+        if i.HAS_RX:
+            d.extend(i.rx._ag.getDrivers())
+        return d
+
+
+def segmented_pack_frames(DATA_WIDTH: int, SEGMENT_CNT: int,
+                          frames: List[List[int]],
+                          errs: Optional[List[int]]=None,
+                          fcs_space=False) -> List[Tuple[int, ...]]:
+    """
+    Pack the frames in to data words of the segmented stream,
+    each frame starts in the segment after the end of the previous frame
+
+    :param errs: optional list of error flags for each frame, if specified
+        the data tuples also contain the err
+    :param fcs_space: if True the segment after the frame is left unused
+        if there is less than 4B of free space in the last segment of the frame
+        (space for FCS, see :class:`hwtLib.peripheral.ethernet.mac_segmented.EthernetMacSegmented`)
+    """
+    SEG_B = DATA_WIDTH // SEGMENT_CNT // 8
+    # list of (bytes, start, end, err) for each segment
+    segments = []
+    for f_i, f in enumerate(frames):
+        seg_cnt = ceil(len(f) / SEG_B)
+        assert seg_cnt > 0
+        err = 0 if errs is None else errs[f_i]
+        for s_i in range(seg_cnt):
+            is_end = s_i == seg_cnt - 1
+            segments.append((f[s_i * SEG_B:(s_i + 1) * SEG_B],
+                             int(s_i == 0), int(is_end), err if is_end else 0))
+        if fcs_space and SEG_B - len(segments[-1][0]) < 4:
+            segments.append(([], 0, 0, 0))
+
+    words = []
+    for w_i in range(ceil(len(segments) / SEGMENT_CNT)):
+        data = keep = start = end = err = 0
+        for s_i, (seg_bytes, s, e, er) in enumerate(
+                segments[w_i * SEGMENT_CNT:(w_i + 1) * SEGMENT_CNT]):
+            for b_i, b in enumerate(seg_bytes):
+                B_i = s_i * SEG_B + b_i
+                data |= b << (B_i * 8)
+                keep |= 1 << B_i
+            start |= s << s_i
+            end |= e << s_i
+            err |= er << s_i
+
+        if errs is None:
+            words.append((data, keep, start, end))
+        else:
+            words.append((data, keep, start, end, err))
+
+    return words
+
+
+def segmented_send_frames(intf: Union[AxiStreamSegmented, VldSyncedSegmented],
+                          frames: List[List[int]],
+                          errs: Optional[List[int]]=None,
+                          fcs_space=False):
+    """
+    Append the frames to the data of the simulation agent of the interface
+    (:see: :func:`~.segmented_pack_frames`)
+    """
+    if intf.USE_ERR and errs is None:
+        errs = [0 for _ in frames]
+    intf._ag.data.extend(segmented_pack_frames(
+        intf.DATA_WIDTH, intf.SEGMENT_CNT, frames, errs, fcs_space))
+
+
+def segmented_recieve_frames(intf: Union[AxiStreamSegmented, VldSyncedSegmented])\
+        -> List[Tuple[List[int], int]]:
+    """
+    Pop all data from the simulation agent of the interface and parse the frames from it
+
+    :return: list of tuples (frame bytes, err flag)
+    """
+    ag_data = intf._ag.data
+    SEG_B = intf.DATA_WIDTH // intf.SEGMENT_CNT // 8
+    frames = []
+    cur = None
+    w_i = 0
+    while ag_data:
+        w = ag_data.popleft()
+        data = w[0]
+        if isinstance(data, int):
+            data_vld = mask(intf.DATA_WIDTH)
+        else:
+            # the bytes which are not used do not have to be valid
+            data, data_vld = data.val, data.vld_mask
+        keep, start, end = (int(v) for v in w[1:4])
+        err = int(w[4]) if intf.USE_ERR else 0
+        for s_i in range(intf.SEGMENT_CNT):
+            if get_bit_range(start, s_i, 1):
+                assert cur is None, ("Frame starts before end of previous frame", w_i, s_i)
+                cur = []
+            seg_keep = get_bit_range(keep, s_i * SEG_B, SEG_B)
+            if seg_keep:
+                assert cur is not None, ("Data outside of frame", w_i, s_i)
+                assert seg_keep & (seg_keep + 1) == 0, (
+                    "Valid bytes are not in lower part of segment", w_i, s_i, seg_keep)
+                for b_i in range(SEG_B):
+                    if (seg_keep >> b_i) & 1:
+                        B_off = (s_i * SEG_B + b_i) * 8
+                        assert get_bit_range(data_vld, B_off, 8) == 0xff, (
+                            "Invalid value of the data byte", w_i, s_i, b_i)
+                        cur.append(get_bit_range(data, B_off, 8))
+            if get_bit_range(end, s_i, 1):
+                assert cur is not None, ("End of frame without start", w_i, s_i)
+                frames.append((cur, get_bit_range(err, s_i, 1)))
+                cur = None
+        w_i += 1
+
+    assert cur is None, ("Incomplete frame", cur)
+    return frames
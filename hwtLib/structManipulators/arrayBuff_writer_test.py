@@ -134,10 +134,11 @@ class ArrayBuff_writer_TC(SimTestCase):
 
         self.assertValEqual(self.u.uploaded._ag.data[-1], N)
 
-    def test_fullFill_randomized(self):
+    def test_fullFill_randomized(self, paged=False):
         u = self.u
         N = 2 * 16 - 1
-        m = AxiDpSimRam(self.DATA_WIDTH, u.clk, wDatapumpIntf=u.wDatapump)
+        m = AxiDpSimRam(self.DATA_WIDTH, u.clk, wDatapumpIntf=u.wDatapump,
+                        paged=paged)
         ITEM_SIZE = self.DATA_WIDTH // 8
         MAGIC = 88
 
@@ -162,6 +163,9 @@ class ArrayBuff_writer_TC(SimTestCase):
 
         self.assertValEqual(self.u.uploaded._ag.data[-1], N)
 
+    def test_fullFill_randomized_paged(self):
+        self.test_fullFill_randomized(paged=True)
+
     def test_fullFill_extraAck(self):
         u = self.u
         N = 16
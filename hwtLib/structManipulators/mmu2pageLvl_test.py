@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from random import Random
 import unittest
 
 from hwt.hdl.constants import WRITE, NOP
@@ -103,9 +104,123 @@ class MMU_2pageLvl_TC(SimTestCase):
         self.assertValEqual(u.segfault._ag.data[-1], 0)
 
 
+class MMU_2pageLvl_tlb_TC(MMU_2pageLvl_TC):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = MMU_2pageLvl()
+        u.TLB_WAYS = 4
+        u.TLB_SETS = 2
+        cls.compileSim(u)
+
+    def build_page_tables(self, m, lvl1_items, lvl2_items):
+        """
+        Map virtual page (i, j) to physical page 1 + i * lvl2_items + j
+
+        :return: function virt addr -> phys addr
+        """
+        u = self.u
+        for i in range(lvl1_items):
+            lvl2pgtData = [(1 + i * lvl2_items + j) << u.PAGE_OFFSET_WIDTH
+                           if j < lvl2_items else mask(u.ADDR_WIDTH)
+                           for j in range(u.LVL2_PAGE_TABLE_ITEMS)]
+            lvl2pgt = m.calloc(u.LVL2_PAGE_TABLE_ITEMS,
+                               u.ADDR_WIDTH // 8,
+                               initValues=lvl2pgtData)
+            u.lvl1Table._ag.requests.append((WRITE, i, lvl2pgt))
+
+        def translate(i, j, offset):
+            return ((1 + i * lvl2_items + j) << u.PAGE_OFFSET_WIDTH) | offset
+
+        return translate
+
+    def assertTlbCounters(self, hits, misses):
+        u = self.u
+        self.assertValEqual(u.tlbHits._ag.data[-1], hits)
+        self.assertValEqual(u.tlbMisses._ag.data[-1], misses)
+
+    def test_tlb_hit(self, N=16):
+        u = self.u
+        m = AxiDpSimRam(u.DATA_WIDTH, u.clk, rDatapumpIntf=u.rDatapump)
+        translate = self.build_page_tables(m, 1, 2)
+        # wait for lvl1Table storage init
+        u.virtIn._ag.data.extend([NOP, NOP])
+        u.virtIn._ag.data.extend(self.buildVirtAddr(0, 1, i) for i in range(N))
+
+        self.runSim((N + 30) * CLK_PERIOD)
+
+        self.assertValSequenceEqual(u.physOut._ag.data,
+                                    [translate(0, 1, i) for i in range(N)])
+        self.assertTlbCounters(N - 1, 1)
+        self.assertValEqual(u.segfault._ag.data[-1], 0)
+
+    def test_tlb_flush(self):
+        u = self.u
+        m = AxiDpSimRam(u.DATA_WIDTH, u.clk, rDatapumpIntf=u.rDatapump)
+        translate = self.build_page_tables(m, 1, 2)
+        va = self.buildVirtAddr(0, 1, 3)
+        u.virtIn._ag.data.extend([NOP, NOP, va, va,
+                                  *(NOP for _ in range(30)), va, va])
+        u.tlbFlush._ag.data.extend([*(NOP for _ in range(25)), 1])
+
+        self.runSim(60 * CLK_PERIOD)
+
+        self.assertValSequenceEqual(u.physOut._ag.data,
+                                    [translate(0, 1, 3) for _ in range(4)])
+        self.assertTlbCounters(2, 2)
+
+    def test_tlb_flush_during_walk(self):
+        u = self.u
+        m = AxiDpSimRam(u.DATA_WIDTH, u.clk, rDatapumpIntf=u.rDatapump)
+        translate = self.build_page_tables(m, 1, 2)
+        va = self.buildVirtAddr(0, 1, 3)
+        u.virtIn._ag.data.extend([NOP, NOP, va,
+                                  *(NOP for _ in range(30)), va])
+        # flush while the item from the page table is downloaded,
+        # the result of this download should not be stored in TLB
+        u.tlbFlush._ag.data.extend([NOP, NOP, NOP, NOP, 1])
+
+        self.runSim(60 * CLK_PERIOD)
+
+        self.assertValSequenceEqual(u.physOut._ag.data,
+                                    [translate(0, 1, 3) for _ in range(2)])
+        self.assertTlbCounters(0, 2)
+
+    def test_tlb_replacement_randomized(self, N=100):
+        u = self.u
+        self.randomize(u.rDatapump.r)
+        self.randomize(u.virtIn)
+        self.randomize(u.physOut)
+
+        m = AxiDpSimRam(u.DATA_WIDTH, u.clk, rDatapumpIntf=u.rDatapump)
+        # 12 pages, 8 TLB items
+        translate = self.build_page_tables(m, 3, 4)
+        rand = Random(0)
+        u.virtIn._ag.data.extend([NOP, NOP])
+        expected = []
+        for _ in range(N):
+            # prefer first pages to have some hits
+            i = rand.choice((0, 0, 1, 2))
+            j = rand.randint(0, 3)
+            offset = rand.randint(0, u.PAGE_SIZE - 1)
+            u.virtIn._ag.data.append(self.buildVirtAddr(i, j, offset))
+            expected.append(translate(i, j, offset))
+
+        self.runSim(N * 20 * CLK_PERIOD)
+
+        self.assertValSequenceEqual(u.physOut._ag.data, expected)
+        hits = int(u.tlbHits._ag.data[-1])
+        misses = int(u.tlbMisses._ag.data[-1])
+        self.assertEqual(hits + misses, N)
+        self.assertGreater(hits, N // 4)
+        self.assertGreaterEqual(misses, 12)
+        self.assertValEqual(u.segfault._ag.data[-1], 0)
+
+
 if __name__ == "__main__":
     suite = unittest.TestSuite()
-    # suite.addTest(MMU_2pageLvl_TC('test_translate10xRandomized'))
+    # suite.addTest(MMU_2pageLvl_tlb_TC('test_tlb_hit'))
     suite.addTest(unittest.makeSuite(MMU_2pageLvl_TC))
+    suite.addTest(unittest.makeSuite(MMU_2pageLvl_tlb_TC))
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
@@ -2,18 +2,23 @@
 # -*- coding: utf-8 -
 
 from hwt.code import Concat, If
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
 from hwt.interfaces.std import Handshaked, BramPort_withoutClk, \
-    Signal
+    Signal, HandshakeSync, VectSignal
 from hwt.interfaces.utils import propagateClkRstn, addClkRstn
 from hwt.math import log2ceil
 from hwt.synthesizer.param import Param
 from hwt.synthesizer.unit import Unit
 from hwtLib.amba.datapump.intf import AxiRDatapumpIntf
 from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.handshaked.joinPrioritized import HsJoinPrioritized
 from hwtLib.handshaked.ramAsHs import RamAsHs
+from hwtLib.handshaked.reg import HandshakedReg
 from hwtLib.handshaked.streamNode import StreamNode
 from hwtLib.mem.ram import RamSingleClock
 from hwtLib.structManipulators.arrayItemGetter import ArrayItemGetter
+from hwtLib.structManipulators.mmu_tlb import MmuTlb
 
 
 FLAG_INVALID = 1
@@ -34,6 +39,19 @@ class MMU_2pageLvl(Unit):
     :attention: use value -1 to mark that page is not mapped, it will result
         in segfault signal asserted high when this address is accessed
 
+    :ivar ~.TLB_WAYS: number of ways of TLB (:class:`~.MmuTlb`), 0 means that there is no TLB
+        and each translation downloads the item from leaf page table
+    :ivar ~.TLB_SETS: number of sets of TLB, 1 means fully associative TLB
+    :ivar ~.tlbFlush: (only if TLB_WAYS > 0) invalidate all translations in TLB,
+        the translations which are being downloaded at the time of the flush
+        are not stored in TLB
+    :ivar ~.tlbHits: (only if TLB_WAYS > 0) number of translations resolved by TLB
+    :ivar ~.tlbMisses: (only if TLB_WAYS > 0) number of translations which required
+        the download of the item from leaf page table
+
+    :note: the translations are always returned in order, the translation which hits in TLB
+        has to wait until all previous translations are finished
+
     .. hwt-autodoc::
     """
     def _config(self):
@@ -48,6 +66,10 @@ class MMU_2pageLvl(Unit):
 
         self.MAX_OVERLAP = Param(16)
 
+        self.TLB_WAYS = Param(0)
+        self.TLB_SETS = Param(1)
+        self.TLB_COUNTER_WIDTH = Param(32)
+
     def _declr(self):
         self.PAGE_OFFSET_WIDTH = log2ceil(self.PAGE_SIZE)
         self.LVL1_PAGE_TABLE_INDX_WIDTH = log2ceil(self.LVL1_PAGE_TABLE_ITEMS)
@@ -91,7 +113,31 @@ class MMU_2pageLvl(Unit):
 
         self.pageOffsetFifo = HandshakedFifo(Handshaked)
         self.pageOffsetFifo.DEPTH = self.MAX_OVERLAP
-        self.pageOffsetFifo.DATA_WIDTH = self.PAGE_OFFSET_WIDTH
+        if self.TLB_WAYS:
+            # whole virtual address because virtual page number is required for TLB fill
+            self.pageOffsetFifo.DATA_WIDTH = self.VIRT_ADDR_WIDTH
+            self._declr_tlb()
+        else:
+            self.pageOffsetFifo.DATA_WIDTH = self.PAGE_OFFSET_WIDTH
+
+    def _declr_tlb(self):
+        self.tlbFlush = HandshakeSync()
+        self.tlbHits = VectSignal(self.TLB_COUNTER_WIDTH)._m()
+        self.tlbMisses = VectSignal(self.TLB_COUNTER_WIDTH)._m()
+
+        t = self.tlb = MmuTlb()
+        t.VPN_WIDTH = self.VIRT_ADDR_WIDTH - self.PAGE_OFFSET_WIDTH
+        t.PPN_WIDTH = self.ADDR_WIDTH - self.PAGE_OFFSET_WIDTH
+        t.WAYS = self.TLB_WAYS
+        t.SETS = self.TLB_SETS
+        t.COUNTER_WIDTH = self.TLB_COUNTER_WIDTH
+
+        self.virtInReg = HandshakedReg(Handshaked)
+        self.virtInReg.DATA_WIDTH = self.VIRT_ADDR_WIDTH
+
+        # join of translations from TLB and from page table
+        self.physOutJoin = HsJoinPrioritized(Handshaked)
+        self.physOutJoin.DATA_WIDTH = self.ADDR_WIDTH
 
     def connectLvl1PageTable(self):
         rpgt = self.lvl1Table
@@ -107,18 +153,20 @@ class MMU_2pageLvl(Unit):
         lvl1read = self.lvl1Converter.r
         return lvl1read
 
-    def connectL1Load(self, lvl1readAddr):
-        virtIn = self.virtIn
+    def connectL1Load(self, lvl1readAddr, virtAddr):
+        """
+        :return: list of interfaces which have to be synchronized
+            with the source of virtAddr
+        """
         lvl2indx = self.lvl2indxFifo.dataIn
         pageOffset = self.pageOffsetFifo
 
-        lvl2indx.data(virtIn.data[(self.LVL2_PAGE_TABLE_INDX_WIDTH
-                                   + self.PAGE_OFFSET_WIDTH):self.PAGE_OFFSET_WIDTH])
-        pageOffset.dataIn.data(virtIn.data, fit=True)
-        lvl1readAddr.data(virtIn.data[:(self.LVL2_PAGE_TABLE_INDX_WIDTH
-                                           + self.PAGE_OFFSET_WIDTH)])
-        StreamNode(masters=[virtIn],
-                   slaves=[lvl2indx, lvl1readAddr, pageOffset.dataIn]).sync()
+        lvl2indx.data(virtAddr[(self.LVL2_PAGE_TABLE_INDX_WIDTH
+                                + self.PAGE_OFFSET_WIDTH):self.PAGE_OFFSET_WIDTH])
+        pageOffset.dataIn.data(virtAddr, fit=True)
+        lvl1readAddr.data(virtAddr[:(self.LVL2_PAGE_TABLE_INDX_WIDTH
+                                     + self.PAGE_OFFSET_WIDTH)])
+        return [lvl2indx, lvl1readAddr, pageOffset.dataIn]
 
     def connectL2Load(self, lvl2base, segfaultFlag):
         lvl2get = self.lvl2get
@@ -134,17 +182,84 @@ class MMU_2pageLvl(Unit):
                                lvl2get.index:~segfaultFlag
                               }).sync()
 
-    def connectPhyout(self, segfaultFlag):
+    def connectPhyout(self, segfaultFlag, physOut):
         phyAddrBase = self.lvl2get.item
         pageOffset = self.pageOffsetFifo.dataOut
 
         segfault = segfaultFlag | phyAddrBase.data[0]._eq(FLAG_INVALID)
         StreamNode(masters=[phyAddrBase, pageOffset],
-                   slaves=[self.physOut],
-                   extraConds={self.physOut:~segfault}).sync()
+                   slaves=[physOut],
+                   extraConds={physOut:~segfault}).sync()
+
+        physOut.data(Concat(phyAddrBase.data[:self.PAGE_OFFSET_WIDTH],
+                            pageOffset.data[self.PAGE_OFFSET_WIDTH:]))
+
+    def connectTlb(self, lvl1readAddr, walkOut):
+        """
+        Resolve the translation in TLB, on TLB miss start the download
+        of the item from leaf page table and store the result in TLB
+
+        :param walkOut: the interface with the translations from the page table
+        :return: the list of interfaces which have to be synchronized with the TLB
+        """
+        PAGE_OFFSET_WIDTH = self.PAGE_OFFSET_WIDTH
+        tlb = self.tlb
+        self.virtInReg.dataIn(self.virtIn)
+        req = self.virtInReg.dataOut
+        # the lookup is combinational and req.data is stable until lookupRes is confirmed
+        tlb.lookup.data(req.data[:PAGE_OFFSET_WIDTH])
+        tlb.lookup.vld(req.vld)
+        req.rd(tlb.lookup.rd)
+        tlb.flush(self.tlbFlush)
+        self.tlbHits(tlb.hits)
+        self.tlbMisses(tlb.misses)
+
+        res = tlb.lookupRes
+        hitOut = self.physOutJoin.dataIn[1]
+        hitOut.data(Concat(res.ppn, req.data[PAGE_OFFSET_WIDTH:]))
+        walkIn = self.connectL1Load(lvl1readAddr, req.data)
+
+        # number of translations which are downloading item from the page table
+        walkCntr = self._reg("walkCntr", Bits(log2ceil(self.MAX_OVERLAP + 1)), def_val=0)
+        # virtual page number of the last translation which started the download
+        lastWalkVpn = self._reg("lastWalkVpn", tlb.lookup.data._dtype)
+        # the hit can not overtake a previous miss
+        hitAllowed = walkCntr._eq(0)
+        # the miss on the page which is currently being downloaded waits for the TLB fill
+        # and is then resolved as a hit
+        walkAllowed = walkCntr._eq(0) | (lastWalkVpn != tlb.lookup.data)
+        lookupAllowed = rename_signal(self, res.found._ternary(hitAllowed, walkAllowed), "lookupAllowed")
+        skipWhen = {i: res.found for i in walkIn}
+        skipWhen[hitOut] = ~res.found
+        StreamNode(masters=[res],
+                   slaves=[hitOut, *walkIn],
+                   extraConds={i: lookupAllowed for i in [res, hitOut, *walkIn]},
+                   skipWhen=skipWhen).sync()
+
+        walkStart = rename_signal(self, res.vld & res.rd & ~res.found, "walkStart")
+        If(walkStart,
+           lastWalkVpn(tlb.lookup.data)
+        )
+        walkDone = rename_signal(self, walkOut.vld & walkOut.rd, "walkDone")
+        If(walkStart & ~walkDone,
+           walkCntr(walkCntr + 1)
+        ).Elif(~walkStart & walkDone,
+           walkCntr(walkCntr - 1)
+        )
+
+        # number of translations which were started before flush
+        # and which results should not be stored in TLB
+        fillSkip = self._reg("fillSkip", walkCntr._dtype, def_val=0)
+        If(self.tlbFlush.vld,
+           fillSkip(walkDone._ternary(walkCntr - 1, walkCntr))
+        ).Elif(walkDone & (fillSkip != 0),
+           fillSkip(fillSkip - 1)
+        )
 
-        self.physOut.data(Concat(phyAddrBase.data[:self.PAGE_OFFSET_WIDTH],
-                                 pageOffset.data))
+        fill = tlb.fill
+        fill.addr(self.pageOffsetFifo.dataOut.data[:PAGE_OFFSET_WIDTH])
+        fill.data(self.lvl2get.item.data[:PAGE_OFFSET_WIDTH])
+        fill.vld(walkDone & fillSkip._eq(0))
 
     def segfaultChecker(self):
         lvl1item = self.lvl1Converter.r.data
@@ -166,9 +281,16 @@ class MMU_2pageLvl(Unit):
         segfaultFlag = self.segfaultChecker()
 
         lvl1read = self.connectLvl1PageTable()
-        self.connectL1Load(lvl1read.addr)
+        if self.TLB_WAYS:
+            walkOut = self.physOutJoin.dataIn[0]
+            self.connectTlb(lvl1read.addr, walkOut)
+            self.physOut(self.physOutJoin.dataOut)
+        else:
+            walkOut = self.physOut
+            StreamNode(masters=[self.virtIn],
+                       slaves=self.connectL1Load(lvl1read.addr, self.virtIn.data)).sync()
         self.connectL2Load(lvl1read.data, segfaultFlag)
-        self.connectPhyout(segfaultFlag)
+        self.connectPhyout(segfaultFlag, walkOut)
 
         self.segfault(segfaultFlag)
 
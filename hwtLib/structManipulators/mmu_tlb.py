@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.code import Concat, If, Switch
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.agents.handshaked import HandshakedAgent
+from hwt.interfaces.std import Handshaked, HandshakeSync, Signal, \
+    VectSignal
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil, isPow2
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axi_comp.cache.pseudo_lru import PseudoLru
+from hwtLib.common_nonstd_interfaces.addr_data_hs import AddrDataHs
+from hwtLib.handshaked.streamNode import StreamNode
+from hwtLib.logic.binToOneHot import binToOneHot
+from hwtLib.logic.oneHotToBin import oneHotToBin
+from hwtLib.mem.cam import Cam
+from hwtSimApi.hdlSimulator import HdlSimulator
+from pyMathBitPrecise.bit_utils import mask
+
+
+class MmuTlbLookupResIntf(HandshakeSync):
+    """
+    Interface for a result of the lookup in :class:`~.MmuTlb`
+
+    :ivar ~.found: 1 if the translation was found
+    :ivar ~.ppn: physical page number (valid only if found=1)
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        self.PPN_WIDTH = Param(20)
+
+    def _declr(self):
+        self.found = Signal()
+        self.ppn = VectSignal(self.PPN_WIDTH)
+        HandshakeSync._declr(self)
+
+    def _initSimAgent(self, sim: HdlSimulator):
+        self._ag = MmuTlbLookupResAgent(sim, self)
+
+
+class MmuTlbLookupResAgent(HandshakedAgent):
+    """
+    Simulation agent for :class:`~.MmuTlbLookupResIntf`,
+    data format is tuple (found, ppn)
+    """
+
+    def set_data(self, data):
+        i = self.intf
+        if data is None:
+            found, ppn = None, None
+        else:
+            found, ppn = data
+
+        i.found.write(found)
+        i.ppn.write(ppn)
+
+    def get_data(self):
+        i = self.intf
+        return i.found.read(), i.ppn.read()
+
+
+class MmuTlb(Unit):
+    """
+    Translation lookaside buffer, a cache of translations
+    from virtual page number (vpn) to physical page number (ppn)
+
+    The tags are stored in :class:`hwtLib.mem.cam.Cam` and the lookup is combinational,
+    the victim for a fill is the first invalid way in the set
+    or the way selected by :class:`~.PseudoLru` (the item used by lookup or fill
+    is marked as the most recently used in its set).
+
+    :ivar ~.WAYS: number of items in each set (power of 2, >= 2)
+    :ivar ~.SETS: number of sets (power of 2), 1 means fully associative TLB,
+        the set is selected by lower bits of vpn
+    :ivar ~.COUNTER_WIDTH: width of hits/misses counters (the counters are wrapping)
+    :ivar ~.lookup: the vpn to translate
+    :ivar ~.lookupRes: the result of the lookup, transaction on this interface
+        is also counted in hits/misses counters
+    :ivar ~.fill: the port for insert of the new translation (addr=vpn, data=ppn),
+        always ready
+    :ivar ~.flush: the port for the invalidation of all items, always ready,
+        the flush has higher priority than the fill in same clock cycle
+    :ivar ~.hits: number of lookups which have found the translation
+    :ivar ~.misses: number of lookups which have not found the translation
+
+    :note: the fill does not check if the vpn is already present,
+        if there are multiple items for same vpn (e.g. fill from concurrent translations)
+        they have the same ppn and the lookup remains correct
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        self.VPN_WIDTH = Param(20)
+        self.PPN_WIDTH = Param(20)
+        self.WAYS = Param(4)
+        self.SETS = Param(1)
+        self.COUNTER_WIDTH = Param(32)
+
+    def _declr(self):
+        assert self.WAYS >= 2 and isPow2(self.WAYS), self.WAYS
+        assert isPow2(self.SETS), self.SETS
+        self.SET_INDEX_WIDTH = log2ceil(self.SETS) if self.SETS > 1 else 0
+        self.TAG_WIDTH = self.VPN_WIDTH - self.SET_INDEX_WIDTH
+        assert self.TAG_WIDTH > 0, (self.VPN_WIDTH, self.SETS)
+        self.ITEMS = self.SETS * self.WAYS
+
+        addClkRstn(self)
+        self.lookup = Handshaked()
+        self.lookup.DATA_WIDTH = self.VPN_WIDTH
+
+        self.lookupRes = MmuTlbLookupResIntf()._m()
+        self.lookupRes.PPN_WIDTH = self.PPN_WIDTH
+
+        f = self.fill = AddrDataHs()
+        f.ADDR_WIDTH = self.VPN_WIDTH
+        f.DATA_WIDTH = self.PPN_WIDTH
+
+        self.flush = HandshakeSync()
+
+        self.hits = VectSignal(self.COUNTER_WIDTH)._m()
+        self.misses = VectSignal(self.COUNTER_WIDTH)._m()
+
+        t = self.tags = Cam()
+        t.KEY_WIDTH = self.TAG_WIDTH
+        t.ITEMS = self.ITEMS
+        # valid bits are in this component to allow flush in a single clock cycle
+        t.USE_VLD_BIT = False
+
+    def split_vpn(self, vpn):
+        """
+        :return: tuple (tag, set index), the set index is None for fully associative TLB
+        """
+        if self.SET_INDEX_WIDTH:
+            return vpn[:self.SET_INDEX_WIDTH], vpn[self.SET_INDEX_WIDTH:]
+        else:
+            return vpn, None
+
+    def set_bits(self, sig, set_i: int):
+        """
+        :return: list of bits of sig for ways of the set
+        """
+        return [sig[set_i * self.WAYS + w] for w in range(self.WAYS)]
+
+    def select_set(self, name: str, set_index, vals):
+        """
+        Select the value for the set specified by set_index
+        """
+        if set_index is None:
+            return vals[0]
+        res = self._sig(name, vals[0]._dtype)
+        Switch(set_index).add_cases(
+            [(i, res(v)) for i, v in enumerate(vals)]
+        )
+        return res
+
+    def lookup_logic(self, item_valid, ppn_mem):
+        """
+        :return: tuple (lookup ack, one hot encoded found item)
+        :note: the found item is strictly one hot (or 0) even if the vpn is present multiple times,
+            only the first matching item is used (same as for the ppn selection)
+        """
+        lookup = self.lookup
+        res = self.lookupRes
+        tag, set_index = self.split_vpn(lookup.data)
+
+        tags = self.tags
+        tags.match.data(tag)
+        tags.match.vld(lookup.vld)
+        tags.out.rd(1)
+
+        match = tags.out.data & item_valid
+        found_oh = []
+        for s in range(self.SETS):
+            for m in self.set_bits(match, s):
+                if set_index is not None:
+                    m = m & set_index._eq(s)
+                found_oh.append(m)
+        found_oh = rename_signal(self, Concat(*reversed(found_oh)), "found_oh")
+        found_index = oneHotToBin(self, found_oh, "found_index")
+
+        found = rename_signal(self, found_oh != 0, "found")
+        res.found(found)
+        res.ppn(ppn_mem[found_index])
+        StreamNode([lookup], [res]).sync()
+
+        lookup_ack = rename_signal(self, res.vld & res.rd, "lookup_ack")
+        for name, cond in [("hits", res.found), ("misses", ~res.found)]:
+            cntr = self._reg(f"{name}_cntr", Bits(self.COUNTER_WIDTH), def_val=0)
+            If(lookup_ack & cond,
+               cntr(cntr + 1)
+            )
+            getattr(self, name)(cntr)
+
+        found_first_oh = rename_signal(self, binToOneHot(found_index, en=found), "found_first_oh")
+        return lookup_ack, found_first_oh
+
+    def fill_logic(self, item_valid, ppn_mem, lru):
+        """
+        :return: tuple (fill enable, set index of the fill, way of the fill)
+        """
+        fill = self.fill
+        flush = self.flush
+        fill.rd(1)
+        flush.rd(1)
+        WAYS = self.WAYS
+        tag, set_index = self.split_vpn(fill.addr)
+
+        set_valid = self.select_set(
+            "fill_set_valid", set_index,
+            [Concat(*reversed(self.set_bits(item_valid, s))) for s in range(self.SETS)])
+        set_lru = self.select_set("fill_set_lru", set_index, lru)
+
+        victim_way = self._sig("victim_way", Bits(log2ceil(WAYS)))
+        If(set_valid._eq(mask(WAYS)),
+           victim_way(PseudoLru(set_lru).get_lru())
+        ).Else(
+           # use the first invalid way
+           victim_way(oneHotToBin(self, ~set_valid, "first_invalid_way"))
+        )
+        if set_index is None:
+            fill_index = victim_way
+        else:
+            fill_index = Concat(set_index, victim_way)
+        fill_index = rename_signal(self, fill_index, "fill_index")
+
+        fill_en = rename_signal(self, fill.vld & ~flush.vld, "fill_en")
+        w = self.tags.write
+        w.addr(fill_index)
+        w.data(tag)
+        w.vld(fill_en)
+
+        If(self.clk._onRisingEdge() & fill_en,
+           ppn_mem[fill_index](fill.data)
+        )
+
+        If(flush.vld,
+           item_valid(0)
+        ).Elif(fill_en,
+           item_valid(item_valid | binToOneHot(fill_index))
+        )
+
+        return fill_en, set_index, victim_way
+
+    def _impl(self):
+        propagateClkRstn(self)
+        item_valid = self._reg("item_valid", Bits(self.ITEMS), def_val=0)
+        ppn_mem = self._sig("ppn_mem", Bits(self.PPN_WIDTH)[self.ITEMS])
+        lru_t = Bits(PseudoLru.lru_reg_width(self.WAYS), force_vector=True)
+        lru = [self._reg(f"lru_{s:d}", lru_t, def_val=0) for s in range(self.SETS)]
+
+        lookup_ack, found_oh = self.lookup_logic(item_valid, ppn_mem)
+        fill_en, fill_set_index, victim_way = self.fill_logic(item_valid, ppn_mem, lru)
+
+        # mark the items used by lookup and fill as recently used
+        # (the fill as more recent if both are in same set),
+        # PseudoLru.mark_use requires one hot masks: the lookup mask is the first found item
+        # and the fill mask is the decoded victim way, both gated by a single enable
+        fill_oh = binToOneHot(victim_way)
+        for s, lru_reg in enumerate(lru):
+            fill_in_set = fill_en
+            if fill_set_index is not None:
+                fill_in_set = fill_in_set & fill_set_index._eq(s)
+            lookup_used = Concat(*reversed([lookup_ack & f for f in self.set_bits(found_oh, s)]))
+            fill_used = fill_in_set._ternary(fill_oh, fill_oh._dtype.from_py(0))
+            lru_tmp = self._sig(f"lru_{s:d}_tmp", lru_reg._dtype)
+            lru_tmp(PseudoLru(lru_reg).mark_use(rename_signal(self, lookup_used, f"lru_{s:d}_lookup_used")))
+            lru_reg(PseudoLru(lru_tmp).mark_use(rename_signal(self, fill_used, f"lru_{s:d}_fill_used")))
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = MmuTlb()
+    u.SETS = 2
+    print(to_rtl_str(u))
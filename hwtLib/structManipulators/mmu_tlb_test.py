@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from hwt.hdl.constants import NOP
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.structManipulators.mmu_tlb import MmuTlb
+from hwtSimApi.constants import CLK_PERIOD
+
+
+class MmuTlb_TC(SimTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = MmuTlb()
+        u.VPN_WIDTH = 8
+        u.PPN_WIDTH = 8
+        u.WAYS = 4
+        cls.compileSim(u)
+
+    def lookup_results(self):
+        """
+        :return: list of ppn or None if translation was not found
+        """
+        return [int(ppn) if int(found) else None
+                for found, ppn in self.u.lookupRes._ag.data]
+
+    def assertCounters(self, hits, misses):
+        u = self.u
+        self.assertValEqual(u.hits._ag.data[-1], hits)
+        self.assertValEqual(u.misses._ag.data[-1], misses)
+
+    def test_nop(self):
+        self.runSim(10 * CLK_PERIOD)
+        self.assertEmpty(self.u.lookupRes._ag.data)
+        self.assertCounters(0, 0)
+
+    def test_fill_and_lookup(self):
+        u = self.u
+        u.fill._ag.data.extend([(1, 10), (2, 20), (3, 30)])
+        u.lookup._ag.data.extend([NOP, NOP, NOP, 1, 2, 4, 3, 1, 5])
+
+        self.runSim(15 * CLK_PERIOD)
+        self.assertSequenceEqual(self.lookup_results(),
+                                 [10, 20, None, 30, 10, None])
+        self.assertCounters(4, 2)
+
+    def test_lru_replacement(self):
+        u = self.u
+        u.fill._ag.data.extend([(0, 10), (1, 11), (2, 12), (3, 13),
+                                NOP, NOP, (4, 14)])
+        # use 0 so the next victim is in the second half of the PLRU tree
+        # where the 3 is the most recently used, 2 should be replaced
+        u.lookup._ag.data.extend([NOP, NOP, NOP, NOP, NOP, 0,
+                                  NOP, NOP, NOP, 0, 1, 2, 3, 4])
+
+        self.runSim(20 * CLK_PERIOD)
+        self.assertSequenceEqual(self.lookup_results(),
+                                 [10, 10, 11, None, 13, 14])
+        self.assertCounters(5, 1)
+
+    def test_flush(self):
+        u = self.u
+        u.fill._ag.data.extend([(1, 10), (2, 20), NOP, NOP, NOP, NOP, (3, 30)])
+        u.flush._ag.data.extend([NOP, NOP, NOP, 1])
+        u.lookup._ag.data.extend([NOP, NOP, 1, NOP, NOP, NOP, NOP, NOP, 1, 2, 3])
+
+        self.runSim(20 * CLK_PERIOD)
+        self.assertSequenceEqual(self.lookup_results(),
+                                 [10, None, None, 30])
+        self.assertCounters(2, 2)
+
+
+class MmuTlb_2sets_TC(MmuTlb_TC):
+
+    @classmethod
+    def setUpClass(cls):
+        u = cls.u = MmuTlb()
+        u.VPN_WIDTH = 8
+        u.PPN_WIDTH = 8
+        u.WAYS = 2
+        u.SETS = 2
+        cls.compileSim(u)
+
+    def test_lru_replacement(self):
+        u = self.u
+        # odd vpns are in set 1, filling of set 1 does not replace items in set 0
+        u.fill._ag.data.extend([(0, 10), (2, 12), (1, 11), (3, 13), (5, 15)])
+        u.lookup._ag.data.extend([NOP, NOP, NOP, NOP, NOP, NOP, 0, 2, 1, 3, 5])
+
+        self.runSim(20 * CLK_PERIOD)
+        self.assertSequenceEqual(self.lookup_results(),
+                                 [10, 12, None, 13, 15])
+
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(MmuTlb_TC('test_lru_replacement'))
+    suite.addTest(unittest.makeSuite(MmuTlb_TC))
+    suite.addTest(unittest.makeSuite(MmuTlb_2sets_TC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
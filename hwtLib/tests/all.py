@@ -8,6 +8,8 @@ from hwt.simulator.simTestCase import SimTestCase
 from hwtLib.abstract.busEndpoint_test import BusEndpointTC
 from hwtLib.abstract.frame_utils.alignment_utils_test import FrameAlignmentUtilsTC
 from hwtLib.abstract.frame_utils.join.test import FrameJoinUtilsTC
+from hwtLib.abstract.sim_ram_test import SimRamPagedStorage_TC, SimRam_TC, \
+    SimRamDictStorage_TC
 from hwtLib.abstract.template_configured_test import TemplateConfigured_TC
 from hwtLib.amba.axiLite_comp.buff_test import AxiRegTC
 from hwtLib.amba.axiLite_comp.endpoint_arr_test import \
@@ -20,25 +22,35 @@ from hwtLib.amba.axiLite_comp.endpoint_test import AxiLiteEndpointTCs
 from hwtLib.amba.axiLite_comp.to_axi_test import AxiLite_to_Axi_TC
 from hwtLib.amba.axi_comp.cache.caheWriteAllocWawOnlyWritePropagating_test import AxiCaheWriteAllocWawOnlyWritePropagatingTCs
 from hwtLib.amba.axi_comp.cache.pseudo_lru_test import PseudoLru_TC
+from hwtLib.amba.axi_comp.cache.replacement_policy_test import CacheReplacementPolicy_TC
+from hwtLib.amba.axi_comp.cache.cache_model_test import CacheModel_TC
+from hwtLib.amba.axi_comp.cache.mshr_test import AxiCacheMshrFileTC
 from hwtLib.amba.axi_comp.interconnect.matrixAddrCrossbar_test import\
     AxiInterconnectMatrixAddrCrossbar_TCs
 from hwtLib.amba.axi_comp.interconnect.matrixCrossbar_test import \
     AxiInterconnectMatrixCrossbar_TCs
 from hwtLib.amba.axi_comp.interconnect.matrixR_test import AxiInterconnectMatrixR_TCs
 from hwtLib.amba.axi_comp.interconnect.matrixW_test import AxiInterconnectMatrixW_TCs
+from hwtLib.amba.axi_comp.interconnect.matrixArbitration_test import AxiInterconnectArbitration_TCs
+from hwtLib.amba.axi_comp.interconnect.matrixIdRemap_test import AxiInterconnectMatrixIdRemap_TCs
 from hwtLib.amba.axi_comp.lsu.read_aggregator_test import AxiReadAggregator_TCs
 from hwtLib.amba.axi_comp.lsu.store_queue_write_propagating_test import AxiStoreQueueWritePropagating_TCs
 from hwtLib.amba.axi_comp.lsu.write_aggregator_test import AxiWriteAggregator_TCs
 from hwtLib.amba.axi_comp.oooOp.examples.counterArray_test import OooOpExampleCounterArray_TCs
+from hwtLib.amba.axi_comp.oooOp.examples.counterArrayBanked_test import OooOpExampleCounterArrayBanked_TCs
 from hwtLib.amba.axi_comp.oooOp.examples.counterHashTable_test import OooOpExampleCounterHashTable_TC
+from hwtLib.amba.axi_comp.oooOp.examples.counterHashTableBanked_test import OooOpExampleCounterHashTableBanked_TCs
 from hwtLib.amba.axi_comp.resize_test import AxiResizeTC
 from hwtLib.amba.axi_comp.sim.ag_test import Axi_ag_TC
+from hwtLib.amba.axi_comp.prefetcher_test import AxiReadPrefetcherTCs
 from hwtLib.amba.axi_comp.slave_timeout_test import AxiSlaveTimeoutTC
 from hwtLib.amba.axi_comp.static_remap_test import AxiStaticRemapTCs
 from hwtLib.amba.axi_comp.stream_to_mem_test import Axi4_streamToMemTC
 from hwtLib.amba.axi_comp.tester_test import AxiTesterTC
 from hwtLib.amba.axi_comp.to_axiLite_test import Axi_to_AxiLite_TC
 from hwtLib.amba.axi_test import AxiTC
+from hwtLib.amba.axis_test import AxiS_bytes_TC
+from hwtLib.amba.sim.axis_file_test import AxiStreamFrameFile_TC
 from hwtLib.amba.axis_comp.en_test import AxiS_en_TC
 from hwtLib.amba.axis_comp.fifoDrop_test import AxiSFifoDropTC
 from hwtLib.amba.axis_comp.fifoMeasuring_test import AxiS_fifoMeasuringTC
@@ -56,8 +68,10 @@ from hwtLib.amba.datapump.interconnect.wStrictOrderComplex_test import \
     WStrictOrderInterconnectComplexTC
 from hwtLib.amba.datapump.interconnect.wStrictOrder_test import \
     WStrictOrderInterconnectTC, WStrictOrderInterconnect2TC
+from hwtLib.amba.datapump.burst_split_test import Axi_BurstSplitReorder_TCs
 from hwtLib.amba.datapump.r_aligned_test import Axi_rDatapump_alignedTCs
 from hwtLib.amba.datapump.r_unaligned_test import Axi_rDatapump_unalignedTCs
+from hwtLib.amba.datapump.sim_ram_timing_test import AxiSimRamTimingModel_TC
 from hwtLib.amba.datapump.w_test import Axi_wDatapumpTCs
 from hwtLib.avalon.axiToMm_test import AxiToAvalonMm_TCs
 from hwtLib.avalon.endpoint_test import AvalonMmEndpointTCs
@@ -80,6 +94,8 @@ from hwtLib.examples.arithmetic.twoCntrs_test import TwoCntrsTC
 from hwtLib.examples.arithmetic.vhdl_vector_auto_casts import VhdlVectorAutoCastExampleTC
 from hwtLib.examples.arithmetic.widthCasting import WidthCastingExampleTC
 from hwtLib.examples.axi.debugbusmonitor_test import DebugBusMonitorExampleAxiTC
+from hwtLib.tools.debug_bus_monitor_ctl_test import DebugBusMonitorCtlMmapTC, \
+    DebugBusMonitorCtlNameMemoryTC
 from hwtLib.examples.axi.simpleAxiRegs_test import SimpleAxiRegsTC
 from hwtLib.examples.builders.ethAddrUpdater_test import EthAddrUpdaterTCs
 from hwtLib.examples.builders.handshakedBuilderSimple import \
@@ -159,6 +175,10 @@ from hwtLib.logic.countLeading_test import CountLeadingTC
 from hwtLib.logic.crcComb_test import CrcCombTC
 from hwtLib.logic.crcUtils_test import CrcUtilsTC
 from hwtLib.logic.crc_test import CrcTC
+from hwtLib.logic.crcSw_test import CrcSw_TC
+from hwtLib.logic.toeplitzHashSw_test import ToeplitzHashSw_TC
+from hwtLib.logic.inetChecksum_test import InetChecksum_TCs
+from hwtLib.logic.xorNetwork_test import XorNetworkTC
 from hwtLib.logic.lfsr import LfsrTC
 from hwtLib.logic.oneHotToBin_test import OneHotToBinTC
 from hwtLib.mem.atomic.flipCntr_test import FlipCntrTC
@@ -178,6 +198,9 @@ from hwtLib.peripheral.displays.hd44780.driver_test import Hd44780Driver8bTC
 from hwtLib.peripheral.displays.segment7_test import Segment7TC
 from hwtLib.peripheral.ethernet.mac_rx_test import EthernetMac_rx_TCs
 from hwtLib.peripheral.ethernet.mac_tx_test import EthernetMac_tx_TCs
+from hwtLib.peripheral.ethernet.mac_segmented_test import EthernetMacSegmented_TCs
+from hwtLib.peripheral.ethernet.inet_checksum_offload_test import Ipv4ChecksumOffload_TCs
+from hwtLib.peripheral.ethernet.rss_test import Rss_TCs
 from hwtLib.peripheral.ethernet.rmii_adapter_test import RmiiAdapterTC
 from hwtLib.peripheral.i2c.masterBitCntrl_test import I2CMasterBitCntrlTC
 from hwtLib.peripheral.mdio.master_test import MdioMasterTC
@@ -192,7 +215,9 @@ from hwtLib.structManipulators.cLinkedListReader_test import \
     CLinkedListReaderTC
 from hwtLib.structManipulators.cLinkedListWriter_test import \
     CLinkedListWriterTC
-from hwtLib.structManipulators.mmu2pageLvl_test import MMU_2pageLvl_TC
+from hwtLib.structManipulators.mmu2pageLvl_test import MMU_2pageLvl_TC, \
+    MMU_2pageLvl_tlb_TC
+from hwtLib.structManipulators.mmu_tlb_test import MmuTlb_TC, MmuTlb_2sets_TC
 from hwtLib.structManipulators.structReader_test import StructReaderTC
 from hwtLib.structManipulators.structWriter_test import StructWriter_TC
 from hwtLib.tests.constraints.xdc_clock_related_test import ConstraintsXdcClockRelatedTC
@@ -208,6 +233,7 @@ from hwtLib.tests.serialization.tmpVar_test import Serializer_tmpVar_TC
 from hwtLib.tests.serialization.vhdl_test import Vhdl2008Serializer_TC
 from hwtLib.tests.simulator.basicRtlSimulatorVcdTmpDirs_test import BasicRtlSimulatorVcdTmpDirs_TCs
 from hwtLib.tests.simulator.json_log_test import HsFifoJsonLogTC
+from hwtLib.tests.sharded_runner_test import ShardedRunnerTC
 from hwtLib.tests.simulator.utils_test import SimulatorUtilsTC
 from hwtLib.tests.structIntf_operator_test import StructIntf_operatorTC
 from hwtLib.tests.synthesizer.astNodeIoReplacing_test import AstNodeIoReplacingTC
@@ -254,6 +280,7 @@ suite = testSuiteFromTCs(
     # basic tests
     FileUtilsTC,
     ArrayQueryTC,
+    ShardedRunnerTC,
     RtlLvlTC,
     ReprOfHdlObjsTC,
     HdlCommentsTC,
@@ -318,8 +345,14 @@ suite = testSuiteFromTCs(
     TemplateConfigured_TC,
     FrameAlignmentUtilsTC,
     FrameJoinUtilsTC,
+    SimRamPagedStorage_TC,
+    SimRamDictStorage_TC,
+    SimRam_TC,
     HwExceptionCatch_TC,
     PseudoLru_TC,
+    CacheReplacementPolicy_TC,
+    CacheModel_TC,
+    AxiCacheMshrFileTC,
 
     # tests of simple units
     TimerTC,
@@ -388,11 +421,18 @@ suite = testSuiteFromTCs(
     I2CMasterBitCntrlTC,
     *EthernetMac_rx_TCs,
     *EthernetMac_tx_TCs,
+    *EthernetMacSegmented_TCs,
+    *Ipv4ChecksumOffload_TCs,
+    *Rss_TCs,
     MdioMasterTC,
     Hd44780Driver8bTC,
     CrcUtilsTC,
     CrcCombTC,
     CrcTC,
+    CrcSw_TC,
+    ToeplitzHashSw_TC,
+    *InetChecksum_TCs,
+    XorNetworkTC,
 
     BusEndpointTC,
 
@@ -421,13 +461,17 @@ suite = testSuiteFromTCs(
     *AxiStaticRemapTCs,
     AxiResizeTC,
 
+    AxiS_bytes_TC,
+    AxiStreamFrameFile_TC,
     AxisFrameGenTC,
     *AddrDataHs_to_Axi_TCs,
     Axi4BRam_TC,
     *Axi_rDatapump_alignedTCs,
     *Axi_rDatapump_unalignedTCs,
+    *Axi_BurstSplitReorder_TCs,
     *Axi_wDatapumpTCs,
     AxiSlaveTimeoutTC,
+    *AxiReadPrefetcherTCs,
     AxiSStoredBurstTC,
     AxiS_en_TC,
     AxiS_fifoMeasuringTC,
@@ -450,6 +494,8 @@ suite = testSuiteFromTCs(
     *AxiInterconnectMatrixCrossbar_TCs,
     *AxiInterconnectMatrixR_TCs,
     *AxiInterconnectMatrixW_TCs,
+    *AxiInterconnectArbitration_TCs,
+    *AxiInterconnectMatrixIdRemap_TCs,
 
     *AxiWriteAggregator_TCs,
     *AxiReadAggregator_TCs,
@@ -457,6 +503,7 @@ suite = testSuiteFromTCs(
     *AxiCaheWriteAllocWawOnlyWritePropagatingTCs,
 
     Axi_ag_TC,
+    AxiSimRamTimingModel_TC,
     Axi4_streamToMemTC,
     ArrayItemGetterTC,
     ArrayItemGetter2in1WordTC,
@@ -464,9 +511,14 @@ suite = testSuiteFromTCs(
     CLinkedListReaderTC,
     CLinkedListWriterTC,
     MMU_2pageLvl_TC,
+    MMU_2pageLvl_tlb_TC,
+    MmuTlb_TC,
+    MmuTlb_2sets_TC,
     StructWriter_TC,
     StructReaderTC,
     *OooOpExampleCounterArray_TCs,
+    *OooOpExampleCounterArrayBanked_TCs,
+    *OooOpExampleCounterHashTableBanked_TCs,
     OooOpExampleCounterHashTable_TC,
 
     # ipif tests
@@ -493,6 +545,8 @@ suite = testSuiteFromTCs(
     *CuckooHashTableWithRamTCs,
     PingResponderTC,
     DebugBusMonitorExampleAxiTC,
+    DebugBusMonitorCtlMmapTC,
+    DebugBusMonitorCtlNameMemoryTC,
 
     RmiiAdapterTC,
     ConstraintsXdcClockRelatedTC,
@@ -502,6 +556,13 @@ suite = testSuiteFromTCs(
 
 
 def main():
+    if len(sys.argv) > 1:
+        # arguments for timing aware parallel runner (e.g. -j 8 --shard 1/2)
+        from hwtLib.tests.sharded_runner import main as sharded_runner_main
+        if not sharded_runner_main(sys.argv[1:], suite):
+            sys.exit(1)
+        return
+
     # runner = TextTestRunner(verbosity=2, failfast=True)
     runner = TextTestRunner(verbosity=2)
 
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Timing aware parallel runner for the test suite (:mod:`hwtLib.tests.all`)
+
+* durations of tests are stored in a cache file and the test classes are scheduled
+  longest first on a process pool (the test class is an unit of scheduling
+  because the simulation model is usually compiled in setUpClass)
+* --shard i/n selects a subset of test classes for this machine, the shards are balanced
+  using the durations from the cache (the cache file has to be the same on all machines)
+* --changed runs only the test classes whose source modules (the module of the test
+  and hwtLib modules it depends on) changed since the last run or which failed in last run
+
+.. code-block:: bash
+
+    python -m hwtLib.tests.sharded_runner -j 8 --shard 1/2 --top 20
+"""
+
+import argparse
+from collections import OrderedDict
+from hashlib import sha1
+import inspect
+import json
+import multiprocessing
+import os
+import sys
+from time import perf_counter
+import traceback
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Type
+from unittest import TestCase, TestResult, TestSuite
+
+
+DEFAULT_CACHE_FILE = ".hwtLib_test_durations.json"
+# estimated duration of the test which was never executed [s]
+DEFAULT_TEST_DURATION = 1.0
+
+
+def iter_tests(suite):
+    """
+    Iterate all TestCase instances in a (possibly nested) TestSuite
+    """
+    for t in suite:
+        if isinstance(t, TestSuite):
+            yield from iter_tests(t)
+        else:
+            yield t
+
+
+def group_tests_by_class(suite) -> "OrderedDict[Type[TestCase], List[TestCase]]":
+    res = OrderedDict()
+    for t in iter_tests(suite):
+        res.setdefault(t.__class__, []).append(t)
+    return res
+
+
+def test_class_name(cls: Type[TestCase]) -> str:
+    return f"{cls.__module__:s}.{cls.__qualname__:s}"
+
+
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """
+    :param shard: string in format "i/n" where i is 1 based index of the shard
+    :return: tuple (0 based index, number of shards)
+    """
+    try:
+        i, n = shard.split("/")
+        i, n = int(i), int(n)
+    except ValueError:
+        raise ValueError("Shard has to be specified as i/n", shard)
+    if n < 1 or i < 1 or i > n:
+        raise ValueError("Shard index out of range", shard)
+    return i - 1, n
+
+
+class DurationCache():
+    """
+    Persistent storage of the durations of tests and hashes of source modules
+
+    :ivar ~.durations: dictionary {test id: duration in seconds}
+    :ivar ~.failed: set of test ids which failed in last run
+    :ivar ~.module_hashes: dictionary {module name: hash of the source file}
+        from the last run
+    """
+
+    def __init__(self, path: Optional[str]=DEFAULT_CACHE_FILE):
+        self.path = path
+        self.durations: Dict[str, float] = {}
+        self.failed: Set[str] = set()
+        self.module_hashes: Dict[str, str] = {}
+        if path is not None and os.path.isfile(path):
+            with open(path) as f:
+                d = json.load(f)
+            self.durations = d.get("durations", {})
+            self.failed = set(d.get("failed", []))
+            self.module_hashes = d.get("module_hashes", {})
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "durations": self.durations,
+                "failed": sorted(self.failed),
+                "module_hashes": self.module_hashes,
+            }, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def estimate(self, tests: Sequence[TestCase]) -> float:
+        """
+        Estimate the duration of the tests
+        """
+        durations = self.durations
+        return sum(durations.get(t.id(), DEFAULT_TEST_DURATION) for t in tests)
+
+
+def module_source_hash(module_name: str) -> Optional[str]:
+    m = sys.modules.get(module_name)
+    try:
+        path = inspect.getsourcefile(m)
+    except TypeError:
+        return None
+    if path is None or not os.path.isfile(path):
+        return None
+    with open(path, "rb") as f:
+        return sha1(f.read()).hexdigest()
+
+
+def module_dependencies(module_name: str, package_prefix: str="hwtLib",
+                        _cache: Optional[Dict[str, Set[str]]]=None) -> Set[str]:
+    """
+    Collect the modules of the package which are used by the module (transitively),
+    the dependencies are resolved from the objects in the namespace of the module
+
+    :return: set of module names (including the module itself)
+    """
+    if _cache is None:
+        _cache = {}
+    res = set()
+    to_resolve = [module_name]
+    while to_resolve:
+        name = to_resolve.pop()
+        if name in res:
+            continue
+        res.add(name)
+        deps = _cache.get(name)
+        if deps is None:
+            deps = set()
+            m = sys.modules.get(name)
+            if m is not None:
+                for v in list(vars(m).values()):
+                    if inspect.ismodule(v):
+                        dep = v.__name__
+                    else:
+                        dep = getattr(v, "__module__", None)
+                    if isinstance(dep, str) and dep.startswith(package_prefix) and dep != name:
+                        deps.add(dep)
+            _cache[name] = deps
+        to_resolve.extend(deps)
+    return res
+
+
+def assign_shards(classes: Sequence[Type[TestCase]], estimates: Dict[Type[TestCase], float],
+                  shard_cnt: int) -> List[List[Type[TestCase]]]:
+    """
+    Split test classes in to shards with similar duration
+    (longest processing time first, deterministic for same estimates)
+    """
+    shards = [[] for _ in range(shard_cnt)]
+    loads = [0.0 for _ in range(shard_cnt)]
+    for cls in sorted(classes, key=lambda c: (-estimates[c], test_class_name(c))):
+        i = min(range(shard_cnt), key=lambda i: (loads[i], i))
+        shards[i].append(cls)
+        loads[i] += estimates[cls]
+    return shards
+
+
+class _TimingResult(TestResult):
+    """
+    TestResult which records the duration and the outcome of each test
+    """
+
+    def __init__(self):
+        super(_TimingResult, self).__init__()
+        self.records = OrderedDict()
+        self._t0 = None
+
+    def startTest(self, test):
+        super(_TimingResult, self).startTest(test)
+        self._t0 = perf_counter()
+
+    def stopTest(self, test):
+        super(_TimingResult, self).stopTest(test)
+        tid = test.id()
+        status, msg = self.records.get(tid, ("ok", None))
+        self.records[tid] = (status, msg, perf_counter() - self._t0)
+
+    def _record(self, test, status, err):
+        self.records[test.id()] = (status, self._exc_info_to_string(err, test) if err else None)
+
+    def addError(self, test, err):
+        super(_TimingResult, self).addError(test, err)
+        if isinstance(test, TestCase):
+            self._record(test, "error", err)
+        else:
+            # error in setUpClass/tearDownClass
+            self.records[str(test)] = ("error", self._exc_info_to_string(err, test), 0.0)
+
+    def addFailure(self, test, err):
+        super(_TimingResult, self).addFailure(test, err)
+        self._record(test, "fail", err)
+
+    def addSkip(self, test, reason):
+        super(_TimingResult, self).addSkip(test, reason)
+        self.records[test.id()] = ("skip", reason)
+
+    def addExpectedFailure(self, test, err):
+        super(_TimingResult, self).addExpectedFailure(test, err)
+        self._record(test, "ok", None)
+
+    def addUnexpectedSuccess(self, test):
+        super(_TimingResult, self).addUnexpectedSuccess(test)
+        self.records[test.id()] = ("fail", "unexpected success")
+
+
+# tests of each test class, set before the worker processes are forked
+_WORKER_TESTS: List[List[TestCase]] = []
+
+
+def _run_test_class(i: int) -> Tuple[int, List[Tuple[str, str, Optional[str], float]], float]:
+    """
+    Run all tests of a single test class
+
+    :return: tuple (index of the class, list of (test id, status, message, duration), class duration)
+    """
+    t0 = perf_counter()
+    result = _TimingResult()
+    try:
+        TestSuite(_WORKER_TESTS[i]).run(result)
+    except Exception:
+        result.records[test_class_name(_WORKER_TESTS[i][0].__class__)] = (
+            "error", traceback.format_exc(), 0.0)
+    records = [(tid, *r) for tid, r in result.records.items()]
+    return i, records, perf_counter() - t0
+
+
+class ShardedTestRunner():
+    """
+    Runner which runs the test classes of the suite on a process pool,
+    the longest test classes first
+
+    :ivar ~.records: list of (test id, status, message, duration) from the last run
+    """
+
+    def __init__(self, cache: DurationCache, jobs: Optional[int]=None,
+                 shard: Tuple[int, int]=(0, 1), changed_only: bool=False,
+                 out=sys.stdout):
+        """
+        :param cache: cache of durations, updated after run
+        :param jobs: number of worker processes (None for the number of CPUs, 1 for serial run)
+        :param shard: tuple (0 based index, number of shards)
+        :param changed_only: run only the test classes with changed sources or failed tests
+        """
+        self.cache = cache
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        self.jobs = jobs
+        self.shard = shard
+        self.changed_only = changed_only
+        self.out = out
+        self.records = []
+
+    def select(self, suite) -> List[Tuple[Type[TestCase], List[TestCase]]]:
+        """
+        Select the test classes which should be executed (in the order of execution)
+        """
+        classes = group_tests_by_class(suite)
+        cache = self.cache
+        estimates = {cls: cache.estimate(tests) for cls, tests in classes.items()}
+
+        shard_i, shard_cnt = self.shard
+        selected = assign_shards(list(classes.keys()), estimates, shard_cnt)[shard_i]
+
+        if self.changed_only:
+            dep_cache = {}
+            _selected = []
+            for cls in selected:
+                deps = module_dependencies(cls.__module__, _cache=dep_cache)
+                changed = any(cache.module_hashes.get(m) != module_source_hash(m)
+                              for m in deps)
+                if changed or any(t.id() in cache.failed for t in classes[cls]):
+                    _selected.append(cls)
+            selected = _selected
+
+        # selected is already sorted by estimate (longest first)
+        return [(cls, classes[cls]) for cls in selected]
+
+    def run(self, suite) -> bool:
+        """
+        :return: True if all tests passed
+        """
+        global _WORKER_TESTS
+        selected = self.select(suite)
+        _WORKER_TESTS = [tests for _, tests in selected]
+        t0 = perf_counter()
+        results = []
+        if self.jobs > 1 and len(selected) > 1 and "fork" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("fork")
+            with ctx.Pool(min(self.jobs, len(selected))) as pool:
+                for r in pool.imap_unordered(_run_test_class, range(len(selected)), chunksize=1):
+                    self._report_class(selected, r)
+                    results.append(r)
+        else:
+            for i in range(len(selected)):
+                r = _run_test_class(i)
+                self._report_class(selected, r)
+                results.append(r)
+        _WORKER_TESTS = []
+        self.wall_time = perf_counter() - t0
+
+        self._update_cache(selected, results)
+        self.records = [rec for _, records, _ in results for rec in records]
+        return all(status in ("ok", "skip") for _, status, _, _ in self.records)
+
+    def _report_class(self, selected, result):
+        i, records, duration = result
+        cls = selected[i][0]
+        failed = sum(1 for _, status, _, _ in records if status in ("fail", "error"))
+        self.out.write(f"{test_class_name(cls):s} ({len(records):d} tests, {duration:.2f}s)"
+                       f" {'FAIL' if failed else 'ok'}\n")
+        self.out.flush()
+
+    def _update_cache(self, selected, results):
+        cache = self.cache
+        dep_cache = {}
+        for i, records, _ in results:
+            cls, tests = selected[i]
+            for tid, status, _, duration in records:
+                if status in ("fail", "error"):
+                    cache.failed.add(tid)
+                else:
+                    cache.failed.discard(tid)
+                if status != "skip":
+                    cache.durations[tid] = duration
+            for m in module_dependencies(cls.__module__, _cache=dep_cache):
+                h = module_source_hash(m)
+                if h is not None:
+                    cache.module_hashes[m] = h
+        cache.save()
+
+    def report(self, top: Optional[int]=None):
+        """
+        Write the failures and the table of test durations (longest first)
+
+        :param top: max number of rows in the table (None for all)
+        """
+        out = self.out
+        for tid, status, msg, _ in self.records:
+            if status in ("fail", "error"):
+                out.write("=" * 70)
+                out.write(f"\n{status.upper():s}: {tid:s}\n")
+                out.write("-" * 70)
+                out.write(f"\n{msg:s}\n")
+
+        records = sorted(self.records, key=lambda r: -r[3])
+        if top is not None:
+            records = records[:top]
+        out.write(f"\n{'duration [s]':>12s}  {'status':6s}  test\n")
+        for tid, status, _, duration in records:
+            out.write(f"{duration:12.3f}  {status:6s}  {tid:s}\n")
+
+        total = sum(r[3] for r in self.records)
+        failed = sum(1 for r in self.records if r[1] in ("fail", "error"))
+        out.write(f"\nRan {len(self.records):d} tests, {failed:d} failed,"
+                  f" total test time {total:.2f}s, wall time {self.wall_time:.2f}s\n")
+        out.flush()
+
+
+def main(argv=None, suite=None):
+    parser = argparse.ArgumentParser(description="Run the tests on a process pool, longest tests first")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of worker processes (default: number of CPUs)")
+    parser.add_argument("--shard", type=str, default="1/1",
+                        help="run only i-th of n shards of test classes, format i/n")
+    parser.add_argument("--cache", type=str, default=DEFAULT_CACHE_FILE,
+                        help="file with the durations of tests from previous runs")
+    parser.add_argument("--changed", action="store_true",
+                        help="run only the tests which sources changed or which failed since the last run")
+    parser.add_argument("--top", type=int, default=30,
+                        help="number of rows in the table of test durations (0 for all)")
+    args = parser.parse_args(argv)
+
+    if suite is None:
+        from hwtLib.tests.all import suite
+
+    runner = ShardedTestRunner(DurationCache(args.cache), jobs=args.jobs,
+                               shard=parse_shard(args.shard),
+                               changed_only=args.changed)
+    ok = runner.run(suite)
+    runner.report(top=args.top if args.top > 0 else None)
+    return ok
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
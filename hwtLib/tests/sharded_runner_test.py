@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import StringIO
+import os
+import tempfile
+from time import sleep
+import unittest
+from unittest import TestCase, TestSuite
+
+from hwtLib.tests.sharded_runner import DurationCache, ShardedTestRunner, \
+    assign_shards, parse_shard, group_tests_by_class, module_dependencies
+
+
+class _SlowTC(TestCase):
+    # executed only by ShardedRunnerTC
+    __test__ = False
+
+    def test_slow(self):
+        sleep(0.05)
+
+    def test_fast(self):
+        pass
+
+
+class _FastTC(TestCase):
+    __test__ = False
+
+    def test_fast(self):
+        pass
+
+
+class _FailingTC(TestCase):
+    __test__ = False
+
+    def test_fail(self):
+        self.assertEqual(0, 1)
+
+
+def _suite(*classes):
+    loader = unittest.TestLoader()
+    return TestSuite([loader.loadTestsFromTestCase(c) for c in classes])
+
+
+class ShardedRunnerTC(TestCase):
+
+    def setUp(self):
+        fd, self.cache_path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        os.remove(self.cache_path)
+
+    def tearDown(self):
+        if os.path.exists(self.cache_path):
+            os.remove(self.cache_path)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("1/1"), (0, 1))
+        self.assertEqual(parse_shard("3/4"), (2, 4))
+        for s in ["0/1", "2/1", "1", "a/b"]:
+            with self.assertRaises(ValueError):
+                parse_shard(s)
+
+    def test_assign_shards(self):
+        classes = [type(name, (TestCase,), {}) for name in ["a", "b", "c", "d", "e"]]
+        a, b, c, d, e = classes
+        estimates = {a: 10, b: 1, c: 5, d: 4, e: 1}
+        shards = assign_shards(classes, estimates, 2)
+        self.assertSequenceEqual(shards, [[a, e], [c, d, b]])
+
+    def test_run_and_cache(self, jobs=2):
+        suite = _suite(_FastTC, _SlowTC, _FailingTC)
+        out = StringIO()
+        r = ShardedTestRunner(DurationCache(self.cache_path), jobs=jobs, out=out)
+        self.assertFalse(r.run(suite))
+        r.report()
+        self.assertEqual(len(r.records), 4)
+        self.assertIn("FAIL: ", out.getvalue())
+
+        cache = DurationCache(self.cache_path)
+        slow_id = f"{_SlowTC.__module__:s}.{_SlowTC.__qualname__:s}.test_slow"
+        self.assertGreaterEqual(cache.durations[slow_id], 0.05)
+        self.assertEqual(len(cache.failed), 1)
+
+        # longest first according to the cache
+        r = ShardedTestRunner(cache, jobs=jobs, out=out)
+        selected = [cls for cls, _ in r.select(suite)]
+        self.assertIs(selected[0], _SlowTC)
+
+        # nothing changed, only the failing test should be executed again
+        r = ShardedTestRunner(cache, jobs=jobs, changed_only=True, out=out)
+        selected = [cls for cls, _ in r.select(suite)]
+        self.assertSequenceEqual(selected, [_FailingTC])
+
+    def test_run_serial(self):
+        self.test_run_and_cache(jobs=1)
+
+    def test_shards_cover_all(self):
+        suite = _suite(_FastTC, _SlowTC, _FailingTC)
+        cache = DurationCache(None)
+        selected = []
+        for i in range(2):
+            r = ShardedTestRunner(cache, shard=(i, 2))
+            selected.extend(cls for cls, _ in r.select(suite))
+        self.assertCountEqual(selected, group_tests_by_class(suite).keys())
+
+    def test_module_dependencies(self):
+        deps = module_dependencies(__name__)
+        self.assertIn("hwtLib.tests.sharded_runner", deps)
+        self.assertIn(__name__, deps)
+
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(ShardedRunnerTC('test_run_and_cache'))
+    suite.addTest(unittest.makeSuite(ShardedRunnerTC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
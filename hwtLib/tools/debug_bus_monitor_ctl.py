@@ -1,7 +1,11 @@
 import json
 from math import ceil
+import mmap
+import os
 import subprocess
 import sys
+import time
+from typing import Dict, List, Optional, Tuple
 
 
 def bit_mask(w):
@@ -21,6 +25,31 @@ def select_bit_range(val: int, bits_start: int, bits_len: int):
     return val & bit_mask(bits_len)
 
 
+def compile_name_memory(name_memory, path=()) -> List[Tuple[Tuple[str, ...], int, int]]:
+    """
+    Convert a name memory (a tree of dictionaries with [bit_offset, width] leafs)
+    to a flat list of fields
+
+    :return: list of tuples (path, bit_offset, width)
+    """
+    res = []
+    for k, v in name_memory.items():
+        p = (*path, k)
+        if isinstance(v, list):
+            bits_start, bits_len = v
+            res.append((p, bits_start, bits_len))
+        else:
+            res.extend(compile_name_memory(v, p))
+    return res
+
+
+def format_field_value(val: int, width: int):
+    if width == 1:
+        return f"{val:d}"
+    else:
+        return f"0x{val:x}"
+
+
 def words_to_int(words, word_size, size):
     end_bytes = size % word_size
     if end_bytes != 0:
@@ -45,6 +74,10 @@ class DebugBusMonitorCtl():
         self.addr = addr
         self.name_memory = None
         self.data_memory_size = None
+        # list of tuples (path, bit_offset, width), :see: :func:`~.compile_name_memory`
+        self.fields = None
+        # list of tuples (path_str, byte_start, byte_end, shift, mask)
+        self._field_decoders = None
 
     def load_name_memory(self):
         size = self.read_int(self.REG_NAME_MEMORY_SIZE, 4)
@@ -52,9 +85,31 @@ class DebugBusMonitorCtl():
         name_memory = self.read(offset, size)
         name_memory = (name_memory).decode("utf-8")
         name_memory = json.loads(name_memory)
-        data_width = self.get_data_memory_width(name_memory)
+        self.set_name_memory(name_memory)
+
+    def set_name_memory(self, name_memory):
+        """
+        Set the description of the data memory and precompile it to a flat list of fields
+        """
         self.name_memory = name_memory
+        fields = self.fields = compile_name_memory(name_memory)
+        data_width = max((off + w for _, off, w in fields), default=0)
         self.data_memory_size = ceil(data_width / 8)
+        self._field_decoders = [
+            (".".join(path), off // 8, ceil((off + w) / 8), off % 8, bit_mask(w))
+            for path, off, w in fields
+        ]
+        names = set()
+        for name, _, _, _, _ in self._field_decoders:
+            assert name not in names, ("Multiple fields with the same name in snapshot", name)
+            names.add(name)
+
+    def _require_fields(self):
+        if self.name_memory is None:
+            self.load_name_memory()
+        elif self.fields is None:
+            # name_memory was set directly
+            self.set_name_memory(self.name_memory)
 
     def get_data_memory_width(self, name_memory):
         if isinstance(name_memory, list):
@@ -79,31 +134,116 @@ class DebugBusMonitorCtl():
         for _ in range(indent):
             out.write("  ")
 
-    def _dump_txt(self, out, name_memory, data, indent):
+    def _dump_txt(self, out, name_memory, values, indent):
         for k, v in name_memory.items():
+            self._dump_txt_indent(out, indent)
+            out.write(k)
             if isinstance(v, list):
-                self._dump_txt_indent(out, indent)
-                out.write(k)
+                _, width = v
                 out.write(": ")
-                bits_start, bits_len = v
-                val = select_bit_range(data, bits_start, bits_len)
-                if bits_len == 1:
-                    out.write(f"{val:d}")
-                else:
-                    out.write(f"0x{val:x}")
+                out.write(format_field_value(next(values), width))
                 out.write("\n")
             else:
-                self._dump_txt_indent(out, indent)
-                out.write(k)
                 out.write(":\n")
-                self._dump_txt(out, v, data, indent + 1)
+                self._dump_txt(out, v, values, indent + 1)
 
     def dump_txt(self, out=sys.stdout):
-        if self.name_memory is None:
-            self.load_name_memory()
+        snapshot = self.snapshot()
+        # the fields in snapshot are in the order of name memory
+        self._dump_txt(out, self.name_memory, iter(snapshot.values()), 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Read the data memory and decode all fields
+
+        :return: dictionary {"path.to.field": value} (in the order of name memory)
+        :note: the uniqueness of the names is asserted in :meth:`~.set_name_memory`
+        """
+        self._require_fields()
+        data = self.read(self.REG_DATA_MEMORY, self.data_memory_size)
+        from_bytes = int.from_bytes
+        return {
+            name: (from_bytes(data[start:end], "little") >> shift) & m
+            for name, start, end, shift, m in self._field_decoders
+        }
+
+    @staticmethod
+    def diff(prev: Dict[str, int], cur: Dict[str, int]) -> Dict[str, Tuple[Optional[int], int]]:
+        """
+        :return: dictionary {"path.to.field": (prev value, current value)}
+            for the fields which value has changed
+        """
+        return {
+            k: (prev.get(k, None), v)
+            for k, v in cur.items()
+            if prev.get(k, None) != v
+        }
+
+    def _to_dict(self, name_memory, values):
+        res = {}
+        for k, v in name_memory.items():
+            if isinstance(v, list):
+                res[k] = next(values)
+            else:
+                res[k] = self._to_dict(v, values)
+        return res
+
+    def to_dict(self):
+        """
+        Read the data memory and decode it to a dictionary with the same structure as name memory
+        """
+        snapshot = self.snapshot()
+        return self._to_dict(self.name_memory, iter(snapshot.values()))
+
+    def _periodically(self, rate: float, count: Optional[int]):
+        period = 1.0 / rate
+        next_t = time.monotonic()
+        i = 0
+        while count is None or i < count:
+            yield i
+            i += 1
 
-        data = self.read_int(self.REG_DATA_MEMORY, self.data_memory_size)
-        self._dump_txt(out, self.name_memory, data, 0)
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # we are late, do not try to catch up
+                next_t = time.monotonic()
+
+    def poll(self, out=sys.stdout, rate: float=1000.0, count: int=None):
+        """
+        Periodically read the values of signals and write them to out as JSON lines
+        ({"time": <time.time()>, "data": <snapshot()>} per line)
+
+        :param rate: number of samples per second
+        :param count: number of samples (None for infinite)
+        """
+        for _ in self._periodically(rate, count):
+            t = time.time()
+            d = self.snapshot()
+            out.write(json.dumps({"time": t, "data": d}))
+            out.write("\n")
+        out.flush()
+
+    def watch(self, out=sys.stdout, rate: float=10.0, count: int=None):
+        """
+        Periodically read the values of signals and write only the fields which changed
+        (the first sample is written completely)
+
+        :param rate: number of samples per second
+        :param count: number of samples (None for infinite)
+        """
+        self._require_fields()
+        widths = {d[0]: w for d, (_, _, w) in zip(self._field_decoders, self.fields)}
+        prev = {}
+        for _ in self._periodically(rate, count):
+            t = time.time()
+            cur = self.snapshot()
+            for k, (_, v) in self.diff(prev, cur).items():
+                out.write(f"{t:.6f} {k:s}: {format_field_value(v, widths[k])}\n")
+            out.flush()
+            prev = cur
 
 
 class DebugBusMonitorCtlDevmem(DebugBusMonitorCtl):
@@ -126,6 +266,86 @@ class DebugBusMonitorCtlDevmem(DebugBusMonitorCtl):
         return words_to_int(words, word_size, size).to_bytes(size, "little")
 
 
+class DebugBusMonitorCtlMmap(DebugBusMonitorCtl):
+    """
+    DebugBusMonitorCtl which maps the address space from a file (/dev/mem, UIO device or a plain file)
+    and reads the data directly from the mapped memory
+
+    :note: The memory is mapped once and remapped only if there is an access outside of mapped region.
+    """
+
+    def __init__(self, addr, path="/dev/mem", size=None):
+        """
+        :param addr: base address of the component (offset in the file)
+        :param path: path to a file which should be mapped
+        :param size: size of the region to map, if None the size is resolved on first read
+        """
+        DebugBusMonitorCtl.__init__(self, addr)
+        self.path = path
+        flags = os.O_RDONLY
+        if hasattr(os, "O_SYNC"):
+            # to disable caching on /dev/mem
+            flags |= os.O_SYNC
+        self.fd = os.open(path, flags)
+        self.mm = None
+        # address of the first byte of the mapped region (aligned to ALLOCATIONGRANULARITY)
+        self.mm_addr = None
+        self.mm_size = 0
+        if size is not None:
+            self._map(self.addr, size)
+
+    def _map(self, addr, size):
+        if self.mm is not None:
+            self.mm.close()
+        align = mmap.ALLOCATIONGRANULARITY
+        mm_addr = addr - addr % align
+        mm_size = addr + size - mm_addr
+        mm_size = ceil(mm_size / mmap.PAGESIZE) * mmap.PAGESIZE
+        try:
+            mm = mmap.mmap(self.fd, mm_size, mmap.MAP_SHARED, mmap.PROT_READ, offset=mm_addr)
+        except ValueError:
+            # regular file which is smaller than a page
+            file_size = os.fstat(self.fd).st_size
+            if mm_addr + mm_size <= file_size:
+                raise
+            mm_size = file_size - mm_addr
+            mm = mmap.mmap(self.fd, mm_size, mmap.MAP_SHARED, mmap.PROT_READ, offset=mm_addr)
+
+        self.mm = mm
+        self.mm_addr = mm_addr
+        self.mm_size = mm_size
+
+    def read(self, addr, size):
+        addr += self.addr
+        if self.mm is None or addr < self.mm_addr or addr + size > self.mm_addr + self.mm_size:
+            # extend the region to contain the original region and the new one
+            if self.mm is not None:
+                start = min(addr, self.mm_addr)
+                end = max(addr + size, self.mm_addr + self.mm_size)
+                self._map(start, end - start)
+            else:
+                self._map(addr, size)
+        offset = addr - self.mm_addr
+        d = self.mm[offset:offset + size]
+        if len(d) != size:
+            raise ValueError("Read outside of the file", self.path, addr, size)
+        return d
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description='Dump a values from DebugBusMonitor instance.')
@@ -136,14 +356,33 @@ if __name__ == "__main__":
     parser.add_argument('--memory-desc', dest='mem_desc', default=None, type=str,
                         help='path to a file with a json specification of memory space of the signals')
 
+    parser.add_argument('--mmap', dest='mmap_file', default=None, type=str,
+                        help='map the memory from this file (e.g. /dev/mem or /dev/uioX) instead of using the devmem tool')
+    parser.add_argument('--poll', dest='poll_rate', default=None, type=float,
+                        help='periodically dump values as JSON lines with this rate [Hz]')
+    parser.add_argument('--watch', dest='watch_rate', default=None, type=float,
+                        help='periodically print only values which changed with this rate [Hz]')
+    parser.add_argument('--count', default=None, type=int,
+                        help='number of samples for --poll/--watch (infinite if not specified)')
+
     args = parser.parse_args()
-    db = DebugBusMonitorCtlDevmem(args.address)
-    db.devmem = args.devmem
+    if args.mmap_file:
+        db = DebugBusMonitorCtlMmap(args.address, args.mmap_file)
+    else:
+        db = DebugBusMonitorCtlDevmem(args.address)
+        db.devmem = args.devmem
+
     if args.mem_desc:
         with open(args.mem_desc) as fp:
             name_memory = json.load(fp)
-        data_width = db.get_data_memory_width(name_memory)
-        db.name_memory = name_memory
-        db.data_memory_size = ceil(data_width / 8)
+        db.set_name_memory(name_memory)
 
-    db.dump_txt(sys.stdout)
+    try:
+        if args.poll_rate is not None:
+            db.poll(sys.stdout, args.poll_rate, args.count)
+        elif args.watch_rate is not None:
+            db.watch(sys.stdout, args.watch_rate, args.count)
+        else:
+            db.dump_txt(sys.stdout)
+    except KeyboardInterrupt:
+        pass
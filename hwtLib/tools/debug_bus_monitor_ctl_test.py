@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import StringIO
+import json
+import os
+import tempfile
+import unittest
+
+from hwtLib.tools.debug_bus_monitor_ctl import DebugBusMonitorCtlMmap, \
+    DebugBusMonitorCtl, compile_name_memory
+
+
+NAME_MEMORY = {
+    "din0": {"data": [0, 8], "vld": [8, 1], "rd": [9, 1]},
+    "cntr": [10, 16],
+}
+
+NESTED_NAME_MEMORY = {
+    "a": {"b": {"x": [0, 3]}, "c": {"y": [3, 9]}, "z": [12, 1]},
+    "w": [13, 19],
+}
+
+
+def build_debug_bus_monitor_image(base_addr: int, name_memory: dict, data: int, data_size: int):
+    """
+    Create a memory image of the address space of DebugBusMonitor
+    (registers, data memory and name memory)
+    """
+    names = json.dumps(name_memory).encode("utf-8")
+    name_offset = 0x8 + data_size
+    img = bytearray(base_addr)
+    img += len(names).to_bytes(4, "little")
+    img += name_offset.to_bytes(4, "little")
+    img += data.to_bytes(data_size, "little")
+    img += names
+    return img
+
+
+class DebugBusMonitorCtlMmapTC(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        self.base_addr = 3 * 4096 + 16
+        self.data_offset = self.base_addr + 0x8
+        data = 0xabcd << 10 | 1 << 9 | 0x5a
+        img = build_debug_bus_monitor_image(self.base_addr, NAME_MEMORY, data, 4)
+        with os.fdopen(fd, "wb") as f:
+            f.write(img)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def update_data(self, data: int):
+        with open(self.path, "r+b") as f:
+            f.seek(self.data_offset)
+            f.write(data.to_bytes(4, "little"))
+
+    def test_dump_txt(self):
+        buff = StringIO()
+        with DebugBusMonitorCtlMmap(self.base_addr, self.path) as db:
+            db.dump_txt(buff)
+        self.assertEqual(buff.getvalue(), """\
+din0:
+  data: 0x5a
+  vld: 0
+  rd: 1
+cntr: 0xabcd
+""")
+
+    def test_live_update(self):
+        with DebugBusMonitorCtlMmap(self.base_addr, self.path) as db:
+            self.assertEqual(db.to_dict()["cntr"], 0xabcd)
+            self.update_data(0x1234 << 10 | 1 << 8)
+            d = db.to_dict()
+            self.assertDictEqual(d, {"din0": {"data": 0, "vld": 1, "rd": 0}, "cntr": 0x1234})
+
+    def test_poll(self):
+        buff = StringIO()
+        with DebugBusMonitorCtlMmap(self.base_addr, self.path) as db:
+            db.poll(buff, rate=1000, count=3)
+        lines = buff.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        t_prev = None
+        for line in lines:
+            d = json.loads(line)
+            self.assertEqual(d["data"]["cntr"], 0xabcd)
+            if t_prev is not None:
+                self.assertGreater(d["time"], t_prev)
+            t_prev = d["time"]
+
+    def test_read_outside(self):
+        with DebugBusMonitorCtlMmap(self.base_addr, self.path) as db:
+            with self.assertRaises(ValueError):
+                db.read(0, 1 << 20)
+
+    def test_snapshot_diff(self):
+        with DebugBusMonitorCtlMmap(self.base_addr, self.path) as db:
+            s0 = db.snapshot()
+            self.assertDictEqual(s0, {"din0.data": 0x5a, "din0.vld": 0, "din0.rd": 1, "cntr": 0xabcd})
+            self.assertSequenceEqual(list(s0.keys()), ["din0.data", "din0.vld", "din0.rd", "cntr"])
+            self.update_data(0xabcd << 10 | 1 << 8 | 0x5a)
+            s1 = db.snapshot()
+            self.assertDictEqual(DebugBusMonitorCtl.diff(s0, s1),
+                                 {"din0.vld": (0, 1), "din0.rd": (1, 0)})
+            self.assertDictEqual(DebugBusMonitorCtl.diff(s1, s1), {})
+
+    def test_watch(self):
+        buff = StringIO()
+        with DebugBusMonitorCtlMmap(self.base_addr, self.path) as db:
+            db.watch(buff, rate=1000, count=3)
+        lines = [line.split(" ", 1)[1] for line in buff.getvalue().splitlines()]
+        # only the first sample as nothing changed
+        self.assertSequenceEqual(lines, [
+            "din0.data: 0x5a",
+            "din0.vld: 0",
+            "din0.rd: 1",
+            "cntr: 0xabcd",
+        ])
+
+
+class DebugBusMonitorCtlBytes(DebugBusMonitorCtl):
+    """
+    DebugBusMonitorCtl with the data memory in bytes object
+    """
+
+    def read(self, addr, size):
+        assert addr == self.REG_DATA_MEMORY, addr
+        return self.data[:size]
+
+
+class DebugBusMonitorCtlNameMemoryTC(unittest.TestCase):
+
+    def test_compile_name_memory(self):
+        self.assertSequenceEqual(compile_name_memory(NESTED_NAME_MEMORY), [
+            (("a", "b", "x"), 0, 3),
+            (("a", "c", "y"), 3, 9),
+            (("a", "z"), 12, 1),
+            (("w",), 13, 19),
+        ])
+
+    def test_dump_txt_nested(self):
+        db = DebugBusMonitorCtlBytes(0)
+        db.data = (0x7ffff << 13 | 1 << 12 | 0x1ff << 3 | 0x5).to_bytes(4, "little")
+        db.name_memory = NESTED_NAME_MEMORY
+        buff = StringIO()
+        db.dump_txt(buff)
+        self.assertEqual(buff.getvalue(), """\
+a:
+  b:
+    x: 0x5
+  c:
+    y: 0x1ff
+  z: 1
+w: 0x7ffff
+""")
+        self.assertDictEqual(db.to_dict(), {
+            "a": {"b": {"x": 5}, "c": {"y": 0x1ff}, "z": 1},
+            "w": 0x7ffff})
+
+    def test_empty_group(self):
+        db = DebugBusMonitorCtlBytes(0)
+        db.data = (0x3 << 4 | 0x5).to_bytes(1, "little")
+        db.name_memory = {"a": {"x": [0, 4]}, "empty": {}, "b": {"c": {}, "y": [4, 2]}}
+        buff = StringIO()
+        db.dump_txt(buff)
+        self.assertEqual(buff.getvalue(), """\
+a:
+  x: 0x5
+empty:
+b:
+  c:
+  y: 0x3
+""")
+        self.assertDictEqual(db.to_dict(), {
+            "a": {"x": 5}, "empty": {}, "b": {"c": {}, "y": 3}})
+
+    def test_duplicate_snapshot_name(self):
+        db = DebugBusMonitorCtl(0)
+        with self.assertRaises(AssertionError):
+            db.set_name_memory({"a.b": [0, 1], "a": {"b": [1, 1]}})
+
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(DebugBusMonitorCtlMmapTC('test_poll'))
+    suite.addTest(unittest.makeSuite(DebugBusMonitorCtlMmapTC))
+    suite.addTest(unittest.makeSuite(DebugBusMonitorCtlNameMemoryTC))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
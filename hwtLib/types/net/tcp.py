@@ -0,0 +1,14 @@
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.struct import HStruct
+from hwtLib.types.ctypes import uint16_t, uint32_t
+from hwtLib.types.net.ip import l4port_t
+
+
+TCP_header_t = HStruct(
+    (l4port_t, "srcp"), (l4port_t, "dstp"),
+    (uint32_t, "seqNo"),
+    (uint32_t, "ackNo"),
+    (Bits(4), "dataOffset"), (Bits(3), "reserved"), (Bits(9), "flags"), (uint16_t, "window"),
+    (Bits(16), "checksum"), (uint16_t, "urgentPtr"),
+    name="TCP_header_t"
+    )